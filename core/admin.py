@@ -6,6 +6,10 @@ from core.models import (
     DataSource,
     DataSourceSupportedScope,
     FhirAuxResource,
+    FhirAuxSearchIndex,
+    FhirExportJob,
+    FhirImportJob,
+    FhirRefIndexJob,
     FhirSource,
     JheClient,
     JheSetting,
@@ -13,6 +17,8 @@ from core.models import (
     Observation,
     ObservationIdentifier,
     Organization,
+    OwIngestCheckpoint,
+    OwSyncJob,
     Patient,
     PatientIdentifier,
     PatientInvitation,
@@ -20,6 +26,7 @@ from core.models import (
     Practitioner,
     PractitionerClient,
     PractitionerOrganization,
+    PractitionerPatientAccess,
     Study,
     StudyClient,
     StudyDataSource,
@@ -169,6 +176,52 @@ class FhirAuxResourceAdmin(admin.ModelAdmin):
     raw_id_fields = ("fhir_source",)
 
 
+@admin.register(FhirAuxSearchIndex)
+class FhirAuxSearchIndexAdmin(admin.ModelAdmin):
+    list_display = ("id", "resource", "param", "system", "value", "date_low", "date_high")
+    search_fields = ("param", "value")
+    list_filter = ("param",)
+    raw_id_fields = ("resource",)
+
+
+@admin.register(FhirExportJob)
+class FhirExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "jhe_user", "level", "group_id", "status", "created", "last_updated")
+    search_fields = ("jhe_user__email",)
+    list_filter = ("level", "status")
+    raw_id_fields = ("jhe_user",)
+
+
+@admin.register(FhirImportJob)
+class FhirImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "jhe_user", "status", "total", "created", "finished")
+    search_fields = ("jhe_user__email",)
+    list_filter = ("status",)
+    raw_id_fields = ("jhe_user",)
+
+
+@admin.register(FhirRefIndexJob)
+class FhirRefIndexJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "fhir_source", "status", "rows_indexed", "refs_rewritten", "refs_not_found", "created")
+    search_fields = ("jhe_user__email",)
+    list_filter = ("status", "cross_source")
+    raw_id_fields = ("jhe_user", "fhir_source")
+
+
+@admin.register(OwIngestCheckpoint)
+class OwIngestCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("id", "ow_user_id", "prefix", "last_key", "last_updated")
+    search_fields = ("ow_user_id", "last_key")
+
+
+@admin.register(OwSyncJob)
+class OwSyncJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "jhe_user", "status", "files_processed", "observations_created", "created", "finished")
+    search_fields = ("jhe_user__email",)
+    list_filter = ("status",)
+    raw_id_fields = ("jhe_user",)
+
+
 @admin.register(PatientIdentifier)
 class PatientIdentifierAdmin(admin.ModelAdmin):
     list_display = ("id", "patient", "system", "value")
@@ -206,6 +259,13 @@ class PractitionerOrganizationAdmin(admin.ModelAdmin):
     raw_id_fields = ("practitioner", "organization")
 
 
+@admin.register(PractitionerPatientAccess)
+class PractitionerPatientAccessAdmin(admin.ModelAdmin):
+    list_display = ("id", "practitioner_user", "patient", "organization")
+    search_fields = ("practitioner_user__email", "patient__name_family", "organization__name")
+    raw_id_fields = ("practitioner_user", "patient", "organization")
+
+
 @admin.register(StudyPatient)
 class StudyPatientAdmin(admin.ModelAdmin):
     list_display = ("id", "study", "patient")
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
@@ -7,3 +8,8 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.signals  # noqa
+
+        if settings.FHIR_XVER_WARM_UP:
+            from core.fhir.cross_version import warm_up
+
+            warm_up()
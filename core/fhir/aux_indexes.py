@@ -0,0 +1,117 @@
+"""Postgres indexes backing the FhirAuxResource search params (see core/fhir/search.py).
+
+The aux query builder filters the opaque ``fhir_data`` JSONB body, which the table's only
+b-tree (``resource_type, fhir_source``) cannot help with. The indexes here are derived from
+fhir_config.json rather than declared on the model, so they follow the config:
+
+  * one ``jsonb_path_ops`` GIN on ``fhir_data`` -- serves the ``fhir_data @> ...`` containment
+    predicates every token/identifier/code param compiles to;
+  * per aux resource, one partial expression index (``WHERE resource_type = '<Type>'``) for each
+    distinct ``__search`` date expression and ``__sortDate`` expression -- the exact
+    ``COALESCE(fhir_data #>> ...)`` text the builder filters and sorts on.
+
+``manage.py fhir_aux_indexes`` creates (or ``--drop``s) them; ``create_aux_indexes`` is also run
+from a migration so a fresh database gets the indexes for the shipped config. Every statement is
+``IF NOT EXISTS`` / ``IF EXISTS``, so both are safe to re-run after the config changes.
+"""
+
+import hashlib
+
+from core.fhir.config import aux_resource_types, aux_search_params, aux_sort_date
+from core.fhir.search import date_expression
+
+AUX_TABLE = "core_fhirauxresource"
+GIN_INDEX_NAME = "fhiraux_fhir_data_path_ops"
+
+
+def _quote_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _text_array_literal(segments):
+    # A text[] literal ('{a,b}'); FHIR element names are plain identifiers, so no element quoting.
+    return _quote_literal("{" + ",".join(segments) + "}") + "::text[]"
+
+
+def _inline(sql, params):
+    # Index DDL cannot take bound parameters, so the (config-derived) path arrays are inlined.
+    return sql % tuple(_text_array_literal(param) for param in params)
+
+
+def _expression_index_name(resource_type, expression):
+    # Stable and well under Postgres' 63-char identifier limit.
+    digest = hashlib.sha1(f"{resource_type}:{expression}".encode()).hexdigest()[:10]
+    return f"fhiraux_{resource_type.lower()[:30]}_{digest}"
+
+
+def _date_path_sets(resource_type):
+    path_sets = []
+    for spec in aux_search_params(resource_type).values():
+        if spec.get("type") == "date":
+            paths = spec["path"] if isinstance(spec["path"], list) else [spec["path"]]
+            path_sets.append(tuple(paths))
+    sort_paths = aux_sort_date(resource_type)
+    if sort_paths:
+        path_sets.append(tuple(sort_paths))
+    return list(dict.fromkeys(path_sets))  # de-duplicated, declaration order
+
+
+def aux_index_definitions():
+    """Every ``(name, create_sql, drop_sql)`` the current config calls for, GIN first."""
+    definitions = [
+        (
+            GIN_INDEX_NAME,
+            f"CREATE INDEX {{concurrently}}IF NOT EXISTS {GIN_INDEX_NAME} ON {AUX_TABLE} "
+            "USING gin (fhir_data jsonb_path_ops)",
+            f"DROP INDEX {{concurrently}}IF EXISTS {GIN_INDEX_NAME}",
+        )
+    ]
+    for resource_type in sorted(aux_resource_types()):
+        for paths in _date_path_sets(resource_type):
+            expression = _inline(*date_expression(list(paths)))
+            name = _expression_index_name(resource_type, expression)
+            definitions.append(
+                (
+                    name,
+                    f"CREATE INDEX {{concurrently}}IF NOT EXISTS {name} ON {AUX_TABLE} (({expression})) "
+                    f"WHERE resource_type = {_quote_literal(resource_type)}",
+                    f"DROP INDEX {{concurrently}}IF EXISTS {name}",
+                )
+            )
+    return definitions
+
+
+def render_statement(statement, concurrently=False):
+    """Fill an index definition's ``{concurrently}`` slot."""
+    # CONCURRENTLY avoids locking writes on a large table, but cannot run inside a transaction.
+    return statement.replace("{concurrently}", "CONCURRENTLY " if concurrently else "")
+
+
+def _execute(connection, statements, concurrently):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(render_statement(statement, concurrently))
+
+
+def create_aux_indexes(connection, concurrently=False):
+    """Create any missing aux search indexes; returns their names."""
+    definitions = aux_index_definitions()
+    _execute(connection, [create for _, create, _ in definitions], concurrently)
+    return [name for name, _, _ in definitions]
+
+
+def drop_aux_indexes(connection, concurrently=False):
+    """Drop the aux search indexes the current config calls for; returns their names."""
+    definitions = aux_index_definitions()
+    _execute(connection, [drop for _, _, drop in definitions], concurrently)
+    return [name for name, _, _ in definitions]
+
+
+def create_aux_indexes_migration(apps, schema_editor):
+    """``RunPython`` forward helper (a migration's indexes match the config it ran against)."""
+    create_aux_indexes(schema_editor.connection)
+
+
+def drop_aux_indexes_migration(apps, schema_editor):
+    """``RunPython`` reverse helper for :func:`create_aux_indexes_migration`."""
+    drop_aux_indexes(schema_editor.connection)
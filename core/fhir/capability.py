@@ -0,0 +1,69 @@
+"""The server's FHIR CapabilityStatement (``GET FHIR/<version>/metadata``), derived from the config.
+
+Lists every supported resource type with the interactions and ``__search`` params fhir_config.json
+declares for its mapped and/or auxiliary store, so a client can discover -- rather than assume --
+which searches the server evaluates itself (the MCP server uses it to push ``date`` filters down).
+"""
+
+from django.utils import timezone
+
+from core.fhir.config import (
+    FHIR_VERSION,
+    aux_interactions,
+    aux_search_params,
+    mapped_interactions,
+    mapped_search_params,
+    supported_resource_types,
+)
+
+_FHIR_VERSIONS = {"R4": "4.0.1", "R5": "5.0.0"}
+
+# Search params every resource accepts (handled upstream of the per-resource ``__search`` blocks).
+_COMMON_SEARCH_PARAMS = {"_id": "token", "_lastUpdated": "date", "_source": "uri"}
+
+# Type-level operations beyond the config's interactions (see core/views/fhir_operations.py).
+_OPERATIONS = {"Observation": ["stats", "lastn"]}
+
+# ``__search`` value types that are not FHIR search param types are advertised as the type they match.
+_SEARCH_PARAM_TYPES = {"identifier": "token", "code": "token", "const": "token"}
+
+
+def _interaction_code(interaction):
+    return "search-type" if interaction == "search" else interaction
+
+
+def _resource_entry(resource_type):
+    interactions = mapped_interactions(resource_type) | aux_interactions(resource_type)
+    params = dict(_COMMON_SEARCH_PARAMS)
+    for name, spec in {**aux_search_params(resource_type), **mapped_search_params(resource_type)}.items():
+        params[name] = _SEARCH_PARAM_TYPES.get(spec.get("type"), spec.get("type"))
+    entry = {
+        "type": resource_type,
+        "interaction": [{"code": _interaction_code(interaction)} for interaction in sorted(interactions)],
+    }
+    if "search" in interactions:
+        entry["searchParam"] = [{"name": name, "type": ptype} for name, ptype in params.items()]
+    if resource_type in _OPERATIONS:
+        entry["operation"] = [
+            {"name": name, "definition": f"http://hl7.org/fhir/OperationDefinition/{resource_type}-{name}"}
+            for name in _OPERATIONS[resource_type]
+        ]
+    return entry
+
+
+def capability_statement():
+    """The CapabilityStatement resource for this server's FHIR endpoint."""
+    return {
+        "resourceType": "CapabilityStatement",
+        "status": "active",
+        "date": timezone.now().isoformat(),
+        "kind": "instance",
+        "fhirVersion": _FHIR_VERSIONS.get(FHIR_VERSION, FHIR_VERSION),
+        "format": ["json"],
+        "rest": [
+            {
+                "mode": "server",
+                "resource": [_resource_entry(resource_type) for resource_type in supported_resource_types()],
+            }
+        ],
+    }
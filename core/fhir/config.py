@@ -100,8 +100,9 @@ def ref_paths_for(resource_type):
     """The reference paths declared for an auxiliary resource type (issue #584).
 
     Each is a dotted path into the FHIR body ending at a ``reference`` string (e.g.
-    ``"subject.reference"``) that the index-refs pass rewrites from an upstream id to a JHE id.
-    Returns an empty list when none are declared.
+    ``"subject.reference"``) that the index-refs pass rewrites from an upstream id to a JHE id;
+    arrays along the path are unwrapped, so ``"result.reference"`` covers every
+    ``DiagnosticReport.result``. Returns an empty list when none are declared.
     """
     return _AUX_RESOURCES.get(resource_type, {}).get("__refPaths", [])
 
@@ -317,6 +318,38 @@ def _fhir_model_class(resource_type):
     return getattr(module, resource_type)
 
 
+@lru_cache(maxsize=512)
+def fhir_path_repeats(resource_type, path):
+    """Per-segment cardinality of a dotted element path, from the FHIR model (fhir.resources).
+
+    Returns a tuple of booleans -- True where that element repeats (is a JSON array in the body)
+    -- e.g. ``("Encounter", "type.coding")`` -> ``(True, True)``. Returns ``None`` when the path
+    cannot be resolved (unknown resource or element, or a step into a primitive), so callers fall
+    back to a shape-agnostic predicate.
+    """
+    from fhir.resources import get_fhir_model_class
+    from pydantic.v1.fields import SHAPE_SINGLETON
+
+    try:
+        model_cls = _fhir_model_class(resource_type)
+    except (ImportError, AttributeError):
+        return None
+    repeats = []
+    for segment in path.split("."):
+        if model_cls is None:
+            return None
+        field = next((f for f in model_cls.__fields__.values() if f.alias == segment), None)
+        if field is None:
+            return None
+        repeats.append(field.shape != SHAPE_SINGLETON)
+        element_type = getattr(field.type_, "__resource_type__", None)
+        try:
+            model_cls = get_fhir_model_class(element_type) if element_type else None
+        except KeyError:
+            model_cls = None
+    return tuple(repeats)
+
+
 def _validate_fhir_fields(resource_type, mapping):
     try:
         model_cls = _fhir_model_class(resource_type)
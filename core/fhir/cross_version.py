@@ -13,10 +13,20 @@ the called group's input ``mode``.
 
 Everything is best-effort: a rule that raises is logged and skipped rather than failing the whole
 conversion, and the result is validated as R5 downstream. See ``fhir-r4-import.md`` (repo root).
+
+Two executors share those semantics. ``_Interpreter`` walks the map JSON as-is and is kept as the
+reference. ``_Engine`` -- what :func:`transform_to_r5` uses -- compiles each group once, on first
+use, into a plan (``_GroupPlan`` / ``_RulePlan`` / ...) with the choice keys flattened, conditions
+parsed, and ``child_type`` / ``_target_key`` / ``is_list`` lookups memoized per model, and
+binds variables in chained ``_Scope`` s instead of copying the pools for every binding. Plans are
+cached per ``XVerMaps`` instance (see ``_plans_for``), so a bulk import compiles each resource
+type's groups once per process.
 """
 
+import functools
 import logging
 import re
+import time
 
 from .cross_version_maps import get_maps
 from .cross_version_type_index import child_type, has_field, is_list, model_for
@@ -32,8 +42,9 @@ class XVerError(Exception):
 
 
 class _Var:
-    """A bound FML variable: its dict/scalar ``value`` and the R5 model class of its type
-    (``model`` is ``None`` for primitives), plus the type name for choice-key flattening."""
+    """A bound FML variable: its dict/scalar ``value`` and the R5 model of its type (a type name,
+    see ``cross_version_type_index``; ``None`` for primitives), plus the type name for choice-key
+    flattening."""
 
     __slots__ = ("value", "model", "tname")
 
@@ -43,7 +54,13 @@ class _Var:
         self.tname = tname
 
 
-class _Engine:
+class _Interpreter:
+    """Reference executor: walks the StructureMap JSON directly on every call.
+
+    Production conversions go through the compiled :class:`_Engine`; this one is kept as the
+    behavioural reference the plans are checked against (tests, ``scripts/bench_cross_version.py``).
+    """
+
     def __init__(self, maps=None):
         self.maps = maps or get_maps()
 
@@ -182,7 +199,7 @@ class _Engine:
         if name == "DefaultMappingGroupAnonymousAlias":
             if first is None or first.model is None:
                 return  # primitive argument: value already copied by the create short-circuit.
-            type_name = first.model.__name__
+            type_name = first.model
             # Datatypes resolve to their type-default group; backbone elements (typeMode absent)
             # resolve by a group whose name matches the type (ObservationComponent, ...).
             group = self.maps.default_group_for(type_name) or self.maps.group_for(type_name)
@@ -265,7 +282,7 @@ def _target_key(target_model, element, source_var):
         return element, child_model
     tname = None
     if source_var is not None:
-        tname = source_var.model.__name__ if source_var.model is not None else source_var.tname
+        tname = source_var.model if source_var.model is not None else source_var.tname
     if not tname:
         return element, (source_var.model if source_var else None)
     key = element + tname[:1].upper() + tname[1:]
@@ -297,12 +314,408 @@ def _prune(value):
     return value
 
 
+# ---------------------------------------------------------------------------
+# Compiled execution plans
+# ---------------------------------------------------------------------------
+
+_UNRESOLVED = object()
+_PARAM_LITERAL_KEYS = ("valueString", "valueBoolean", "valueInteger", "valueDecimal", "valueUri")
+
+
+class _Scope:
+    """One level of a chained variable pool: a rule binding shadows its enclosing scope instead of
+    copying it (the interpreter's ``dict(svars)`` per binding)."""
+
+    __slots__ = ("vars", "parent")
+
+    def __init__(self, parent=None, variables=None):
+        self.vars = variables if variables is not None else {}
+        self.parent = parent
+
+    def get(self, name):
+        scope = self
+        while scope is not None:
+            var = scope.vars.get(name)
+            if var is not None:
+                return var
+            scope = scope.parent
+        return None
+
+
+class _ConditionPlan:
+    """A parsed ``<path> = 'literal'`` / ``<path> != 'literal'`` / ``<path> = <var>`` condition
+    (see ``_Interpreter._eval_condition``)."""
+
+    __slots__ = ("path", "head", "tail", "negate", "literal", "rhs")
+
+    def __init__(self, match):
+        lhs, op, rhs = match.groups()
+        self.path = lhs
+        self.head, self.tail = None, ()
+        if "." in lhs:
+            self.head, tail = lhs.split(".", 1)
+            self.tail = tuple(tail.split("."))
+        self.negate = op == "!="
+        self.literal = rhs.startswith("'") and rhs.endswith("'")
+        self.rhs = rhs[1:-1] if self.literal else rhs
+
+    def holds(self, svars, binding):
+        if self.head is not None:
+            var = svars.get(self.head)
+            left = var.value if var is not None else None
+            for part in self.tail:
+                left = left.get(part) if isinstance(left, dict) else None
+        else:
+            var = svars.get(self.path)
+            if var is not None:
+                left = var.value
+            elif isinstance(binding.value, dict):
+                left = binding.value.get(self.path)
+            else:
+                left = None
+        if self.literal:
+            right = self.rhs
+        else:
+            var = svars.get(self.rhs)
+            right = var.value if var is not None else self.rhs
+        return (left != right) if self.negate else (left == right)
+
+
+class _NeverHolds:
+    """Stands in for a condition the executor does not support: the rule is skipped."""
+
+    @staticmethod
+    def holds(svars, binding):
+        return False
+
+
+def _compile_condition(condition):
+    match = _CONDITION_RE.match(condition)
+    if not match:
+        logger.debug("cross_version: unsupported condition skipped: %s", condition)
+        return _NeverHolds
+    return _ConditionPlan(match)
+
+
+def _compile_param(param):
+    """``(is_variable, name_or_literal)`` for a target/dependent parameter."""
+    if "valueId" in param:
+        return True, param["valueId"]
+    for key in _PARAM_LITERAL_KEYS:
+        if key in param:
+            return False, param[key]
+    return False, None
+
+
+def _param_value(param, svars, tvars):
+    is_variable, value = param
+    if not is_variable:
+        return value
+    var = svars.get(value) or tvars.get(value)
+    return var.value if var is not None else None
+
+
+class _TargetPlan:
+    """One ``copy`` / ``translate`` / ``create`` target with its parameters pre-extracted.
+
+    ``keys`` memoizes ``(json_key, child_model, is_list)`` of a ``create`` per
+    ``(context model, source variable model, source type name)`` -- everything ``_target_key``
+    and ``is_list`` depend on.
+    """
+
+    __slots__ = ("context", "transform", "element", "params", "url", "variable", "error", "keys")
+
+    def __init__(self, target, transform):
+        self.context = target.get("context")
+        self.transform = transform
+        self.element = target.get("element")
+        self.variable = target.get("variable")
+        self.params = self.url = self.error = None
+        self.keys = {}
+        try:
+            if transform == "copy":
+                self.params = tuple(_compile_param(p) for p in target["parameter"])
+            elif transform == "translate":
+                params = target.get("parameter", [])
+                self.params = tuple(_compile_param(p) for p in params)
+                self.url = params[1].get("valueString") if len(params) > 1 else None
+        except Exception as exc:
+            # A malformed target fails when it runs (after the context check), as in the interpreter.
+            self.error = exc
+
+    def apply(self, maps, svars, tvars):
+        context = tvars.get(self.context)
+        if context is None or not isinstance(context.value, dict):
+            return
+        if self.error is not None:
+            raise self.error
+        element = self.element
+
+        if self.transform == "copy":
+            value = _param_value(self.params[0], svars, tvars)
+            if element is not None and value is not None:
+                context.value[element] = value
+            return
+
+        if self.transform == "translate":
+            code = _param_value(self.params[0], svars, tvars)
+            if element is not None and code is not None:
+                context.value[element] = maps.translate(self.url, code)
+            return
+
+        self._create(svars, tvars, context, element)
+
+    def _create(self, svars, tvars, context, element):
+        var_name = self.variable
+        source_var = svars.get(var_name) if var_name else None
+        if source_var is None:
+            memo_key = (context.model, False, None, None)
+        else:
+            memo_key = (context.model, True, source_var.model, source_var.tname)
+        resolved = self.keys.get(memo_key)
+        if resolved is None:
+            json_key, child_model = _target_key(context.model, element, source_var)
+            resolved = self.keys[memo_key] = (json_key, child_model, is_list(context.model, json_key))
+        json_key, child_model, listy = resolved
+
+        if source_var is not None and source_var.model is None and not isinstance(source_var.value, (dict, list)):
+            if listy:
+                context.value.setdefault(json_key, []).append(source_var.value)
+            else:
+                context.value[json_key] = source_var.value
+            if var_name:
+                tvars.vars[var_name] = _Var(source_var.value, None, source_var.tname)
+            return
+
+        new_obj = {}
+        if listy:
+            context.value.setdefault(json_key, []).append(new_obj)
+        else:
+            context.value[json_key] = new_obj
+        if var_name:
+            tvars.vars[var_name] = _Var(new_obj, child_model, getattr(source_var, "tname", None))
+
+
+def _compile_target(target):
+    transform = target.get("transform")
+    if transform in ("copy", "translate"):
+        return _TargetPlan(target, transform)
+    if transform in (None, "create") and target.get("element") is not None:
+        return _TargetPlan(target, "create")
+    return None  # ``evaluate`` and anything else: skipped, as in the interpreter.
+
+
+class _DependentPlan:
+    """A ``dependent`` group call. A named group is resolved on first call; the anonymous default
+    alias resolves by the runtime model of its first argument, memoized per model."""
+
+    __slots__ = ("anonymous", "name", "params", "group")
+
+    def __init__(self, dependent):
+        self.name = dependent.get("name")
+        self.anonymous = self.name == "DefaultMappingGroupAnonymousAlias"
+        self.params = tuple(param.get("valueId") for param in dependent.get("parameter", []))
+        self.group = _UNRESOLVED
+
+    def run(self, engine, svars, tvars, depth):
+        if self.anonymous:
+            first = svars.get(self.params[0]) if self.params else None
+            if first is None or first.model is None:
+                return
+            group = engine.plans.for_model(first.model)
+        else:
+            if self.group is _UNRESOLVED:
+                self.group = engine.plans.group(self.name)
+            group = self.group
+        if group is None:
+            return
+
+        args = []
+        for (_, is_source), vid in zip(group.inputs, self.params):
+            pool = svars if is_source else tvars
+            var = pool.get(vid)
+            if var is None:  # tolerate name reuse across pools
+                var = (tvars if is_source else svars).get(vid)
+            if var is None:
+                return
+            args.append(var)
+        if len(args) != len(group.inputs):
+            return
+        engine.run_group(group, args, depth + 1)
+
+
+class _RulePlan:
+    __slots__ = ("name", "context", "has_element", "key", "variable", "condition")
+    __slots__ += ("targets", "creates", "dependents", "children", "child_types")
+
+    def __init__(self, rule, source):
+        self.name = rule.get("name")
+        self.context = source.get("context")
+        self.has_element = source.get("element") is not None
+        self.key = _choice_key(source.get("element"), source.get("type")) if self.has_element else None
+        self.variable = source.get("variable") or None
+        self.condition = _compile_condition(source["condition"]) if source.get("condition") else None
+        self.targets = tuple(t for t in map(_compile_target, rule.get("target", [])) if t is not None)
+        # Only a ``create`` binds a target variable; without one the rule can share its parent's pool.
+        self.creates = any(t.transform == "create" for t in self.targets)
+        self.dependents = tuple(_DependentPlan(d) for d in rule.get("dependent", []))
+        self.children = _compile_rules(rule.get("rule", []))
+        self.child_types = {}  # context model -> child_type(model, key)
+
+    def run(self, engine, svars, tvars, depth):
+        context = svars.get(self.context)
+        if context is None or not isinstance(context.value, dict):
+            return
+        self.bind(engine, context, svars, tvars, depth)
+
+    def bind(self, engine, context, svars, tvars, depth):
+        if not self.has_element:
+            bindings = (context,)
+        else:
+            raw = context.value.get(self.key)
+            if raw is None:
+                return
+            resolved = self.child_types.get(context.model)
+            if resolved is None:
+                resolved = self.child_types[context.model] = child_type(context.model, self.key)
+            model, tname = resolved
+            if isinstance(raw, list):
+                bindings = [_Var(item, model, tname) for item in raw]
+            else:
+                bindings = (_Var(raw, model, tname),)
+
+        for binding in bindings:
+            local_s = _Scope(svars, {self.variable: binding}) if self.variable else svars
+            if self.condition is not None and not self.condition.holds(local_s, binding):
+                continue
+            local_t = _Scope(tvars) if self.creates else tvars
+            for target in self.targets:
+                target.apply(engine.maps, local_s, local_t)
+            for dependent in self.dependents:
+                dependent.run(engine, local_s, local_t, depth)
+            for child in self.children:
+                child.run(engine, local_s, local_t, depth)
+
+
+def _compile_rules(rules):
+    # A rule without a source does nothing (nor do its children).
+    return tuple(_RulePlan(rule, rule["source"][0]) for rule in rules if rule.get("source"))
+
+
+class _GroupPlan:
+    __slots__ = ("name", "inputs", "extends", "parent", "rules")
+
+    def __init__(self, group):
+        self.name = group.get("name")
+        self.inputs = tuple((spec["name"], spec.get("mode") == "source") for spec in group.get("input", []))
+        self.extends = group.get("extends")
+        self.parent = _UNRESOLVED
+        self.rules = _compile_rules(group.get("rule", []))
+
+
+class _Plans:
+    """The compiled groups of one ``XVerMaps``, built lazily and shared by every conversion."""
+
+    def __init__(self, maps):
+        self.maps = maps
+        self._compiled = {}  # id(group dict) -> _GroupPlan
+        self._by_model = {}  # model -> _GroupPlan of the anonymous default alias
+
+    def compile(self, group):
+        if group is None:
+            return None
+        plan = self._compiled.get(id(group))
+        if plan is None:
+            plan = self._compiled[id(group)] = _GroupPlan(group)
+        return plan
+
+    def group(self, name):
+        return self.compile(self.maps.group_for(name))
+
+    def for_model(self, model):
+        try:
+            return self._by_model[model]
+        except KeyError:
+            # Datatypes resolve to their type-default group; backbone elements by the type's name.
+            plan = self._by_model[model] = self.compile(
+                self.maps.default_group_for(model) or self.maps.group_for(model)
+            )
+            return plan
+
+    def parent_of(self, plan):
+        if plan.parent is _UNRESOLVED:
+            plan.parent = self.group(plan.extends) if plan.extends else None
+        return plan.parent
+
+
+@functools.lru_cache(maxsize=4)
+def _plans_for(maps):
+    return _Plans(maps)
+
+
+class _Engine:
+    """Executes compiled group plans; same results as :class:`_Interpreter`."""
+
+    def __init__(self, maps=None):
+        self.maps = maps or get_maps()
+        self.plans = _plans_for(self.maps)
+
+    def transform(self, resource_type, r4_body):
+        group = self.plans.group(resource_type)
+        if group is None:
+            raise XVerError(f"No R4->R5 StructureMap for resource type {resource_type!r}")
+        model = model_for(resource_type)
+        src = _Var(dict(r4_body), model, resource_type)
+        tgt = _Var({}, model, resource_type)
+        self.run_group(group, [src, tgt], depth=0)
+        result = _prune(tgt.value)
+        result["resourceType"] = resource_type
+        return result
+
+    def run_group(self, plan, args, depth):
+        if depth > _MAX_DEPTH:
+            logger.warning("cross_version: recursion guard hit at group %s", plan.name)
+            return
+        svars, tvars = _Scope(), _Scope()
+        for (name, is_source), var in zip(plan.inputs, args):
+            (svars if is_source else tvars).vars[name] = var
+
+        parent = self.plans.parent_of(plan)
+        if parent is not None:
+            self.run_group(parent, args, depth + 1)
+
+        inputs = svars.vars
+        for rule in plan.rules:
+            # Most rules select an element the body does not have: skip those without a call.
+            context = inputs.get(rule.context)
+            if context is None or not isinstance(context.value, dict):
+                continue
+            if rule.has_element and context.value.get(rule.key) is None:
+                continue
+            try:
+                rule.bind(self, context, svars, tvars, depth)
+            except Exception as exc:  # best-effort: drop this field, keep converting.
+                logger.debug("cross_version: dropped rule %s in %s: %s", rule.name, plan.name, exc)
+
+
 def transform_to_r5(resource_type, r4_body):
     """Convert an R4 FHIR resource (camelCased dict) to R5. Raises :class:`XVerError` if no map
     exists for ``resource_type``."""
     return _Engine().transform(resource_type, r4_body)
 
 
+def warm_up():
+    """Load the maps and type index and compile every group's plan now, so a process's first R4
+    import does not pay for it (``CoreConfig.ready`` when ``settings.FHIR_XVER_WARM_UP``)."""
+    start = time.perf_counter()
+    engine = _Engine()
+    for group in engine.maps.groups.values():
+        engine.plans.compile(group)
+    logger.info(
+        "cross_version: warmed up %d groups in %.0f ms", len(engine.maps.groups), (time.perf_counter() - start) * 1000
+    )
+
+
 # ---------------------------------------------------------------------------
 # Data-loss detection
 # ---------------------------------------------------------------------------
@@ -0,0 +1,99 @@
+"""The prebuilt index for the R4 -> R5 engine: everything it otherwise derives at first use.
+
+Without it, the first R4 import in each process introspects the ``fhir.resources`` models
+(importing the package's modules) and parses the StructureMap / ConceptMap JSON of the
+cross-version package -- a multi-second cold path on every worker start. ``manage.py
+build_cross_version_index`` (run in the Docker build) writes both, precomputed, to one
+``marshal`` file at ``settings.FHIR_XVER_INDEX_PATH``:
+
+- ``types``: per R5 model, ``json_key -> (child model name or None, type name, is_list)``
+  (``cross_version_type_index``), each table encoded separately and decoded on first use of that
+  type (``type_table``), so loading the index does not materialize all ~840 of them;
+- ``maps``: the StructureMap groups, the type-default groups and the ConceptMap tables
+  (``cross_version_maps.XVerMaps``).
+
+The file is only used when its fingerprint -- index format, Python version (the ``marshal``
+format is version-specific), installed ``fhir.resources`` version, and a hash of the
+cross-version package files -- matches the running process; otherwise it is ignored and the
+engine derives everything lazily as before.
+"""
+
+import functools
+import glob
+import hashlib
+import logging
+import marshal
+import os
+import sys
+from importlib import metadata
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+
+
+def index_path():
+    return settings.FHIR_XVER_INDEX_PATH
+
+
+def package_dir():
+    return getattr(
+        settings,
+        "FHIR_XVER_PACKAGE_DIR",
+        os.path.join(settings.BASE_DIR, "data", "fhir", "fhir-cross-version-package"),
+    )
+
+
+def fingerprint(directory=None):
+    """What the index was derived from; an index whose fingerprint differs is stale."""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(directory or package_dir(), "*.json"))):
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as handle:
+            digest.update(handle.read())
+    return {
+        "format": INDEX_FORMAT,
+        "python": list(sys.version_info[:2]),
+        "fhir.resources": metadata.version("fhir.resources"),
+        "package": digest.hexdigest(),
+    }
+
+
+def write_index(types, maps, path=None):
+    """Write the index for ``types`` (``build_type_table()``) and ``maps`` (``XVerMaps.to_index()``)."""
+    path = path or index_path()
+    encoded = {type_name: marshal.dumps(table) for type_name, table in types.items()}
+    data = marshal.dumps({"fingerprint": fingerprint(), "types": encoded, "maps": maps})
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp, path)  # atomic: a starting worker never reads a half-written file
+    load_index.cache_clear()
+    return len(data)
+
+
+@functools.lru_cache(maxsize=1)
+def load_index():
+    """The prebuilt index, or ``None`` when it is missing, unreadable or stale (loaded once per process)."""
+    path = index_path()
+    try:
+        with open(path, "rb") as handle:
+            # One read + loads: ``marshal.load`` on a file object reads it a few bytes at a time.
+            index = marshal.loads(handle.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError) as exc:
+        logger.warning("cross_version: ignoring unreadable index %s: %s", path, exc)
+        return None
+    if not isinstance(index, dict) or index.get("fingerprint") != fingerprint():
+        logger.warning("cross_version: ignoring stale index %s; rerun manage.py build_cross_version_index", path)
+        return None
+    return index
+
+
+def type_table(index, type_name):
+    """The field table of ``type_name`` from a loaded index, or ``None`` if it is not a model."""
+    encoded = index["types"].get(type_name)
+    return marshal.loads(encoded) if encoded is not None else None
@@ -2,6 +2,8 @@
 registries used by the engine. See ``fhir-r4-import.md`` (repo root).
 
 Only ``*4to5`` StructureMaps are loaded (the R4B ``*4Bto5`` variants are deliberately skipped).
+When the prebuilt index (``cross_version_index``) is current, the registries come from it instead
+of the package JSON.
 """
 
 import functools
@@ -11,7 +13,7 @@ import logging
 import os
 import re
 
-from django.conf import settings
+from . import cross_version_index
 
 logger = logging.getLogger(__name__)
 
@@ -23,14 +25,6 @@ _DEFAULT_TYPE_MODES = {"type", "type-and-types", "type-and-default"}
 _VERSION_SUFFIX = re.compile(r"(R4B|R4|R5|R3|R2)$")
 
 
-def _package_dir():
-    return getattr(
-        settings,
-        "FHIR_XVER_PACKAGE_DIR",
-        os.path.join(settings.BASE_DIR, "data", "fhir", "fhir-cross-version-package"),
-    )
-
-
 def _base_type(type_name):
     """``CodeableConceptR4`` -> ``CodeableConcept`` (strip the version suffix)."""
     if not type_name:
@@ -41,13 +35,22 @@ def _base_type(type_name):
 class XVerMaps:
     """Group and ConceptMap registries loaded from the cross-version package directory."""
 
-    def __init__(self, package_dir=None):
-        self.package_dir = package_dir or _package_dir()
+    def __init__(self, package_dir=None, index=None):
+        self.package_dir = package_dir or cross_version_index.package_dir()
         self.groups = {}  # group name -> group dict
         self.default_groups = {}  # source base type name -> group dict (typeMode type*)
         self.conceptmaps = {}  # ConceptMap url -> {source_code: target_code}
         self._missing_conceptmaps = set()
-        self._load()
+        if index is not None:
+            self.groups = index["groups"]
+            self.default_groups = index["default_groups"]
+            self.conceptmaps = index["conceptmaps"]
+        else:
+            self._load()
+
+    def to_index(self):
+        """The registries as stored in the prebuilt index (see ``cross_version_index``)."""
+        return {"groups": self.groups, "default_groups": self.default_groups, "conceptmaps": self.conceptmaps}
 
     def _load(self):
         for path in sorted(glob.glob(os.path.join(self.package_dir, "StructureMap-*4to5.json"))):
@@ -117,5 +120,6 @@ class XVerMaps:
 
 @functools.lru_cache(maxsize=1)
 def get_maps():
-    """Process-wide singleton (loaded once, then cached)."""
-    return XVerMaps()
+    """Process-wide singleton (loaded once, then cached): from the prebuilt index when current."""
+    index = cross_version_index.load_index()
+    return XVerMaps(index=index["maps"]) if index is not None else XVerMaps()
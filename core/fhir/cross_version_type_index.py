@@ -7,7 +7,7 @@ do not carry that type, so we recover it by introspecting the R5 ``fhir.resource
 classes:
 
 - a field annotation whose class name ends in ``Type`` (e.g. ``CodeableConceptType``) is a
-  **complex** type; its model class is the annotation name minus the ``Type`` suffix
+  **complex** type; its model is the annotation name minus the ``Type`` suffix
   (``CodeableConcept``), looked up in the model registry;
 - any other annotation (``Code``, ``String``, ``DateTime`` ...) is a **primitive** -- the engine
   copies its scalar value directly instead of recursing into a datatype group.
@@ -16,41 +16,28 @@ Choice elements (``value[x]``) are already flattened in FHIR JSON (``valueQuanti
 flattened key is looked up directly. Introspecting the *R5* model for an *R4* body assumes the
 two shapes agree for the element; where they do not, the field resolves to ``None`` and is
 handled as a primitive/passthrough (a documented lossy edge).
+
+A model is identified by its **type name** (``"CodeableConcept"``), and what the engine needs of
+it is a field table: ``json_key -> (child model name or None, type name, is_list)``. The tables
+come from the prebuilt index (``manage.py build_cross_version_index``, see
+``cross_version_index``) when one is present and current, so a worker never imports
+``fhir.resources`` for the engine at all; otherwise each type's table is introspected on first
+use, importing only that type's ``fhir.resources`` module.
 """
 
 import functools
-import importlib
-import pkgutil
 import typing
 
-import fhir.resources as _fr
-from fhir.resources.core.fhirabstractmodel import FHIRAbstractModel
+from .cross_version_index import load_index, type_table
 
 
 @functools.lru_cache(maxsize=1)
-def _registry():
-    """All ``fhir.resources`` model classes keyed by class name (resources + datatypes +
-    backbone elements). Built once by walking the package."""
-    reg = {}
-    for module_info in pkgutil.iter_modules(_fr.__path__):
-        if module_info.name in ("core", "fhirtypes", "fhirtypesvalidators"):
-            continue
-        try:
-            module = importlib.import_module(f"fhir.resources.{module_info.name}")
-        except Exception:
-            continue
-        for attr in dir(module):
-            obj = getattr(module, attr)
-            if isinstance(obj, type) and issubclass(obj, FHIRAbstractModel):
-                reg.setdefault(obj.__name__, obj)
-    return reg
+def _model_classes():
+    """``fhir.resources``' own name -> (class, module) registry (resources + datatypes + backbone
+    elements); classes are imported on demand by ``get_fhir_model_class``."""
+    from fhir.resources.fhirtypesvalidators import MODEL_CLASSES
 
-
-def model_for(type_name):
-    """R5 model class for a FHIR type/resource name, or ``None`` if unknown (a primitive)."""
-    if not type_name:
-        return None
-    return _registry().get(type_name)
+    return MODEL_CLASSES
 
 
 def _innermost(annotation):
@@ -65,44 +52,85 @@ def _innermost(annotation):
     return annotation
 
 
-def _field(parent_cls, json_key):
-    if parent_cls is None:
+def _contains_list(annotation):
+    if typing.get_origin(annotation) is list:
+        return True
+    return any(_contains_list(arg) for arg in typing.get_args(annotation))
+
+
+def _introspect(type_name):
+    """Field table of one model, read off its ``fhir.resources`` class."""
+    from fhir.resources.fhirtypesvalidators import get_fhir_model_class
+
+    table = {}
+    for json_key, field in get_fhir_model_class(type_name).__fields__.items():
+        name = getattr(_innermost(field.annotation), "__name__", None)
+        if name and name.endswith("Type"):
+            base = name[:-4]
+            child = base if base in _model_classes() else None
+            table[json_key] = (child, base, _contains_list(field.annotation))
+        else:
+            table[json_key] = (None, name, _contains_list(field.annotation))
+    return table
+
+
+def build_type_table():
+    """Field tables of every model (what the prebuilt index stores). Imports all of ``fhir.resources``."""
+    return {type_name: _introspect(type_name) for type_name in _model_classes()}
+
+
+_tables = {}  # type name -> field table, filled on first use
+
+
+def _fields(type_name):
+    table = _tables.get(type_name)
+    if table is None:
+        index = load_index()
+        if index is not None:
+            table = type_table(index, type_name)
+        elif type_name in _model_classes():
+            table = _introspect(type_name)
+        if table is None:
+            return None
+        _tables[type_name] = table
+    return table
+
+
+def model_for(type_name):
+    """The R5 model (its type name) for a FHIR type/resource name, or ``None`` if unknown (a primitive)."""
+    if not type_name:
         return None
-    return getattr(parent_cls, "__fields__", {}).get(json_key)
+    index = load_index()
+    known = index["types"] if index is not None else _model_classes()
+    return type_name if type_name in known else None
 
 
-def has_field(parent_cls, json_key):
-    """Does ``parent_cls`` declare ``json_key`` directly (i.e. it is not a flattened choice)?"""
-    return _field(parent_cls, json_key) is not None
+def _field(model, json_key):
+    if model is None:
+        return None
+    table = _fields(model)
+    return table.get(json_key) if table is not None else None
+
 
+def has_field(model, json_key):
+    """Does ``model`` declare ``json_key`` directly (i.e. it is not a flattened choice)?"""
+    return _field(model, json_key) is not None
 
-def child_type(parent_cls, json_key):
-    """``(model_cls_or_None, type_name)`` for ``parent_cls.<json_key>``.
 
-    ``model_cls`` is ``None`` for a primitive-typed child (copy the scalar) or an unknown field.
+def child_type(model, json_key):
+    """``(model_or_None, type_name)`` for ``model.<json_key>``.
+
+    The child model is ``None`` for a primitive-typed child (copy the scalar) or an unknown field.
     ``type_name`` is the complex model name (``CodeableConcept``) or the primitive annotation name
     (``DateTime``); ``None`` when the field is unknown.
     """
-    field = _field(parent_cls, json_key)
+    field = _field(model, json_key)
     if field is None:
         return None, None
-    inner = _innermost(field.annotation)
-    name = getattr(inner, "__name__", None)
-    if name and name.endswith("Type"):
-        base = name[:-4]
-        return model_for(base), base
-    return None, name
-
-
-def _contains_list(annotation):
-    if typing.get_origin(annotation) is list:
-        return True
-    return any(_contains_list(arg) for arg in typing.get_args(annotation))
+    return field[0], field[1]
 
 
-def is_list(parent_cls, json_key):
-    """Is ``parent_cls.<json_key>`` a repeating (list) element?"""
-    field = _field(parent_cls, json_key)
-    if field is None:
-        return False
-    return _contains_list(field.annotation)
+def is_list(model, json_key):
+    """Is ``model.<json_key>`` a repeating (list) element?"""
+    field = _field(model, json_key)
+    return field is not None and field[2]
@@ -184,6 +184,10 @@ def render_resource(instance, source_model, mapping):
     ``source_model`` is the Django model class name the mapping's paths are prefixed with
     (e.g. ``"DataSource"`` for a Device, ``"Patient"`` for a Patient); a token whose first
     dotted segment equals it is resolved against the instance, otherwise it is a literal.
+
+    This walks (interprets) the mapping tree on every call. ``build_fhir_resource`` runs the
+    equivalent compiled plan instead (see ``compile_mapping``); this stays the reference
+    implementation the plan is checked against.
     """
     rendered = {}
     for key, node in mapping.items():
@@ -195,6 +199,130 @@ def render_resource(instance, source_model, mapping):
     return rendered
 
 
+# ---------------------------------------------------------------------------
+# Compiled plans
+# ---------------------------------------------------------------------------
+#
+# ``_render`` re-parses the mapping for every instance: it re-splits each expression on "+",
+# re-classifies each token and re-walks every dict child with ``_contains_path``. None of that
+# depends on the instance, so ``compile_mapping`` does it once and returns a plan -- a tree of
+# closures over pre-extracted literals, pre-split attribute paths and precomputed path-presence
+# flags -- that renders exactly what ``render_resource`` would.
+
+
+def _compile_token(token, source_model):
+    """Compile one operand to ``(is_path, value)``: attribute parts for a path, else the literal."""
+    token = token.strip()
+    if _is_literal_token(token):
+        return False, token[1:-1]
+    parts = token.split(".")
+    if parts[0] == source_model:
+        return True, tuple(parts[1:])
+    return False, token  # bare literal (lenient fallback)
+
+
+def _resolve_parts(instance, parts):
+    current = instance
+    for part in parts:
+        if current is None:
+            return _MISSING
+        current = getattr(current, part, _MISSING)
+        if current is _MISSING:
+            return _MISSING
+    return _materialize(current)
+
+
+def _compile_string(expr, source_model):
+    operands = [_compile_token(token, source_model) for token in expr.split("+")]
+    if len(operands) == 1:
+        is_path, value = operands[0]
+        if is_path:
+            return lambda instance: _resolve_parts(instance, value)
+        return lambda instance: value
+
+    def concat(instance):
+        # Every operand is stringified; a missing path voids the whole expr.
+        pieces = []
+        for is_path, value in operands:
+            if is_path:
+                value = _resolve_parts(instance, value)
+                if _is_empty(value):
+                    return _MISSING
+            elif _is_empty(value):
+                return _MISSING
+            pieces.append(str(value))
+        return "".join(pieces)
+
+    return concat
+
+
+def _compile_node(node, source_model):
+    if isinstance(node, str):
+        return _compile_string(node, source_model)
+    if isinstance(node, list):
+        items = [_compile_node(item, source_model) for item in node]
+
+        def render_list(instance):
+            rendered = [item(instance) for item in items]
+            return [value for value in rendered if not _is_empty(value)]
+
+        return render_list
+    if isinstance(node, dict):
+        children = [
+            (key, _compile_node(child, source_model), _contains_path(child, source_model))
+            for key, child in node.items()
+            if not _is_annotation(key)
+        ]
+        has_path = any(child_is_path for _, _, child_is_path in children)
+
+        def render_dict(instance):
+            out = {}
+            has_resolved_path = False
+            for key, render_child, child_is_path in children:
+                rendered = render_child(instance)
+                if not _is_empty(rendered):
+                    out[key] = rendered
+                    if child_is_path:
+                        has_resolved_path = True
+            # Dropped when it references DB paths but resolved none of them (see _render).
+            if has_path and not has_resolved_path:
+                return _MISSING
+            return out
+
+        return render_dict
+    return lambda instance: node  # literal scalar (number, bool)
+
+
+def compile_mapping(mapping, source_model):
+    """Compile a resource mapping into a plan: ``plan(instance)`` -> the ``render_resource`` dict."""
+    fields = [(key, _compile_node(node, source_model)) for key, node in mapping.items() if not _is_annotation(key)]
+
+    def plan(instance):
+        rendered = {}
+        for key, render_field in fields:
+            value = render_field(instance)
+            if not _is_empty(value):
+                rendered[key] = value
+        return rendered
+
+    return plan
+
+
+# Plans keyed by (id(mapping), source_model). The mapping itself is kept alongside its plan so
+# the id cannot be reused by another dict while the entry lives; config mappings are static.
+_PLANS = {}
+
+
+def get_compiled_plan(mapping, source_model):
+    """The cached compiled plan for ``mapping`` rendered against ``source_model`` instances."""
+    key = (id(mapping), source_model)
+    entry = _PLANS.get(key)
+    if entry is None or entry[0] is not mapping:
+        entry = (mapping, compile_mapping(mapping, source_model))
+        _PLANS[key] = entry
+    return entry[1]
+
+
 def build_fhir_resource(instance, resource_type, mapping):
     """Build a FHIR resource dict from a model instance.
 
@@ -205,7 +333,7 @@ def build_fhir_resource(instance, resource_type, mapping):
     ``id`` is coerced to a string per the FHIR spec. The result is not validated here --
     callers validate against the appropriate fhir.resources model.
     """
-    result = render_resource(instance, instance._meta.object_name, mapping)
+    result = get_compiled_plan(mapping, instance._meta.object_name)(instance)
     result["resourceType"] = resource_type
     # The resource id is always the Django primary key.
     result["id"] = str(instance.pk)
@@ -0,0 +1,211 @@
+"""FHIR Bulk Data ``$export`` (system ``$export``, ``Patient/$export``, ``Group/<id>/$export``).
+
+A kick-off request (core/views/fhir_export.py) records a :class:`~core.models.FhirExportJob`
+and hands it to :func:`start_export_job`, which runs it as a background job (core/services/jobs.py).
+The job writes one NDJSON file per requested resource type under
+``settings.FHIR_EXPORT_DIR/<job id>/``.
+
+Every row is read through the same authorized ``fhir_search`` querysets the search endpoint uses
+-- the mapped model's and/or ``FhirAuxResource``'s, per the resource's ``search`` interactions
+in fhir_config.json -- so an export can never see more than a search by the same user. Rows are
+streamed from a server-side cursor (``.iterator(chunk_size=...)``) and rendered through the
+config-driven engine (core/fhir/engine.py) or the aux serializer, so a whole study is never held
+in memory and never paginated with OFFSET.
+
+Levels:
+
+  * ``system`` -- every supported type the user can search.
+  * ``patient`` -- the same, minus the types outside the Patient compartment (Device, Group,
+    Organization, Practitioner) unless named in ``_type``.
+  * ``group`` -- as ``patient``, scoped to one Study (FHIR Group) via the ``study_id`` filter.
+
+``_type`` (comma-separated) narrows the types; ``_since`` keeps only rows updated after an instant.
+"""
+
+import json
+import logging
+import shutil
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError as DRFValidationError
+
+from core.fhir.config import (
+    aux_interactions,
+    get_resource_mapping,
+    is_aux_resource,
+    is_mapped_resource,
+    is_supported_resource,
+    mapped_interactions,
+    mapped_model_name,
+    supported_resource_types,
+)
+from core.fhir.engine import build_fhir_resource
+from core.services.jobs import run_job, start_job
+
+logger = logging.getLogger(__name__)
+
+# The ``_outputFormat`` values accepted at kick-off (NDJSON is the only format produced).
+NDJSON_FORMATS = frozenset({"application/fhir+ndjson", "application/ndjson", "ndjson"})
+NDJSON_CONTENT_TYPE = "application/fhir+ndjson"
+
+# Resources outside the Patient compartment, left out of patient/group exports unless named in _type.
+_NON_COMPARTMENT_TYPES = frozenset({"Device", "Group", "Organization", "Practitioner"})
+
+# Rows fetched per round trip from the server-side cursor.
+CHUNK_SIZE = 2000
+
+
+# ---------------------------------------------------------------------------
+# Kick-off parameters
+# ---------------------------------------------------------------------------
+
+
+def _searchable(resource_type):
+    return (is_mapped_resource(resource_type) and "search" in mapped_interactions(resource_type)) or (
+        is_aux_resource(resource_type) and "search" in aux_interactions(resource_type)
+    )
+
+
+def default_export_types(level):
+    """The resource types an export of ``level`` writes when ``_type`` is absent."""
+    types = [resource_type for resource_type in supported_resource_types() if _searchable(resource_type)]
+    if level == "system":
+        return types
+    return [resource_type for resource_type in types if resource_type not in _NON_COMPARTMENT_TYPES]
+
+
+def parse_export_types(raw, level):
+    """Resolve the ``_type`` param (comma-separated) to a list of types; absent -> the level default."""
+    if not raw:
+        return default_export_types(level)
+    types = []
+    for resource_type in raw.split(","):
+        resource_type = resource_type.strip()
+        if not resource_type or resource_type in types:
+            continue
+        if not is_supported_resource(resource_type) or not _searchable(resource_type):
+            raise DRFValidationError(f"Unsupported _type for $export: '{resource_type}'.")
+        types.append(resource_type)
+    return types
+
+
+def parse_since(raw):
+    """Parse the ``_since`` instant (an aware datetime, or None when absent)."""
+    if not raw:
+        return None
+    since = parse_datetime(raw)
+    if since is None:
+        raise DRFValidationError(f"Invalid _since value: '{raw}' (expected a FHIR instant).")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+# ---------------------------------------------------------------------------
+# Reading and rendering
+# ---------------------------------------------------------------------------
+
+
+def _serialize_mapped(resource_type):
+    if resource_type == "Observation":
+        # valueAttachment.data needs Base64 encoding, which the config can't express.
+        from core.serializers import FHIRObservationSerializer
+
+        return FHIRObservationSerializer().to_representation
+    mapping = get_resource_mapping(resource_type)
+    return lambda instance: build_fhir_resource(instance, resource_type, mapping)
+
+
+def _serialize_aux(instance):
+    from core.serializers import FHIRAuxResourceSerializer
+
+    return FHIRAuxResourceSerializer().to_representation(instance)
+
+
+def export_querysets(jhe_user_id, resource_type, group_id=None, since=None):
+    """The authorized ``(queryset, serialize)`` pairs an export of ``resource_type`` streams.
+
+    One pair per backing store the type can be searched in (mapped model, then aux), each built
+    by that store's ``fhir_search`` with the export's group scope, narrowed by ``_since``.
+    """
+    from core.models import FhirAuxResource
+
+    scope = {"study_id": group_id} if group_id else {}
+    sources = []
+    if is_mapped_resource(resource_type) and "search" in mapped_interactions(resource_type):
+        model = apps.get_model("core", mapped_model_name(resource_type))
+        sources.append((model.fhir_search(jhe_user_id, **scope), _serialize_mapped(resource_type)))
+    if is_aux_resource(resource_type) and "search" in aux_interactions(resource_type):
+        sources.append((FhirAuxResource.fhir_search(jhe_user_id, resource_type, **scope), _serialize_aux))
+    if since is not None:
+        sources = [(queryset.filter(last_updated__gt=since), serialize) for queryset, serialize in sources]
+    # Stream in primary-key order: no sort on the search's ordering columns is needed to export.
+    return [(queryset.order_by("pk"), serialize) for queryset, serialize in sources]
+
+
+def write_ndjson(handle, jhe_user_id, resource_type, group_id=None, since=None):
+    """Stream every exported ``resource_type`` row to ``handle`` as NDJSON; return the row count."""
+    count = 0
+    for queryset, serialize in export_querysets(jhe_user_id, resource_type, group_id, since):
+        for instance in queryset.iterator(chunk_size=CHUNK_SIZE):
+            handle.write(json.dumps(serialize(instance), separators=(",", ":"), default=str))
+            handle.write("\n")
+            count += 1
+    return count
+
+
+# ---------------------------------------------------------------------------
+# Job execution
+# ---------------------------------------------------------------------------
+
+
+def export_dir(job):
+    """The directory a job's NDJSON output files are written to."""
+    return settings.FHIR_EXPORT_DIR / str(job.pk)
+
+
+def start_export_job(job):
+    """Run ``job`` -- on a background thread once the kick-off commits, or inline."""
+    start_job(job, run_export_job)
+
+
+def run_export_job(job_id):
+    """Execute an accepted export job, writing its NDJSON files and recording the manifest.
+
+    A job cancelled while running stops before its next resource type. Any failure marks the job
+    ``failed`` with the error message (reported by the status endpoint).
+    """
+    from core.models import FhirExportJob
+
+    run_job(FhirExportJob, job_id, _export)
+
+
+def _export(job):
+    from core.models import FhirExportJob
+
+    job.transaction_time = timezone.now()
+    FhirExportJob.objects.filter(pk=job.pk).update(transaction_time=job.transaction_time)
+    directory = export_dir(job)
+    directory.mkdir(parents=True, exist_ok=True)
+    output = []
+    for resource_type in job.resource_types:
+        if FhirExportJob.objects.filter(pk=job.pk, status=FhirExportJob.STATUS_CANCELLED).exists():
+            logger.info("fhir export %s cancelled", job.pk)
+            return None
+        path = directory / f"{resource_type}.ndjson"
+        with open(path, "w", encoding="utf-8") as handle:
+            count = write_ndjson(handle, job.jhe_user_id, resource_type, job.group_id, job.since)
+        if count:
+            output.append({"type": resource_type, "file": path.name, "count": count})
+        else:
+            path.unlink()  # the manifest lists only types with at least one resource
+    # run_job doesn't resurrect a job that was cancelled (and had its files removed) meanwhile.
+    return {"output": output}
+
+
+def delete_export_output(job):
+    """Remove a job's output directory (on cancel/delete)."""
+    shutil.rmtree(export_dir(job), ignore_errors=True)
@@ -0,0 +1,256 @@
+"""Structural validation of FHIR R5 bodies: a JSON Schema per resource type, compiled to Python checks.
+
+The ``structural`` validation mode (``settings.FHIR_VALIDATION_MODE``, see fhir_validation.py)
+checks a body's *shape* -- element names, JSON types, cardinality (array vs single), required
+elements and the FHIR primitive formats -- without constructing a ``fhir.resources`` model, which
+is what makes a write's validation expensive. The rules are those of the R5 spec's JSON Schema
+(``fhir.schema.json``), derived here from the ``fhir.resources`` models -- themselves generated
+from the spec -- so they always match the installed R5 version:
+
+- every element of a type is a property; unknown properties are errors (``additionalProperties``
+  is false), and a repeating element is a non-empty array;
+- a complex element refers (``$ref``) to its datatype's definition, so only the definitions
+  reachable from the resource type are built; ``contained`` resources are only checked for a
+  ``resourceType``;
+- a primitive is a JSON ``boolean`` / ``integer`` / ``number`` / ``string`` (a repeating
+  primitive's items may be ``null`` when a ``_element`` extension array carries them), and a
+  string primitive must match its type's regex.
+
+What the schema cannot express -- choice-type exclusivity (``value[x]``), the invariants, and
+"either the value or its ``_element`` extension" -- is left to ``full`` validation. Conversely it
+holds bodies to the JSON format where the model parse is lenient: an empty array, or a number
+where a string primitive belongs, is accepted (coerced) by the model but rejected here.
+
+``jsonschema`` would interpret the schema node by node and is slower than the model parse it is
+meant to replace, so :func:`compile_schema` compiles the (small) subset of JSON Schema used here
+into nested closures once per resource type; checking a typical resource then costs tens of
+microseconds.
+"""
+
+import functools
+import re
+import typing
+
+from pydantic.v1.fields import SHAPE_SINGLETON
+
+# FHIR primitives that are not JSON strings.
+_JSON_TYPES = {
+    "boolean": "boolean",
+    "integer": "integer",
+    "positiveInt": "integer",
+    "unsignedInt": "integer",
+    "decimal": "number",
+}
+
+_PYTHON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def _model_class(type_name):
+    from fhir.resources import get_fhir_model_class
+
+    try:
+        return get_fhir_model_class(type_name)
+    except KeyError:
+        raise LookupError(type_name)
+
+
+def _inner(annotation):
+    # ``Optional[String]`` (a repeating primitive's item type) -> ``String``.
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    return args[0] if args else annotation
+
+
+def _primitive(type_):
+    # pydantic keeps the plain ``bool`` as a Boolean field's type; every other primitive is named.
+    fhir_type = "boolean" if type_ is bool else getattr(type_, "__visit_name__", None)
+    json_type = _JSON_TYPES.get(fhir_type, "string")
+    schema = {"type": json_type}
+    regex = getattr(type_, "regex", None)
+    if json_type == "string" and regex is not None:
+        # The spec's regexes are implicitly anchored (fhir.schema.json anchors them too).
+        schema["pattern"] = f"^(?:{regex.pattern})$"
+    return schema
+
+
+def _define(type_name, definitions):
+    if type_name in definitions:
+        return
+    definitions[type_name] = None  # reserve: datatypes are recursive (Extension, Identifier ...)
+    properties = {}
+    required = []
+    for field in _model_class(type_name).__fields__.values():
+        if field.name == "resource_type":
+            continue
+        type_ = _inner(field.type_)
+        element_type = getattr(type_, "__resource_type__", None)
+        if field.alias == "fhir_comments":
+            item = {}
+        elif element_type == "Resource":
+            item = {"type": "object", "required": ["resourceType"]}
+        elif element_type:
+            _define(element_type, definitions)
+            item = {"$ref": f"#/$defs/{element_type}"}
+        else:
+            item = _primitive(type_)
+        if field.shape != SHAPE_SINGLETON:
+            if field.alias.startswith("_") or not element_type:
+                item = {"anyOf": [item, {"type": "null"}]}
+            item = {"type": "array", "minItems": 1, "items": item}
+        if field.required:
+            required.append(field.alias)
+        properties[field.alias] = item
+    definition = {"type": "object", "properties": properties, "additionalProperties": False}
+    if required:
+        definition["required"] = required
+    definitions[type_name] = definition
+
+
+def resource_schema(resource_type):
+    """The structural JSON Schema of ``resource_type``; raises ``LookupError`` if it is not a FHIR type."""
+    definitions = {}
+    _define(resource_type, definitions)
+    root = dict(definitions[resource_type])
+    root["properties"] = {**root["properties"], "resourceType": {"const": resource_type}}
+    return {"$schema": "https://json-schema.org/draft/2020-12/schema", **root, "$defs": definitions}
+
+
+def compile_schema(schema):
+    """Compile ``schema`` (as built by :func:`resource_schema`) into ``check(value) -> [error, ...]``.
+
+    Supports the keywords the builder emits: ``type``, ``const``, ``properties``,
+    ``additionalProperties: false``, ``required``, ``items``, ``minItems``, ``pattern``, ``anyOf``
+    and local ``$ref``\\ s into ``$defs``.
+    """
+    compiled = {}
+    for name, definition in schema.get("$defs", {}).items():
+        compiled[name] = _compile(definition, compiled)
+    root = _compile({key: value for key, value in schema.items() if key not in ("$defs", "$schema")}, compiled)
+    label = (schema.get("properties", {}).get("resourceType") or {}).get("const", "$")
+
+    def check(value):
+        errors = []
+        root(value, label, errors)
+        return errors
+
+    return check
+
+
+def _compile(node, compiled):
+    if "$ref" in node:
+        name = node["$ref"].rsplit("/", 1)[1]
+        return lambda value, path, errors: compiled[name](value, path, errors)
+    if "const" in node:
+        return _compile_const(node["const"])
+    if "anyOf" in node:
+        return _compile_any_of([_compile(option, compiled) for option in node["anyOf"]])
+    types = node.get("type")
+    if types is None:
+        return lambda value, path, errors: None
+    types = [types] if isinstance(types, str) else types
+    if types == ["object"]:
+        return _compile_object(node, compiled)
+    if types == ["array"]:
+        return _compile_array(node, compiled)
+    if types == ["string"]:
+        return _compile_string(node.get("pattern"))
+    return _compile_types(types)
+
+
+def _compile_const(expected):
+    def check(value, path, errors):
+        if value != expected:
+            errors.append(f"{path}: must be {expected!r}")
+
+    return check
+
+
+def _compile_any_of(options):
+    def check(value, path, errors):
+        first = None
+        for option in options:
+            attempt = []
+            option(value, path, attempt)
+            if not attempt:
+                return
+            first = first or attempt
+        errors.extend(first)
+
+    return check
+
+
+def _compile_object(node, compiled):
+    properties = {key: _compile(child, compiled) for key, child in node.get("properties", {}).items()}
+    required = tuple(node.get("required", ()))
+    closed = node.get("additionalProperties", True) is False
+
+    def check(value, path, errors):
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object")
+            return
+        for key, item in value.items():
+            child = properties.get(key)
+            if child is not None:
+                child(item, f"{path}.{key}", errors)
+            elif closed:
+                errors.append(f"{path}.{key}: unknown element")
+        for key in required:
+            if key not in value:
+                errors.append(f"{path}.{key}: required element is missing")
+
+    return check
+
+
+def _compile_array(node, compiled):
+    item = _compile(node.get("items", {}), compiled)
+    min_items = node.get("minItems", 0)
+
+    def check(value, path, errors):
+        if not isinstance(value, list):
+            errors.append(f"{path}: expected an array")
+            return
+        if len(value) < min_items:
+            errors.append(f"{path}: must not be empty")
+        for index, element in enumerate(value):
+            item(element, f"{path}[{index}]", errors)
+
+    return check
+
+
+def _compile_string(pattern):
+    match = re.compile(pattern).match if pattern else None
+
+    def check(value, path, errors):
+        if not isinstance(value, str):
+            errors.append(f"{path}: expected a string")
+        elif match is not None and match(value) is None:
+            errors.append(f"{path}: invalid value {value!r}")
+
+    return check
+
+
+def _compile_types(types):
+    def check(value, path, errors):
+        if not any(_is_type(value, json_type) for json_type in types):
+            errors.append(f"{path}: expected {' or '.join(types)}")
+
+    return check
+
+
+def _is_type(value, json_type):
+    if json_type == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if json_type == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, _PYTHON_TYPES[json_type])
+
+
+@functools.cache
+def structural_validator(resource_type):
+    """The compiled structural check of ``resource_type`` (built on first use, then cached)."""
+    return compile_schema(resource_schema(resource_type))
@@ -1,15 +1,43 @@
 """Validate an incoming FHIR resource dict against its ``fhir.resources`` model.
 
 Used on the write path for auxiliary resources (and anywhere a verbatim FHIR body must be
-checked before it is stored). The resource is parsed with the ``fhir.resources`` model that
-matches its ``resourceType``; a parse/validation failure is surfaced as a DRF 400.
+checked before it is stored). How thoroughly is set by ``settings.FHIR_VALIDATION_MODE``:
+
+- ``full`` (the default) -- the resource is parsed with the ``fhir.resources`` model that matches
+  its ``resourceType``; a parse/validation failure is surfaced as a DRF 400;
+- ``structural`` -- the body is checked against the resource type's compiled JSON Schema
+  (core/fhir/fhir_schema.py): element names, JSON types, cardinality, required elements and
+  primitive formats, at a fraction of the cost of a model parse, but without the invariants;
+- ``off`` -- only the resource type is checked; for deployments whose writers are trusted.
+
+A caller that needs the parsed model (the OMH Observation create path reads it) uses
+:func:`parse_fhir_resource`, which always parses in full. Each validation's duration is recorded
+per resource type and mode (:func:`validation_timings`), and every
+``settings.FHIR_VALIDATION_TIMINGS_LOG_SECONDS`` the process logs a summary of them at INFO.
 """
 
+import functools
 import importlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
 
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework.exceptions import ValidationError as DRFValidationError
 
+from core.fhir.fhir_schema import structural_validator
+
+logger = logging.getLogger(__name__)
 
+MODE_FULL = "full"
+MODE_STRUCTURAL = "structural"
+MODE_OFF = "off"
+MODES = (MODE_FULL, MODE_STRUCTURAL, MODE_OFF)
+
+
+@functools.cache
 def fhir_model_class(resource_type):
     """Return the ``fhir.resources`` model class for a resourceType, or raise LookupError."""
     try:
@@ -19,19 +47,110 @@ def fhir_model_class(resource_type):
         raise LookupError(resource_type)
 
 
-def validate_fhir_resource(resource_type, data):
+def validation_mode():
+    mode = settings.FHIR_VALIDATION_MODE
+    if mode not in MODES:
+        raise ImproperlyConfigured(f"FHIR_VALIDATION_MODE must be one of {', '.join(MODES)}, not '{mode}'.")
+    return mode
+
+
+def validate_fhir_resource(resource_type, data, mode=None):
     """Validate ``data`` (a FHIR resource dict) against ``resource_type``; raise DRF 400 on failure.
 
     FHIR JSON is camelCase, so the body is validated as-is. ``resourceType`` in the body is
-    ignored in favour of the routed ``resource_type``.
+    ignored in favour of the routed ``resource_type``. ``mode`` defaults to
+    ``settings.FHIR_VALIDATION_MODE``. Returns the parsed model in ``full`` mode, else ``None``.
     """
+    mode = mode or validation_mode()
     try:
         model_cls = fhir_model_class(resource_type)
     except LookupError:
         raise DRFValidationError(f"Unknown FHIR resource type: {resource_type}.")
+    if mode == MODE_OFF:
+        return None
 
     payload = {key: value for key, value in dict(data).items() if key != "resourceType"}
+    if mode == MODE_STRUCTURAL:
+        with timed(resource_type, mode):
+            errors = structural_validator(resource_type)(payload)
+        if errors:
+            raise DRFValidationError(f"Invalid FHIR {resource_type}: {'; '.join(errors)}")
+        return None
     try:
-        model_cls.parse_obj(payload)
+        with timed(resource_type, mode):
+            return model_cls.parse_obj(payload)
     except Exception as exc:
         raise DRFValidationError(f"Invalid FHIR {resource_type}: {exc}")
+
+
+def parse_fhir_resource(resource_type, data):
+    """Parse ``data`` into its ``fhir.resources`` model (whatever the mode); parse errors propagate."""
+    model_cls = fhir_model_class(resource_type)
+    with timed(resource_type, MODE_FULL):
+        return model_cls.parse_obj(data)
+
+
+# -- timings --
+
+_timings = {}  # (resource_type, mode) -> [count, total seconds, max seconds]
+_timings_lock = threading.Lock()
+_last_summary = time.monotonic()
+
+
+@contextmanager
+def timed(resource_type, mode):
+    """Record the duration of the enclosed validation of one ``resource_type`` body."""
+    global _last_summary
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        interval = settings.FHIR_VALIDATION_TIMINGS_LOG_SECONDS
+        with _timings_lock:
+            stats = _timings.setdefault((resource_type, mode), [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            summary_due = interval > 0 and time.monotonic() - _last_summary >= interval
+            if summary_due:
+                _last_summary = time.monotonic()
+        logger.debug("fhir validation: %s (%s) %.2f ms", resource_type, mode, elapsed * 1000)
+        if summary_due:
+            log_validation_timings()
+
+
+def validation_timings():
+    """This process's validation timings: ``{(resource_type, mode): {"count", "total_ms", "mean_ms", "max_ms"}}``."""
+    with _timings_lock:
+        snapshot = {key: list(stats) for key, stats in _timings.items()}
+    return {
+        key: {
+            "count": count,
+            "total_ms": total * 1000,
+            "mean_ms": total * 1000 / count,
+            "max_ms": longest * 1000,
+        }
+        for key, (count, total, longest) in snapshot.items()
+    }
+
+
+def log_validation_timings():
+    """Log this process's validation timings at INFO, one line per resource type and mode."""
+    for (resource_type, mode), stats in sorted(validation_timings().items()):
+        logger.info(
+            "fhir validation timings: %s (%s) count=%d mean=%.2f ms max=%.2f ms total=%.0f ms",
+            resource_type,
+            mode,
+            stats["count"],
+            stats["mean_ms"],
+            stats["max_ms"],
+            stats["total_ms"],
+        )
+
+
+def reset_validation_timings():
+    global _last_summary
+    with _timings_lock:
+        _timings.clear()
+        _last_summary = time.monotonic()
@@ -0,0 +1,169 @@
+"""``Observation/$stats`` and ``Observation/$lastn`` -- time-series summaries computed in SQL.
+
+Both operations start from the same authorized, filtered queryset the Observation search
+produces (``fhir_search`` + the common and ``__search`` params, so ``patient``, ``code``,
+``date``, study scope etc. all apply) and never load the matching rows into Python:
+
+  * ``$stats`` aggregates per code -- row count and earliest/latest effective time (the
+    ``effective_date_time`` / ``effective_period_start`` columns, the same instant the ``date``
+    param and sort use) -- plus, for every numeric OMH measure in ``omh_data.body`` (a member that
+    is a number or a ``{value, unit}`` object, e.g. ``heart_rate``, ``systolic_blood_pressure``),
+    its count/average/minimum/maximum overall and, with ``bucket=day|hour``, per time bucket.
+  * ``$lastn`` returns the newest ``max`` observations per code (a ``ROW_NUMBER()`` window).
+
+The response shapes are built in core/views/fhir_operations.py.
+"""
+
+from datetime import UTC
+
+from django.db import connection
+from django.db.models import Count, F, Max, Min, Window
+from django.db.models.functions import Coalesce, RowNumber
+from rest_framework.exceptions import ValidationError as DRFValidationError
+
+# ``bucket`` values -> the ``date_trunc`` field they group by.
+STATS_BUCKETS = {"day": "day", "hour": "hour"}
+
+# Upper bound on ``$lastn``'s ``max`` (per code).
+LASTN_MAX = 100
+
+_EFFECTIVE = Coalesce("effective_date_time", "effective_period_start")
+
+# One row per (observation, numeric body member). A body that is not a JSON object contributes
+# nothing (jsonb_each would raise on it); a member counts when it is a number or carries a numeric
+# ``value`` (the OMH unit-value shape), so nested structures such as effective_time_frame are skipped.
+_MEASURES_SQL = """
+    SELECT o.codeable_concept_id, m.key, {bucket} AS bucket, COUNT(*), AVG(v.n), MIN(v.n), MAX(v.n), MIN(v.unit)
+    FROM core_observation o
+    CROSS JOIN LATERAL jsonb_each(
+        CASE WHEN jsonb_typeof(o.omh_data -> 'body') = 'object' THEN o.omh_data -> 'body' ELSE '{{}}'::jsonb END
+    ) AS m(key, value)
+    CROSS JOIN LATERAL (
+        SELECT CASE
+            WHEN jsonb_typeof(m.value) = 'number' THEN m.value::numeric
+            WHEN jsonb_typeof(m.value -> 'value') = 'number' THEN (m.value -> 'value')::numeric
+        END AS n,
+        m.value ->> 'unit' AS unit
+    ) AS v
+    WHERE o.id IN ({ids}) AND v.n IS NOT NULL {bucket_filter}
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+"""
+
+_BUCKET_EXPRESSION = "date_trunc(%s, COALESCE(o.effective_date_time, o.effective_period_start) AT TIME ZONE 'UTC')"
+
+
+def parse_bucket(raw):
+    """Validate the ``bucket`` param (``day``/``hour``, or absent -> ``None``)."""
+    if not raw:
+        return None
+    bucket = STATS_BUCKETS.get(raw.strip().lower())
+    if bucket is None:
+        raise DRFValidationError(f"Invalid bucket: '{raw}' (expected one of {', '.join(STATS_BUCKETS)}).")
+    return bucket
+
+
+def parse_lastn_max(raw):
+    """Validate ``$lastn``'s ``max`` param (default 1, at most ``LASTN_MAX``)."""
+    if raw in (None, ""):
+        return 1
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        value = 0
+    if not 1 <= value <= LASTN_MAX:
+        raise DRFValidationError(f"Invalid max: '{raw}' (expected an integer from 1 to {LASTN_MAX}).")
+    return value
+
+
+def _rows(queryset):
+    # The search queryset yields each observation once (its access and study conditions are
+    # EXISTS subqueries), so it is aggregated as is; only its sort is dropped, which would
+    # otherwise join the GROUP BY of the aggregates below.
+    return queryset.order_by()
+
+
+def _measures(rows, bucket):
+    ids_sql, ids_params = rows.values("pk").query.sql_with_params()
+    if bucket:
+        sql = _MEASURES_SQL.format(
+            ids=ids_sql,
+            bucket=_BUCKET_EXPRESSION,
+            bucket_filter="AND COALESCE(o.effective_date_time, o.effective_period_start) IS NOT NULL",
+        )
+        params = [bucket, *ids_params]
+    else:
+        sql = _MEASURES_SQL.format(ids=ids_sql, bucket="NULL::timestamp", bucket_filter="")
+        params = list(ids_params)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _number(value):
+    return float(value) if value is not None else None
+
+
+def observation_stats(queryset, bucket=None):
+    """Per-code statistics for the observations in ``queryset`` (see module docstring).
+
+    Returns a list (ordered by code system, code) of dicts: ``system``, ``code``, ``display``,
+    ``count``, ``earliest``, ``latest`` and ``measures`` -- one ``{name, unit, count, average,
+    minimum, maximum}`` per numeric body member, each with a ``buckets`` list of ``{start, count,
+    average, minimum, maximum}`` when ``bucket`` is given.
+    """
+    rows = _rows(queryset)
+    codes = (
+        rows.values(
+            "codeable_concept_id",
+            system=F("codeable_concept__coding_system"),
+            code=F("codeable_concept__coding_code"),
+            display=F("codeable_concept__text"),
+        )
+        .annotate(count=Count("pk"), earliest=Min(_EFFECTIVE), latest=Max(_EFFECTIVE))
+        .order_by("system", "code")
+    )
+    stats = {}
+    for entry in codes:
+        concept_id = entry.pop("codeable_concept_id")
+        stats[concept_id] = {**entry, "measures": {}}
+
+    for concept_id, name, start, count, average, minimum, maximum, unit in _measures(rows, None):
+        stats[concept_id]["measures"][name] = {
+            "name": name,
+            "unit": unit,
+            "count": count,
+            "average": _number(average),
+            "minimum": _number(minimum),
+            "maximum": _number(maximum),
+        }
+    if bucket:
+        for concept_id, name, start, count, average, minimum, maximum, _ in _measures(rows, bucket):
+            measure = stats[concept_id]["measures"][name]
+            measure.setdefault("buckets", []).append(
+                {
+                    "start": start.replace(tzinfo=UTC),
+                    "count": count,
+                    "average": _number(average),
+                    "minimum": _number(minimum),
+                    "maximum": _number(maximum),
+                }
+            )
+    return [{**entry, "measures": list(entry["measures"].values())} for entry in stats.values()]
+
+
+def observation_lastn(queryset, max_per_code=1):
+    """The newest ``max_per_code`` observations of each code in ``queryset``, newest first per code."""
+    ranked = _rows(queryset).annotate(
+        code_rank=Window(
+            RowNumber(),
+            partition_by=[F("codeable_concept_id")],
+            order_by=[_EFFECTIVE.desc(nulls_last=True), F("pk").desc()],
+        )
+    )
+    return (
+        ranked.filter(code_rank__lte=max_per_code)
+        .select_related("subject_patient", "codeable_concept")
+        .prefetch_related("identifiers")
+        .order_by("codeable_concept__coding_system", "codeable_concept__coding_code", "code_rank")
+    )
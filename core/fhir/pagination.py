@@ -1,6 +1,15 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
 from django.db.models.query import RawQuerySet
-from rest_framework.pagination import PageNumberPagination
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from core.pagination import PaginatedRawQuerySet
 
@@ -49,3 +58,128 @@ class FHIRBundlePagination(PageNumberPagination):
         if next_link:
             links.append({"relation": "next", "url": next_link})
         return links
+
+
+def cursor_requested(request):
+    """True when the search opted into keyset paging (a ``_cursor`` param, empty on the first page)."""
+    return "_cursor" in request.GET
+
+
+class FHIRCursorPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination for FHIR searchset Bundles.
+
+    Instead of ``OFFSET n`` the page seeks past the last row of the previous page on
+    ``(last_updated, id)`` -- the newest first, or oldest first with ``_sort=_lastUpdated`` -- so a
+    deep page costs the same as the first one and can use the ``(..., -last_updated)`` indexes.
+    The client starts with an empty ``_cursor`` and follows the Bundle's ``next`` link, whose
+    ``_cursor`` is an opaque token for that position. Works on any mapped or FhirAuxResource
+    search queryset (every one has ``last_updated`` and a unique pk).
+
+    ``total`` follows FHIR ``_total``: omitted by default (``none``), the planner's row estimate
+    for ``estimate``, and a real ``COUNT(*)`` only for ``accurate``.
+    """
+
+    cursor_query_param = "_cursor"
+    page_size_query_param = "_count"
+    page_size = FHIRBundlePagination.page_size
+    max_page_size = FHIRBundlePagination.max_page_size
+    total_modes = ("none", "estimate", "accurate")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.descending = self._descending(request)
+        self.total = self._total(queryset, request)
+        size = self._page_size(request)
+
+        order = ("-last_updated", "-pk") if self.descending else ("last_updated", "pk")
+        queryset = queryset.order_by(*order)
+        position = self._decode(request.GET.get(self.cursor_query_param), queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._seek(*position))
+
+        rows = list(queryset[: size + 1])
+        self.has_next = len(rows) > size
+        page = rows[:size]
+        self.next_position = (page[-1].last_updated, page[-1].pk) if self.has_next else None
+        return page
+
+    def get_paginated_response(self, data):
+        response_data = {"resourceType": "Bundle", "type": "searchset"}
+        if self.total is not None:
+            response_data["total"] = self.total
+        response_data.update({"entry": data, "link": self._get_fhir_links(), "meta": {}})
+        return Response(response_data)
+
+    def _get_fhir_links(self):
+        links = [{"relation": "self", "url": self.request.build_absolute_uri()}]
+        if self.next_position is not None:
+            url = remove_query_param(self.request.build_absolute_uri(), "_page")
+            links.append({"relation": "next", "url": replace_query_param(url, self.cursor_query_param, self._encode())})
+        return links
+
+    # -- request params --
+
+    def _page_size(self, request):
+        raw = request.GET.get(self.page_size_query_param)
+        try:
+            size = int(raw) if raw else self.page_size
+        except ValueError:
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    @staticmethod
+    def _descending(request):
+        # Keyset order is fixed to (last_updated, id); only its direction can be chosen.
+        raw = (request.GET.get("_sort") or "-_lastUpdated").strip()
+        key = raw.lstrip("-").replace("_", "").lower()
+        if "," in raw or key != "lastupdated":
+            raise DRFValidationError("_cursor paging only supports _sort=_lastUpdated or _sort=-_lastUpdated.")
+        return raw.startswith("-")
+
+    def _total(self, queryset, request):
+        mode = (request.GET.get("_total") or "none").strip().lower()
+        if mode not in self.total_modes:
+            raise DRFValidationError(f"Invalid _total value: '{mode}' (expected one of {', '.join(self.total_modes)}).")
+        if mode == "accurate":
+            return queryset.count()
+        if mode == "estimate":
+            return _estimated_count(queryset)
+        return None
+
+    # -- cursor token --
+
+    def _seek(self, last_updated, pk):
+        # The OR alone gives Postgres no range to seek the last_updated index on; the redundant
+        # bound ANDed to it does, so a deep page starts at the cursor instead of scanning to it.
+        if self.descending:
+            return Q(last_updated__lte=last_updated) & (
+                Q(last_updated__lt=last_updated) | Q(last_updated=last_updated, pk__lt=pk)
+            )
+        return Q(last_updated__gte=last_updated) & (
+            Q(last_updated__gt=last_updated) | Q(last_updated=last_updated, pk__gt=pk)
+        )
+
+    def _encode(self):
+        last_updated, pk = self.next_position
+        token = json.dumps([last_updated.isoformat(), str(pk)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(token.encode()).decode().rstrip("=")
+
+    def _decode(self, raw, model):
+        if not raw:
+            return None  # first page
+        try:
+            last_updated, pk = json.loads(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)))
+            last_updated = parse_datetime(last_updated)
+            pk = model._meta.pk.to_python(pk)
+        except (binascii.Error, ValueError, TypeError, UnicodeDecodeError, DjangoValidationError):
+            last_updated = None
+        if last_updated is None:
+            raise DRFValidationError("Invalid _cursor value.")
+        return last_updated, pk
+
+
+def _estimated_count(queryset):
+    """The Postgres planner's row estimate for ``queryset`` (no scan; may be off, never exact)."""
+    plan = json.loads(queryset.explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -4,68 +4,201 @@ When a FHIR aux resource is uploaded its references still point at the upstream
 (e.g. ``Encounter.subject.reference = "Patient/123"``), while JHE stores each resource under a
 new UUID. This pass rewrites the references declared in ``__refPaths`` (fhir_config.json) from
 ``"<Type>/<upstreamId>"`` to ``"<Type>/<JHE-UUID>"`` by looking up the target row's
-``fhir_resource_id`` within the SAME FhirSource. Unresolvable references become
-``"not-found:<upstreamId>"``.
+``fhir_resource_id`` within the SAME FhirSource -- and, with ``cross_source``, then among the
+patient's other FhirSources (a match found in more than one of them is ambiguous and not used).
+Unresolvable references become ``"not-found:<upstreamId>"``. A ref path may run through arrays
+(``result.reference``): every reference it reaches is rewritten.
 
-Scope (kept deliberately small, see #584): same-FhirSource lookup and scalar dotted ref paths
-only. Expanding the lookup across a patient's sources, and supporting array-valued ref paths,
-are tracked as follow-ups.
+The pass is set-based so it scales to sources with millions of rows:
+
+  * the ``(resource_type, fhir_resource_id) -> pk`` lookup is built from a ``values_list``
+    projection streamed with ``.iterator()`` -- no ``fhir_data`` is loaded for it;
+  * un-indexed rows are fetched ``CHUNK_SIZE`` at a time in pk order (keyset pagination, so each
+    chunk is a short query rather than one cursor held open across the run's commits);
+  * each chunk's rewritten bodies are written with one ``bulk_update`` and their search index
+    re-extracted, in the chunk's own transaction.
+
+A chunk's rows are marked ``ref_indexed`` as it commits, so an interrupted run loses at most the
+chunk in flight, and a rerun only visits the rows still un-indexed. Run in the background it is a
+:class:`~core.models.FhirRefIndexJob` (:func:`start_ref_index_job`), which also records its
+progress and resume point with every chunk.
 """
 
+import uuid
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
 from core.fhir.config import ref_paths_for
+from core.fhir.search_index import index_aux_resources
+from core.services.jobs import run_job, start_job
+
+# Un-indexed rows fetched, rewritten and written per transaction.
+CHUNK_SIZE = 1000
 
 
-def _leaf(body, path):
-    """Resolve a dotted ``path`` to its leaf, returning ``(container, key, value)`` or ``None``.
+def _leaves(node, parts):
+    """Yield ``(container, key)`` for every leaf the dotted path ``parts`` reaches in ``node``.
 
-    Only walks plain dict hops (scalar paths); a missing or non-dict hop yields ``None``.
+    Arrays are unwrapped at every hop and at the leaf (a leaf array yields ``(list, index)`` per
+    item); a missing key or a scalar hop ends that branch.
     """
-    node = body
-    parts = path.split(".")
-    for part in parts[:-1]:
-        if not isinstance(node, dict) or not isinstance(node.get(part), dict):
-            return None
-        node = node[part]
-    key = parts[-1]
-    if not isinstance(node, dict) or key not in node:
+    if isinstance(node, list):
+        for item in node:
+            yield from _leaves(item, parts)
+        return
+    if not isinstance(node, dict) or parts[0] not in node:
+        return
+    if len(parts) > 1:
+        yield from _leaves(node[parts[0]], parts[1:])
+    elif isinstance(node[parts[0]], list):
+        yield from ((node[parts[0]], index) for index in range(len(node[parts[0]])))
+    else:
+        yield node, parts[0]
+
+
+def _uuid(value):
+    try:
+        return uuid.UUID(value)
+    except (ValueError, AttributeError, TypeError):
         return None
-    return node, key, node[key]
 
 
-def index_fhir_source_refs(fhir_source):
-    """Rewrite references in every not-yet-indexed aux row of ``fhir_source``.
+class _Targets:
+    """Where a chunk's references can resolve: ``(resource_type, upstream id) -> JHE pk``."""
 
-    Returns a summary dict: ``rows_indexed``, ``refs_rewritten``, ``refs_not_found``.
-    """
-    rows = list(fhir_source.aux_resources.all())
-    # (resource_type, upstream_id) -> JHE uuid, for resolving references within this source.
-    target_index = {(row.resource_type, str(row.fhir_resource_id)): str(row.pk) for row in rows if row.fhir_resource_id}
-    # Ids already equal to a row's JHE pk are previously-resolved refs; leave them untouched so
-    # re-indexing is idempotent and never flips a resolved ref to not-found.
-    source_pks = {str(row.pk) for row in rows}
+    def __init__(self, fhir_source, cross_source):
+        from core.models import FhirAuxResource
 
-    summary = {"rows_indexed": 0, "refs_rewritten": 0, "refs_not_found": 0}
-    for row in [r for r in rows if not r.ref_indexed]:
-        body = row.fhir_data or {}
-        for path in ref_paths_for(row.resource_type):
-            found = _leaf(body, path)
-            if not found:
-                continue
-            container, key, value = found
-            if not isinstance(value, str) or "/" not in value:
-                continue  # not a "Type/id" literal reference
+        rows = FhirAuxResource.objects.exclude(fhir_resource_id=None)
+        self.own = self._index(rows.filter(fhir_source=fhir_source))
+        self.other = {}
+        self.scope = FhirAuxResource.objects.filter(fhir_source=fhir_source)
+        if cross_source:
+            patient_rows = rows.filter(fhir_source__patient_id=fhir_source.patient_id)
+            self.other = self._index(patient_rows.exclude(fhir_source=fhir_source), unique=True)
+            self.scope = FhirAuxResource.objects.filter(fhir_source__patient_id=fhir_source.patient_id)
+
+    @staticmethod
+    def _index(queryset, unique=False):
+        index = {}
+        ambiguous = set()
+        for resource_type, upstream_id, pk in queryset.values_list("resource_type", "fhir_resource_id", "pk").iterator(
+            chunk_size=CHUNK_SIZE * 10
+        ):
+            key = (resource_type, upstream_id)
+            if unique and index.get(key, pk) != pk:
+                ambiguous.add(key)
+            index[key] = pk
+        for key in ambiguous:
+            del index[key]
+        return index
+
+    def resolve(self, resource_type, upstream_id):
+        key = (resource_type, upstream_id)
+        return self.own.get(key) or self.other.get(key)
+
+    def jhe_ids(self, ids):
+        """The ``ids`` that are already JHE pks of rows in scope (previously resolved references)."""
+        pks = {pk for pk in map(_uuid, ids) if pk is not None}
+        if not pks:
+            return set()
+        return {str(pk) for pk in self.scope.filter(pk__in=pks).values_list("pk", flat=True)}
+
+
+def _references(row):
+    for path in ref_paths_for(row.resource_type):
+        for container, key in _leaves(row.fhir_data or {}, path.split(".")):
+            value = container[key]
+            if isinstance(value, str) and "/" in value:  # a "Type/id" literal reference
+                yield container, key, value
+
+
+def _index_chunk(rows, targets):
+    """Rewrite the references of ``rows`` in place; return the chunk's counts."""
+    counts = {"rows_indexed": len(rows), "refs_rewritten": 0, "refs_not_found": 0}
+    # Ids already equal to a JHE pk are previously-resolved refs; leave them untouched so
+    # re-indexing is idempotent and never flips a resolved ref to not-found.
+    resolved = targets.jhe_ids({value.partition("/")[2] for row in rows for _, _, value in _references(row)})
+    for row in rows:
+        for container, key, value in _references(row):
             rtype, _, upstream_id = value.partition("/")
-            if upstream_id in source_pks:
-                continue  # already a JHE id (previously resolved); leave it
-            target_uuid = target_index.get((rtype, upstream_id))
-            if target_uuid:
-                container[key] = f"{rtype}/{target_uuid}"
-                summary["refs_rewritten"] += 1
+            if upstream_id in resolved:
+                continue
+            target = targets.resolve(rtype, upstream_id)
+            if target:
+                container[key] = f"{rtype}/{target}"
+                counts["refs_rewritten"] += 1
             else:
                 container[key] = f"not-found:{upstream_id}"
-                summary["refs_not_found"] += 1
-        row.fhir_data = body
+                counts["refs_not_found"] += 1
         row.ref_indexed = True
-        row.save(update_fields=["fhir_data", "ref_indexed"])
-        summary["rows_indexed"] += 1
-    return summary
+    return counts
+
+
+def index_fhir_source_refs(fhir_source, cross_source=False, chunk_size=CHUNK_SIZE, resume_after=None, on_chunk=None):
+    """Rewrite references in every not-yet-indexed aux row of ``fhir_source``.
+
+    Rows are processed ``chunk_size`` per transaction. ``resume_after`` skips rows with a pk at or
+    below it (a job's resume point); ``on_chunk(last pk, counts)`` is called inside each chunk's
+    transaction. Returns a summary dict: ``rows_indexed``, ``refs_rewritten``, ``refs_not_found``.
+    """
+    from core.models import FhirAuxResource
+
+    targets = _Targets(fhir_source, cross_source)
+    pending = (
+        fhir_source.aux_resources.filter(ref_indexed=False).only("pk", "resource_type", "fhir_data").order_by("pk")
+    )
+    summary = {"rows_indexed": 0, "refs_rewritten": 0, "refs_not_found": 0}
+    last = resume_after
+    while True:
+        rows = list((pending if last is None else pending.filter(pk__gt=last))[:chunk_size])
+        if not rows:
+            return summary
+        counts = _index_chunk(rows, targets)
+        last = rows[-1].pk
+        with transaction.atomic():
+            # bulk_update sends no post_save, so the rewritten bodies' search index is refreshed here.
+            FhirAuxResource.objects.bulk_update(rows, ["fhir_data", "ref_indexed"])
+            index_aux_resources(rows)
+            if on_chunk is not None:
+                on_chunk(last, counts)
+        for key, count in counts.items():
+            summary[key] += count
+
+
+# -- background jobs --
+
+
+def start_ref_index_job(job):
+    """Run ``job`` -- on a background thread once its creation commits, or inline."""
+    start_job(job, run_ref_index_job)
+
+
+def run_ref_index_job(job_id, resume=False):
+    """Execute an accepted ref-index job; any failure marks it ``failed`` with the error message.
+
+    With ``resume``, a job left ``in-progress`` (its process died) or ``failed`` continues after
+    the last chunk it committed.
+    """
+    from core.models import FhirRefIndexJob
+
+    run_job(FhirRefIndexJob, job_id, _index_job, resume=resume)
+
+
+def _index_job(job):
+    from core.models import FhirRefIndexJob
+
+    def on_chunk(last_pk, counts):
+        FhirRefIndexJob.objects.filter(pk=job.pk).update(
+            resume_after=last_pk,
+            rows_indexed=F("rows_indexed") + counts["rows_indexed"],
+            refs_rewritten=F("refs_rewritten") + counts["refs_rewritten"],
+            refs_not_found=F("refs_not_found") + counts["refs_not_found"],
+            last_updated=timezone.now(),
+        )
+
+    index_fhir_source_refs(
+        job.fhir_source, cross_source=job.cross_source, resume_after=job.resume_after, on_chunk=on_chunk
+    )
@@ -13,8 +13,57 @@ explicit filter authorized up front (an unauthorized organization/study/patient
 These two concerns are identical across all six models, so they live here rather than being
 duplicated per model. Model imports are done lazily inside the functions to avoid import cycles
 (the models import this module at class-definition time).
+
+Within a request the resolved user, the user's Patient profile and the practitioner
+authorization decisions are memoized on a request-scoped ``AuthContext`` (installed by
+``core.middleware.AuthContextMiddleware``): one FHIR request runs several ``fhir_search`` calls
+-- the main query, each source of a mapped+aux search, the re-read after a create, a bundle's
+per-entry writes -- for the same user and filters. Outside a request (commands, background jobs)
+there is no context and every call queries.
 """
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class AuthContext:
+    """Per-request memo: users by id, Patient profiles by user id, and the
+    ``(user, organization, study, patient)`` scopes already authorized."""
+
+    def __init__(self):
+        self.users = {}
+        self.patients = {}
+        self.authorized = set()
+
+
+_auth_context = ContextVar("fhir_auth_context", default=None)
+
+
+def current_auth_context():
+    """The current request's ``AuthContext``, or None outside a request."""
+    return _auth_context.get()
+
+
+@contextmanager
+def auth_context():
+    """Install a fresh ``AuthContext`` for the duration of the block (one request)."""
+    token = _auth_context.set(AuthContext())
+    try:
+        yield _auth_context.get()
+    finally:
+        _auth_context.reset(token)
+
+
+def forget_authorizations():
+    """Drop the current request's memoized authorization decisions.
+
+    Called when a membership change rewrites practitioner access mid-request
+    (``PractitionerPatientAccess.refresh``), so a later check in the same request sees it.
+    """
+    context = _auth_context.get()
+    if context is not None:
+        context.authorized.clear()
+
 
 def resolve_fhir_user(jhe_user_id):
     """Resolve the requesting ``JheUser`` (404 if it does not exist).
@@ -26,7 +75,65 @@ def resolve_fhir_user(jhe_user_id):
 
     from core.models import JheUser
 
-    return get_object_or_404(JheUser.objects.select_related("patient_profile", "practitioner_profile"), id=jhe_user_id)
+    context = _auth_context.get()
+    if context is not None and str(jhe_user_id) in context.users:
+        return context.users[str(jhe_user_id)]
+    user = get_object_or_404(JheUser.objects.select_related("patient_profile", "practitioner_profile"), id=jhe_user_id)
+    if context is not None:
+        context.users[str(jhe_user_id)] = user
+    return user
+
+
+def request_patient(jhe_user_id, lookup):
+    """The user's Patient profile via ``lookup()``, memoized for the request once found.
+
+    A missing profile is not memoized: a request may create it (patient registration).
+    """
+    context = _auth_context.get()
+    if context is not None and jhe_user_id in context.patients:
+        return context.patients[jhe_user_id]
+    patient = lookup()
+    if context is not None and patient is not None:
+        context.patients[jhe_user_id] = patient
+    return patient
+
+
+def patient_access(jhe_user_id, patient_field, organization_id=None):
+    """``EXISTS`` a PractitionerPatientAccess row for the practitioner user and the patient in
+    ``patient_field`` of the outer query (through ``organization_id``, if given).
+
+    A correlated semi-join on the access table's (practitioner user, patient) index: it never
+    multiplies the outer rows, so the search querysets need no ``DISTINCT`` and the planner can
+    walk their ordering index and stop after one page.
+    """
+    from django.db.models import Exists, OuterRef
+
+    from core.models import PractitionerPatientAccess
+
+    access = PractitionerPatientAccess.objects.filter(
+        practitioner_user_id=jhe_user_id, patient_id=OuterRef(patient_field)
+    )
+    if organization_id:
+        access = access.filter(organization_id=organization_id)
+    return Exists(access)
+
+
+def study_enrollment(study_id, patient_field):
+    """``EXISTS`` a StudyPatient row enrolling the outer query's ``patient_field`` in the study."""
+    from django.db.models import Exists, OuterRef
+
+    from core.models import StudyPatient
+
+    return Exists(StudyPatient.objects.filter(study_id=study_id, patient_id=OuterRef(patient_field)))
+
+
+def patient_identifier(value, patient_field):
+    """``EXISTS`` a PatientIdentifier with ``value`` on the outer query's ``patient_field``."""
+    from django.db.models import Exists, OuterRef
+
+    from core.models import PatientIdentifier
+
+    return Exists(PatientIdentifier.objects.filter(patient_id=OuterRef(patient_field), value=value))
 
 
 def authorize_practitioner_scope(
@@ -48,7 +155,14 @@ def authorize_practitioner_scope(
     """
     from django.core.exceptions import PermissionDenied
 
-    from core.models import Organization, Patient, Study
+    from core.models import Organization, PractitionerPatientAccess, Study
+
+    # A scope already authorized earlier in this request is not re-checked; a denial raises, so
+    # only grants are memoized.
+    context = _auth_context.get()
+    scope = tuple(str(value) if value else None for value in (jhe_user_id, organization_id, study_id, patient_id))
+    if context is not None and scope in context.authorized:
+        return
 
     # Each check is a single membership ``.exists()`` against the practitioner's organizations
     # (no Practitioner row is materialized -- this runs on both sources of a mapped+aux union
@@ -65,6 +179,10 @@ def authorize_practitioner_scope(
         raise PermissionDenied(f"Current user is not authorized to access Group/{study_id}.")
     if (
         patient_id
-        and not Patient.objects.filter(id=patient_id, organizations__practitioners__jhe_user_id=jhe_user_id).exists()
+        and not PractitionerPatientAccess.objects.filter(
+            practitioner_user_id=jhe_user_id, patient_id=patient_id
+        ).exists()
     ):
         raise PermissionDenied(f"Current user is not authorized to access Patient/{patient_id}.")
+    if context is not None:
+        context.authorized.add(scope)
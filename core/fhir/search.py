@@ -13,6 +13,9 @@ here are applied to whichever authorized queryset that store produced -- never a
     while the JSONB matching runs as raw SQL). Values only ever reach Postgres as bound
     parameters -- jsonpath ``$vars`` for the path-exists predicates, positional params for ``#>>``
     date comparisons -- so no user input is ever interpolated into SQL or a jsonpath expression.
+    Params of the indexed types are by default answered from the extracted FhirAuxSearchIndex
+    rows instead (``EXISTS`` subqueries; see core/fhir/search_index.py), with the JSONB builder
+    kept as the fallback behind the ``fhir.aux_search_index`` setting.
 
 The supported params per resource are the US Core "supported searches" set (CapabilityStatement
 Summary of Resource/Profile Capabilities). The resource-agnostic ``_id`` / ``_lastUpdated`` params
@@ -24,7 +27,7 @@ handled upstream (see core/views/fhir.py); this module handles the resource-spec
 import json
 import re
 
-from django.db.models import BooleanField, F, Q, TextField
+from django.db.models import BooleanField, Exists, F, OuterRef, Q, TextField
 from django.db.models.expressions import RawSQL
 from django.db.models.functions import Coalesce
 from django.utils import timezone
@@ -34,9 +37,12 @@ from rest_framework.exceptions import ValidationError as DRFValidationError
 from core.fhir.config import (
     aux_search_params,
     aux_sort_date,
+    fhir_path_repeats,
     mapped_search_params,
     mapped_sort_date,
 )
+from core.fhir.search_index import INDEXED_TYPES, date_range
+from core.services.jhe_settings import get_setting
 
 # US Core date-comparator prefixes -> the operator/lookup they express.
 _DATE_COMPARATORS = {"ge": "gte", "le": "lte", "gt": "gt", "lt": "lt"}
@@ -122,18 +128,48 @@ def _jsonpath_literal(value):
 # array auto-unwraps -- one predicate matches a CodeableConcept's ``coding`` array, a repeating
 # element, or a scalar alike. Date predicates instead extract text with ``#>>`` and compare
 # lexically (ISO-8601 order == chronological order), COALESCE-ing polymorphic ``[x]`` paths.
+#
+# Exact-match token/identifier/code predicates are instead phrased as JSONB containment,
+#   fhir_data @> '<document>'
+# whenever the path's cardinality is known from the FHIR model (``fhir_path_repeats``): the
+# document nests the matched value under the path, wrapping each repeating element in an array,
+# so it means the same as the lax jsonpath for a conformant body -- and, unlike a jsonpath
+# function call, it can use the ``jsonb_path_ops`` GIN index (see core/fhir/aux_indexes.py).
 
 
 def _path_exists(jsonpath, variables):
     return "jsonb_path_exists(fhir_data, %s, %s)", [jsonpath, json.dumps(variables)]
 
 
-def _coding_term(paths, field, value):
+def _containment_document(resource_type, path, leaf):
+    # The JSONB document ``fhir_data @>`` tests for ``leaf`` at ``path``, or None when the path's
+    # cardinality is unknown (the caller then keeps the jsonpath predicate).
+    repeats = fhir_path_repeats(resource_type, path)
+    if repeats is None:
+        return None
+    document = leaf
+    for segment, repeating in zip(reversed(path.split(".")), reversed(repeats), strict=True):
+        document = {segment: [document] if repeating else document}
+    return document
+
+
+def _contains(document):
+    return "fhir_data @> %s::jsonb", [json.dumps(document)]
+
+
+def _coding_term(resource_type, paths, field, value):
     # Match a Coding/CodeableConcept element whose <field> (code, or value for Identifier) -- and
     # system, when the token carries one -- equals the given token.
     system, code = _split_token(value)
     sql_parts, params = [], []
     for path in paths:
+        leaf = {key: term for key, term in ((field, code), ("system", system)) if term}
+        document = _containment_document(resource_type, path, leaf) if leaf else None
+        if document is not None:
+            sql, prm = _contains(document)
+            sql_parts.append(sql)
+            params += prm
+            continue
         conditions, variables = [], {}
         if code is not None:
             conditions.append(f"@.{field} == $v")
@@ -148,18 +184,22 @@ def _coding_term(paths, field, value):
     return "(" + " OR ".join(sql_parts) + ")", params
 
 
-def _code_term(paths, value):
+def _code_term(resource_type, paths, value):
     # Match a scalar code element (a plain FHIR ``code``); the token's system, if any, is ignored.
     _, code = _split_token(value)
     sql_parts, params = [], []
     for path in paths:
-        sql, prm = _path_exists(f"$.{path} ? (@ == $v)", {"v": code})
+        document = _containment_document(resource_type, path, code)
+        if document is not None:
+            sql, prm = _contains(document)
+        else:
+            sql, prm = _path_exists(f"$.{path} ? (@ == $v)", {"v": code})
         sql_parts.append(sql)
         params += prm
     return "(" + " OR ".join(sql_parts) + ")", params
 
 
-def _string_term(paths, value):
+def _string_term(resource_type, paths, value):
     # FHIR string search: case-insensitive starts-with over any of the paths.
     pattern = _jsonpath_literal("^" + _regex_escape(value.strip()))
     sql_parts, params = [], []
@@ -170,7 +210,7 @@ def _string_term(paths, value):
     return "(" + " OR ".join(sql_parts) + ")", params
 
 
-def _reference_term(paths, value):
+def _reference_term(resource_type, paths, value):
     # Match a reference by full value ("Patient/123") or by a bare id ("123", i.e. any ".../123").
     value = value.strip()
     suffix = _jsonpath_literal("/" + _regex_escape(value) + "$")
@@ -183,8 +223,8 @@ def _reference_term(paths, value):
 
 
 _TERM_BUILDERS = {
-    "token": lambda paths, value: _coding_term(paths, "code", value),
-    "identifier": lambda paths, value: _coding_term(paths, "value", value),
+    "token": lambda resource_type, paths, value: _coding_term(resource_type, paths, "code", value),
+    "identifier": lambda resource_type, paths, value: _coding_term(resource_type, paths, "value", value),
     "code": _code_term,
     "string": _string_term,
     "reference": _reference_term,
@@ -196,10 +236,17 @@ def _pg_path(path):
     return path.split(".")
 
 
+def date_expression(paths):
+    """The ``COALESCE(fhir_data #>> ...)`` text expression (and params) for date/sort ``paths``.
+
+    Shared with core/fhir/aux_indexes.py, whose expression indexes must match it exactly.
+    """
+    return "COALESCE(" + ", ".join(["fhir_data #>> %s"] * len(paths)) + ")", [_pg_path(path) for path in paths]
+
+
 def _aux_date_term(paths, raw_values):
     # ISO-8601 lexical comparison over COALESCE(polymorphic [x] paths). Repeated params AND.
-    coalesce = "COALESCE(" + ", ".join(["fhir_data #>> %s"] * len(paths)) + ")"
-    coalesce_params = [_pg_path(path) for path in paths]
+    coalesce, coalesce_params = date_expression(paths)
     and_sql, params = [], []
     for raw in raw_values:
         comparator = _DATE_COMPARATORS.get(raw[:2])
@@ -208,13 +255,15 @@ def _aux_date_term(paths, raw_values):
             and_sql.append(f"({coalesce}) {_SQL_OPERATORS[comparator]} %s")
             params += coalesce_params + [value]
         else:
-            # A bare date/dateTime: prefix match, so 2020-01-01 matches that whole instant/day.
-            and_sql.append(f"({coalesce}) LIKE %s")
-            params += coalesce_params + [value + "%"]
+            # A bare date/dateTime: prefix match, so 2020-01-01 matches that whole instant/day. The
+            # redundant lower bound (a string sorts at or after its own prefix) lets the expression
+            # index seek to the first candidate instead of scanning the whole resource type.
+            and_sql.append(f"({coalesce}) >= %s AND ({coalesce}) LIKE %s")
+            params += coalesce_params + [value] + coalesce_params + [value + "%"]
     return " AND ".join(and_sql), params
 
 
-def _aux_param_sql(spec, raw_values):
+def _aux_param_sql(resource_type, spec, raw_values):
     ptype = spec["type"]
     paths = _paths(spec)
     if ptype == "date":
@@ -229,7 +278,7 @@ def _aux_param_sql(spec, raw_values):
             piece = piece.strip()
             if not piece:
                 continue
-            sql, prm = builder(paths, piece)
+            sql, prm = builder(resource_type, paths, piece)
             or_sql.append(sql)
             params += prm
         if or_sql:
@@ -239,10 +288,98 @@ def _aux_param_sql(spec, raw_values):
     return " AND ".join(and_sql), params
 
 
+# ---------------------------------------------------------------------------
+# Auxiliary store: FhirAuxSearchIndex lookups
+# ---------------------------------------------------------------------------
+#
+# With the ``fhir.aux_search_index`` setting on (the default), a param of an indexed type is
+# answered from the extracted FhirAuxSearchIndex rows (core/fhir/search_index.py) instead: each
+# raw value becomes one ``EXISTS (... WHERE resource_id = outer.id AND param = ... AND ...)``
+# subquery on the b-tree indexed ``(param, value)`` / ``(param, date_low|date_high)`` columns.
+# Dates there are matched as FHIR ranges -- the value's implied ``[low, high]`` against the
+# stored element's -- rather than by ISO-8601 string comparison.
+
+
+def _index_value(value):
+    from core.models import FhirAuxSearchIndex
+
+    return value[: FhirAuxSearchIndex.MAX_VALUE_LENGTH]
+
+
+def _index_token_q(value, with_system=True):
+    system, code = _split_token(value)
+    q = Q()
+    if code is not None:
+        q &= Q(value=_index_value(code))
+    if system and with_system:
+        q &= Q(system=_index_value(system))
+    return q
+
+
+def _index_reference_q(value):
+    prefix, _, ref_id = value.rpartition("/")
+    if not prefix:
+        return Q(value=_index_value(ref_id))
+    # "Encounter/1" matches a stored "Encounter/1" and any absolute ".../Encounter/1".
+    return Q(value=_index_value(ref_id)) & (Q(system=_index_value(prefix)) | Q(system__endswith="/" + prefix))
+
+
+def _index_date_q(raw):
+    comparator = _DATE_COMPARATORS.get(raw[:2])
+    bounds = date_range(raw[2:] if comparator else raw)
+    if bounds is None:
+        raise DRFValidationError(f"Invalid date value: '{raw}'.")
+    low, high = bounds
+    if comparator == "gte":
+        return Q(date_high__gte=low)
+    if comparator == "lte":
+        return Q(date_low__lte=high)
+    if comparator == "gt":
+        return Q(date_high__gt=high)
+    if comparator == "lt":
+        return Q(date_low__lt=low)
+    return Q(date_low__gte=low, date_high__lte=high)
+
+
+_INDEX_Q_BUILDERS = {
+    "token": _index_token_q,
+    "identifier": _index_token_q,
+    "code": lambda value: _index_token_q(value, with_system=False),
+    "string": lambda value: Q(value__startswith=_index_value(value.strip().lower())),
+    "reference": _index_reference_q,
+}
+
+
+def _index_param_q(param, spec, raw_values):
+    """One ``Exists`` per raw value -- repeated params AND, so the caller filters on each."""
+    from core.models import FhirAuxSearchIndex
+
+    ptype = spec["type"]
+    conditions = []
+    for raw in raw_values:
+        if ptype == "date":
+            matched = _index_date_q(raw)
+        else:
+            pieces = [piece.strip() for piece in raw.split(",") if piece.strip()]
+            if not pieces:
+                continue
+            matched = Q()
+            for piece in pieces:  # comma-separated values OR together
+                matched |= _INDEX_Q_BUILDERS[ptype](piece)
+        rows = FhirAuxSearchIndex.objects.filter(resource=OuterRef("pk"), param=param).filter(matched)
+        conditions.append(Exists(rows))
+    return conditions
+
+
 def _apply_aux_filters(queryset, resource_type, request):
     specs = aux_search_params(resource_type)
+    use_index = get_setting("fhir.aux_search_index", True)
     for index, (param, raw_values) in enumerate(_match_params(request, specs.keys()).items()):
-        sql, params = _aux_param_sql(specs[param], raw_values)
+        if use_index and specs[param].get("type") in INDEXED_TYPES:
+            for condition in _index_param_q(param, specs[param], raw_values):
+                queryset = queryset.filter(condition)
+            continue
+        sql, params = _aux_param_sql(resource_type, specs[param], raw_values)
         if not sql:
             continue
         flag = f"_search{index}"
@@ -341,8 +478,7 @@ def _annotate_sort_date(queryset, resource_type, store):
     paths = aux_sort_date(resource_type)
     if not paths:
         return None, queryset
-    sql = "COALESCE(" + ", ".join(["fhir_data #>> %s"] * len(paths)) + ")"
-    params = [_pg_path(path) for path in paths]
+    sql, params = date_expression(paths)
     return "_sortdate", queryset.annotate(_sortdate=RawSQL(sql, params, output_field=TextField()))
 
 
@@ -366,5 +502,8 @@ def _apply_sort(queryset, resource_type, request, store):
             order.append(("-" if descending else "") + sort_name)
         # Unknown sort keys are ignored (FHIR permits a server to ignore unsupported _sort keys).
     if order:
+        # The sort keys are not unique; pk breaks their ties (in the last key's direction) so that
+        # _page offsets never skip or repeat a row.
+        order.append("-pk" if order[-1].startswith("-") else "pk")
         queryset = queryset.order_by(*order)
     return queryset
@@ -0,0 +1,216 @@
+"""Token-side search index for auxiliary resources (``FhirAuxSearchIndex``).
+
+Every time a FhirAuxResource is saved its ``__search`` values are extracted from ``fhir_data``
+into narrow, b-tree-indexed ``FhirAuxSearchIndex`` rows, so an aux search filter becomes an
+``EXISTS`` lookup on ``(param, value)`` / ``(param, date_low|date_high)`` instead of a JSONB scan
+of every row of the resource type (core/fhir/search.py builds those lookups).
+
+Extraction mirrors the JSONB builder's lax-mode paths: a dotted ``path`` is walked through the
+body with every JSON array along it -- including the leaf -- unwrapped, so one declared path
+yields a row per Coding, repeating element or scalar it reaches. Per param type:
+
+  * ``token`` / ``identifier`` -- a Coding's ``system`` + ``code`` / an Identifier's ``system`` +
+    ``value``;
+  * ``code`` -- the plain code string (no system);
+  * ``string`` -- the string, lower-cased (string search is a case-insensitive prefix match);
+  * ``reference`` -- the reference split at its last ``/``: prefix in ``system``, id in ``value``
+    (so both ``Encounter/1`` and a bare ``1`` are equality lookups);
+  * ``date`` -- the first path (in declaration order) that has a value, as the ``[date_low,
+    date_high]`` instant range its precision implies (``2021`` is the whole year).
+
+The index is maintained by a ``post_save`` signal (core/signals.py), so every writer -- the FHIR
+endpoint's ``_persist_aux`` -- keeps it current; the bulk writers, which send no signal, index
+their rows themselves: the R4 Bundle import's batched insert (``bulk_create_aux_resources``) with
+:func:`index_new_aux_resources`, the index-refs pass's ``bulk_update`` with
+:func:`index_aux_resources`. It is rebuilt for existing rows by ``manage.py
+rebuild_fhir_aux_search_index``.
+"""
+
+import calendar
+from datetime import UTC, datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.fhir.config import aux_search_params
+
+# Bulk-insert batch and rebuild chunk size.
+BATCH_SIZE = 1000
+
+INDEXED_TYPES = frozenset({"token", "identifier", "code", "string", "reference", "date"})
+
+
+def _paths(spec):
+    path = spec.get("path")
+    return path if isinstance(path, list) else [path]
+
+
+def _leaves(node, segments):
+    # Lax-mode walk: arrays are unwrapped at every step, and at the leaf.
+    if isinstance(node, list):
+        for item in node:
+            yield from _leaves(item, segments)
+        return
+    if not segments:
+        yield node
+        return
+    if isinstance(node, dict) and segments[0] in node:
+        yield from _leaves(node[segments[0]], segments[1:])
+
+
+def _clip(value):
+    from core.models import FhirAuxSearchIndex
+
+    return value[: FhirAuxSearchIndex.MAX_VALUE_LENGTH] if isinstance(value, str) else value
+
+
+def date_range(text):
+    """The inclusive ``(low, high)`` instants a FHIR date/dateTime/instant covers, or ``None``.
+
+    A partial date spans its whole year/month/day and a dateTime its whole second; a dateTime
+    without an offset is taken as UTC.
+    """
+    if not isinstance(text, str):
+        return None
+    text = text.strip()
+    try:
+        if len(text) == 4:
+            low = datetime(int(text), 1, 1, tzinfo=UTC)
+            return low, low.replace(year=low.year + 1) - timedelta(microseconds=1)
+        if len(text) == 7:
+            year, month = int(text[:4]), int(text[5:7])
+            low = datetime(year, month, 1, tzinfo=UTC)
+            return low, low + timedelta(days=calendar.monthrange(year, month)[1]) - timedelta(microseconds=1)
+        if len(text) == 10:
+            low = datetime.fromisoformat(text).replace(tzinfo=UTC)
+            return low, low + timedelta(days=1) - timedelta(microseconds=1)
+    except ValueError:
+        return None
+    moment = parse_datetime(text)
+    if moment is None:
+        return None
+    if timezone.is_naive(moment):
+        moment = moment.replace(tzinfo=UTC)
+    if moment.microsecond:
+        return moment, moment
+    return moment, moment + timedelta(seconds=1) - timedelta(microseconds=1)
+
+
+def _value_rows(ptype, leaf):
+    if ptype in ("token", "identifier"):
+        if isinstance(leaf, dict):
+            key = "code" if ptype == "token" else "value"
+            yield {"system": _clip(leaf.get("system")), "value": _clip(leaf.get(key))}
+    elif ptype == "code":
+        if isinstance(leaf, str):
+            yield {"value": _clip(leaf)}
+    elif ptype == "string":
+        if isinstance(leaf, str):
+            yield {"value": _clip(leaf.strip().lower())}
+    elif ptype == "reference":
+        if isinstance(leaf, str):
+            prefix, _, ref_id = leaf.strip().rpartition("/")
+            yield {"system": _clip(prefix or None), "value": _clip(ref_id)}
+
+
+def extract_index_values(resource_type, body):
+    """The ``FhirAuxSearchIndex`` field dicts (``param`` included) for one aux body."""
+    rows = []
+    for param, spec in aux_search_params(resource_type).items():
+        ptype = spec.get("type")
+        if ptype not in INDEXED_TYPES:
+            continue
+        if ptype == "date":
+            # COALESCE semantics: the first path that carries a value supplies the date(s).
+            for path in _paths(spec):
+                texts = [leaf for leaf in _leaves(body, path.split(".")) if isinstance(leaf, str)]
+                if not texts:
+                    continue
+                for text in texts:
+                    bounds = date_range(text)
+                    if bounds is not None:
+                        rows.append(
+                            {"param": param, "value": _clip(text), "date_low": bounds[0], "date_high": bounds[1]}
+                        )
+                break
+            continue
+        for path in _paths(spec):
+            for leaf in _leaves(body, path.split(".")):
+                rows.extend({"param": param, **row} for row in _value_rows(ptype, leaf))
+    return rows
+
+
+def index_aux_resource(instance):
+    """Replace ``instance``'s search-index rows with those extracted from its current body."""
+    index_aux_resources([instance])
+
+
+def index_aux_resources(instances):
+    """Replace the search-index rows of ``instances`` (e.g. after a ``bulk_update`` of their bodies)."""
+    from core.models import FhirAuxSearchIndex
+
+    rows = [
+        FhirAuxSearchIndex(resource_id=instance.pk, **values)
+        for instance in instances
+        for values in extract_index_values(instance.resource_type, instance.fhir_data or {})
+    ]
+    with transaction.atomic():
+        FhirAuxSearchIndex.objects.filter(resource_id__in=[instance.pk for instance in instances]).delete()
+        FhirAuxSearchIndex.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+def index_new_aux_resources(instances):
+    """Write the search-index rows of freshly inserted ``instances`` (which have none yet)."""
+    from core.models import FhirAuxSearchIndex
+
+    rows = [
+        FhirAuxSearchIndex(resource_id=instance.pk, **values)
+        for instance in instances
+        for values in extract_index_values(instance.resource_type, instance.fhir_data or {})
+    ]
+    FhirAuxSearchIndex.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+def rebuild_search_index(queryset, batch_size=BATCH_SIZE, index_model=None):
+    """Re-extract the search index of every row in ``queryset`` (a FhirAuxResource queryset).
+
+    Works in ``batch_size`` chunks, each in its own transaction: a chunk's old rows are deleted
+    and its new ones bulk-inserted, so a long rebuild never holds one huge transaction. Returns
+    ``(resources, index_rows)`` counts. ``index_model`` lets a migration pass its historical model.
+    """
+    if index_model is None:
+        from core.models import FhirAuxSearchIndex as index_model
+
+    resources = index_rows = 0
+    chunk = []
+
+    def flush():
+        nonlocal index_rows
+        rows = [
+            index_model(resource_id=pk, **values)
+            for pk, resource_type, body in chunk
+            for values in extract_index_values(resource_type, body or {})
+        ]
+        with transaction.atomic():
+            index_model.objects.filter(resource_id__in=[pk for pk, _, _ in chunk]).delete()
+            index_model.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        index_rows += len(rows)
+        chunk.clear()
+
+    for row in queryset.order_by("pk").values_list("pk", "resource_type", "fhir_data").iterator(chunk_size=batch_size):
+        chunk.append(row)
+        resources += 1
+        if len(chunk) >= batch_size:
+            flush()
+    if chunk:
+        flush()
+    return resources, index_rows
+
+
+def rebuild_search_index_migration(apps, schema_editor):
+    """``RunPython`` helper: index the aux rows that existed before the index table."""
+    rebuild_search_index(
+        apps.get_model("core", "FhirAuxResource").objects.all(),
+        index_model=apps.get_model("core", "FhirAuxSearchIndex"),
+    )
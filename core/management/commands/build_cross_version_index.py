@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.fhir.cross_version_index import index_path, write_index
+from core.fhir.cross_version_maps import XVerMaps
+from core.fhir.cross_version_type_index import build_type_table
+
+
+class Command(BaseCommand):
+    help = "Prebuild the R4 -> R5 cross-version index (type tables, StructureMap groups, ConceptMaps) into one file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Where to write the index (default: settings.FHIR_XVER_INDEX_PATH)")
+
+    def handle(self, *args, **options):
+        path = options["output"] or index_path()
+        types = build_type_table()
+        maps = XVerMaps()
+        size = write_index(types, maps.to_index(), path)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {path}: {len(types)} types, {len(maps.groups)} groups, "
+                f"{len(maps.conceptmaps)} ConceptMaps ({size // 1024} KiB)"
+            )
+        )
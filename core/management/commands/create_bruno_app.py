@@ -4,7 +4,7 @@ from django.utils import timezone
 from oauth2_provider.models import AccessToken, get_application_model
 from oauthlib.common import generate_token
 
-from core.models import JheUser, Organization, PractitionerOrganization
+from core.models import JheUser, Organization, PractitionerOrganization, PractitionerPatientAccess
 
 
 class Command(BaseCommand):
@@ -91,4 +91,6 @@ class Command(BaseCommand):
             PractitionerOrganization(practitioner=practitioner, organization=org, role="manager") for org in orgs_to_add
         ]
         PractitionerOrganization.objects.bulk_create(links)
+        # bulk_create sends no post_save, so project the new memberships explicitly.
+        PractitionerPatientAccess.refresh(practitioner_ids=[practitioner.id])
         self.stdout.write(self.style.SUCCESS(f"  Added {user.email} as manager to {len(links)} organizations"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.fhir.aux_indexes import aux_index_definitions, create_aux_indexes, drop_aux_indexes, render_statement
+
+
+class Command(BaseCommand):
+    help = "Create (or drop) the Postgres indexes backing the FhirAuxResource search params in fhir_config.json"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--drop", action="store_true", help="Drop the indexes instead of creating them")
+        parser.add_argument(
+            "--concurrently",
+            action="store_true",
+            help="Build/drop with CONCURRENTLY so writes are not blocked (slower; not inside a transaction)",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Print the SQL without executing it")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            for _, create, drop in aux_index_definitions():
+                statement = drop if options["drop"] else create
+                self.stdout.write(render_statement(statement, options["concurrently"]) + ";")
+            return
+
+        if options["drop"]:
+            names = drop_aux_indexes(connection, concurrently=options["concurrently"])
+            self.stdout.write(self.style.SUCCESS(f"Dropped {len(names)} FhirAuxResource search indexes"))
+        else:
+            names = create_aux_indexes(connection, concurrently=options["concurrently"])
+            self.stdout.write(self.style.SUCCESS(f"Ensured {len(names)} FhirAuxResource search indexes"))
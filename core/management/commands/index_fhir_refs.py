@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.fhir.ref_indexing import run_ref_index_job
+from core.models import FhirRefIndexJob, FhirSource
+
+
+class Command(BaseCommand):
+    help = "Rewrite a FhirSource's aux-resource references from upstream ids to JHE ids, chunk by chunk"
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--source", help="Id of the FhirSource to index (starts a new job)")
+        target.add_argument("--resume", metavar="JOB_ID", help="Resume an interrupted or failed index-refs job")
+        parser.add_argument(
+            "--cross-source",
+            action="store_true",
+            help="Also resolve references against the patient's other FhirSources (new jobs only)",
+        )
+
+    def handle(self, *args, **options):
+        if options["resume"]:
+            job = FhirRefIndexJob.objects.filter(pk=options["resume"]).first()
+            if job is None:
+                raise CommandError(f"No index-refs job {options['resume']}")
+        else:
+            fhir_source = FhirSource.objects.select_related("patient").filter(pk=options["source"]).first()
+            if fhir_source is None:
+                raise CommandError(f"No FhirSource {options['source']}")
+            job = FhirRefIndexJob.objects.create(
+                jhe_user=fhir_source.patient.jhe_user, fhir_source=fhir_source, cross_source=options["cross_source"]
+            )
+        run_ref_index_job(job.pk, resume=bool(options["resume"]))
+        job.refresh_from_db()
+        if job.status != FhirRefIndexJob.STATUS_COMPLETED:
+            raise CommandError(f"Index-refs job {job.pk} is {job.status}: {job.error or 'not resumable'}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Job {job.pk}: indexed {job.rows_indexed} rows, rewrote {job.refs_rewritten} references "
+                f"({job.refs_not_found} not found)"
+            )
+        )
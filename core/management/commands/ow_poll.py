@@ -14,7 +14,10 @@ Modes (selected via the ``ow.ingest_mode`` JheSetting):
 
 * ``raw``: walks the OW S3/MinIO bucket and converts via
   ``omh_shim.convert(source="oura_raw")``. Dedup uses the same pattern with
-  ``system="ow:raw"``.
+  ``system="ow:raw"``. Each tick lists every user's heart-rate prefix,
+  starting after the user's ``OwIngestCheckpoint`` (the last key
+  fully ingested for them), and reads the new objects concurrently; a user's
+  checkpoint only advances when every one of their objects was ingested.
 
 The command no-ops in two situations:
 
@@ -25,17 +28,29 @@ The command no-ops in two situations:
 
 OW connection config (``ow.api_url``, ``ow.api_key``) is read from JheSettings
 via ``get_setting()``, matching ``core/views/ow.py``.
+
+Users are polled concurrently: a thread pool of ``ow.poll_concurrency`` workers
+(default ``DEFAULT_POLL_CONCURRENCY``) sharing one pooled HTTP session does the
+network I/O and OMH conversion, while the command's own thread does all the
+database work -- per user, one ``value__in`` query dedups every record in the
+response and the new Observations and their identifiers are bulk-inserted.
+Each tick ends with a metrics line (users polled/failed, records seen/created,
+per-user fetch latency percentiles).
 """
 
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
 import requests
 from django.core.cache import cache
 from django.core.management.base import BaseCommand
-from django.db import IntegrityError, transaction
+from django.db import transaction
+from django.db.models import Max
 from django.utils import timezone
 from omh_shim import convert
+from requests.adapters import HTTPAdapter
 
 from core.models import (
     CodeableConcept,
@@ -44,9 +59,10 @@ from core.models import (
     JheUser,
     Observation,
     ObservationIdentifier,
+    OwIngestCheckpoint,
 )
 from core.services.jhe_settings import get_setting
-from core.services.ow_ingest import list_new_objects, read_object
+from core.services.ow_ingest import get_client, list_new_objects_by_user, load_config, read_object
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +77,10 @@ _SYNC_LOCK_KEY = "ow.sync_in_progress"
 # and is force-reclaimed by the next tick. Sized at ~2x the default cron
 # interval (15 min) so a healthy long-running poll is never preempted.
 LOCK_STALE_AFTER = timedelta(minutes=30)
+# Users fetched in parallel when ``ow.poll_concurrency`` is unset.
+DEFAULT_POLL_CONCURRENCY = 8
+# Rows per INSERT / per dedup ``value__in`` lookup.
+BATCH_SIZE = 1000
 
 
 def _write_sync_lock(value: str) -> None:
@@ -75,6 +95,172 @@ def _write_sync_lock(value: str) -> None:
     cache.delete(f"jhe_setting:{_SYNC_LOCK_KEY}")
 
 
+def poll_concurrency() -> int:
+    """Worker threads per tick, from the ``ow.poll_concurrency`` JheSetting (at least 1)."""
+    try:
+        return max(1, int(get_setting("ow.poll_concurrency", DEFAULT_POLL_CONCURRENCY)))
+    except (TypeError, ValueError):
+        return DEFAULT_POLL_CONCURRENCY
+
+
+def _http_session(pool_size: int) -> requests.Session:
+    # One keep-alive connection pool shared by every worker, sized to the worker count.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an ascending list.
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _convert_all(records, source, label):
+    omh_records = []
+    for record in records:
+        try:
+            omh_records.append(convert(source=source, data_type="heart_rate", sample=record))
+        except Exception:
+            logger.warning("Skipping unconvertible record for %s", label, exc_info=True)
+    return omh_records
+
+
+def fetch_normalized(session, ow_api_url, ow_api_key, user_id, ow_user_id, start_time, end_time):
+    """Fetch and convert one user's timeseries window; ``None`` when the request fails.
+
+    Runs on a worker thread, so it must not touch the database.
+    """
+    try:
+        resp = session.get(
+            f"{ow_api_url}/api/v1/users/{ow_user_id}/timeseries",
+            params={
+                "types": "heart_rate",
+                "start_time": start_time.isoformat(),
+                "end_time": end_time.isoformat(),
+            },
+            headers={"X-Open-Wearables-API-Key": ow_api_key},
+            timeout=30,
+        )
+    except requests.RequestException as e:
+        logger.error("OW timeseries request failed for user=%s: %s", user_id, e)
+        return None
+
+    if resp.status_code != 200:
+        logger.error(
+            "OW timeseries error for user=%s: %s %s",
+            user_id,
+            resp.status_code,
+            resp.text[:300],
+        )
+        return None
+
+    data = resp.json()
+    records = data.get("data", data) if isinstance(data, dict) else data
+    if not isinstance(records, list):
+        logger.warning("OW timeseries returned non-list payload for user=%s", user_id)
+        return None
+    return _convert_all(records, "ow_normalized", f"user={user_id}")
+
+
+def raw_prefix(s3_config) -> str:
+    """The S3 key prefix of the raw heart-rate objects; per-user keys continue ``<ow user id>/``."""
+    return f"{s3_config.key_prefix.rstrip('/')}{RAW_TRACE_ID_HEART_RATE}/"
+
+
+def fetch_raw_object(client, bucket, key):
+    """Read and convert one raw S3 heart-rate object; ``None`` when it cannot be read.
+
+    Runs on a worker thread, so it must not touch the database.
+    """
+    try:
+        payload = read_object(key, client=client, bucket=bucket)
+    except Exception:
+        logger.warning("Unreadable raw object %s", key, exc_info=True)
+        return None
+    return _convert_all(payload.get("data", []), "oura_raw", f"key={key}")
+
+
+def save_checkpoints(prefix, last_keys):
+    """Record ``{ow_user_id: last_key}`` as the users' raw listing checkpoints under ``prefix``."""
+    for ow_user_id, last_key in last_keys.items():
+        OwIngestCheckpoint.objects.update_or_create(
+            ow_user_id=ow_user_id, prefix=prefix, defaults={"last_key": last_key}
+        )
+
+
+def persist_records(patient, omh_records, system, data_source, hr_code):
+    """Insert the not-yet-ingested ``omh_records`` for ``patient``; return how many were created.
+
+    Each record is deduped by ``ObservationIdentifier(system, value=<omh-header.uuid>)``: all of
+    a response's uuids are checked in ``value__in`` batches, then the new Observations and their
+    identifiers are bulk-inserted in one transaction. Identifiers insert with
+    ``ignore_conflicts``; an Observation whose identifier lost a race with a concurrent writer is
+    deleted again, so a uuid is only ever ingested once.
+    """
+    by_uuid = {}
+    for omh_record in omh_records:
+        uuid_value = omh_record.get("header", {}).get("uuid")
+        if uuid_value and uuid_value not in by_uuid:
+            by_uuid[uuid_value] = omh_record
+    uuids = list(by_uuid)
+    existing = set()
+    for i in range(0, len(uuids), BATCH_SIZE):
+        existing.update(
+            ObservationIdentifier.objects.filter(system=system, value__in=uuids[i : i + BATCH_SIZE]).values_list(
+                "value", flat=True
+            )
+        )
+
+    pending = []
+    for uuid_value, omh_record in by_uuid.items():
+        if uuid_value in existing:
+            continue
+        observation = Observation(
+            subject_patient=patient,
+            codeable_concept=hr_code,
+            data_source=data_source,
+            omh_data=omh_record,
+            status="final",
+        )
+        try:
+            # bulk_create bypasses save(): validate and project the timing columns here.
+            observation.clean()
+            observation._sync_effective_time_frame()
+        except Exception:
+            logger.warning(
+                "Failed to persist observation for patient=%s uuid=%s",
+                patient.id,
+                uuid_value,
+                exc_info=True,
+            )
+            continue
+        pending.append((uuid_value, observation))
+    if not pending:
+        return 0
+
+    with transaction.atomic():
+        observations = Observation.objects.bulk_create([obs for _, obs in pending], batch_size=BATCH_SIZE)
+        ObservationIdentifier.objects.bulk_create(
+            [
+                ObservationIdentifier(observation=obs, system=system, value=uuid_value)
+                for (uuid_value, _), obs in zip(pending, observations, strict=True)
+            ],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        claimed = set(
+            ObservationIdentifier.objects.filter(observation__in=observations).values_list("observation_id", flat=True)
+        )
+        orphans = [obs.pk for obs in observations if obs.pk not in claimed]
+        if orphans:
+            # Lost a race with a concurrent tick; treat as already-ingested.
+            Observation.objects.filter(pk__in=orphans).delete()
+    return len(observations) - len(orphans)
+
+
 class Command(BaseCommand):
     help = "Poll Open Wearables for new observations."
 
@@ -157,212 +343,158 @@ class Command(BaseCommand):
             return
 
         oura_ds, _ = DataSource.objects.get_or_create(name="Oura", defaults={"type": "personal_device"})
+        system = NORMALIZED_SYSTEM if mode == "normalized" else RAW_SYSTEM
 
         # Only users linked to an OW account: identifier startswith "ow:".
-        users = JheUser.objects.filter(identifier__startswith="ow:")
+        users = JheUser.objects.filter(identifier__startswith="ow:").select_related("patient_profile")
         patient_id = options.get("patient_id")
         if patient_id is not None:
             users = users.filter(patient_profile__id=patient_id)
 
-        total_created = 0
+        targets = []
         for user in users:
             patient = getattr(user, "patient_profile", None)
             if patient is None:
                 continue
-            consented_codes = {s.coding_code for s in patient.consolidated_consented_scopes()}
-            if HEART_RATE_CODE not in consented_codes:
-                continue
+            if hr_code.id in patient.consented_scope_ids():
+                targets.append((user, patient))
 
-            try:
-                if mode == "normalized":
-                    created = self._poll_user_normalized(user, patient, oura_ds, hr_code, ow_api_url, ow_api_key)
-                else:
-                    created = self._poll_user_raw(user, patient, oura_ds, hr_code)
-                total_created += created
-            except Exception:
-                logger.exception("ow_poll failed for jhe_user_id=%s", user.id)
-
-        self.stdout.write(self.style.SUCCESS(f"OW poll complete (mode={mode}). Created {total_created} observations."))
-
-    def _poll_user_normalized(self, user, patient, data_source, hr_code, ow_api_url, ow_api_key):
-        ow_user_id = user.identifier.removeprefix("ow:")
-        end_time = timezone.now()
-        start_time = end_time - POLL_WINDOW
-
-        # Resume from the most recent successfully ingested record so we
-        # don't refetch the entire window every tick.
-        last_obs = (
+        # Resume each user from its most recent successfully ingested record (one query for
+        # all of them) so we don't refetch the entire window every tick.
+        last_ingested = dict(
             Observation.objects.filter(
-                subject_patient=patient,
+                subject_patient__in=[patient for _, patient in targets],
                 codeable_concept=hr_code,
-                identifiers__system=NORMALIZED_SYSTEM,
+                identifiers__system=system,
             )
-            .order_by("-last_updated")
-            .first()
+            .values("subject_patient_id")
+            .annotate(last=Max("last_updated"))
+            .values_list("subject_patient_id", "last")
         )
-        if last_obs:
-            start_time = max(start_time, last_obs.last_updated - POLL_OVERLAP)
-
-        try:
-            resp = requests.get(
-                f"{ow_api_url}/api/v1/users/{ow_user_id}/timeseries",
-                params={
-                    "types": "heart_rate",
-                    "start_time": start_time.isoformat(),
-                    "end_time": end_time.isoformat(),
-                },
-                headers={"X-Open-Wearables-API-Key": ow_api_key},
-                timeout=30,
-            )
-        except requests.RequestException as e:
-            logger.error("OW timeseries request failed for user=%s: %s", user.id, e)
-            return 0
-
-        if resp.status_code != 200:
-            logger.error(
-                "OW timeseries error for user=%s: %s %s",
-                user.id,
-                resp.status_code,
-                resp.text[:300],
-            )
-            return 0
-
-        data = resp.json()
-        records = data.get("data", data) if isinstance(data, dict) else data
-        if not isinstance(records, list):
-            logger.warning("OW timeseries returned non-list payload for user=%s", user.id)
-            return 0
-
-        created = 0
-        for record in records:
-            try:
-                omh_record = convert(source="ow_normalized", data_type="heart_rate", sample=record)
-            except Exception:
-                logger.warning("Skipping unconvertible record for user=%s", user.id, exc_info=True)
-                continue
-
-            uuid_value = omh_record.get("header", {}).get("uuid")
-            if not uuid_value:
-                continue
-
-            # Dedup: paired ObservationIdentifier row with (system, value) unique.
-            if ObservationIdentifier.objects.filter(system=NORMALIZED_SYSTEM, value=uuid_value).exists():
-                continue
 
+        since_by_user = {}
+        for user, patient in targets:
+            start_time = timezone.now() - POLL_WINDOW
+            if patient.id in last_ingested:
+                start_time = max(start_time, last_ingested[patient.id] - POLL_OVERLAP)
+            since_by_user[user.id] = start_time
+
+        raw_objects = {}
+        if mode == "raw":
+            # List every user's objects, resumed from their checkpoints; a failure here
+            # fails the whole tick (there is nothing per-user left to fall back to).
             try:
-                with transaction.atomic():
-                    obs = Observation.objects.create(
-                        subject_patient=patient,
-                        codeable_concept=hr_code,
-                        data_source=data_source,
-                        omh_data=omh_record,
-                        status="final",
+                s3_config = load_config()
+                client = get_client(s3_config)
+                prefix = raw_prefix(s3_config)
+                ow_user_ids = {user.id: user.identifier.removeprefix("ow:") for user, _ in targets}
+                checkpoints = dict(
+                    OwIngestCheckpoint.objects.filter(prefix=prefix, ow_user_id__in=ow_user_ids.values()).values_list(
+                        "ow_user_id", "last_key"
                     )
-                    ObservationIdentifier.objects.create(
-                        observation=obs,
-                        system=NORMALIZED_SYSTEM,
-                        value=uuid_value,
-                    )
-                created += 1
-            except IntegrityError:
-                # Lost a race with a concurrent tick; treat as already-ingested.
-                continue
-            except Exception:
-                logger.warning(
-                    "Failed to persist observation for patient=%s uuid=%s",
-                    patient.id,
-                    uuid_value,
-                    exc_info=True,
                 )
-
-        logger.info("Poll completed for jhe_user=%s patient=%s created=%d", user.id, patient.id, created)
-        return created
-
-    def _poll_user_raw(self, user, patient, data_source, hr_code):
-        """Raw S3-backed ingest. Walks the OW MinIO bucket for new objects.
-
-        Each individual record (not each S3 object) is deduped via
-        ``ObservationIdentifier(system="ow:raw", value=<omh-header.uuid>)``,
-        mirroring the normalized path so that idempotency is guaranteed even
-        if the same payload is re-uploaded under a different S3 key.
-        """
-        ow_user_id = user.identifier.removeprefix("ow:")
-        end_time = timezone.now()
-        start_time = end_time - POLL_WINDOW
-
-        last_obs = (
-            Observation.objects.filter(
-                subject_patient=patient,
-                codeable_concept=hr_code,
-                identifiers__system=RAW_SYSTEM,
-            )
-            .order_by("-last_updated")
-            .first()
-        )
-        if last_obs:
-            start_time = max(start_time, last_obs.last_updated - POLL_OVERLAP)
-
+                listed = list_new_objects_by_user(
+                    client,
+                    s3_config.bucket,
+                    prefix,
+                    {ow_user_ids[user_id]: since for user_id, since in since_by_user.items()},
+                    checkpoints,
+                )
+            except Exception as e:
+                self.stderr.write(f"ow_poll aborted: OW raw S3 listing failed: {e}")
+                logger.exception("OW raw S3 listing failed")
+                return
+            raw_objects = {user_id: listed[ow_user_id] for user_id, ow_user_id in ow_user_ids.items()}
+
+        concurrency = poll_concurrency()
+        session = _http_session(concurrency) if mode == "normalized" else None
+        latencies = []
+        failed_users = set()
+        records_seen = total_created = 0
+        # Raw mode: objects still outstanding per user, and the key each user's checkpoint
+        # advances to once all of them have been ingested.
+        remaining = {user_id: len(objects) for user_id, objects in raw_objects.items()}
+        last_keys = {}
+        created_by_user = {}
         try:
-            objects = list_new_objects(ow_user_id, start_time)
-        except Exception as e:
-            logger.error("OW raw S3 list failed for user=%s: %s", user.id, e)
-            return 0
-
-        created = 0
-        for obj in objects:
-            # Only heart-rate keys for now; other endpoints are a follow-up.
-            if RAW_TRACE_ID_HEART_RATE not in obj.key:
-                continue
-
-            try:
-                payload = read_object(obj.key)
-            except Exception:
-                logger.warning("Skipping unreadable raw object %s", obj.key, exc_info=True)
-                continue
-
-            for record in payload.get("data", []):
-                try:
-                    omh_record = convert(source="oura_raw", data_type="heart_rate", sample=record)
-                except Exception:
-                    logger.warning("Skipping unconvertible raw record key=%s", obj.key, exc_info=True)
-                    continue
-
-                uuid_value = omh_record.get("header", {}).get("uuid")
-                if not uuid_value:
-                    continue
-
-                if ObservationIdentifier.objects.filter(system=RAW_SYSTEM, value=uuid_value).exists():
-                    continue
-
-                try:
-                    with transaction.atomic():
-                        obs = Observation.objects.create(
-                            subject_patient=patient,
-                            codeable_concept=hr_code,
-                            data_source=data_source,
-                            omh_data=omh_record,
-                            status="final",
-                        )
-                        ObservationIdentifier.objects.create(
-                            observation=obs,
-                            system=RAW_SYSTEM,
-                            value=uuid_value,
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ow-poll") as pool:
+                futures = {}
+                for user, patient in targets:
+                    ow_user_id = user.identifier.removeprefix("ow:")
+                    if mode == "normalized":
+                        args = (fetch_normalized, session, ow_api_url, ow_api_key, user.id, ow_user_id)
+                        future = pool.submit(self._timed, *args, since_by_user[user.id], timezone.now())
+                        futures[future] = (user, patient)
+                        continue
+                    # Raw mode reads every new object concurrently, not one user at a time.
+                    for obj in raw_objects[user.id]:
+                        future = pool.submit(self._timed, fetch_raw_object, client, s3_config.bucket, obj.key)
+                        futures[future] = (user, patient)
+                    if raw_objects[user.id]:
+                        last_keys[ow_user_id] = raw_objects[user.id][-1].key
+
+                # Database writes stay on this thread, as each fetch completes.
+                for future in as_completed(futures):
+                    user, patient = futures[future]
+                    try:
+                        omh_records, latency = future.result()
+                        latencies.append(latency)
+                        if omh_records is None:
+                            failed_users.add(user.id)
+                            continue
+                        records_seen += len(omh_records)
+                        created = persist_records(patient, omh_records, system, oura_ds, hr_code)
+                        total_created += created
+                        created_by_user[user.id] = created_by_user.get(user.id, 0) + created
+                        if user.id in remaining:
+                            remaining[user.id] -= 1
+                            if remaining[user.id]:
+                                continue
+                        logger.info(
+                            "Poll completed for jhe_user=%s patient=%s mode=%s created=%d",
+                            user.id,
+                            patient.id,
+                            mode,
+                            created_by_user[user.id],
                         )
-                    created += 1
-                except IntegrityError:
-                    continue
-                except Exception:
-                    logger.warning(
-                        "Failed to persist raw observation patient=%s uuid=%s",
-                        patient.id,
-                        uuid_value,
-                        exc_info=True,
-                    )
-
-        logger.info(
-            "Raw poll completed for jhe_user=%s patient=%s created=%d",
-            user.id,
-            patient.id,
-            created,
+                    except Exception:
+                        failed_users.add(user.id)
+                        logger.exception("ow_poll failed for jhe_user_id=%s", user.id)
+        finally:
+            if session is not None:
+                session.close()
+
+        if mode == "raw":
+            # A user with an unread or unsaved object keeps their checkpoint, so it is retried.
+            failed_ow_ids = {user.identifier.removeprefix("ow:") for user, _ in targets if user.id in failed_users}
+            save_checkpoints(prefix, {k: v for k, v in last_keys.items() if k not in failed_ow_ids})
+
+        metrics = self._metrics(len(targets), len(failed_users), records_seen, total_created, latencies, concurrency)
+        logger.info("ow_poll tick: %s", metrics)
+        self.stdout.write(
+            self.style.SUCCESS(f"OW poll complete (mode={mode}). Created {total_created} observations. {metrics}")
         )
-        return created
+
+    @staticmethod
+    def _timed(fetch, *args):
+        started = time.monotonic()
+        result = fetch(*args)
+        return result, time.monotonic() - started
+
+    @staticmethod
+    def _metrics(users_polled, users_failed, records_seen, created, latencies, concurrency):
+        parts = [
+            f"users_polled={users_polled}",
+            f"users_failed={users_failed}",
+            f"records_seen={records_seen}",
+            f"records_created={created}",
+            f"concurrency={concurrency}",
+        ]
+        if latencies:
+            latencies = sorted(latencies)
+            parts += [
+                f"latency_p50_ms={_percentile(latencies, 0.5) * 1000:.0f}",
+                f"latency_p95_ms={_percentile(latencies, 0.95) * 1000:.0f}",
+                f"latency_max_ms={latencies[-1] * 1000:.0f}",
+            ]
+        return " ".join(parts)
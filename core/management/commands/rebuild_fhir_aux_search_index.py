@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.fhir.search_index import BATCH_SIZE, rebuild_search_index
+from core.models import FhirAuxResource
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-extract the FhirAuxSearchIndex rows of existing FhirAuxResource rows (e.g. after a __search config change)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--resource-type", help="Only rebuild rows of this FHIR resource type")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Resources per transaction")
+
+    def handle(self, *args, **options):
+        queryset = FhirAuxResource.objects.all()
+        if options["resource_type"]:
+            queryset = queryset.filter(resource_type=options["resource_type"])
+        resources, rows = rebuild_search_index(queryset, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {resources} FhirAuxResource rows ({rows} search index rows)"))
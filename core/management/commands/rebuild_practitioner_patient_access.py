@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.models import PractitionerPatientAccess
+
+
+class Command(BaseCommand):
+    help = "Recompute the PractitionerPatientAccess table from the patient/practitioner organization memberships"
+
+    def handle(self, *args, **options):
+        rows = PractitionerPatientAccess.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt PractitionerPatientAccess ({rows} rows)"))
@@ -25,6 +25,7 @@ from core.models import (
     Organization,
     PatientIdentifier,
     PractitionerOrganization,
+    PractitionerPatientAccess,
     Study,
     StudyClient,
     StudyDataSource,
@@ -72,6 +73,8 @@ class Command(BaseCommand):
             self.seed_oauth_application()
             self.seed_mcp_broker_application()
             self.seed_sof_ehr_launch_application()
+            # The practitioner memberships are bulk-inserted (no post_save), so project them here.
+            PractitionerPatientAccess.rebuild()
 
         if options.get("with_rich_demo"):
             self.stdout.write("Generating rich demo data (CGM + Oura)…")
@@ -115,6 +118,10 @@ class Command(BaseCommand):
                 ["https://fhir.epic.com/interconnect-fhir-oauth/oauth2"],
             ),
             ("auth.sof.trusted_audience", "string", "77849e74-8e2a-4c2f-826c-bdbef6da3357"),
+            # Issuer discovery cache (core/oidc_verify.py), seconds: fresh lifetime cap,
+            # then how long a stale jwks_uri is served while it revalidates.
+            ("auth.sof.discovery_ttl", "int", 3600),
+            ("auth.sof.discovery_stale_ttl", "int", 86400),
             # Open Wearables polling pipeline (see ow_poll management command).
             ("module.ow", "bool", False),
             ("ow.sync_in_progress", "string", ""),
@@ -1,5 +1,8 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import HttpResponse
 
+from core.fhir.scope import auth_context
+
 
 class OAuthCorsMiddleware:
     """Permissive CORS for the OAuth endpoints under /o/.
@@ -32,3 +35,30 @@ class OAuthCorsMiddleware:
             response["Access-Control-Allow-Headers"] = "Authorization, Content-Type"
             response["Access-Control-Max-Age"] = "86400"
         return response
+
+
+class AuthContextMiddleware:
+    """Installs the request-scoped ``AuthContext`` (core/fhir/scope.py).
+
+    ``resolve_fhir_user``, ``JheUser.get_patient`` and ``authorize_practitioner_scope`` memoize
+    on it for the rest of the request. The context lives in a ``ContextVar``, so it follows the
+    request through ``sync_to_async`` hops under ASGI and is discarded when the response returns.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with auth_context():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with auth_context():
+            return await self.get_response(request)
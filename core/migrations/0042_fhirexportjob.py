@@ -0,0 +1,34 @@
+# Generated by Django 5.2.15 on 2026-10-18 02:29
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0041_observation_effective_time_frame'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FhirExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('level', models.CharField(choices=[('system', 'System'), ('patient', 'Patient'), ('group', 'Group')])),
+                ('group_id', models.BigIntegerField(blank=True, null=True)),
+                ('resource_types', models.JSONField(default=list)),
+                ('since', models.DateTimeField(blank=True, null=True)),
+                ('request_url', models.TextField()),
+                ('status', models.CharField(choices=[('accepted', 'Accepted'), ('in-progress', 'In progress'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='accepted')),
+                ('output', models.JSONField(default=list)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('transaction_time', models.DateTimeField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('jhe_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fhir_export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations
+
+from core.fhir.aux_indexes import create_aux_indexes_migration, drop_aux_indexes_migration
+
+
+class Migration(migrations.Migration):
+    # GIN + partial expression indexes for the aux search params declared in fhir_config.json.
+    # Config changes after this migration are picked up with ``manage.py fhir_aux_indexes``.
+
+    dependencies = [
+        ("core", "0042_fhirexportjob"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_aux_indexes_migration, drop_aux_indexes_migration),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.15 on 2026-10-18 02:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.fhir.search_index import rebuild_search_index_migration
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0043_fhirauxresource_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FhirAuxSearchIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('param', models.CharField()),
+                ('system', models.CharField(blank=True, null=True)),
+                ('value', models.CharField(blank=True, null=True)),
+                ('date_low', models.DateTimeField(blank=True, null=True)),
+                ('date_high', models.DateTimeField(blank=True, null=True)),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_index', to='core.fhirauxresource')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['param', 'value'], name='fhirauxsearch_param_value', opclasses=['varchar_pattern_ops', 'varchar_pattern_ops']), models.Index(fields=['param', 'date_low'], name='fhirauxsearch_param_low'), models.Index(fields=['param', 'date_high'], name='fhirauxsearch_param_high')],
+            },
+        ),
+        migrations.RunPython(rebuild_search_index_migration, migrations.RunPython.noop),
+    ]
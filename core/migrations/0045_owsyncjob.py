@@ -0,0 +1,32 @@
+# Generated by Django 5.2.15 on 2026-10-18 03:09
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0044_fhirauxsearchindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwSyncJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('accepted', 'Accepted'), ('in-progress', 'In progress'), ('completed', 'Completed'), ('failed', 'Failed')], default='accepted')),
+                ('files_processed', models.IntegerField(default=0)),
+                ('files_skipped', models.IntegerField(default=0)),
+                ('observations_created', models.IntegerField(default=0)),
+                ('errors', models.JSONField(default=list)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('jhe_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ow_sync_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
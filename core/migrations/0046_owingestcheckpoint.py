@@ -0,0 +1,26 @@
+# Generated by Django 5.2.15 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0045_owsyncjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwIngestCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ow_user_id', models.CharField(max_length=255)),
+                ('prefix', models.CharField(max_length=1024)),
+                ('last_key', models.CharField(max_length=1024)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('ow_user_id', 'prefix'), name='unique_ow_ingest_checkpoint')],
+            },
+        ),
+    ]
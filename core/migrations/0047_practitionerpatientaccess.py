@@ -0,0 +1,38 @@
+# Generated by Django 5.2.15 on 2026-10-18 03:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0046_owingestcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PractitionerPatientAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='practitioner_access', to='core.organization')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='practitioner_access', to='core.patient')),
+                ('practitioner_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patient_access', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('practitioner_user', 'patient', 'organization'), name='core_practitionerpatientaccess_unique')],
+            },
+        ),
+        # Project the memberships that existed before the table.
+        migrations.RunSQL(
+            """
+            INSERT INTO core_practitionerpatientaccess (practitioner_user_id, patient_id, organization_id)
+            SELECT DISTINCT pr.jhe_user_id, po.patient_id, po.organization_id
+            FROM core_patientorganization po
+            JOIN core_practitionerorganization pro ON pro.organization_id = po.organization_id
+            JOIN core_practitioner pr ON pr.id = pro.practitioner_id
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
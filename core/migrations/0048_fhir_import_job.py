@@ -0,0 +1,32 @@
+# Generated by Django 5.2.15 on 2026-10-18 04:08
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0047_practitionerpatientaccess'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FhirImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('fhir_source_id', models.CharField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('accepted', 'Accepted'), ('in-progress', 'In progress'), ('completed', 'Completed'), ('failed', 'Failed')], default='accepted')),
+                ('bundle', models.JSONField(blank=True, null=True)),
+                ('total', models.IntegerField(default=0)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('jhe_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fhir_import_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.15 on 2026-10-18 04:20
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0048_fhir_import_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FhirRefIndexJob",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("cross_source", models.BooleanField(default=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("accepted", "Accepted"),
+                            ("in-progress", "In progress"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="accepted",
+                    ),
+                ),
+                ("rows_indexed", models.IntegerField(default=0)),
+                ("refs_rewritten", models.IntegerField(default=0)),
+                ("refs_not_found", models.IntegerField(default=0)),
+                ("resume_after", models.UUIDField(blank=True, null=True)),
+                ("error", models.TextField(blank=True, null=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                ("finished", models.DateTimeField(blank=True, null=True)),
+                (
+                    "fhir_source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="ref_index_jobs", to="core.fhirsource"
+                    ),
+                ),
+                (
+                    "jhe_user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fhir_ref_index_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
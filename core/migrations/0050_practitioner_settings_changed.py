@@ -0,0 +1,17 @@
+# Generated by Django 5.2.15 on 2026-10-18 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0049_fhir_ref_index_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="practitioner",
+            name="settings_changed",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
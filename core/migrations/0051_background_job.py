@@ -0,0 +1,17 @@
+# Generated by Django 5.2.15 on 2026-10-18 04:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0050_practitioner_settings_changed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fhirexportjob",
+            name="finished",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -4,20 +4,27 @@ from .fhir_aux_resource import (
     JHE_FHIR_SOURCE_BASE,
     JHE_NATIVE_SOURCE,
     FhirAuxResource,
+    FhirAuxSearchIndex,
     apply_jhe_extensions,
     fhir_source_uri,
     parse_fhir_source_id,
 )
+from .fhir_export_job import FhirExportJob
+from .fhir_import_job import FhirImportJob
+from .fhir_ref_index_job import FhirRefIndexJob
 from .fhir_source import FhirSource
 from .jhe_client import JheClient
 from .jhe_setting import JheSetting
 from .jhe_user import JheUser, JheUserManager
 from .observation import Observation, ObservationIdentifier
 from .organization import Organization
+from .ow_ingest_checkpoint import OwIngestCheckpoint
+from .ow_sync_job import OwSyncJob
 from .patient import Patient, PatientIdentifier, PatientOrganization
 from .patient_invitation import PatientInvitation
 from .practitioner import Practitioner, PractitionerOrganization
 from .practitioner_client import PractitionerClient
+from .practitioner_patient_access import PractitionerPatientAccess
 from .study import Study, StudyClient, StudyDataSource, StudyPatient, StudyPatientScopeConsent, StudyScopeRequest
 
 __all__ = [
@@ -28,6 +35,10 @@ __all__ = [
     "JHE_FHIR_SOURCE_BASE",
     "JHE_NATIVE_SOURCE",
     "FhirAuxResource",
+    "FhirAuxSearchIndex",
+    "FhirExportJob",
+    "FhirImportJob",
+    "FhirRefIndexJob",
     "FhirSource",
     "fhir_source_uri",
     "parse_fhir_source_id",
@@ -38,12 +49,15 @@ __all__ = [
     "Observation",
     "ObservationIdentifier",
     "Organization",
+    "OwIngestCheckpoint",
+    "OwSyncJob",
     "Patient",
     "PatientIdentifier",
     "PatientInvitation",
     "PatientOrganization",
     "Practitioner",
     "PractitionerClient",
+    "PractitionerPatientAccess",
     "PractitionerOrganization",
     "Study",
     "StudyClient",
@@ -0,0 +1,61 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class BackgroundJobQuerySet(models.QuerySet):
+    def stale(self):
+        """Active jobs that have not reported progress for ``settings.JOB_STALE_SECONDS``.
+
+        A running job's heartbeat (core/services/jobs.py) keeps ``last_updated`` current, so these
+        are jobs whose process died -- a deploy, the OOM killer, a recycled worker -- or whose
+        thread never started.
+        """
+        cutoff = timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+        return self.filter(status__in=self.model.ACTIVE_STATUSES, last_updated__lt=cutoff)
+
+    def expire_stale(self):
+        """Mark this queryset's stale jobs ``failed``; return how many there were."""
+        now = timezone.now()
+        return self.stale().update(
+            status=self.model.STATUS_FAILED,
+            error="The job stopped reporting progress (its server process exited).",
+            finished=now,
+            last_updated=now,
+        )
+
+
+class BackgroundJob(models.Model):
+    """A unit of work run off the request (see core/services/jobs.py).
+
+    The request that starts one records the row and answers at once; the job then runs on a
+    background thread, and a status endpoint reports its ``status`` from the row. The UUID pk is the
+    opaque job id.
+    """
+
+    STATUS_ACCEPTED = "accepted"
+    STATUS_IN_PROGRESS = "in-progress"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    STATUSES = {
+        STATUS_ACCEPTED: "Accepted",
+        STATUS_IN_PROGRESS: "In progress",
+        STATUS_COMPLETED: "Completed",
+        STATUS_FAILED: "Failed",
+    }
+    ACTIVE_STATUSES = (STATUS_ACCEPTED, STATUS_IN_PROGRESS)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(choices=list(STATUSES.items()), default=STATUS_ACCEPTED)
+    error = models.TextField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    last_updated = models.DateTimeField(auto_now=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    objects = BackgroundJobQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
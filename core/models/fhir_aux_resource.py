@@ -3,7 +3,7 @@ import uuid
 from django.db import models
 
 from core.fhir.config import aux_resource_types
-from core.fhir.scope import authorize_practitioner_scope, resolve_fhir_user
+from core.fhir.scope import authorize_practitioner_scope, patient_access, resolve_fhir_user, study_enrollment
 
 JHE_EXTENSION_BASE = "https://jupyterhealth.org/fhir/StructureDefinition"
 # JHE provenance extension URLs -- stripped from a body before re-stamping so an update replaces
@@ -142,11 +142,10 @@ class FhirAuxResource(models.Model):
         # narrowed to an organization, to a study (its enrolled patients), or to a single patient
         # (each authorized up front, 403 on mismatch). resource_id selects a single row by its
         # UUID. fhir_source_id narrows to a single upstream source (the `_source=<base>/<id>` read
-        # route); like an identifier it is an unauthorized predicate -- the organization/patient
-        # join already scopes the result, so an inaccessible source simply yields nothing.
-        # distinct() collapses the duplicate rows produced by spanning the patient's
-        # organization/study many-to-many relationships. **params is reserved for additional FHIR
-        # search predicates.
+        # route); like an identifier it is an unauthorized predicate -- the patient access scope
+        # already bounds the result, so an inaccessible source simply yields nothing. Access and
+        # study enrollment are correlated EXISTS subqueries, so no row repeats and no distinct()
+        # is needed. **params is reserved for additional FHIR search predicates.
         user = resolve_fhir_user(jhe_user_id)
         if user.is_patient():
             qs = FhirAuxResource.objects.filter(
@@ -156,12 +155,9 @@ class FhirAuxResource(models.Model):
             authorize_practitioner_scope(jhe_user_id, organization_id, study_id, patient_id)
             qs = FhirAuxResource.objects.filter(
                 resource_type=resource_type,
-                fhir_source__patient__organizations__practitioners__jhe_user_id=jhe_user_id,
-            )
-            if organization_id:
-                qs = qs.filter(fhir_source__patient__organizations__id=organization_id)
+            ).filter(patient_access(jhe_user_id, "fhir_source__patient_id", organization_id))
             if study_id:
-                qs = qs.filter(fhir_source__patient__studypatient__study_id=study_id)
+                qs = qs.filter(study_enrollment(study_id, "fhir_source__patient_id"))
             if patient_id:
                 qs = qs.filter(fhir_source__patient_id=patient_id)
 
@@ -170,4 +166,41 @@ class FhirAuxResource(models.Model):
         if fhir_source_id:
             qs = qs.filter(fhir_source_id=fhir_source_id)
 
-        return qs.distinct().order_by("-last_updated")
+        return qs.order_by("-last_updated")
+
+
+class FhirAuxSearchIndex(models.Model):
+    """One extracted search value of a FhirAuxResource row (a token-side search index).
+
+    Each ``__search`` param declared for the row's resource type in fhir_config.json contributes
+    one row per value found in ``fhir_data`` (see core/fhir/search_index.py): a Coding/Identifier's
+    ``system`` + code/value, a plain code, a lower-cased string, a reference split into its prefix
+    (``system``) and trailing id (``value``), or a date's ``[date_low, date_high]`` range. The aux
+    search filters then become indexed ``EXISTS`` lookups here instead of JSONB scans. Rows are
+    rewritten whenever the resource is saved and cascade away with it.
+    """
+
+    # Longer values are truncated (on write and on lookup alike) to stay within b-tree entry limits.
+    MAX_VALUE_LENGTH = 512
+
+    resource = models.ForeignKey(FhirAuxResource, on_delete=models.CASCADE, related_name="search_index")
+    param = models.CharField()
+    system = models.CharField(null=True, blank=True)
+    value = models.CharField(null=True, blank=True)
+    date_low = models.DateTimeField(null=True, blank=True)
+    date_high = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # pattern_ops serves both equality and the string params' prefix LIKE.
+            models.Index(
+                fields=["param", "value"],
+                name="fhirauxsearch_param_value",
+                opclasses=["varchar_pattern_ops", "varchar_pattern_ops"],
+            ),
+            models.Index(fields=["param", "date_low"], name="fhirauxsearch_param_low"),
+            models.Index(fields=["param", "date_high"], name="fhirauxsearch_param_high"),
+        ]
+
+    def __str__(self):
+        return f"{self.resource_id} {self.param}={self.system or ''}|{self.value or ''}"
@@ -0,0 +1,38 @@
+from django.db import models
+
+from .background_job import BackgroundJob
+
+
+class FhirExportJob(BackgroundJob):
+    """A FHIR Bulk Data ``$export`` request and its progress (see core/fhir/export.py).
+
+    The kick-off request records the export ``level`` (``system``, ``patient`` or ``group``), the
+    resource types and ``_since`` cutoff it asked for, and the requesting user -- whose
+    ``fhir_search`` authorization scopes every row the job writes. The job then runs in the
+    background, streaming one NDJSON file per resource type; ``output`` lists the files written
+    (``{"type", "file", "count"}``) once it completes. The UUID pk is the opaque job id used in the
+    status and output URLs.
+    """
+
+    STATUS_CANCELLED = "cancelled"
+    STATUSES = {**BackgroundJob.STATUSES, STATUS_CANCELLED: "Cancelled"}
+
+    LEVELS = {
+        "system": "System",
+        "patient": "Patient",
+        "group": "Group",
+    }
+
+    jhe_user = models.ForeignKey("JheUser", on_delete=models.CASCADE, related_name="fhir_export_jobs")
+    level = models.CharField(choices=list(LEVELS.items()))
+    # The Study (FHIR Group) a group-level export is scoped to.
+    group_id = models.BigIntegerField(null=True, blank=True)
+    resource_types = models.JSONField(default=list)
+    since = models.DateTimeField(null=True, blank=True)
+    request_url = models.TextField()
+    status = models.CharField(choices=list(STATUSES.items()), default=BackgroundJob.STATUS_ACCEPTED)
+    output = models.JSONField(default=list)
+    transaction_time = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"$export {self.level} {self.pk} ({self.status})"
@@ -0,0 +1,24 @@
+from django.db import models
+
+from .background_job import BackgroundJob
+
+
+class FhirImportJob(BackgroundJob):
+    """An R4 Bundle import run in the background (``Prefer: respond-async`` on ``/fhir-import/R4``,
+    see core/services/fhir_import.py).
+
+    The kick-off request validates the Bundle's shape, records the job -- the requesting user, the
+    ``X-JHE-FHIR-Source-ID`` header it named (the write context entries are created under) and the
+    Bundle itself -- and answers ``202 Accepted``. Once the job completes, ``result`` holds the
+    ``batch-response`` entries, in Bundle order, exactly as a synchronous import would have returned
+    them, and the stored Bundle is dropped. The UUID pk is the opaque job id used in the status URL.
+    """
+
+    jhe_user = models.ForeignKey("JheUser", on_delete=models.CASCADE, related_name="fhir_import_jobs")
+    fhir_source_id = models.CharField(null=True, blank=True)
+    bundle = models.JSONField(null=True, blank=True)
+    total = models.IntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+
+    def __str__(self):
+        return f"R4 import {self.pk} ({self.status})"
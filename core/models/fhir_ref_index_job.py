@@ -0,0 +1,27 @@
+from django.db import models
+
+from .background_job import BackgroundJob
+
+
+class FhirRefIndexJob(BackgroundJob):
+    """One index-refs run over a FhirSource's aux resources (see core/fhir/ref_indexing.py).
+
+    Started from ``POST /api/v1/fhir_sources/<id>/index_refs`` with ``Prefer: respond-async`` or by
+    ``manage.py index_fhir_refs``. The run commits chunk by chunk and records its counters and the
+    last row it committed (``resume_after``) with each chunk, so ``/api/v1/fhir_sources/<id>/
+    index_refs/<job id>`` reports progress and an interrupted job can be resumed
+    (``manage.py index_fhir_refs --resume <job id>``) without redoing any chunk. The UUID pk is the
+    opaque job id.
+    """
+
+    jhe_user = models.ForeignKey("JheUser", on_delete=models.CASCADE, related_name="fhir_ref_index_jobs")
+    fhir_source = models.ForeignKey("FhirSource", on_delete=models.CASCADE, related_name="ref_index_jobs")
+    # Also resolve references against the patient's other FhirSources (after this source's own rows).
+    cross_source = models.BooleanField(default=False)
+    rows_indexed = models.IntegerField(default=0)
+    refs_rewritten = models.IntegerField(default=0)
+    refs_not_found = models.IntegerField(default=0)
+    resume_after = models.UUIDField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Ref index {self.pk} ({self.status})"
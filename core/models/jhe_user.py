@@ -14,6 +14,7 @@ from django.utils.http import urlsafe_base64_encode
 from django.utils.translation import gettext_lazy as _
 from oauth2_provider.models import AccessToken, Grant, IDToken, RefreshToken, get_application_model
 
+from core.fhir.scope import request_patient
 from core.services.jhe_settings import get_setting
 from core.tokens import account_activation_token
 
@@ -216,8 +217,9 @@ class JheUser(AbstractUser):
         return self.user_type == "practitioner" or hasattr(self, "practitioner_profile")
 
     def get_patient(self):
-        patient = Patient.objects.filter(jhe_user_id=self.id)
-        return patient[0] if patient else None
+        # Views and FHIR handlers ask for it repeatedly within a request (e.g. per bundle entry);
+        # memoized on the request's AuthContext (core/fhir/scope.py).
+        return request_patient(self.id, lambda: Patient.objects.filter(jhe_user_id=self.id).first())
 
     @property
     def practitioner(self):
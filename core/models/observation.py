@@ -5,16 +5,23 @@ import logging
 from django.conf import settings
 from django.core.exceptions import BadRequest, PermissionDenied
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db import models
-from django.db.models import F, Q
+from django.db import models, transaction
+from django.db.models import Exists, F, OuterRef, Q
 from django.db.utils import IntegrityError
 from django.shortcuts import get_object_or_404
 from fhir.resources.observation import Observation as FHIRObservation
 from jsonschema import ValidationError
 
 from core.fhir.effective_time_frame import extract_effective_time_frame
-from core.fhir.scope import authorize_practitioner_scope, resolve_fhir_user
-from core.utils import validate_with_registry
+from core.fhir.fhir_validation import parse_fhir_resource
+from core.fhir.scope import (
+    authorize_practitioner_scope,
+    patient_access,
+    patient_identifier,
+    resolve_fhir_user,
+    study_enrollment,
+)
+from core.utils import get_schema_validator, omh_body_schema_path
 
 from .codeable_concept import CodeableConcept
 from .data_source import DataSource
@@ -24,6 +31,17 @@ from .practitioner import Practitioner
 logger = logging.getLogger(__name__)
 
 
+def _study_scope(study_id):
+    # A study-scoped search: the patient is enrolled in the study AND the observation's code is
+    # one of the study's requested scopes -- two correlated EXISTS against the same study.
+    from .study import StudyScopeRequest
+
+    return (
+        study_enrollment(study_id, "subject_patient_id"),
+        Exists(StudyScopeRequest.objects.filter(study_id=study_id, scope_code_id=OuterRef("codeable_concept_id"))),
+    )
+
+
 # Observation per record: https://stackoverflow.com/a/61484800 (author worked at ONC)
 class Observation(models.Model):
     subject_patient = models.ForeignKey("Patient", on_delete=models.CASCADE)
@@ -83,28 +101,19 @@ class Observation(models.Model):
 
         # Return the observations a practitioner is allowed to see, newest first. An
         # observation is visible only when its patient shares an organization with the
-        # practitioner identified by jhe_user_id: the traversal walks Observation -> Patient
-        # -> PatientOrganization -> Organization -> PractitionerOrganization -> Practitioner.
-        # Keeping the patient's and the practitioner's organization lookups in one filter()
-        # call matches them against the SAME organization (Django reuses the join for lookups
-        # sharing the "subject_patient__organizations" prefix); an optional organization_id
-        # narrows that shared organization. The result is then optionally narrowed: by study
-        # (the patient must be enrolled in the study AND the observation's code must be one of
-        # that study's requested scopes, both matched against the SAME study), to a single
-        # patient, or to a single observation. The annotate() calls flatten columns from the
-        # joined CodeableConcept and Patient rows onto each observation as plain attributes for
-        # the serializer to read. distinct() collapses the duplicate observation rows produced
-        # by spanning these many-to-many relationships.
-        organization_filters = {"subject_patient__organizations__practitioners": practitioner}
-        if organization_id:
-            organization_filters["subject_patient__organizations__id"] = organization_id
-        qs = Observation.objects.filter(**organization_filters)
+        # practitioner identified by jhe_user_id, i.e. has a PractitionerPatientAccess row for
+        # them; an optional organization_id narrows that shared organization. The result is
+        # then optionally narrowed: by study (the patient must be enrolled in the study AND the
+        # observation's code must be one of that study's requested scopes), to a single
+        # patient, or to a single observation. Every many-to-many condition is a correlated
+        # EXISTS, so no observation row is repeated and the query needs no DISTINCT -- Postgres
+        # can walk the (subject_patient, -last_updated) index and stop after a page. The
+        # annotate() calls flatten columns from the (to-one) CodeableConcept and Patient joins
+        # onto each observation as plain attributes for the serializer to read.
+        qs = Observation.objects.filter(patient_access(practitioner.jhe_user_id, "subject_patient_id", organization_id))
 
         if study_id:
-            qs = qs.filter(
-                subject_patient__studypatient__study_id=study_id,
-                codeable_concept__studyscoperequest__study_id=study_id,
-            )
+            qs = qs.filter(*_study_scope(study_id))
         if patient_id:
             qs = qs.filter(subject_patient_id=patient_id)
         if observation_id:
@@ -119,9 +128,7 @@ class Observation(models.Model):
                 patient_name_given=F("subject_patient__name_given"),
                 jhe_user_id=F("subject_patient__jhe_user_id"),
             )
-            .distinct()
-            .order_by("-last_updated")
-        )
+        ).order_by("-last_updated")
 
     @staticmethod
     def practitioner_authorized(practitioner_user_id, observation_id):
@@ -146,8 +153,9 @@ class Observation(models.Model):
         # mismatch) and, via **params, by patient identifier and coding system|code. When a
         # study is given the patient must be enrolled in it AND the observation's code must be
         # one of that study's requested scopes. resource_id selects a single observation.
-        # Related rows are selected/prefetched to avoid N+1; distinct() collapses the duplicate
-        # rows produced by spanning these many-to-many relationships.
+        # Related rows are selected/prefetched to avoid N+1. The access, study and identifier
+        # conditions are correlated EXISTS subqueries (never a row-multiplying join), so the
+        # result needs no DISTINCT and a page is read straight off the ordering index.
         coding_system = params.get("coding_system")
         coding_code = params.get("coding_code")
         patient_identifier_value = params.get("patient_identifier_value")
@@ -157,26 +165,19 @@ class Observation(models.Model):
             qs = Observation.objects.filter(subject_patient__jhe_user_id=jhe_user_id)
         else:
             authorize_practitioner_scope(jhe_user_id, organization_id, study_id, patient_id)
-            # Anchor on the practitioner's organization membership; an optional organization_id
-            # narrows that SAME shared organization (kept in one filter() so Django reuses the
-            # join). A study additionally requires the patient be enrolled AND the code be one
-            # of that study's requested scopes (matched against the same study).
-            organization_filters = {"subject_patient__organizations__practitioners__jhe_user_id": jhe_user_id}
-            if organization_id:
-                organization_filters["subject_patient__organizations__id"] = organization_id
-            qs = Observation.objects.filter(**organization_filters)
+            # Anchor on the patients the practitioner can access (through organization_id, if
+            # given). A study additionally requires the patient be enrolled AND the code be one
+            # of that study's requested scopes.
+            qs = Observation.objects.filter(patient_access(jhe_user_id, "subject_patient_id", organization_id))
             if study_id:
-                qs = qs.filter(
-                    subject_patient__studypatient__study_id=study_id,
-                    codeable_concept__studyscoperequest__study_id=study_id,
-                )
+                qs = qs.filter(*_study_scope(study_id))
             if patient_id:
                 qs = qs.filter(subject_patient_id=patient_id)
 
         if resource_id:
             qs = qs.filter(id=resource_id)
         if patient_identifier_value:
-            qs = qs.filter(subject_patient__identifiers__value=patient_identifier_value)
+            qs = qs.filter(patient_identifier(patient_identifier_value, "subject_patient_id"))
         if coding_system:
             qs = qs.filter(codeable_concept__coding_system=coding_system)
         if coding_code:
@@ -185,7 +186,6 @@ class Observation(models.Model):
         return (
             qs.select_related("subject_patient", "codeable_concept")
             .prefetch_related("identifiers")
-            .distinct()
             .order_by("-last_updated")
         )
 
@@ -197,109 +197,227 @@ class Observation(models.Model):
         # Observation model: the value attachment is decoded into the omh_data column, the code
         # must be a known, consented scope, and a Device is required. The FHIR view routes
         # non-OMH (or code-less) Observations to FhirAuxResource instead, so this method always
-        # handles the OMH path.
+        # handles the OMH path. A single create is a one-entry fhir_bulk_create.
+        outcome = Observation.fhir_bulk_create([data], user)[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    @staticmethod
+    def fhir_bulk_create(resources, user):
+        """Create many OMH Observations in one pass, returning one outcome per resource, in order.
+
+        Each outcome is either the created Observation or the exception that rejected that entry
+        -- the same BadRequest / PermissionDenied / IntegrityError / Django ValidationError that
+        ``fhir_create`` raises for a single resource, checked in the same order. The patients,
+        practitioner authorization, devices, codes, consents and identifier conflicts for the whole
+        batch are each resolved with one set-based query (consents once per distinct patient), the
+        OMH schema check and the effective_* projection run in Python, and the surviving rows are
+        written with bulk_create -- so a large bundle costs a handful of queries, not several per
+        entry. Identifiers repeated within the batch conflict like they would across requests.
+        A resource may be passed as its body or as an already-parsed ``fhir.resources`` Observation.
+        """
         import humps
 
-        camelized = humps.camelize(data)
+        outcomes = [None] * len(resources)
+        pending = []  # (index, FHIRObservation)
+        for index, data in enumerate(resources):
+            try:
+                if not isinstance(data, FHIRObservation):  # already parsed, e.g. with its Bundle
+                    data = parse_fhir_resource("Observation", humps.camelize(data))
+                pending.append((index, data))
+            except Exception as e:
+                outcomes[index] = BadRequest(e)  # TBD: move to view
+
+        lookups = Observation._bulk_lookups([fhir_observation for _, fhir_observation in pending], user)
+        claimed_identifiers = set()
+        to_create = []  # (index, Observation, [(system, value)])
+        for index, fhir_observation in pending:
+            try:
+                identifiers = [
+                    (identifier.system, identifier.value) for identifier in fhir_observation.identifier or []
+                ]
+                observation = Observation._bulk_build(fhir_observation, user, lookups, identifiers, claimed_identifiers)
+                observation.omh_data = Observation._decode_omh_data(fhir_observation)
+                # bulk_create bypasses save(): validate and project the timing columns here.
+                observation.clean()
+                observation._sync_effective_time_frame()
+            except Exception as e:
+                outcomes[index] = e
+                continue
+            claimed_identifiers.update(identifiers)
+            to_create.append((index, observation, identifiers))
+
         try:
-            fhir_observation = FHIRObservation.parse_obj(camelized)
-        except Exception as e:
-            raise (BadRequest(e))  # TBD: move to view
+            with transaction.atomic():
+                Observation._bulk_insert(to_create)
+        except IntegrityError:
+            # An identifier was inserted concurrently after the conflict check: fall back to one
+            # savepoint per entry so only the conflicting entries fail.
+            for index, observation, identifiers in to_create:
+                observation.pk = None
+                observation._state.adding = True
+                try:
+                    with transaction.atomic():
+                        Observation._bulk_insert([(index, observation, identifiers)])
+                except IntegrityError as e:
+                    outcomes[index] = e
+        for index, observation, _ in to_create:
+            if outcomes[index] is None:
+                outcomes[index] = observation
+        return outcomes
 
+    @staticmethod
+    def _bulk_insert(to_create):
+        observations = Observation.objects.bulk_create([observation for _, observation, _ in to_create])
+        ObservationIdentifier.objects.bulk_create(
+            [
+                ObservationIdentifier(observation=observation, system=system, value=value)
+                for observation, (_, _, identifiers) in zip(observations, to_create)
+                for system, value in identifiers
+            ]
+        )
+
+    @staticmethod
+    def _reference_id(reference, prefix):
+        """The id of a ``<prefix>/<id>`` reference, or None when the reference has another shape."""
+        if not reference or not reference.startswith(prefix):
+            return None
+        return reference.split("/")[1]
+
+    @staticmethod
+    def _bulk_lookups(fhir_observations, user):
+        """Resolve every row the batch refers to with one query per kind, keyed for dict lookups."""
+        patient_ids, device_ids, codings, identifiers = set(), set(), set(), set()
+        for fhir_observation in fhir_observations:
+            subject = fhir_observation.subject.reference if fhir_observation.subject else None
+            patient_ids.add(Observation._reference_id(subject, "Patient/"))
+            device = fhir_observation.device.reference if fhir_observation.device else None
+            device_ids.add(Observation._reference_id(device, "Device/"))
+            for coding in fhir_observation.code.coding or []:
+                codings.add((coding.system, coding.code))
+            for identifier in fhir_observation.identifier or []:
+                identifiers.add((identifier.system, identifier.value))
+        # Ids that are not integers can never match a row; drop them rather than erroring the batch.
+        patient_ids = {int(pk) for pk in patient_ids if pk and pk.isdigit()}
+        device_ids = {int(pk) for pk in device_ids if pk and pk.isdigit()}
+
+        lookups = {
+            "patients": {},
+            "authorized_patient_ids": set(),
+            "user_patient": None,
+            "devices": {},
+            "codeable_concepts": {},
+            "existing_identifiers": set(),
+        }
+        if not fhir_observations:
+            return lookups
+        lookups["patients"] = Patient.objects.in_bulk(patient_ids)
+        if user.is_practitioner():
+            lookups["authorized_patient_ids"] = set(
+                Patient.for_practitioner_organization_study(user.pk)
+                .filter(id__in=patient_ids)
+                .values_list("id", flat=True)
+            )
+        else:
+            lookups["user_patient"] = user.get_patient()
+        lookups["devices"] = DataSource.objects.filter(Q(type="personal_device") | Q(type="device")).in_bulk(device_ids)
+        if codings:
+            coding_filter = Q()
+            for system, code in codings:
+                coding_filter |= Q(coding_system=system, coding_code=code)
+            # Keep the first (lowest id) concept per coding, matching the single-create .first().
+            for codeable_concept in CodeableConcept.objects.filter(coding_filter).order_by("-id"):
+                lookups["codeable_concepts"][(codeable_concept.coding_system, codeable_concept.coding_code)] = (
+                    codeable_concept
+                )
+        if identifiers:
+            # One query per identifier system so the (system, value) unique index is usable.
+            values_by_system = {}
+            for system, value in identifiers:
+                values_by_system.setdefault(system, set()).add(value)
+            identifier_filter = Q()
+            for system, values in values_by_system.items():
+                system_filter = Q(system__isnull=True) if system is None else Q(system=system)
+                identifier_filter |= system_filter & Q(value__in=values)
+            lookups["existing_identifiers"] = set(
+                ObservationIdentifier.objects.filter(identifier_filter).values_list("system", "value")
+            )
+        return lookups
+
+    @staticmethod
+    def _bulk_build(fhir_observation, user, lookups, identifiers, claimed_identifiers):
+        """Run the single-create checks for one entry against the batch lookups; return an unsaved row."""
         # Subject -- the structural link to the Patient.
-        if (
-            not fhir_observation.subject
-            or not fhir_observation.subject.reference
-            or not fhir_observation.subject.reference.startswith("Patient/")
-        ):
+        subject = fhir_observation.subject.reference if fhir_observation.subject else None
+        subject_patient_id = Observation._reference_id(subject, "Patient/")
+        if subject_patient_id is None:
             raise (
                 BadRequest("Subject is required and must be a reference to a Patient ID and start with 'Patient/'")
             )  # TBD: move to view
-        subject_patient_id = fhir_observation.subject.reference.split("/")[1]
-        try:
-            subject_patient = Patient.objects.get(pk=subject_patient_id)
-        except Patient.DoesNotExist:
+        subject_patient = lookups["patients"].get(int(subject_patient_id)) if subject_patient_id.isdigit() else None
+        if subject_patient is None:
             raise (BadRequest(f"Patient id={subject_patient_id} can not be found."))  # TBD: move to view
 
         if user.is_practitioner():
-            if not subject_patient.practitioner_authorized(user.pk, subject_patient.id):
+            if subject_patient.id not in lookups["authorized_patient_ids"]:
                 raise PermissionDenied("Current user doesn't have access to the Patient.")
             user_patient = subject_patient
         else:
-            user_patient = user.get_patient()
+            user_patient = lookups["user_patient"]
         if user_patient is None:
             raise PermissionDenied("Current user is not a Patient.")
         if subject_patient.id != user_patient.id:
             raise PermissionDenied("The Subject Patient does not match the current user.")
 
-        data_source = Observation._resolve_device(fhir_observation)
-
-        # Reject duplicate identifiers up front so we don't create an orphan observation
-        # before the ObservationIdentifier unique constraint trips.
-        for identifier in fhir_observation.identifier or []:
-            if ObservationIdentifier.objects.filter(system=identifier.system, value=identifier.value).exists():
-                raise IntegrityError(f"Identifier already exists: system={identifier.system} value={identifier.value}")
-        codeable_concept, omh_data = Observation._omh_payload(fhir_observation, user_patient)
-
-        observation = Observation.objects.create(
-            subject_patient=subject_patient,
-            data_source=data_source,
-            codeable_concept=codeable_concept,
-            status=fhir_observation.status,
-            omh_data=omh_data,
-        )
-
-        if fhir_observation.identifier:
-            for identifier in fhir_observation.identifier:
-                ObservationIdentifier.objects.create(
-                    observation=observation,
-                    system=identifier.system,
-                    value=identifier.value,
-                )
-
-        return observation
-
-    @staticmethod
-    def _resolve_device(fhir_observation):
-        reference = fhir_observation.device.reference if fhir_observation.device else None
-        if not reference or not reference.startswith("Device/"):
+        device = fhir_observation.device.reference if fhir_observation.device else None
+        device_id = Observation._reference_id(device, "Device/")
+        if device_id is None:
             raise BadRequest("Device is required and must be a reference to a Data Source ID and start with 'Device/'")
-        device_id = reference.split("/")[1]
-        try:
-            return DataSource.objects.get((Q(type="personal_device") | Q(type="device")), id=device_id)
-        except DataSource.DoesNotExist:
+        data_source = lookups["devices"].get(int(device_id)) if device_id.isdigit() else None
+        if data_source is None:
             raise (BadRequest(f"Device Data Source id={device_id} can not be found."))
 
-    @staticmethod
-    def _omh_payload(fhir_observation, user_patient):
-        """Resolve the (consented) CodeableConcept and decode the OMH value attachment."""
+        # Reject duplicate identifiers (already stored, or claimed by an earlier entry of this
+        # batch) up front so we don't create an orphan observation before the
+        # ObservationIdentifier unique constraint trips.
+        for system, value in identifiers:
+            if (system, value) in lookups["existing_identifiers"] or (system, value) in claimed_identifiers:
+                raise IntegrityError(f"Identifier already exists: system={system} value={value}")
+
         if len(fhir_observation.code.coding) != 1:
             raise BadRequest("Exactly one Code must be provided.")  # TBD: move to view
         coding = fhir_observation.code.coding[0]
-
-        codeable_concept = CodeableConcept.objects.filter(coding_system=coding.system, coding_code=coding.code).first()
+        codeable_concept = lookups["codeable_concepts"].get((coding.system, coding.code))
         if codeable_concept is None:
             raise BadRequest(f"Code not found: system={coding.system} code={coding.code}")  # TBD: move to view
 
-        if codeable_concept.id not in [scope.id for scope in user_patient.consolidated_consented_scopes()]:
+        if codeable_concept.id not in user_patient.consented_scope_ids():
             raise PermissionDenied(
                 f"Observation data with coding_system={codeable_concept.coding_system}"
                 f" coding_code={codeable_concept.coding_code} has not been consented for any studies by this Patient."
             )
 
+        return Observation(
+            subject_patient=subject_patient,
+            data_source=data_source,
+            codeable_concept=codeable_concept,
+            status=fhir_observation.status,
+        )
+
+    @staticmethod
+    def _decode_omh_data(fhir_observation):
         try:
-            omh_data = json.loads(base64.b64decode(fhir_observation.valueAttachment.data).decode("ascii"))
+            return json.loads(base64.b64decode(fhir_observation.valueAttachment.data).decode("ascii"))
         except Exception:
             raise BadRequest("valueAttachment.data must be Base 64 Encoded Binary JSON.")  # TBD: move to view
 
-        return codeable_concept, omh_data
-
     @staticmethod
     def validate_outer_schema(instance_data):
         for name in ("data-point-1.0.json", "data-series-1.0.json"):
-            schema = json.loads((settings.DATA_DIR_PATH.schemas_metadata / name).read_text())
+            validator = get_schema_validator(settings.DATA_DIR_PATH.schemas_metadata / name)
             try:
-                validate_with_registry(instance=instance_data, schema=schema)
+                validator.validate(instance_data)
                 return True
             except ValidationError:
                 # Not a match; try the next outer schema
@@ -325,16 +443,12 @@ class Observation(models.Model):
         try:
             omh_data = self.omh_data
 
-            header_schema = json.loads((settings.DATA_DIR_PATH.schemas_metadata / "header-1.0.json").read_text())
-            validate_with_registry(instance=omh_data.get("header"), schema=header_schema)
+            # Compiled validators are cached process-wide (core.utils.get_schema_validator).
+            header_validator = get_schema_validator(settings.DATA_DIR_PATH.schemas_metadata / "header-1.0.json")
+            header_validator.validate(omh_data.get("header"))
 
-            body_schema = json.loads(
-                (
-                    settings.DATA_DIR_PATH.schemas_data
-                    / f"schema-{self.codeable_concept.coding_code.replace(':', '_').replace('.', '-')}.json"
-                ).read_text()
-            )
-            validate_with_registry(instance=omh_data.get("body"), schema=body_schema)
+            body_validator = get_schema_validator(omh_body_schema_path(self.codeable_concept.coding_code))
+            body_validator.validate(omh_data.get("body"))
         except ValidationError as error:
             # Re-raise OMH schema failures as a Django ValidationError keyed to omh_data so the
             # admin renders an inline field error instead of a 500 (issue #527). The API path
@@ -5,6 +5,7 @@ from core.fhir.scope import authorize_practitioner_scope, resolve_fhir_user
 
 from .patient import PatientOrganization
 from .practitioner import PractitionerOrganization
+from .practitioner_patient_access import PractitionerPatientAccess
 
 
 class Organization(models.Model):
@@ -101,7 +102,8 @@ class Organization(models.Model):
         # sees the organizations they belong to -- narrowed to a single organization, the
         # organization backing a given study, or the organizations a given patient belongs to
         # (each explicit filter authorized up front, 403 on mismatch). resource_id selects a
-        # single organization.
+        # single organization. Membership is unique per organization and each filter pins one
+        # study/patient, so no row repeats and no distinct() is needed.
         user = resolve_fhir_user(jhe_user_id)
         if user.is_patient():
             qs = Organization.for_patient(jhe_user_id)
@@ -113,12 +115,17 @@ class Organization(models.Model):
             if study_id:
                 qs = qs.filter(study__id=study_id)
             if patient_id:
-                qs = qs.filter(patients__id=patient_id)
+                # The organizations this practitioner shares with the patient.
+                qs = qs.filter(
+                    id__in=PractitionerPatientAccess.objects.filter(
+                        practitioner_user_id=jhe_user_id, patient_id=patient_id
+                    ).values("organization_id")
+                )
 
         if resource_id:
             qs = qs.filter(id=resource_id)
 
-        return qs.distinct().order_by("name")
+        return qs.order_by("name")
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
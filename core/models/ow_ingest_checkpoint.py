@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class OwIngestCheckpoint(models.Model):
+    """Where raw-mode ``ow_poll`` resumes listing one Open Wearables user's S3 objects.
+
+    ``last_key`` is the greatest key under ``prefix`` (an endpoint's key prefix, e.g. the
+    heart-rate one) whose objects have all been ingested for ``ow_user_id``; the next tick lists
+    from there (S3 ``StartAfter``) instead of from the start of the prefix.
+    """
+
+    ow_user_id = models.CharField(max_length=255)
+    prefix = models.CharField(max_length=1024)
+    last_key = models.CharField(max_length=1024)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ow_user_id", "prefix"], name="unique_ow_ingest_checkpoint"),
+        ]
+
+    def __str__(self):
+        return f"{self.ow_user_id} @ {self.last_key}"
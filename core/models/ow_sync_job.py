@@ -0,0 +1,21 @@
+from django.db import models
+
+from .background_job import BackgroundJob
+
+
+class OwSyncJob(BackgroundJob):
+    """One run of the Open Wearables S3 sync (``/api/v1/ow/sync``, see core/services/ow_sync.py).
+
+    The sync request records the job and answers at once; the job then runs in the background
+    and keeps its counters current, so ``/api/v1/ow/sync/<job id>`` can report progress. The UUID
+    pk is the opaque job id.
+    """
+
+    jhe_user = models.ForeignKey("JheUser", on_delete=models.CASCADE, related_name="ow_sync_jobs")
+    files_processed = models.IntegerField(default=0)
+    files_skipped = models.IntegerField(default=0)
+    observations_created = models.IntegerField(default=0)
+    errors = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"OW sync {self.pk} ({self.status})"
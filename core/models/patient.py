@@ -4,7 +4,14 @@ from django.conf import settings
 from django.db import models
 from django.db.utils import IntegrityError
 
-from core.fhir.scope import authorize_practitioner_scope, resolve_fhir_user
+from core.fhir.scope import (
+    authorize_practitioner_scope,
+    patient_access,
+    patient_identifier,
+    resolve_fhir_user,
+    study_enrollment,
+)
+from core.services import consent_scopes
 from core.services.jhe_settings import get_setting
 
 from .codeable_concept import CodeableConcept
@@ -41,6 +48,16 @@ class Patient(models.Model):
             studypatientscopeconsent__study_patient__patient=self,
         ).distinct()
 
+    def consented_scope_ids(self):
+        # The ids of the scope codes this patient has actively consented to (a frozenset), for
+        # per-observation authorization: cached across requests when the cache is shared and
+        # invalidated by consent, enrollment and study-scope changes
+        # (core/services/consent_scopes.py), and memoized on this instance for the rest of the
+        # request.
+        if self._consented_scope_ids is None:
+            self._consented_scope_ids = consent_scopes.consented_scope_ids(self.pk)
+        return self._consented_scope_ids
+
     @staticmethod
     def for_practitioner_organization_study(
         jhe_user_id,
@@ -50,30 +67,21 @@ class Patient(models.Model):
         patient_identifier_value=None,
     ):
         # Return the patients a practitioner is allowed to see: every patient who shares
-        # an organization with the practitioner identified by jhe_user_id. The traversal
-        # walks Patient -> PatientOrganization -> Organization -> PractitionerOrganization
-        # -> Practitioner -> JheUser, so a patient matches only when some organization
-        # they belong to also has the practitioner as a member. The organization
-        # membership of the patient and the practitioner are matched against the SAME
-        # organization by keeping both lookups in one filter() call (Django reuses the
-        # join for lookups sharing the "organizations" prefix within a single filter);
-        # an optional organization_id narrows that shared organization. The result is then
-        # optionally narrowed to patients enrolled in a given study, to a single patient by
-        # id, or to a patient with a matching identifier. distinct() collapses the duplicate
-        # patient rows produced by spanning these many-to-many relationships.
-        organization_filters = {"organizations__practitioners__jhe_user_id": jhe_user_id}
-        if organization_id:
-            organization_filters["organizations__id"] = organization_id
-
-        qs = Patient.objects.filter(**organization_filters)
+        # an organization with the practitioner identified by jhe_user_id, checked against the
+        # precomputed PractitionerPatientAccess table (one row per patient, practitioner and
+        # shared organization); an optional organization_id narrows that shared organization.
+        # The result is then optionally narrowed to patients enrolled in a given study, to a
+        # single patient by id, or to a patient with a matching identifier. Each many-to-many
+        # condition is a correlated EXISTS, so no patient row repeats and no DISTINCT is needed.
+        qs = Patient.objects.filter(patient_access(jhe_user_id, "pk", organization_id))
         if study_id:
-            qs = qs.filter(studypatient__study_id=study_id)
+            qs = qs.filter(study_enrollment(study_id, "pk"))
         if patient_id:
             qs = qs.filter(id=patient_id)
         if patient_identifier_value:
-            qs = qs.filter(identifiers__value=patient_identifier_value)
+            qs = qs.filter(patient_identifier(patient_identifier_value, "pk"))
         # order_by keeps pagination stable (DRF warns on an unordered paginated list).
-        return qs.distinct().order_by("id")
+        return qs.order_by("id")
 
     @staticmethod
     def construct_invitation_link(invitation_url, client_id, auth_code):
@@ -154,7 +162,7 @@ class Patient(models.Model):
         if resource_id:
             qs = qs.filter(id=resource_id)
 
-        return qs.select_related("jhe_user").prefetch_related("identifiers").distinct().order_by("name_family")
+        return qs.select_related("jhe_user").prefetch_related("identifiers").order_by("name_family")
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -172,6 +180,7 @@ class Patient(models.Model):
             self._organization_id = kwargs.pop("organization_id")
         super().__init__(*args, **kwargs)
         self.telecom_email = None
+        self._consented_scope_ids = None
 
 
 class PatientOrganization(models.Model):
@@ -2,6 +2,7 @@ from django.conf import settings
 from django.db import models
 
 from core.fhir.scope import authorize_practitioner_scope, resolve_fhir_user
+from core.services import practitioner_settings
 
 
 class Practitioner(models.Model):
@@ -18,17 +19,24 @@ class Practitioner(models.Model):
         "Organization", through="PractitionerOrganization", related_name="practitioners"
     )
     settings = models.JSONField(default=dict, blank=True)
+    # When each key of ``settings`` was last changed (ns since the epoch), so a change that reaches
+    # the row late never overwrites a newer one.
+    settings_changed = models.JSONField(default=dict, blank=True)
+
+    # Settings writes go through core/services/practitioner_settings.py, which can coalesce them
+    # and write behind; reads overlay the not-yet-flushed changes.
 
     def save_setting(self, key, value):
-        self.settings[key] = value
-        self.save(update_fields=["settings"])
+        practitioner_settings.record_change(self, key, value)
 
     def delete_setting(self, key):
-        self.settings.pop(key, None)
-        self.save(update_fields=["settings"])
+        practitioner_settings.record_change(self, key, None, delete=True)
 
     def get_setting(self, key):
-        return self.settings.get(key)
+        return self.current_settings().get(key)
+
+    def current_settings(self):
+        return practitioner_settings.current_settings(self)
 
     @staticmethod
     def fhir_search(
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.db import connection, models, transaction
+
+from core.fhir.scope import forget_authorizations
+
+# Every (practitioner user, patient, organization) the two membership tables join to, optionally
+# restricted by ``{where}`` (a conjunction over ``po``/``pro``).
+_INSERT_SQL = """
+    INSERT INTO core_practitionerpatientaccess (practitioner_user_id, patient_id, organization_id)
+    SELECT pr.jhe_user_id, po.patient_id, po.organization_id
+    FROM core_patientorganization po
+    JOIN core_practitionerorganization pro ON pro.organization_id = po.organization_id
+    JOIN core_practitioner pr ON pr.id = pro.practitioner_id
+    WHERE {where}
+    ON CONFLICT DO NOTHING
+"""
+
+
+class PractitionerPatientAccess(models.Model):
+    """Which patients a practitioner can see, and through which shared organization.
+
+    A projection of ``PatientOrganization`` x ``PractitionerOrganization``: one row per
+    organization a patient and a practitioner both belong to. Authorization scopes on it with a
+    single indexed semi-join (``EXISTS (SELECT ... WHERE practitioner_user_id = ... AND patient_id =
+    <outer patient>)``, see ``core.fhir.scope.patient_access``) instead of walking the four-table
+    membership join and ``DISTINCT``-ing the result.
+
+    Rows are kept in step by signals on the membership tables (core/signals.py); writers that
+    bypass signals (``bulk_create``) call ``refresh`` themselves, and the
+    ``rebuild_practitioner_patient_access`` command recomputes the whole table.
+    """
+
+    practitioner_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="patient_access"
+    )
+    patient = models.ForeignKey("Patient", on_delete=models.CASCADE, related_name="practitioner_access")
+    organization = models.ForeignKey("Organization", on_delete=models.CASCADE, related_name="practitioner_access")
+
+    class Meta:
+        constraints = [
+            # Also the (practitioner_user, patient) lookup index the scope subqueries use.
+            models.UniqueConstraint(
+                fields=["practitioner_user", "patient", "organization"],
+                name="core_practitionerpatientaccess_unique",
+            )
+        ]
+
+    @staticmethod
+    def refresh(patient_ids=None, practitioner_ids=None, organization_ids=None):
+        """Recompute the rows of the given patients / practitioners (``Practitioner`` ids) /
+        organizations -- the intersection of those given -- from the membership tables."""
+        stale = PractitionerPatientAccess.objects.all()
+        conditions, params = [], []
+        if patient_ids is not None:
+            patient_ids = [int(pk) for pk in patient_ids]
+            stale = stale.filter(patient_id__in=patient_ids)
+            conditions.append("po.patient_id = ANY(%s)")
+            params.append(patient_ids)
+        if practitioner_ids is not None:
+            practitioner_ids = [int(pk) for pk in practitioner_ids]
+            stale = stale.filter(practitioner_user__practitioner_profile__id__in=practitioner_ids)
+            conditions.append("pro.practitioner_id = ANY(%s)")
+            params.append(practitioner_ids)
+        if organization_ids is not None:
+            organization_ids = [int(pk) for pk in organization_ids]
+            stale = stale.filter(organization_id__in=organization_ids)
+            conditions.append("po.organization_id = ANY(%s)")
+            params.append(organization_ids)
+
+        with transaction.atomic():
+            stale.delete()
+            with connection.cursor() as cursor:
+                cursor.execute(_INSERT_SQL.format(where=" AND ".join(conditions) or "TRUE"), params)
+        forget_authorizations()
+
+    @staticmethod
+    def rebuild():
+        """Recompute the whole table; returns the number of rows."""
+        PractitionerPatientAccess.refresh()
+        return PractitionerPatientAccess.objects.count()
+
+    def __str__(self):
+        return f"user {self.practitioner_user_id} -> patient {self.patient_id} (organization {self.organization_id})"
@@ -3,15 +3,33 @@
 Uses PyJWT's PyJWKClient to validate the id_token signature against the EHR's
 JWKS (discovered from .well-known/smart-configuration). Relies only on
 ONC g(10)-mandated capabilities, so the same path works across EHR vendors.
+
+Discovery results are cached per issuer so a token exchange does not wait on
+the EHR's discovery endpoint. An entry is fresh for the discovery document's
+``Cache-Control: max-age`` / ``Expires`` lifetime, capped at the
+``auth.sof.discovery_ttl`` JheSetting (which also applies when the response
+carries no cache headers; ``no-store`` / ``no-cache`` disable caching). After
+that it is served stale for up to ``auth.sof.discovery_stale_ttl`` seconds
+while one background thread revalidates it, and is also the fallback when a
+synchronous refresh fails. ``prewarm_discovery`` fills the cache (and the JWKS
+clients' key sets) for every ``auth.sof.trusted_issuers`` entry; the WSGI/ASGI
+entry points run it on a background thread at startup. All discovery requests
+share one pooled ``requests.Session``.
 """
 
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
 from functools import lru_cache
 
 import jwt
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +41,10 @@ LEEWAY_SECONDS = 30
 
 _DISCOVERY_PATHS = (".well-known/smart-configuration", ".well-known/openid-configuration")
 
+# Defaults for the auth.sof.discovery_ttl / auth.sof.discovery_stale_ttl JheSettings (seconds).
+DEFAULT_DISCOVERY_TTL = 3600
+DEFAULT_DISCOVERY_STALE_TTL = 86400
+
 
 class IdTokenError(Exception):
     """An id_token could not be verified. ``status_code`` is the HTTP status to return."""
@@ -32,13 +54,64 @@ class IdTokenError(Exception):
         self.status_code = status_code
 
 
-def discover_jwks_uri(issuer: str) -> str:
-    """Return the issuer's jwks_uri via SMART/OIDC discovery."""
+@dataclass(frozen=True)
+class _Discovery:
+    jwks_uri: str
+    fresh_until: float  # monotonic
+    stale_until: float  # monotonic
+
+
+_discovery_cache: dict[str, _Discovery] = {}
+_revalidating: set[str] = set()
+_discovery_lock = threading.Lock()
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+
+def clear_discovery_cache() -> None:
+    """Drop every cached discovery result."""
+    with _discovery_lock:
+        _discovery_cache.clear()
+
+
+def _setting_seconds(key: str, default: int) -> int:
+    from core.services.jhe_settings import get_setting
+
+    try:
+        return max(0, int(get_setting(key, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _header_ttl(response) -> int | None:
+    """Lifetime the response's cache headers allow: seconds, 0 for uncacheable, None if unstated."""
+    directives = {}
+    for part in (response.headers.get("Cache-Control") or "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        directives[name] = value.strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        return 0
+    if "max-age" in directives:
+        try:
+            return max(0, int(directives["max-age"]))
+        except ValueError:
+            return 0
+    expires = response.headers.get("Expires")
+    if expires:
+        try:
+            return max(0, int((parsedate_to_datetime(expires) - datetime.now(UTC)).total_seconds()))
+        except (TypeError, ValueError):
+            return 0  # RFC 9111: an invalid Expires means "already expired"
+    return None
+
+
+def _fetch_discovery(issuer: str) -> tuple[str, int | None]:
     base = issuer.rstrip("/")
     for path in _DISCOVERY_PATHS:
         url = f"{base}/{path}"
         try:
-            r = requests.get(url, headers={"Accept": "application/json"}, timeout=10)
+            r = _session.get(url, headers={"Accept": "application/json"}, timeout=10)
         except requests.RequestException as e:
             logger.warning("Discovery request failed for %s: %s", url, e)
             continue
@@ -49,10 +122,102 @@ def discover_jwks_uri(issuer: str) -> str:
                 logger.warning("Discovery doc at %s was not valid JSON", url)
                 continue
             if jwks_uri and jwks_uri.startswith("https://"):
-                return jwks_uri
+                return jwks_uri, _header_ttl(r)
     raise IdTokenError(f"Could not discover jwks_uri for issuer {issuer!r}", status_code=502)
 
 
+def _refresh(issuer: str) -> str:
+    jwks_uri, header_ttl = _fetch_discovery(issuer)
+    ttl = _setting_seconds("auth.sof.discovery_ttl", DEFAULT_DISCOVERY_TTL)
+    if header_ttl is not None:
+        ttl = min(ttl, header_ttl)
+    if ttl > 0:
+        now = time.monotonic()
+        stale_ttl = _setting_seconds("auth.sof.discovery_stale_ttl", DEFAULT_DISCOVERY_STALE_TTL)
+        with _discovery_lock:
+            _discovery_cache[issuer] = _Discovery(jwks_uri, now + ttl, now + ttl + stale_ttl)
+    else:
+        with _discovery_lock:
+            _discovery_cache.pop(issuer, None)
+    return jwks_uri
+
+
+def _revalidate_in_background(issuer: str) -> None:
+    from django.db import connection
+
+    try:
+        _refresh(issuer)
+    except IdTokenError:
+        logger.warning("Background discovery refresh failed for %s; serving the stale jwks_uri", issuer)
+    finally:
+        with _discovery_lock:
+            _revalidating.discard(issuer)
+        connection.close()
+
+
+def discover_jwks_uri(issuer: str) -> str:
+    """Return the issuer's jwks_uri via SMART/OIDC discovery (cached; see module docstring)."""
+    now = time.monotonic()
+    with _discovery_lock:
+        cached = _discovery_cache.get(issuer)
+        start_revalidation = (
+            cached is not None and cached.fresh_until <= now < cached.stale_until and issuer not in _revalidating
+        )
+        if start_revalidation:
+            _revalidating.add(issuer)
+    if cached is not None and now < cached.fresh_until:
+        return cached.jwks_uri
+    if cached is not None and now < cached.stale_until:
+        if start_revalidation:
+            threading.Thread(
+                target=_revalidate_in_background, args=(issuer,), name="oidc-discovery", daemon=True
+            ).start()
+        return cached.jwks_uri
+    try:
+        return _refresh(issuer)
+    except IdTokenError:
+        if cached is not None:
+            logger.warning("Discovery failed for %s; serving the expired jwks_uri", issuer)
+            return cached.jwks_uri
+        raise
+
+
+def prewarm_discovery(issuers=None) -> int:
+    """Discover (and fetch the JWKS of) each issuer; defaults to ``auth.sof.trusted_issuers``.
+
+    Best-effort: a failing issuer is logged and skipped. Returns how many were warmed.
+    """
+    if issuers is None:
+        from core.services.jhe_settings import get_setting
+
+        issuers = get_setting("auth.sof.trusted_issuers", []) or []
+    warmed = 0
+    for issuer in issuers:
+        try:
+            _jwk_client(discover_jwks_uri(issuer)).get_jwk_set()
+        except (IdTokenError, jwt.PyJWKClientError) as e:
+            logger.warning("Could not pre-warm OIDC discovery for %s: %s", issuer, e)
+            continue
+        warmed += 1
+    return warmed
+
+
+def start_discovery_prewarm() -> None:
+    """Run :func:`prewarm_discovery` on a daemon thread (server startup must not wait on EHRs)."""
+
+    def run():
+        from django.db import connection
+
+        try:
+            prewarm_discovery()
+        except Exception:
+            logger.exception("OIDC discovery pre-warm failed")
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name="oidc-discovery-prewarm", daemon=True).start()
+
+
 @lru_cache(maxsize=32)
 def _jwk_client(jwks_uri: str) -> jwt.PyJWKClient:
     # PyJWKClient caches keys internally; lru_cache reuses the client per URI.
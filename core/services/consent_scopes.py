@@ -0,0 +1,51 @@
+"""Cached per-patient consented-scope sets for ingest authorization.
+
+Every uploaded observation must carry a code the patient has consented to in some study. The
+set of those ``CodeableConcept`` ids (``Patient.consented_scope_ids()``) is computed from
+``StudyPatientScopeConsent``; the ``Patient`` instance memoizes it, so a request or poll tick
+that checks many observations for one patient pays for it once.
+
+When the default cache is shared by the server processes (``CACHE_BACKEND``), the set is also
+kept there for ``CONSENTED_SCOPES_CACHE_SECONDS`` and reused across requests. Signals on
+``StudyPatientScopeConsent``, ``StudyPatient`` and ``StudyScopeRequest`` (core/signals.py) drop
+the cached sets of the patients a change touches, so a revoked consent stops authorizing uploads
+on the next request in every process. With Django's per-process default the cache is not used:
+an invalidation could only reach the process that made the change.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.utils import cache_is_shared
+
+
+def _key(patient_id):
+    return f"patient_consented_scopes:{patient_id}"
+
+
+def _query(patient_id):
+    from core.models import StudyPatientScopeConsent
+
+    return frozenset(
+        StudyPatientScopeConsent.objects.filter(study_patient__patient_id=patient_id, consented=True).values_list(
+            "scope_code_id", flat=True
+        )
+    )
+
+
+def consented_scope_ids(patient_id):
+    """The ids of the scope codes ``patient_id`` has actively consented to, as a frozenset."""
+    if not cache_is_shared():
+        return _query(patient_id)
+    key = _key(patient_id)
+    scope_ids = cache.get(key)
+    if scope_ids is None:
+        scope_ids = _query(patient_id)
+        cache.set(key, scope_ids, settings.CONSENTED_SCOPES_CACHE_SECONDS)
+    return scope_ids
+
+
+def invalidate(patient_ids):
+    """Drop the cached consented-scope sets of ``patient_ids``."""
+    if cache_is_shared():
+        cache.delete_many([_key(patient_id) for patient_id in patient_ids])
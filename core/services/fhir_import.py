@@ -0,0 +1,117 @@
+"""Pipelined R4 Bundle import: a process pool for the CPU-bound stage, and background import jobs.
+
+Importing an R4 entry is mostly CPU: the cross-version transform and the ``fhir.resources`` R5
+validation of its body. On a large Bundle ``/fhir-import/R4`` (core/views/fhir_import.py) runs
+that stage for all entries on a pool of ``settings.FHIR_IMPORT_WORKERS`` worker processes
+(:func:`map_entries`) -- results come back in Bundle order, each entry failing on its own -- and
+then writes the converted entries from the request's thread in batched transactions. Small
+Bundles, and deployments with no workers configured, convert inline: below
+``PARALLEL_MIN_ENTRIES`` the pickling round-trip costs more than it saves.
+
+The workers are spawned (not forked -- the parent holds database connections and threads), set up
+Django once, and are reused by every later import in the process. They never touch the database.
+A pool that breaks (a worker killed by the OOM killer, say) is discarded and the Bundle converted
+inline; the next import starts a new one.
+
+``Prefer: respond-async`` on a Bundle import records an :class:`~core.models.FhirImportJob` and
+hands it to :func:`start_import_job`, which runs it as a background job (core/services/jobs.py);
+the client polls the job's status URL for the ``batch-response`` Bundle.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from core.services.jobs import run_job, start_job
+
+logger = logging.getLogger(__name__)
+
+# Bundles with fewer entries than this convert inline even when workers are configured.
+PARALLEL_MIN_ENTRIES = 64
+
+# Converted entries are written this many per transaction.
+WRITE_BATCH_SIZE = 500
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+def _executor(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "jhe.settings"),),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the worker processes (a later import starts new ones)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def map_entries(function, items):
+    """``[function(*item) for item in items]``, in order -- on the worker pool when it is worth it.
+
+    ``function`` must be a picklable module-level function that reports its own failures in its
+    return value: one entry raising would lose the results of the whole chunk it was sent in.
+    """
+    items = list(items)
+    workers = settings.FHIR_IMPORT_WORKERS
+    if workers < 1 or len(items) < PARALLEL_MIN_ENTRIES:
+        return [function(*item) for item in items]
+    # A few chunks per worker: big enough to amortize pickling, small enough to balance the load.
+    chunksize = max(1, len(items) // (workers * 4))
+    try:
+        return list(_executor(workers).map(function, *zip(*items), chunksize=chunksize))
+    except BrokenProcessPool:
+        logger.exception("fhir import: worker pool broke; converting %d entries inline", len(items))
+        shutdown_pool()
+        return [function(*item) for item in items]
+
+
+def start_import_job(job):
+    """Run ``job`` -- on a background thread once the kick-off commits, or inline."""
+    start_job(job, run_import_job)
+
+
+def run_import_job(job_id):
+    """Import an accepted job's Bundle and record its ``batch-response`` entries.
+
+    Entry failures are reported in their entries, as on the synchronous endpoint; only a failure
+    of the run itself (e.g. the job's source no longer resolves) marks the job ``failed``. Either
+    way the stored Bundle is dropped.
+    """
+    from core.models import FhirImportJob
+
+    run_job(FhirImportJob, job_id, _import, on_failure={"bundle": None})
+
+
+def _import(job):
+    from core.views.fhir_import import import_bundle_entries
+
+    return {"bundle": None, "result": import_bundle_entries(job.jhe_user, job.fhir_source_id, job.bundle)}
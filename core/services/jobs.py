@@ -0,0 +1,115 @@
+"""Running background jobs: FHIR ``$export`` and R4 imports, OW sync, index-refs.
+
+Each kind of job is a :class:`~core.models.background_job.BackgroundJob` model plus a *work*
+function that does the job's work given its row. The request that starts one creates the row and
+calls :func:`start_job`, which runs it on a daemon thread once the row is committed -- or inline,
+when ``settings.JOBS_IN_BACKGROUND`` is false (tests, single-process tooling). :func:`run_job` then
+
+  * claims the job (``accepted`` -> ``in-progress``) with one conditional UPDATE, so a job is run
+    at most once however many runners race for it;
+  * runs the work under a heartbeat that touches ``last_updated`` every ``HEARTBEAT_SECONDS``;
+  * records ``completed`` (with whatever fields the work returns) or ``failed`` with the error.
+
+A job whose process dies mid-run stops beating; ``BackgroundJob.objects.expire_stale()`` marks it
+failed once it has been silent for ``settings.JOB_STALE_SECONDS``, which the status endpoints do
+before answering. Jobs whose work can pick up where it stopped are run again with ``resume=True``,
+which also claims ``in-progress`` and ``failed`` jobs.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# How often a running job touches its row's ``last_updated``.
+HEARTBEAT_SECONDS = 60
+
+
+def start_job(job, runner, in_background=None):
+    """Call ``runner(job.pk)`` -- on a background thread once ``job``'s creation commits, or inline.
+
+    ``in_background`` defaults to ``settings.JOBS_IN_BACKGROUND``.
+    """
+    if in_background is None:
+        in_background = settings.JOBS_IN_BACKGROUND
+    if not in_background:
+        runner(job.pk)
+        return
+    name = f"{type(job).__name__}-{job.pk}"
+    transaction.on_commit(
+        lambda: threading.Thread(target=_run_in_thread, args=(runner, job.pk), name=name, daemon=True).start()
+    )
+
+
+def _run_in_thread(runner, job_id):
+    close_old_connections()
+    try:
+        runner(job_id)
+    finally:
+        connection.close()
+
+
+def claim(model, job_id, resume=False):
+    """Move a runnable job to ``in-progress`` and return it, or ``None`` if it is not runnable."""
+    runnable = [model.STATUS_ACCEPTED]
+    if resume:
+        runnable += [model.STATUS_IN_PROGRESS, model.STATUS_FAILED]
+    claimed = model.objects.filter(pk=job_id, status__in=runnable).update(
+        status=model.STATUS_IN_PROGRESS, error=None, finished=None, last_updated=timezone.now()
+    )
+    return model.objects.get(pk=job_id) if claimed else None
+
+
+@contextmanager
+def heartbeat(job):
+    """Touch ``job.last_updated`` every ``HEARTBEAT_SECONDS`` while the block runs."""
+    model = type(job)
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT_SECONDS):
+                model.objects.filter(pk=job.pk, status=model.STATUS_IN_PROGRESS).update(last_updated=timezone.now())
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"{model.__name__}-{job.pk}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(model, job_id, work, resume=False, on_failure=None):
+    """Claim job ``job_id`` of ``model`` and run ``work(job)``; record how it ended.
+
+    ``work`` may return a dict of fields to store with ``completed``. A job whose status moved off
+    ``in-progress`` while it ran (cancelled, or expired as stale) keeps that status. ``on_failure``
+    is a dict of fields to store with ``failed``.
+    """
+    job = claim(model, job_id, resume=resume)
+    if job is None:
+        return
+    try:
+        with heartbeat(job):
+            fields = work(job) or {}
+    except Exception as exc:
+        logger.exception("%s %s failed", model.__name__, job.pk)
+        model.objects.filter(pk=job.pk).update(
+            status=model.STATUS_FAILED,
+            error=str(getattr(exc, "detail", None) or exc),
+            finished=timezone.now(),
+            last_updated=timezone.now(),
+            **(on_failure or {}),
+        )
+        return
+    model.objects.filter(pk=job.pk, status=model.STATUS_IN_PROGRESS).update(
+        status=model.STATUS_COMPLETED, finished=timezone.now(), last_updated=timezone.now(), **fields
+    )
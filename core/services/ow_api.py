@@ -0,0 +1,33 @@
+"""Async client for the Open Wearables REST API.
+
+The OW proxy views (core/views/ow.py) and ``PatientViewSet.wearable_status`` call OW while a
+user waits; going through ``httpx.AsyncClient`` lets those views await the round trip on the
+event loop (see core/views/async_api.py) instead of parking a server thread for up to the timeout.
+"""
+
+import httpx
+
+from core.services.jhe_settings import get_setting
+
+API_KEY_HEADER = "X-Open-Wearables-API-Key"
+DEFAULT_TIMEOUT = 10
+
+
+def api_config():
+    """``(api_url, api_key)`` from the runtime JheSettings; either is empty when OW is not configured.
+
+    Synchronous (a cached settings read); async views call it through ``sync_to_async``.
+    """
+    return get_setting("ow.api_url", ""), get_setting("ow.api_key", "")
+
+
+async def request(method, api_url, api_key, path, *, params=None, json=None, timeout=DEFAULT_TIMEOUT):
+    """Send one authenticated request to ``api_url + path`` and return the ``httpx.Response``.
+
+    Redirects are returned as-is, not followed (the OAuth callback proxy rewrites them).
+    Raises ``httpx.HTTPError`` when OW cannot be reached.
+    """
+    # A client per call: OW calls are rare, and an AsyncClient is bound to the event loop it
+    # first ran on (each test-client request runs on a fresh loop).
+    async with httpx.AsyncClient(timeout=timeout, headers={API_KEY_HEADER: api_key}) as client:
+        return await client.request(method, api_url + path, params=params, json=json)
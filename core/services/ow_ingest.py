@@ -10,22 +10,41 @@ credentials, secret) so operators must set them explicitly via JheSettings
 before enabling raw-mode ingest. ``ow.s3.key_prefix`` is the one knob that
 keeps a default since it is an operational layout convention, not a
 credential or globally-unique resource name.
+
+A poll tick reads the settings once (``load_config``), gets a client from a
+per-settings-fingerprint cache (boto3 clients are thread-safe, so one pooled
+client serves every worker and is only rebuilt when the settings change), and
+lists each user's own key prefix (``list_new_objects_by_user``), resuming from
+their persisted ``StartAfter`` checkpoint.
 """
 
 import json
 from datetime import datetime
+from functools import lru_cache
 from typing import NamedTuple
 
 import boto3
+from botocore.config import Config
 
 from core.services.jhe_settings import get_setting
 
+# Connections kept by the cached client; sized for ow_poll's worker pool.
+MAX_POOL_CONNECTIONS = 32
+
 
 class S3ObjectInfo(NamedTuple):
     key: str
     last_modified: datetime
 
 
+class S3Config(NamedTuple):
+    endpoint_url: str
+    access_key_id: str
+    secret_access_key: str
+    bucket: str
+    key_prefix: str
+
+
 def _required_setting(key: str) -> str:
     value = get_setting(key)
     if not value:
@@ -33,50 +52,75 @@ def _required_setting(key: str) -> str:
     return value
 
 
-def get_client():
-    """Build a boto3 S3 client from ``ow.s3.*`` JheSettings."""
+def load_config() -> S3Config:
+    """Read the ``ow.s3.*`` JheSettings."""
+    return S3Config(
+        endpoint_url=_required_setting("ow.s3.endpoint_url"),
+        access_key_id=_required_setting("ow.s3.access_key_id"),
+        secret_access_key=_required_setting("ow.s3.secret_access_key"),
+        bucket=_required_setting("ow.s3.bucket_name"),
+        key_prefix=get_setting("ow.s3.key_prefix", "raw-payloads/oura/api_response"),
+    )
+
+
+@lru_cache(maxsize=8)
+def _client(endpoint_url: str, access_key_id: str, secret_access_key: str):
     return boto3.client(
         "s3",
-        endpoint_url=_required_setting("ow.s3.endpoint_url"),
-        aws_access_key_id=_required_setting("ow.s3.access_key_id"),
-        aws_secret_access_key=_required_setting("ow.s3.secret_access_key"),
+        endpoint_url=endpoint_url,
+        aws_access_key_id=access_key_id,
+        aws_secret_access_key=secret_access_key,
+        config=Config(max_pool_connections=MAX_POOL_CONNECTIONS),
     )
 
 
-def list_new_objects(ow_user_id: str, since: datetime) -> list[S3ObjectInfo]:
-    """List S3 objects belonging to ``ow_user_id`` newer than ``since``.
+def get_client(config: S3Config | None = None):
+    """The boto3 S3 client for ``config`` (default: the current JheSettings), built once per fingerprint."""
+    config = config or load_config()
+    return _client(config.endpoint_url, config.access_key_id, config.secret_access_key)
 
-    Filters by ``"/{ow_user_id}/"`` substring match on the S3 key (matches
-    Open Wearables' default key layout: ``<prefix>/<provider>/<endpoint>/<user_id>/<...>``).
+
+def list_new_objects_by_user(
+    client,
+    bucket: str,
+    prefix: str,
+    since_by_user: dict[str, datetime],
+    checkpoints: dict[str, str],
+) -> dict[str, list[S3ObjectInfo]]:
+    """List the new objects under ``prefix`` of each user in ``since_by_user``.
+
+    Keys are ``<prefix><user_id>/<...>`` (Open Wearables' default layout with ``prefix`` ending
+    in the endpoint path), so each user's objects are listed from their own ``<prefix><user_id>/``
+    -- starting after the user's checkpoint (the last key ingested for them under ``prefix``)
+    when they have one, and otherwise keeping the objects modified after their ``since``. A
+    user's listing never reads another user's keys, however far apart their checkpoints are.
+    Returns ``{user_id: [objects in key order]}``.
     """
-    client = get_client()
-    bucket = _required_setting("ow.s3.bucket_name")
-    prefix = get_setting("ow.s3.key_prefix", "raw-payloads/oura/api_response")
+    return {
+        user_id: _list_new_objects(client, bucket, f"{prefix}{user_id}/", since, checkpoints.get(user_id))
+        for user_id, since in since_by_user.items()
+    }
+
 
-    results: list[S3ObjectInfo] = []
-    continuation_token = None
+def _list_new_objects(client, bucket, prefix, since, checkpoint):
+    kwargs = {"Bucket": bucket, "Prefix": prefix}
+    if checkpoint:
+        kwargs["StartAfter"] = checkpoint
+    objects = []
     while True:
-        kwargs = {"Bucket": bucket, "Prefix": prefix}
-        if continuation_token:
-            kwargs["ContinuationToken"] = continuation_token
         response = client.list_objects_v2(**kwargs)
         for obj in response.get("Contents", []):
-            key = obj["Key"]
-            last_modified = obj["LastModified"]
-            if f"/{ow_user_id}/" not in key:
-                continue
-            if last_modified <= since:
-                continue
-            results.append(S3ObjectInfo(key=key, last_modified=last_modified))
+            if checkpoint or obj["LastModified"] > since:
+                objects.append(S3ObjectInfo(key=obj["Key"], last_modified=obj["LastModified"]))
         if not response.get("IsTruncated"):
-            break
-        continuation_token = response.get("NextContinuationToken")
-    return results
+            return objects
+        kwargs["ContinuationToken"] = response.get("NextContinuationToken")
 
 
-def read_object(key: str) -> dict:
+def read_object(key: str, client=None, bucket: str | None = None) -> dict:
     """Download an S3 object and parse its JSON body."""
-    client = get_client()
-    bucket = _required_setting("ow.s3.bucket_name")
+    if client is None or bucket is None:
+        config = load_config()
+        client, bucket = client or get_client(config), bucket or config.bucket
     response = client.get_object(Bucket=bucket, Key=key)
     return json.loads(response["Body"].read())
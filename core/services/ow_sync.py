@@ -0,0 +1,344 @@
+"""Background sync of raw Oura heart-rate payloads from Open Wearables' MinIO/S3.
+
+``/api/v1/ow/sync`` (core/views/ow.py) records an :class:`~core.models.OwSyncJob` and hands it to
+:func:`start_sync_job`, which runs it as a background job (core/services/jobs.py); the UI polls the
+job's status endpoint.
+
+A run:
+
+  * lists the bucket under ``<OW_S3_PREFIX>/oura/`` after the newest ``Observation.ow_key``
+    already synced (keys are ``<prefix>/<provider>/<endpoint path...>/<user id>/<file>.json``);
+  * classifies each key by its layout -- when the path spells out the Oura API endpoint
+    (``.../usercollection/<endpoint>/...``) heart-rate files are recognised without a request --
+    and only falls back to a ``head_object`` (``trace_id`` metadata) for keys that don't;
+  * resolves every listed user id to its patient with one query;
+  * downloads, stream-parses and converts the files on a bounded thread pool
+    (``ow.sync_concurrency`` JheSetting), while this thread bulk-inserts the observations in listing
+    order -- so the newest synced ``ow_key`` stays a safe resume point -- and keeps the job's
+    counters current.
+"""
+
+import codecs
+import json
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.services.jhe_settings import get_setting
+from core.services.jobs import run_job, start_job
+
+logger = logging.getLogger(__name__)
+
+
+# from omh_shim import convert
+def convert(*args, **kwargs):
+    raise NotImplementedError("omh-shim disabled in 0.0.11")
+
+
+HEART_RATE_CODE = "omh:heart-rate:2.0"
+
+# Worker threads when ``ow.sync_concurrency`` is unset.
+DEFAULT_SYNC_CONCURRENCY = 8
+# Observations per INSERT.
+CHUNK_SIZE = 500
+# Bytes read from an S3 body per parse step.
+STREAM_CHUNK_SIZE = 64 * 1024
+# Per-sample/per-file messages kept on the job (the counters stay exact past this).
+MAX_ERRORS = 100
+
+_decoder = json.JSONDecoder()
+
+
+def get_s3_client(max_pool_connections=10):
+    """Create a boto3 S3 client for OW's MinIO instance."""
+    return boto3.client(
+        "s3",
+        endpoint_url=settings.OW_S3_ENDPOINT_URL,
+        aws_access_key_id=settings.OW_S3_ACCESS_KEY,
+        aws_secret_access_key=settings.OW_S3_SECRET_KEY,
+        region_name=settings.OW_S3_REGION,
+        config=Config(max_pool_connections=max_pool_connections),
+    )
+
+
+def sync_concurrency():
+    """Worker threads per run, from the ``ow.sync_concurrency`` JheSetting (at least 1)."""
+    try:
+        return max(1, int(get_setting("ow.sync_concurrency", DEFAULT_SYNC_CONCURRENCY)))
+    except (TypeError, ValueError):
+        return DEFAULT_SYNC_CONCURRENCY
+
+
+def key_is_heart_rate(relative_key):
+    """Whether a key's layout marks it a heart-rate file: ``True``/``False``, or ``None`` if unknown.
+
+    ``relative_key`` is the key below ``OW_S3_PREFIX``. The Oura endpoint path is the part between
+    the provider and the user id; when it is spelled out (``.../usercollection/heartrate``) the
+    key alone decides, otherwise the object's metadata has to.
+    """
+    endpoint = relative_key.split("/")[1:-2]
+    if "usercollection" not in endpoint:
+        return None
+    return "heartrate" in endpoint
+
+
+def _head_is_heart_rate(s3_client, bucket, key):
+    """Check S3 object metadata to determine if this is a heart rate file."""
+    try:
+        head = s3_client.head_object(Bucket=bucket, Key=key)
+        trace_id = head.get("Metadata", {}).get("trace_id", "")
+        return "heartrate" in trace_id.lower()
+    except Exception:
+        return False
+
+
+class _JsonStream:
+    """Just enough of an incremental JSON reader to walk one top-level array of values."""
+
+    def __init__(self, body, chunk_size):
+        self._body = body
+        self._chunk_size = chunk_size
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = self._body.read(self._chunk_size)
+        self._eof = not chunk
+        self._buffer = self._buffer[self._pos :] + self._utf8.decode(chunk or b"", final=self._eof)
+        self._pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected):
+        if self.peek() != expected:
+            raise ValueError(f"Expected {expected!r} in JSON stream")
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number (or literal) ending at the buffer's edge may continue in the next chunk.
+            if end == len(self._buffer) and not self._eof:
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    def items(self):
+        self.take("[")
+        if self.peek() == "]":
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError("Malformed JSON array")
+
+
+def iter_measurements(body, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield the samples of a payload file without loading the whole document.
+
+    Accepts a top-level array or an object with a ``data`` array (Oura's response envelope);
+    anything else raises ``ValueError``. ``body`` is a binary file-like (e.g. an S3 ``Body``).
+    """
+    stream = _JsonStream(body, chunk_size)
+    first = stream.peek()
+    if first == "[":
+        yield from stream.items()
+        return
+    if first != "{":
+        raise ValueError(f"Expected array, got {type(stream.value()).__name__}")
+    stream.take("{")
+    while stream.peek() != "}":
+        key = stream.value()
+        stream.take(":")
+        if key == "data" and stream.peek() == "[":
+            yield from stream.items()
+            return
+        stream.value()
+        if stream.peek() == ",":
+            stream.take(",")
+    raise ValueError("Expected array, got dict")
+
+
+def start_sync_job(job):
+    """Run ``job`` -- on a background thread once its creation commits, or inline."""
+    start_job(job, run_sync_job)
+
+
+def run_sync_job(job_id):
+    """Execute an accepted sync job; any failure marks it ``failed`` with the error message."""
+    from core.models import OwSyncJob
+
+    run_job(OwSyncJob, job_id, _sync)
+
+
+def _list_candidates(s3_client, bucket, s3_prefix, start_after):
+    """``(key, user id, heart-rate-by-layout)`` for every JSON key not excluded by its layout."""
+    list_kwargs = {"Bucket": bucket, "Prefix": f"{s3_prefix}/oura/"}
+    if start_after:
+        list_kwargs["StartAfter"] = start_after
+    candidates, errors = [], []
+    for page in s3_client.get_paginator("list_objects_v2").paginate(**list_kwargs):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            if not key.endswith(".json"):
+                continue
+            relative_key = key[len(s3_prefix) + 1 :] if key.startswith(s3_prefix + "/") else key
+            rel_parts = relative_key.split("/")
+            is_heart_rate = key_is_heart_rate(relative_key)
+            if is_heart_rate is False:
+                continue
+            if len(rel_parts) < 5:
+                errors.append(f"Unexpected key format: {key}")
+                continue
+            candidates.append((key, rel_parts[-2], is_heart_rate))
+    return candidates, errors
+
+
+def _patients_by_ow_id(ow_user_ids):
+    """``{ow user id: Patient}`` for the listed ids, whether stored bare or ``ow:``-prefixed."""
+    from core.models import JheUser
+
+    identifiers = set(ow_user_ids) | {f"ow:{ow_user_id}" for ow_user_id in ow_user_ids}
+    patients = {}
+    users = JheUser.objects.filter(identifier__in=identifiers, patient_profile__isnull=False)
+    for user in users.select_related("patient_profile"):
+        patients[user.identifier.removeprefix("ow:")] = user.patient_profile
+    return patients
+
+
+def _fetch_file(s3_client, bucket, key, needs_head):
+    """Worker: ``(omh records, errors)`` for one file, or ``None`` when it isn't heart rate.
+
+    Runs on a worker thread, so it must not touch the database.
+    """
+    if needs_head and not _head_is_heart_rate(s3_client, bucket, key):
+        return None
+    records, errors = [], []
+    try:
+        body = s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+        for i, sample in enumerate(iter_measurements(body)):
+            try:
+                records.append(convert(source="oura_raw", data_type="heart_rate", sample=sample))
+            except Exception as e:
+                errors.append(f"{key} sample {i}: {e}")
+    except Exception as e:
+        errors.append(f"Download/parse failed for {key}: {e}")
+    return records, errors
+
+
+def _sync(job):
+    from core.models import CodeableConcept, DataSource, Observation, OwSyncJob
+
+    bucket = settings.OW_S3_BUCKET
+    s3_prefix = settings.OW_S3_PREFIX
+    concurrency = sync_concurrency()
+    s3_client = get_s3_client(max_pool_connections=concurrency)
+    hr_code = CodeableConcept.objects.get(coding_code=HEART_RATE_CODE)
+    oura_ds, _ = DataSource.objects.get_or_create(name="Oura Ring", defaults={"type": "personal_device"})
+
+    # Resume from the last synced S3 key
+    last_key = (
+        Observation.objects.filter(ow_key__isnull=False).order_by("-ow_key").values_list("ow_key", flat=True).first()
+    )
+    candidates, errors = _list_candidates(s3_client, bucket, s3_prefix, last_key)
+    patients = _patients_by_ow_id({ow_user_id for _, ow_user_id, _ in candidates})
+
+    def record_progress(**deltas):
+        OwSyncJob.objects.filter(pk=job.pk).update(
+            **{name: F(name) + delta for name, delta in deltas.items()},
+            errors=errors[:MAX_ERRORS],
+            last_updated=timezone.now(),
+        )
+
+    work = []
+    skipped = 0
+    for key, ow_user_id, is_heart_rate in candidates:
+        if ow_user_id in patients:
+            work.append((key, patients[ow_user_id], is_heart_rate is None))
+        elif is_heart_rate:
+            # Keys of unknown layout are not HEADed just to count them: no patient, no sync.
+            logger.debug("No JHE user with identifier=%s, skipping %s", ow_user_id, key)
+            skipped += 1
+    record_progress(files_skipped=skipped)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ow-sync") as pool:
+        # Files are fetched in parallel but inserted in listing order: the next run resumes after
+        # the newest synced key, so no key may be inserted before every earlier one is done.
+        # Bound the files held in memory to a couple per worker.
+        pending = deque()
+        queue = iter(work)
+        while True:
+            for key, patient, needs_head in queue:
+                pending.append((pool.submit(_fetch_file, s3_client, bucket, key, needs_head), key, patient))
+                if len(pending) >= 2 * concurrency:
+                    break
+            if not pending:
+                break
+            future, key, patient = pending.popleft()
+            result = future.result()
+            if result is None:
+                continue
+            records, file_errors = result
+            errors.extend(file_errors)
+            created = 0
+            # A file's rows commit together, so an interrupted run never leaves a file half synced
+            # behind the resume point; a chunk that fails is rolled back on its own.
+            with transaction.atomic():
+                observations = []
+                for i, omh_record in enumerate(records):
+                    observation = Observation(
+                        subject_patient=patient,
+                        codeable_concept=hr_code,
+                        data_source=oura_ds,
+                        omh_data=omh_record,
+                        ow_key=key,
+                        status="final",
+                    )
+                    try:
+                        # bulk_create bypasses save(): validate and project the timing columns here.
+                        observation.clean()
+                        observation._sync_effective_time_frame()
+                    except Exception as e:
+                        errors.append(f"{key} record {i}: {e}")
+                        continue
+                    observations.append(observation)
+                for ci in range(0, len(observations), CHUNK_SIZE):
+                    chunk = observations[ci : ci + CHUNK_SIZE]
+                    try:
+                        with transaction.atomic():
+                            Observation.objects.bulk_create(chunk)
+                        created += len(chunk)
+                    except Exception as e:
+                        errors.append(f"Bulk save {key} chunk {ci}: {e}")
+            logger.info("Synced %d/%d from %s", created, len(records), key)
+            record_progress(files_processed=1, observations_created=created)
@@ -0,0 +1,208 @@
+"""Persistence of ``Practitioner.settings`` (the UI's sticky selections).
+
+The list views remember the practitioner's current organization/study/FHIR resource on every
+GET. A change equal to the value already in effect is dropped, so a dashboard that keeps the
+same selection writes nothing. Every real change is stamped with the time it was made, and
+``_write`` applies it only if it is newer than the change last stored for that key
+(``Practitioner.settings_changed``), so writes that reach the row out of order never replace a
+newer value with an older one.
+
+By default (``PRACTITIONER_SETTINGS_FLUSH_SECONDS = 0``) each change is written straight through.
+A positive value turns on write-behind for the sticky selections (:data:`BUFFERED_KEYS`):
+
+  * a change is recorded in a per-practitioner, per-key *pending* entry in the Django cache and
+    applied to the instance in memory;
+  * pending changes are written at most once per period per practitioner -- the first change
+    after a quiet period is written immediately, later ones are coalesced and flushed by a
+    background timer when the period ends;
+  * reads (``Practitioner.get_setting`` / ``current_settings``) overlay the pending entries that
+    are newer than the stored values, and flush them if they are overdue -- e.g. because the
+    process whose timer should have written them was recycled.
+
+Write-behind shares its pending entries between server processes through the cache, so it
+requires a shared cache backend (``CACHE_BACKEND``); with Django's per-process default it raises
+``ImproperlyConfigured``. Changes still buffered when a process exits are flushed by
+``flush_all``.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, connection, transaction
+
+from core.utils import cache_is_shared
+
+logger = logging.getLogger(__name__)
+
+# The settings the list views rewrite on every request; any other key is always written through.
+BUFFERED_KEYS = ("current_organization_id", "current_study_id", "current_fhir_resource")
+
+# Pending entries outlive the flush period by this factor, so a change held up behind a slow or
+# missed timer is still there for the next flush.
+_PENDING_TTL_FACTOR = 60
+
+# Practitioners with changes buffered by this process.
+_buffered_ids = set()
+_buffered_lock = threading.Lock()
+
+
+def _pending_key(practitioner_id, key):
+    return f"practitioner_settings:{practitioner_id}:pending:{key}"
+
+
+def _flushed_key(practitioner_id):
+    return f"practitioner_settings:{practitioner_id}:flushed"
+
+
+def _scheduled_key(practitioner_id):
+    return f"practitioner_settings:{practitioner_id}:scheduled"
+
+
+def _flush_interval():
+    interval = max(0, int(getattr(settings, "PRACTITIONER_SETTINGS_FLUSH_SECONDS", 0)))
+    if interval and not cache_is_shared():
+        raise ImproperlyConfigured(
+            "PRACTITIONER_SETTINGS_FLUSH_SECONDS > 0 needs a cache shared by all server processes; "
+            "set CACHE_BACKEND or write settings through with PRACTITIONER_SETTINGS_FLUSH_SECONDS=0."
+        )
+    return interval
+
+
+def _change(value, delete):
+    return {"value": None if delete else value, "delete": delete, "changed": time.time_ns()}
+
+
+def pending_changes(practitioner_id):
+    """The buffered ``{key: {"value", "delete", "changed"}}`` for a practitioner (``{}`` if none)."""
+    if not _flush_interval():
+        return {}
+    keys = {_pending_key(practitioner_id, key): key for key in BUFFERED_KEYS}
+    return {keys[cache_key]: change for cache_key, change in cache.get_many(keys).items()}
+
+
+def _newer(changes, stored_changed):
+    # The changes not yet superseded by what the row already holds.
+    return {key: change for key, change in changes.items() if change["changed"] > stored_changed.get(key, 0)}
+
+
+def overlay(stored, changes):
+    """``stored`` settings with ``changes`` applied (a new dict)."""
+    merged = dict(stored or {})
+    for key, change in changes.items():
+        if change["delete"]:
+            merged.pop(key, None)
+        else:
+            merged[key] = change["value"]
+    return merged
+
+
+def current_settings(practitioner):
+    """``practitioner``'s settings as a read should see them: stored, plus newer pending changes."""
+    pending = _newer(pending_changes(practitioner.pk), practitioner.settings_changed)
+    if pending:
+        overdue = time.time_ns() - _flush_interval() * 1_000_000_000
+        if min(change["changed"] for change in pending.values()) < overdue:
+            flush(practitioner.pk)
+    return overlay(practitioner.settings, pending)
+
+
+def record_change(practitioner, key, value, delete=False):
+    """Apply one setting change to ``practitioner`` and schedule its persistence.
+
+    Returns ``False`` without writing anything when the change is a no-op.
+    """
+    current = practitioner.current_settings()
+    if delete:
+        if key not in current:
+            return False
+    elif key in current and current[key] == value:
+        return False
+
+    if delete:
+        practitioner.settings.pop(key, None)
+    else:
+        practitioner.settings[key] = value
+    change = _change(value, delete)
+    practitioner.settings_changed[key] = change["changed"]
+
+    interval = _flush_interval()
+    if interval == 0 or key not in BUFFERED_KEYS:
+        _write(practitioner.pk, {key: change})
+        return True
+
+    cache.set(_pending_key(practitioner.pk, key), change, interval * _PENDING_TTL_FACTOR)
+    with _buffered_lock:
+        _buffered_ids.add(practitioner.pk)
+
+    if cache.add(_flushed_key(practitioner.pk), True, interval):
+        # Nothing was written for this practitioner in the last period: write now.
+        flush(practitioner.pk)
+    else:
+        _schedule_flush(practitioner.pk, interval)
+    return True
+
+
+def flush(practitioner_id):
+    """Write a practitioner's pending changes (if any) to the database.
+
+    Entries are left to expire rather than deleted: another process may have replaced one since
+    it was read, and an entry already written is superseded by ``settings_changed`` on read.
+    """
+    with _buffered_lock:
+        _buffered_ids.discard(practitioner_id)
+    pending = pending_changes(practitioner_id)
+    if pending:
+        _write(practitioner_id, pending)
+
+
+@atexit.register
+def flush_all():
+    """Flush every practitioner this process still has buffered changes for."""
+    for practitioner_id in list(_buffered_ids):
+        try:
+            flush(practitioner_id)
+        except Exception:
+            logger.exception("Practitioner settings flush failed for practitioner=%s", practitioner_id)
+
+
+def _write(practitioner_id, changes):
+    from core.models import Practitioner
+
+    with transaction.atomic():
+        practitioner = Practitioner.objects.select_for_update().filter(pk=practitioner_id).first()
+        if practitioner is None:
+            return
+        newer = _newer(changes, practitioner.settings_changed)
+        if not newer:
+            return
+        practitioner.settings = overlay(practitioner.settings, newer)
+        practitioner.settings_changed = {
+            **practitioner.settings_changed,
+            **{key: change["changed"] for key, change in newer.items()},
+        }
+        practitioner.save(update_fields=["settings", "settings_changed"])
+
+
+def _schedule_flush(practitioner_id, interval):
+    # One timer per practitioner per period; the key lapses with the period so a later change
+    # schedules the next one.
+    if not cache.add(_scheduled_key(practitioner_id), True, interval):
+        return
+    timer = threading.Timer(interval, _flush_in_thread, args=(practitioner_id,))
+    timer.daemon = True
+    timer.start()
+
+
+def _flush_in_thread(practitioner_id):
+    close_old_connections()
+    try:
+        flush(practitioner_id)
+    except Exception:
+        logger.exception("Deferred practitioner settings flush failed for practitioner=%s", practitioner_id)
+    finally:
+        connection.close()
@@ -1,10 +1,21 @@
 # accounts/signals.py
 
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from core.models import Practitioner
+from core.fhir.search_index import index_aux_resource
+from core.models import (
+    FhirAuxResource,
+    PatientOrganization,
+    Practitioner,
+    PractitionerOrganization,
+    PractitionerPatientAccess,
+    StudyPatient,
+    StudyPatientScopeConsent,
+    StudyScopeRequest,
+)
+from core.services import consent_scopes
 
 User = get_user_model()
 
@@ -21,3 +32,65 @@ def on_superuser_created(sender, instance, created, **kwargs):
     if created and instance.is_superuser:
         print(f"signals post_save: superuser {instance.email} - adding Practitioner")
         Practitioner.objects.create(jhe_user=instance)
+
+
+@receiver(post_save, sender=FhirAuxResource)
+def on_aux_resource_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Keep the aux search index in step with the stored body (a save that names its fields and
+    # leaves fhir_data/resource_type alone -- e.g. ref_indexed only -- cannot change it).
+    if raw or (update_fields is not None and not {"fhir_data", "resource_type"} & set(update_fields)):
+        return
+    index_aux_resource(instance)
+
+
+@receiver([post_save, post_delete], sender=PatientOrganization)
+def on_patient_organization_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    PractitionerPatientAccess.refresh(patient_ids=[instance.patient_id], organization_ids=[instance.organization_id])
+
+
+@receiver([post_save, post_delete], sender=PractitionerOrganization)
+def on_practitioner_organization_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    PractitionerPatientAccess.refresh(
+        practitioner_ids=[instance.practitioner_id], organization_ids=[instance.organization_id]
+    )
+
+
+@receiver(m2m_changed, sender=PatientOrganization)
+@receiver(m2m_changed, sender=PractitionerOrganization)
+def on_organization_members_added(sender, instance, action, reverse, pk_set, **kwargs):
+    # ``organizations.add()`` (and ``patients``/``practitioners.add()``) bulk-insert the through
+    # rows without post_save; remove()/clear() delete them row by row, so post_delete covers those.
+    if action != "post_add" or not pk_set:
+        return
+    members, organizations = (pk_set, [instance.pk]) if reverse else ([instance.pk], pk_set)
+    member_key = "patient_ids" if sender is PatientOrganization else "practitioner_ids"
+    PractitionerPatientAccess.refresh(**{member_key: members}, organization_ids=organizations)
+
+
+@receiver([post_save, post_delete], sender=StudyPatientScopeConsent)
+def on_scope_consent_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    consent_scopes.invalidate(
+        StudyPatient.objects.filter(pk=instance.study_patient_id).values_list("patient_id", flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=StudyPatient)
+def on_study_enrollment_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    consent_scopes.invalidate([instance.patient_id])
+
+
+@receiver([post_save, post_delete], sender=StudyScopeRequest)
+def on_study_scope_request_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    consent_scopes.invalidate(
+        StudyPatient.objects.filter(study_id=instance.study_id).values_list("patient_id", flat=True)
+    )
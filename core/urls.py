@@ -6,8 +6,10 @@ from core.fhir.config import FHIR_VERSION
 
 from . import views
 from .views import common, mychart, ow
-from .views.fhir import FHIRResourceView
-from .views.fhir_import import FHIRImportView
+from .views.fhir import FHIRCapabilityStatementView, FHIRResourceView
+from .views.fhir_export import FHIRExportOutputView, FHIRExportStatusView, FHIRExportView
+from .views.fhir_import import FHIRImportStatusView, FHIRImportView
+from .views.fhir_operations import FHIRObservationLastNView, FHIRObservationStatsView
 
 
 def fhir_urls(prefix):
@@ -15,12 +17,26 @@ def fhir_urls(prefix):
 
     `prefix` ends in a slash (e.g. "FHIR/R5/"). The bundle-batch base is registered both
     with and without the trailing slash so POST /FHIR/R5 and POST /FHIR/R5/ both work
-    (APPEND_SLASH only 301-redirects, which drops the POST body).
+    (APPEND_SLASH only 301-redirects, which drops the POST body). ``metadata``, the Observation
+    ``$stats``/``$lastn`` and the Bulk Data ``$export`` operations are registered ahead of the
+    generic resource routes they would otherwise match.
     """
     batch = views.FHIRBase.as_view({"post": "create"})
     return [
         path(prefix, batch, name="fhir-batch"),
         path(prefix.rstrip("/"), batch, name="fhir-batch-no-slash"),
+        path(f"{prefix}metadata", FHIRCapabilityStatementView.as_view(), name="fhir-metadata"),
+        path(f"{prefix}Observation/$stats", FHIRObservationStatsView.as_view(), name="fhir-observation-stats"),
+        path(f"{prefix}Observation/$lastn", FHIRObservationLastNView.as_view(), name="fhir-observation-lastn"),
+        path(f"{prefix}$export", FHIRExportView.as_view(level="system"), name="fhir-export"),
+        path(f"{prefix}Patient/$export", FHIRExportView.as_view(level="patient"), name="fhir-export-patient"),
+        path(f"{prefix}Group/<str:id>/$export", FHIRExportView.as_view(level="group"), name="fhir-export-group"),
+        path(f"{prefix}$export-status/<uuid:job_id>", FHIRExportStatusView.as_view(), name="fhir-export-status"),
+        path(
+            f"{prefix}$export-output/<uuid:job_id>/<str:filename>",
+            FHIRExportOutputView.as_view(),
+            name="fhir-export-output",
+        ),
         path(f"{prefix}<str:resource>", FHIRResourceView.as_view(), name="fhir-resource"),
         path(f"{prefix}<str:resource>/<str:id>", FHIRResourceView.as_view(), name="fhir-resource-instance"),
     ]
@@ -93,6 +109,7 @@ urlpatterns = [
     path("api/v1/ow/oauth/oura/authorize", ow.get_oura_auth_url, name="ow-oura-authorize"),
     path("api/v1/oauth/oura/callback", ow.oura_oauth_callback, name="ow-oura-callback"),
     path("api/v1/ow/sync", ow.sync_ow_data, name="ow-sync"),
+    path("api/v1/ow/sync/<uuid:job_id>", ow.ow_sync_status, name="ow-sync-status"),
     # Client UI
     path(
         "common/server-settings.js",
@@ -112,5 +129,6 @@ urlpatterns = [
     # resource. See core/views/fhir_import.py and fhir-r4-import.md.
     path("fhir-import/R4/", FHIRImportView.as_view(), name="fhir-import-bundle"),
     path("fhir-import/R4", FHIRImportView.as_view(), name="fhir-import-bundle-no-slash"),
+    path("fhir-import/R4/$import-status/<uuid:job_id>", FHIRImportStatusView.as_view(), name="fhir-import-status"),
     path("fhir-import/R4/<str:resource>", FHIRImportView.as_view(), name="fhir-import-resource"),
 ]
@@ -2,6 +2,7 @@
 import json
 import logging
 import random
+import threading
 from datetime import timedelta
 from pathlib import Path
 from typing import Any
@@ -23,6 +24,17 @@ from referencing import Registry, Resource
 
 logger = logging.getLogger(__name__)
 
+# Cache backends private to one server process: state kept in them is invisible to the others.
+PER_PROCESS_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def cache_is_shared() -> bool:
+    """Whether the default cache is shared by all server processes (``CACHE_BACKEND``)."""
+    return settings.CACHES["default"]["BACKEND"] not in PER_PROCESS_CACHES
+
 
 class NoNetwork:
     def __call__(self, uri: str):
@@ -56,11 +68,100 @@ def validate_with_registry(*, instance, schema, forbid_unknown_network: bool = T
     Validator = validators.validator_for(schema)
     Validator.check_schema(schema)
 
-    preloaded = build_schema_registry()
-    registry = preloaded.combine(Registry(retrieve=NoNetwork())) if forbid_unknown_network else preloaded
+    registry = get_schema_registry() if forbid_unknown_network else build_schema_registry()
     Validator(schema, registry=registry).validate(instance)
 
 
+# Process-wide cache of compiled OMH validators, keyed by schema id (the schema's file path, e.g.
+# metadata/header-1.0.json or data/schema-omh_heart-rate_2-0.json). Each validator is built once
+# against a single preloaded registry, so a save no longer re-reads the schema, re-globs every
+# schema directory and re-runs check_schema. The cache is stamped with the schema directories'
+# paths and mtimes: adding, removing or renaming a schema file (or pointing DATA_DIR_PATH
+# elsewhere) rebuilds it on the next lookup. In-place edits of an existing file do not bump the
+# directory mtime, so callers that rewrite schemas must call clear_schema_validator_cache().
+_schema_cache_lock = threading.Lock()
+_schema_cache = {"stamp": None, "registry": None, "validators": {}}
+
+
+def _schema_dirs():
+    return (
+        settings.DATA_DIR_PATH.schemas_metadata,
+        settings.DATA_DIR_PATH.schemas_data,
+        settings.DATA_DIR_PATH.schemas_utility,
+    )
+
+
+def _schema_dirs_stamp():
+    stamp = []
+    for directory in _schema_dirs():
+        try:
+            stamp.append((str(directory), directory.stat().st_mtime_ns))
+        except OSError:
+            stamp.append((str(directory), None))
+    return tuple(stamp)
+
+
+def _current_schema_cache():
+    """Return the live cache dict, resetting it first if the schema directories changed."""
+    stamp = _schema_dirs_stamp()
+    if _schema_cache["stamp"] != stamp:
+        with _schema_cache_lock:
+            if _schema_cache["stamp"] != stamp:
+                _schema_cache["registry"] = None
+                _schema_cache["validators"] = {}
+                _schema_cache["stamp"] = stamp
+    return _schema_cache
+
+
+def clear_schema_validator_cache():
+    """Drop every cached registry and validator; the next lookup rebuilds from DATA_DIR_PATH."""
+    with _schema_cache_lock:
+        _schema_cache["stamp"] = None
+        _schema_cache["registry"] = None
+        _schema_cache["validators"] = {}
+
+
+def get_schema_registry() -> Registry:
+    """The preloaded schema registry (remote $refs blocked), built once per schema-dir stamp."""
+    cache = _current_schema_cache()
+    registry = cache["registry"]
+    if registry is None:
+        with _schema_cache_lock:
+            registry = cache["registry"]
+            if registry is None:
+                registry = build_schema_registry().combine(Registry(retrieve=NoNetwork()))
+                # Crawl up front so $ref lookups hit the resolved-resource index, not the retriever.
+                registry = registry.crawl()
+                cache["registry"] = registry
+    return registry
+
+
+def get_schema_validator(schema_path: Path):
+    """Return the compiled validator for the JSON Schema file at ``schema_path`` (cached).
+
+    The schema is read and checked once; a missing file raises FileNotFoundError and is not
+    cached.
+    """
+    cache = _current_schema_cache()
+    key = str(schema_path)
+    validator = cache["validators"].get(key)
+    if validator is None:
+        registry = get_schema_registry()
+        schema = json.loads(Path(schema_path).read_text())
+        Validator = validators.validator_for(schema)
+        Validator.check_schema(schema)
+        validator = Validator(schema, registry=registry)
+        with _schema_cache_lock:
+            validator = cache["validators"].setdefault(key, validator)
+    return validator
+
+
+def omh_body_schema_path(coding_code: str) -> Path:
+    """Path of the OMH body schema for a coding code, e.g. omh:heart-rate:2.0 ->
+    data/omh/json-schemas/data/schema-omh_heart-rate_2-0.json."""
+    return settings.DATA_DIR_PATH.schemas_data / f"schema-{coding_code.replace(':', '_').replace('.', '-')}.json"
+
+
 def generate_observation_value_attachment_data(coding_code):
     data_point = settings.DATA_DIR_PATH.examples_data_point / (
         coding_code.replace(":", "_").replace(".", "-") + ".json"
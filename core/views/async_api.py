@@ -0,0 +1,76 @@
+"""Native async dispatch for DRF views (served by ``jhe.asgi`` under uvicorn).
+
+DRF's ``APIView.dispatch`` is synchronous, so Django runs a plain DRF view start to finish on a
+worker thread. ``AsyncAPIViewMixin`` makes ``dispatch`` a coroutine instead: ``async def``
+handlers run on the event loop (an outbound Open Wearables call then waits without holding a
+thread), while DRF's synchronous steps -- authentication/permissions/throttling, exception
+rendering, and any handler that is still a plain ``def`` -- run through ``sync_to_async``.
+Those calls are thread-sensitive, so under ASGI each request's ORM work stays on that request's
+own thread (Django's handler opens a ``ThreadSensitiveContext`` per request) and under WSGI or the
+test client they run on the calling thread, inside the test transaction.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from rest_framework.decorators import api_view
+
+
+class AsyncAPIViewMixin:
+    """Mix into an ``APIView`` / ``ViewSet`` (before it) to dispatch requests asynchronously.
+
+    Handlers may be ``async def`` or plain ``def``; the two can be mixed on one view.
+    """
+
+    # Overrides View.view_is_async (which refuses a mix of sync and async handlers).
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        # ViewSetMixin.as_view builds a plain function around dispatch; mark it so Django awaits it.
+        return markcoroutinefunction(super().as_view(*args, **initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Mirrors APIView.dispatch.
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def async_api_view(http_method_names):
+    """``@api_view`` for an ``async def`` function view.
+
+    Stack it like ``@api_view`` (outermost, above ``@permission_classes`` and friends); the
+    function receives the DRF request and may await, but must hop to a thread
+    (``sync_to_async``) for synchronous ORM/settings reads.
+    """
+
+    def decorator(func):
+        wrapped = api_view(http_method_names)(func).cls
+
+        async def handler(self, *args, **kwargs):
+            return await func(*args, **kwargs)
+
+        view = type(wrapped.__name__, (AsyncAPIViewMixin, wrapped), {"__doc__": func.__doc__})
+        view.__module__ = func.__module__
+        for method in http_method_names:
+            setattr(view, method.lower(), handler)
+        return view.as_view()
+
+    return decorator
@@ -25,9 +25,11 @@ The FHIR bundle batch endpoint (POST at the base, e.g. ``FHIR/R5/``) remains ser
 import logging
 import uuid
 
+from asgiref.sync import sync_to_async
 from django.core.exceptions import BadRequest as DjangoBadRequest
 from django.core.exceptions import PermissionDenied as DjangoPermissionDenied
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.db.utils import IntegrityError
 from django.utils import timezone
 from django.utils.dateparse import parse_date, parse_datetime
@@ -38,6 +40,7 @@ from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.fhir.capability import capability_statement
 from core.fhir.config import (
     aux_interactions,
     get_config_errors,
@@ -51,8 +54,9 @@ from core.fhir.config import (
 )
 from core.fhir.engine import build_fhir_resource, matches_criteria
 from core.fhir.fhir_validation import validate_fhir_resource
-from core.fhir.pagination import FHIRBundlePagination
+from core.fhir.pagination import FHIRBundlePagination, FHIRCursorPagination, cursor_requested
 from core.fhir.search import apply_search_params, summary_count_requested
+from core.fhir.search_index import index_new_aux_resources
 from core.models import (
     JHE_FHIR_SOURCE_BASE,
     JHE_NATIVE_SOURCE,
@@ -64,6 +68,7 @@ from core.models import (
     parse_fhir_source_id,
 )
 from core.serializers import FHIRAuxResourceSerializer, FHIRObservationSerializer
+from core.views.async_api import AsyncAPIViewMixin
 from core.views.fhir_base import FHIRBase
 
 logger = logging.getLogger(__name__)
@@ -199,26 +204,48 @@ class ObservationHandler(MappedResourceHandler):
 
     def create(self, data):
         # Only the OMH path reaches here (the view routes non-OMH Observations to aux).
-        observation = Observation.fhir_create(data, self.user)
-        logger.debug("created observation: %s", observation)
+        outcome = self.bulk_create([data])[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def bulk_create(self, data_list):
+        """Create many OMH Observations with one ``Observation.fhir_bulk_create`` pass.
+
+        Returns, per entry and in order, the rendered resource or the exception that rejected it.
+        """
+        outcomes = Observation.fhir_bulk_create(data_list, self.user)
+        logger.debug("created observations: %s", outcomes)
 
         # Return a minimal FHIR-compliant response for the patient path (avoids re-rendering
-        # the full search/serializer for the single just-created row).
+        # the full search/serializer for the just-created rows).
         if self.user.is_patient():
-            obs = Observation.objects.select_related("subject_patient", "codeable_concept").get(pk=observation.id)
-            return {
-                "resourceType": "Observation",
-                "id": str(obs.id),
-                "status": "final",
-                "meta": {"lastUpdated": obs.last_updated.isoformat() if obs.last_updated else None},
-                "subject": {"reference": f"Patient/{obs.subject_patient_id}"},
-                "code": {
-                    "coding": [{"system": obs.codeable_concept.coding_system, "code": obs.codeable_concept.coding_code}]
-                },
-            }
-
-        fhir_observation = Observation.fhir_search(self.user.id, resource_id=observation.id).first()
-        return self.serialize(fhir_observation)
+            return [outcome if isinstance(outcome, Exception) else _created_stub(outcome) for outcome in outcomes]
+
+        created_ids = [outcome.id for outcome in outcomes if not isinstance(outcome, Exception)]
+        rendered = {
+            observation.id: self.serialize(observation)
+            for observation in Observation.fhir_search(self.user.id).filter(id__in=created_ids)
+        }
+        return [outcome if isinstance(outcome, Exception) else rendered[outcome.id] for outcome in outcomes]
+
+
+def _created_stub(observation):
+    return {
+        "resourceType": "Observation",
+        "id": str(observation.id),
+        "status": "final",
+        "meta": {"lastUpdated": observation.last_updated.isoformat() if observation.last_updated else None},
+        "subject": {"reference": f"Patient/{observation.subject_patient_id}"},
+        "code": {
+            "coding": [
+                {
+                    "system": observation.codeable_concept.coding_system,
+                    "code": observation.codeable_concept.coding_code,
+                }
+            ]
+        },
+    }
 
 
 # Mapped resources use the generic handler unless they need custom behavior.
@@ -377,6 +404,12 @@ def _derive_patient_fhir_id(resource_type, body):
 
 
 def _persist_aux(instance, resource_type, body, fhir_source):
+    _build_aux(instance, resource_type, body, fhir_source)
+    instance.save()
+    return instance
+
+
+def _build_aux(instance, resource_type, body, fhir_source):
     body = apply_jhe_extensions(_aux_body(body), fhir_source)
     instance.resource_type = resource_type
     instance.fhir_source = fhir_source
@@ -393,7 +426,6 @@ def _persist_aux(instance, resource_type, body, fhir_source):
     instance.fhir_data = body
     # Any write invalidates prior ref indexing; the index-refs pass re-processes this row.
     instance.ref_indexed = False
-    instance.save()
     return instance
 
 
@@ -402,6 +434,34 @@ def create_aux_resource(resource_type, data, fhir_source):
     return _persist_aux(FhirAuxResource(), resource_type, _aux_body(data), fhir_source)
 
 
+def bulk_create_aux_resources(items):
+    """Create many FhirAuxResources -- ``items`` is ``[(resource_type, data, fhir_source)]`` -- with one
+    batched insert, indexing their search values in the same transaction.
+
+    Returns, per item and in order, the created instance or the exception that rejected it. The
+    rows are inserted with ``bulk_create``, which sends no ``post_save``, so the search index is
+    written here rather than by the signal.
+    """
+    instances = [_build_aux(FhirAuxResource(), resource_type, data, source) for resource_type, data, source in items]
+    try:
+        with transaction.atomic():
+            FhirAuxResource.objects.bulk_create(instances)
+            index_new_aux_resources(instances)
+        return instances
+    except IntegrityError:
+        # Fall back to one savepoint per row so only the rows that conflict fail.
+        outcomes = []
+        for instance in instances:
+            instance._state.adding = True
+            try:
+                with transaction.atomic():
+                    instance.save(force_insert=True)
+                outcomes.append(instance)
+            except IntegrityError as e:
+                outcomes.append(e)
+        return outcomes
+
+
 # ---------------------------------------------------------------------------
 # The unified view
 # ---------------------------------------------------------------------------
@@ -411,11 +471,46 @@ class _ConfigError(APIException):
     status_code = http_status.HTTP_500_INTERNAL_SERVER_ERROR
 
 
-class FHIRResourceView(APIView):
+class FHIROperationOutcomeMixin:
+    """Renders domain/model exceptions raised by a FHIR APIView as an OperationOutcome."""
+
+    def handle_exception(self, exc):
+        """Render domain/model exceptions as FHIR OperationOutcome with the right status."""
+        if isinstance(exc, (DjangoPermissionDenied, DRFPermissionDenied)):
+            return self._outcome(http_status.HTTP_403_FORBIDDEN, exc)
+        if isinstance(exc, NotFound):
+            return self._outcome(http_status.HTTP_404_NOT_FOUND, exc)
+        if isinstance(exc, MethodNotAllowed):
+            return self._outcome(http_status.HTTP_405_METHOD_NOT_ALLOWED, exc)
+        if isinstance(exc, IntegrityError):
+            return self._outcome(http_status.HTTP_409_CONFLICT, exc)
+        if isinstance(exc, (DjangoBadRequest, DRFValidationError)):
+            return self._outcome(http_status.HTTP_400_BAD_REQUEST, exc)
+        if isinstance(exc, APIException):
+            status_code = exc.status_code if isinstance(exc.status_code, int) else http_status.HTTP_400_BAD_REQUEST
+            return self._outcome(status_code, exc)
+        logger.exception("Unhandled error in FHIR resource view")
+        return self._outcome(http_status.HTTP_422_UNPROCESSABLE_ENTITY, exc)
+
+    @staticmethod
+    def _outcome(status_code, exc):
+        return Response(FHIRBase.error_outcome(str(exc)), status=status_code)
+
+
+class FHIRCapabilityStatementView(FHIROperationOutcomeMixin, APIView):
+    """``GET FHIR/<version>/metadata`` -- the config-derived CapabilityStatement."""
+
+    def get(self, request):
+        return Response(capability_statement())
+
+
+class FHIRResourceView(AsyncAPIViewMixin, FHIROperationOutcomeMixin, APIView):
     """Dispatches an HTTP verb on ``FHIR/<version>/<resource>[/<id>]`` to the right backing store.
 
     Each request maps to a FHIR interaction (search/read/create/update/delete) and is routed to
     the mapped Django model and/or the FhirAuxResource store per the config (see module docstring).
+    Dispatch is async (core/views/async_api.py): the reads are ``async def``, the writes stay
+    synchronous and run on the request's thread.
     """
 
     def initial(self, request, *args, **kwargs):
@@ -453,12 +548,13 @@ class FHIRResourceView(APIView):
 
     # -- HTTP verbs --
 
-    def get(self, request, resource, id=None):
+    async def get(self, request, resource, id=None):
         self._check_supported(resource)
         if id is None:
-            self._remember_resource(resource)
-            return self._search_bundle(resource)
-        return Response(self._read(resource, id))
+            return await self._asearch_bundle(resource)
+        # A read is one authorized lookup plus rendering, which follows the row's relations
+        # lazily -- it runs on the request's thread as a single block.
+        return Response(await sync_to_async(self._read)(resource, id))
 
     def _remember_resource(self, resource):
         # Make the admin UI's Resource select sticky, mirroring how the studies/observations
@@ -507,16 +603,20 @@ class FHIRResourceView(APIView):
         return handler.serialize(handler.read(fhir_id))
 
     def _create(self, resource, data):
-        criteria = mapped_criteria(resource)
-        mapped = mapped_interactions(resource)
-        aux = aux_interactions(resource)
-        # OMH criteria routes a writable mapped resource between the model and aux.
-        if "create" in mapped and (criteria is None or matches_criteria(_camelized(data), criteria)):
+        if self._creates_mapped(resource, data):
             return self._mapped_handler(resource).create(data)
-        if "create" in aux:
+        if "create" in aux_interactions(resource):
             return self._aux_handler(resource).create(data)
         self._refuse(resource, "create")
 
+    @staticmethod
+    def _creates_mapped(resource, data):
+        # OMH criteria routes a writable mapped resource between the model and aux.
+        criteria = mapped_criteria(resource)
+        return "create" in mapped_interactions(resource) and (
+            criteria is None or matches_criteria(_camelized(data), criteria)
+        )
+
     def _update(self, resource, fhir_id, data, partial):
         if self._is_aux_id(fhir_id):
             if "update" not in aux_interactions(resource):
@@ -583,54 +683,54 @@ class FHIRResourceView(APIView):
         return FhirAuxResource.objects.none(), (lambda obj: obj), "empty"
 
     def _search_bundle(self, resource):
+        queryset, serialize = self._search_queryset(resource)
+        if summary_count_requested(self.request):
+            return self._count_bundle(queryset.count())
+        return self._page_bundle(queryset, serialize)
+
+    async def _asearch_bundle(self, resource):
+        """``_search_bundle`` for the async GET.
+
+        Building the search queryset authorizes the user (the ``fhir_search`` builders query
+        memberships up front), and rendering a page follows each row's relations lazily, so both
+        run on the request's thread; a ``_summary=count`` total is awaited on the async ORM.
+        """
+        queryset, serialize = await sync_to_async(self._search_queryset)(resource, remember=True)
+        if summary_count_requested(self.request):
+            return self._count_bundle(await queryset.acount())
+        return await sync_to_async(self._page_bundle)(queryset, serialize)
+
+    def _search_queryset(self, resource, remember=False):
+        # The filtered (queryset, serialize_fn) of a search; ``remember`` records the resource
+        # type as the practitioner's current one (GET searches from the admin UI).
+        if remember:
+            self._remember_resource(resource)
         queryset, serialize, store = self._search_source(resource)
         queryset = apply_common_search_filters(queryset, self.request)
         if store != "empty":
             queryset = apply_search_params(queryset, resource, self.request, store)
-        if summary_count_requested(self.request):
-            return self._count_bundle(queryset)
-        paginator = FHIRBundlePagination()
+        return queryset, serialize
+
+    def _page_bundle(self, queryset, serialize):
+        # Opt-in keyset paging (``_cursor``) avoids OFFSET scans and, by default, the COUNT(*).
+        paginator = FHIRCursorPagination() if cursor_requested(self.request) else FHIRBundlePagination()
         page = paginator.paginate_queryset(queryset, self.request, view=self)
         entries = [{"resource": serialize(obj)} for obj in page]
         return paginator.get_paginated_response(entries)
 
-    def _count_bundle(self, queryset):
+    def _count_bundle(self, total):
         # _summary=count: the searchset total only, no entries (FHIR count summary).
         return Response(
             {
                 "resourceType": "Bundle",
                 "type": "searchset",
-                "total": queryset.count(),
+                "total": total,
                 "entry": [],
                 "link": [{"relation": "self", "url": self.request.build_absolute_uri()}],
                 "meta": {},
             }
         )
 
-    # -- error rendering --
-
-    def handle_exception(self, exc):
-        """Render domain/model exceptions as FHIR OperationOutcome with the right status."""
-        if isinstance(exc, (DjangoPermissionDenied, DRFPermissionDenied)):
-            return self._outcome(http_status.HTTP_403_FORBIDDEN, exc)
-        if isinstance(exc, NotFound):
-            return self._outcome(http_status.HTTP_404_NOT_FOUND, exc)
-        if isinstance(exc, MethodNotAllowed):
-            return self._outcome(http_status.HTTP_405_METHOD_NOT_ALLOWED, exc)
-        if isinstance(exc, IntegrityError):
-            return self._outcome(http_status.HTTP_409_CONFLICT, exc)
-        if isinstance(exc, (DjangoBadRequest, DRFValidationError)):
-            return self._outcome(http_status.HTTP_400_BAD_REQUEST, exc)
-        if isinstance(exc, APIException):
-            status_code = exc.status_code if isinstance(exc.status_code, int) else http_status.HTTP_400_BAD_REQUEST
-            return self._outcome(status_code, exc)
-        logger.exception("Unhandled error in FHIR resource view")
-        return self._outcome(http_status.HTTP_422_UNPROCESSABLE_ENTITY, exc)
-
-    @staticmethod
-    def _outcome(status_code, exc):
-        return Response(FHIRBase.error_outcome(str(exc)), status=status_code)
-
 
 def _camelized(data):
     import humps
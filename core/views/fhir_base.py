@@ -1,7 +1,6 @@
 import copy
 import http
 import logging
-import traceback
 
 import humps
 from django.core.exceptions import BadRequest, PermissionDenied
@@ -34,54 +33,46 @@ class FHIRBase(viewsets.GenericViewSet):
                 or entry["resource"]["value_attachment"]["data"] is None
             ):
                 raise ValidationError("resource.valueAttachment.data must be not null.")
-        fhir_bundle = Bundle.parse_obj(humps.camelize(request.data))  # noqa
-        # then create each record
-        response_entries = []
-        for entry in request.data["entry"]:
+        fhir_bundle = Bundle.parse_obj(humps.camelize(request.data))
+        # then create each record: OMH Observations are collected and written in one
+        # Observation.fhir_bulk_create pass; anything else is created entry by entry. Response
+        # entries keep the request's entry order.
+        response_entries = [None] * len(request.data["entry"])
+        omh_indexes = []
+        omh_resources = []
+        for index, entry in enumerate(request.data["entry"]):
             if entry["resource"]["resource_type"] != "Observation":
-                response_entries.append(
-                    FHIRBase.bundle_create_response_entry(
-                        http_status.HTTP_400_BAD_REQUEST,
-                        FHIRBase.error_outcome("Only Observation resourceType supported."),
-                    )
+                response_entries[index] = FHIRBase.bundle_create_response_entry(
+                    http_status.HTTP_400_BAD_REQUEST,
+                    FHIRBase.error_outcome("Only Observation resourceType supported."),
                 )
+                continue
             if entry["request"]["method"] != "POST":
-                response_entries.append(
-                    FHIRBase.bundle_create_response_entry(
-                        http_status.HTTP_400_BAD_REQUEST,
-                        FHIRBase.error_outcome("Only POST/Create method supported."),
-                    )
+                response_entries[index] = FHIRBase.bundle_create_response_entry(
+                    http_status.HTTP_400_BAD_REQUEST,
+                    FHIRBase.error_outcome("Only POST/Create method supported."),
                 )
-
+                continue
+            if FHIRBase._is_omh_observation(entry["resource"]):
+                omh_indexes.append(index)
+                # Reuse the entry's model from the Bundle parse instead of parsing it again.
+                omh_resources.append(fhir_bundle.entry[index].resource)
+                continue
             try:
-                observation = FHIRBase._bundle_create_observation(entry["resource"], request)
-                response_entries.append(
-                    FHIRBase.bundle_create_response_entry(http_status.HTTP_201_CREATED, None, observation)
-                )
-
-            except IntegrityError as e:
-                response_entries.append(
-                    FHIRBase.bundle_create_response_entry(http_status.HTTP_409_CONFLICT, FHIRBase.error_outcome(str(e)))
-                )
-            except (PermissionDenied, DRFPermissionDenied) as e:
-                response_entries.append(
-                    FHIRBase.bundle_create_response_entry(
-                        http_status.HTTP_403_FORBIDDEN, FHIRBase.error_outcome(str(e))
-                    )
-                )
-            except (BadRequest, ValidationError) as e:
-                response_entries.append(
-                    FHIRBase.bundle_create_response_entry(
-                        http_status.HTTP_400_BAD_REQUEST, FHIRBase.error_outcome(str(e))
-                    )
+                observation = FHIRBase._bundle_create_aux_observation(entry["resource"], request)
+                response_entries[index] = FHIRBase.bundle_create_response_entry(
+                    http_status.HTTP_201_CREATED, None, observation
                 )
             except Exception as e:
-                print(traceback.format_exc())
-                response_entries.append(
-                    FHIRBase.bundle_create_response_entry(
-                        http_status.HTTP_422_UNPROCESSABLE_ENTITY,
-                        FHIRBase.error_outcome(str(e)),
-                    )
+                response_entries[index] = FHIRBase.bundle_error_response_entry(e)
+
+        outcomes = Observation.fhir_bulk_create(omh_resources, request.user) if omh_resources else []
+        for index, outcome in zip(omh_indexes, outcomes):
+            if isinstance(outcome, Exception):
+                response_entries[index] = FHIRBase.bundle_error_response_entry(outcome)
+            else:
+                response_entries[index] = FHIRBase.bundle_create_response_entry(
+                    http_status.HTTP_201_CREATED, None, outcome
                 )
         return Response(
             FHIRBase.bundle_batch_response(response_entries),
@@ -89,25 +80,40 @@ class FHIRBase(viewsets.GenericViewSet):
         )
 
     @staticmethod
-    def _bundle_create_observation(resource, request):
+    def _is_omh_observation(resource):
         # Route a bundled Observation the same way the single-resource endpoint does: an OMH
         # Observation (code system https://w3id.org/openmhealth) is persisted onto the Django
-        # Observation model; any other Observation is stored in FhirAuxResource, linked to the
-        # FhirSource named by the X-JHE-FHIR-Source-ID header (authoritative) or the entry's own
-        # meta.source (and its patient).
+        # Observation model; any other Observation is stored in FhirAuxResource.
         from core.fhir.config import mapped_criteria
         from core.fhir.engine import matches_criteria
-        from core.views.fhir import create_aux_resource, resolve_fhir_source_context
 
-        user = request.user
-        camelized = humps.camelize(resource)
         criteria = mapped_criteria("Observation")
-        if criteria is None or matches_criteria(camelized, criteria):
-            return Observation.fhir_create(resource, user)
+        return criteria is None or matches_criteria(humps.camelize(resource), criteria)
+
+    @staticmethod
+    def _bundle_create_aux_observation(resource, request):
+        # A non-OMH Observation is linked to the FhirSource named by the X-JHE-FHIR-Source-ID
+        # header (authoritative) or the entry's own meta.source (and its patient).
+        from core.views.fhir import create_aux_resource, resolve_fhir_source_context
 
-        _, fhir_source = resolve_fhir_source_context(request, user, camelized)
+        camelized = humps.camelize(resource)
+        _, fhir_source = resolve_fhir_source_context(request, request.user, camelized)
         return create_aux_resource("Observation", camelized, fhir_source)
 
+    @staticmethod
+    def bundle_error_response_entry(exc):
+        """Map a per-entry create failure onto its batch-response entry (status + OperationOutcome)."""
+        if isinstance(exc, IntegrityError):
+            status = http_status.HTTP_409_CONFLICT
+        elif isinstance(exc, (PermissionDenied, DRFPermissionDenied)):
+            status = http_status.HTTP_403_FORBIDDEN
+        elif isinstance(exc, (BadRequest, ValidationError)):
+            status = http_status.HTTP_400_BAD_REQUEST
+        else:
+            logger.error("Bundle entry create failed", exc_info=exc)
+            status = http_status.HTTP_422_UNPROCESSABLE_ENTITY
+        return FHIRBase.bundle_create_response_entry(status, FHIRBase.error_outcome(str(exc)))
+
     @staticmethod
     def error_outcome(message):
         data = {"issue": [{"severity": "error", "code": "processing", "diagnostics": message}]}
@@ -0,0 +1,137 @@
+"""FHIR Bulk Data ``$export`` endpoints (async request pattern).
+
+  * kick-off -- ``GET FHIR/R5/$export``, ``FHIR/R5/Patient/$export`` or ``FHIR/R5/Group/<id>/$export``
+    records a :class:`~core.models.FhirExportJob` and answers ``202 Accepted`` with the status URL
+    in ``Content-Location``. ``_type`` and ``_since`` are honoured; ``_outputFormat`` must be NDJSON.
+  * status -- ``GET FHIR/R5/$export-status/<job id>`` answers ``202`` (with ``X-Progress``) while
+    the job runs and ``200`` with the completion manifest once done; ``DELETE`` cancels the job and
+    removes its files.
+  * output -- ``GET FHIR/R5/$export-output/<job id>/<Type>.ndjson`` streams one output file.
+
+A job (and its files) is only visible to the user who kicked it off. See core/fhir/export.py for
+how the export itself is scoped and written.
+"""
+
+from django.http import FileResponse
+from django.urls import reverse
+from rest_framework import status as http_status
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.fhir.export import (
+    NDJSON_CONTENT_TYPE,
+    NDJSON_FORMATS,
+    delete_export_output,
+    export_dir,
+    parse_export_types,
+    parse_since,
+    start_export_job,
+)
+from core.models import FhirExportJob, Study
+from core.views.fhir import FHIROperationOutcomeMixin
+
+
+def _output_format(request):
+    # The camel-case parser may snake-case the query key, so accept both spellings.
+    return request.GET.get("_outputFormat") or request.GET.get("_output_format")
+
+
+class FHIRExportView(FHIROperationOutcomeMixin, APIView):
+    """Kick-off for a system-, patient- or group-level ``$export``."""
+
+    level = "system"
+
+    def get(self, request, id=None):
+        output_format = _output_format(request)
+        if output_format and output_format not in NDJSON_FORMATS:
+            raise DRFValidationError(f"Unsupported _outputFormat: '{output_format}'.")
+        group_id = self._authorize_group(id) if self.level == "group" else None
+
+        job = FhirExportJob.objects.create(
+            jhe_user=request.user,
+            level=self.level,
+            group_id=group_id,
+            resource_types=parse_export_types(request.GET.get("_type"), self.level),
+            since=parse_since(request.GET.get("_since")),
+            request_url=request.build_absolute_uri(),
+        )
+        start_export_job(job)
+        response = Response(status=http_status.HTTP_202_ACCEPTED)
+        response["Content-Location"] = request.build_absolute_uri(reverse("fhir-export-status", args=[job.pk]))
+        return response
+
+    def _authorize_group(self, group_id):
+        # The Group must be one the user can read (403 for a study outside their organizations).
+        if not str(group_id).isdigit():
+            raise NotFound(f"Group/{group_id} not found.")
+        if not Study.fhir_search(self.request.user.id, study_id=group_id, resource_id=group_id).exists():
+            raise NotFound(f"Group/{group_id} not found.")
+        return int(group_id)
+
+
+class FHIRExportStatusView(FHIROperationOutcomeMixin, APIView):
+    """Polling (``GET``) and cancellation (``DELETE``) of an export job."""
+
+    def _job(self, job_id):
+        jobs = FhirExportJob.objects.filter(pk=job_id, jhe_user=self.request.user)
+        # A job whose process died stops its heartbeat: report it failed rather than 202 forever.
+        expired = jobs.expire_stale()
+        job = jobs.first()
+        if job is None:
+            raise NotFound(f"Export job {job_id} not found.")
+        if expired:
+            delete_export_output(job)  # whatever it had written is incomplete
+        return job
+
+    def get(self, request, job_id):
+        job = self._job(job_id)
+        if job.status in (FhirExportJob.STATUS_ACCEPTED, FhirExportJob.STATUS_IN_PROGRESS):
+            response = Response(status=http_status.HTTP_202_ACCEPTED)
+            response["X-Progress"] = job.status
+            response["Retry-After"] = "5"
+            return response
+        if job.status == FhirExportJob.STATUS_CANCELLED:
+            raise NotFound(f"Export job {job_id} was cancelled.")
+        if job.status == FhirExportJob.STATUS_FAILED:
+            return self._outcome(http_status.HTTP_500_INTERNAL_SERVER_ERROR, job.error or "Export failed.")
+        return Response(self._manifest(job))
+
+    def _manifest(self, job):
+        return {
+            "transactionTime": job.transaction_time.isoformat(),
+            "request": job.request_url,
+            "requiresAccessToken": True,
+            "output": [
+                {
+                    "type": item["type"],
+                    "url": self.request.build_absolute_uri(reverse("fhir-export-output", args=[job.pk, item["file"]])),
+                    "count": item["count"],
+                }
+                for item in job.output
+            ],
+            "error": [],
+        }
+
+    def delete(self, request, job_id):
+        job = self._job(job_id)
+        job.status = FhirExportJob.STATUS_CANCELLED
+        job.save(update_fields=["status", "last_updated"])
+        delete_export_output(job)
+        return Response(status=http_status.HTTP_202_ACCEPTED)
+
+
+class FHIRExportOutputView(FHIROperationOutcomeMixin, APIView):
+    """Download of one NDJSON file listed in a completed job's manifest."""
+
+    def get(self, request, job_id, filename):
+        job = FhirExportJob.objects.filter(
+            pk=job_id, jhe_user=request.user, status=FhirExportJob.STATUS_COMPLETED
+        ).first()
+        if job is None or filename not in {item["file"] for item in job.output}:
+            raise NotFound(f"Export output {job_id}/{filename} not found.")
+        path = export_dir(job) / filename
+        if not path.is_file():
+            raise NotFound(f"Export output {job_id}/{filename} not found.")
+        return FileResponse(open(path, "rb"), content_type=NDJSON_CONTENT_TYPE)
@@ -12,18 +12,44 @@ endpoints always return a ``batch-response`` **Bundle**, and every entry carries
 an "informational, no loss" note when nothing was dropped, or the error when an entry failed. The
 conversion is best-effort and lossy (see ``fhir-r4-import.md`` at the repo root); R5 validation on
 the create path is the gate that rejects anything the transform could not produce cleanly.
+
+A Bundle is imported as a pipeline: every entry is first converted, routed and (for aux entries)
+R5-validated -- the CPU-bound stage, which runs on the worker pool of
+:mod:`core.services.fhir_import` for large Bundles -- and the converted entries are then written in
+batches (``bulk_create_aux_resources`` / the mapped handler's ``bulk_create``), each batch in its
+own transaction. Entries still fail independently, and each lands in its Bundle slot, so the
+``batch-response`` is in request order whatever the pool or the batching did.
+
+With ``Prefer: respond-async`` a Bundle is imported by a background job instead
+(:class:`~core.models.FhirImportJob`): the POST answers ``202 Accepted`` with the status URL in
+``Content-Location``, and ``GET fhir-import/R4/$import-status/<job id>`` answers ``202`` while it
+runs and ``200`` with the same ``batch-response`` Bundle once it is done.
 """
 
 import logging
 
+from django.urls import reverse
 from rest_framework import status as http_status
-from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.exceptions import MethodNotAllowed, NotFound
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from core.fhir.config import aux_interactions, is_supported_resource
 from core.fhir.cross_version import XVerError, dropped_field_paths, transform_to_r5
+from core.fhir.fhir_validation import validate_fhir_resource
+from core.models import FhirImportJob
+from core.services.fhir_import import WRITE_BATCH_SIZE, map_entries, start_import_job
 
-from .fhir import FHIRResourceView, _camelized, resolve_fhir_source_context
+from .fhir import (
+    FHIR_SOURCE_ID_HEADER,
+    FHIROperationOutcomeMixin,
+    FHIRResourceView,
+    _camelized,
+    _source_id_from_body,
+    bulk_create_aux_resources,
+    resolve_fhir_source_context,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,51 +78,185 @@ class FHIRImportView(FHIRResourceView):
         # forbidden source is a request-level 400/403, not a per-entry outcome.
         resolve_fhir_source_context(request, request.user)
         if resource is None:
-            entries = self._process_bundle(request.data)
+            bundle = _bundle(request.data)
+            if "respond-async" in request.headers.get("Prefer", ""):
+                return self._start_job(bundle)
+            entries = self._import_entries(bundle)
         else:
             entries = [self._process_resource(resource, request.data)]
-        return Response(
-            {"resourceType": "Bundle", "type": "batch-response", "entry": entries},
-            status=http_status.HTTP_200_OK,
+        return Response(_batch_response(entries), status=http_status.HTTP_200_OK)
+
+    def _start_job(self, bundle):
+        job = FhirImportJob.objects.create(
+            jhe_user=self.request.user,
+            fhir_source_id=self.request.headers.get(FHIR_SOURCE_ID_HEADER),
+            bundle=bundle,
+            total=len(bundle.get("entry") or []),
         )
+        start_import_job(job)
+        response = Response(status=http_status.HTTP_202_ACCEPTED)
+        response["Content-Location"] = self.request.build_absolute_uri(reverse("fhir-import-status", args=[job.pk]))
+        return response
 
     # -- per-entry processing --
 
-    def _process_bundle(self, data):
-        bundle = _camelized(data)
-        if not isinstance(bundle, dict) or bundle.get("resourceType") != "Bundle":
-            raise DRFValidationError("Expected a Bundle at /fhir-import/R4.")
-        entries = []
-        for entry in bundle.get("entry", []) or []:
-            resource = (entry or {}).get("resource") or {}
-            entries.append(self._process_resource(resource.get("resourceType"), resource, already_camel=True))
+    def _import_entries(self, bundle):
+        resources = [(entry or {}).get("resource") or {} for entry in bundle.get("entry") or []]
+        prepared = map_entries(_prepare_entry, [(resource.get("resourceType"), resource) for resource in resources])
+        entries = [None] * len(prepared)
+        # Converted entries are written per store after the conversion pass; each fills its slot.
+        bulk = {}  # resource_type -> [(entry index, r5 body, dropped paths)] for mapped bulk handlers
+        aux = []  # [(entry index, resource_type, r5 body, dropped paths)]
+        for index, (route, r5, dropped) in enumerate(prepared):
+            resource_type = resources[index].get("resourceType")
+            if route == "error":
+                entries[index] = r5  # the error entry
+            elif route == "aux":
+                aux.append((index, resource_type, r5, dropped))
+            elif hasattr(self._mapped_handler(resource_type), "bulk_create"):
+                bulk.setdefault(resource_type, []).append((index, r5, dropped))
+            else:
+                try:
+                    entries[index] = _success_entry(self._create(resource_type, r5), resource_type, dropped)
+                except Exception as exc:  # per-entry best-effort, mirroring batch semantics.
+                    entries[index] = _error_entry(exc)
+        for resource_type, pending in bulk.items():
+            handler = self._mapped_handler(resource_type)
+            for batch in _batches(pending):
+                outcomes = handler.bulk_create([r5 for _, r5, _ in batch])
+                for (index, _, dropped), outcome in zip(batch, outcomes):
+                    entries[index] = _outcome_entry(outcome, resource_type, dropped)
+        self._write_aux(aux, entries)
         return entries
 
-    def _process_resource(self, resource_type, body, already_camel=False):
+    def _write_aux(self, pending, entries):
+        """Create the validated aux entries in batches, filling their slots in ``entries``."""
+        sources = {}  # source id -> fhir_source, each resolved (and authorized) once
+        writable = []
+        for index, resource_type, r5, dropped in pending:
+            source_id = self.request.headers.get(FHIR_SOURCE_ID_HEADER) or _source_id_from_body(r5)
+            try:
+                if source_id not in sources:
+                    sources[source_id] = resolve_fhir_source_context(self.request, self.request.user, r5)[1]
+            except Exception as exc:
+                entries[index] = _error_entry(exc)
+                continue
+            writable.append((index, resource_type, r5, dropped, sources[source_id]))
+        for batch in _batches(writable):
+            outcomes = bulk_create_aux_resources([(rt, r5, source) for _, rt, r5, _, source in batch])
+            for (index, resource_type, _, dropped, _), outcome in zip(batch, outcomes):
+                if not isinstance(outcome, Exception):
+                    outcome = self._aux_handler(resource_type).serialize(outcome)
+                entries[index] = _outcome_entry(outcome, resource_type, dropped)
+
+    def _process_resource(self, resource_type, body):
         """Convert one R4 resource and create it; return a Bundle entry (success or error)."""
         try:
-            if not resource_type:
-                raise DRFValidationError("Bundle entry is missing a resource / resourceType.")
-            self._check_supported(resource_type)
-            camel = body if already_camel else _camelized(body)
-            r5 = self._convert(resource_type, camel)
-            dropped = dropped_field_paths(camel, r5)
-            if dropped:
-                logger.warning(
-                    "cross_version import: %s dropped R4 fields with no R5 home: %s",
-                    resource_type,
-                    ", ".join(dropped),
-                )
+            r5, dropped = _convert_entry(resource_type, _camelized(body))
             created = self._create(resource_type, r5)
             return _success_entry(created, resource_type, dropped)
         except Exception as exc:  # per-entry best-effort, mirroring batch semantics.
             return _error_entry(exc)
 
-    def _convert(self, resource_type, camel_body):
-        try:
-            return transform_to_r5(resource_type, camel_body)
-        except XVerError as exc:
-            raise DRFValidationError(str(exc))
+
+class FHIRImportStatusView(FHIROperationOutcomeMixin, APIView):
+    """Polling of a ``Prefer: respond-async`` Bundle import."""
+
+    def get(self, request, job_id):
+        jobs = FhirImportJob.objects.filter(pk=job_id, jhe_user=request.user)
+        jobs.expire_stale()  # a job whose process died reports failed instead of 202 forever
+        job = jobs.first()
+        if job is None:
+            raise NotFound(f"Import job {job_id} not found.")
+        if job.status in FhirImportJob.ACTIVE_STATUSES:
+            response = Response(status=http_status.HTTP_202_ACCEPTED)
+            response["X-Progress"] = f"{job.status} ({job.total} entries)"
+            response["Retry-After"] = "5"
+            return response
+        if job.status == FhirImportJob.STATUS_FAILED:
+            return self._outcome(http_status.HTTP_500_INTERNAL_SERVER_ERROR, job.error or "Import failed.")
+        return Response(_batch_response(job.result))
+
+
+class _JobRequest:
+    """What the create path reads off a request, for an import job running outside one."""
+
+    method = "POST"
+
+    def __init__(self, user, source_id):
+        self.user = user
+        self.headers = {FHIR_SOURCE_ID_HEADER: source_id} if source_id else {}
+
+
+def import_bundle_entries(user, source_id, bundle):
+    """Import ``bundle`` (camelCase) as ``user`` writing to source ``source_id``; return its entries.
+
+    The import job's entry point (core/services/fhir_import.py): the same pipeline as a synchronous
+    Bundle POST, with the job's user and source header standing in for the request.
+    """
+    view = FHIRImportView()
+    view.request = _JobRequest(user, source_id)
+    resolve_fhir_source_context(view.request, user)
+    return view._import_entries(bundle)
+
+
+def _bundle(data):
+    bundle = _camelized(data)
+    if not isinstance(bundle, dict) or bundle.get("resourceType") != "Bundle":
+        raise DRFValidationError("Expected a Bundle at /fhir-import/R4.")
+    return bundle
+
+
+def _batches(items):
+    for start in range(0, len(items), WRITE_BATCH_SIZE):
+        yield items[start : start + WRITE_BATCH_SIZE]
+
+
+def _prepare_entry(resource_type, resource):
+    """The CPU-bound stage of one Bundle entry: convert it, pick its store, validate an aux body.
+
+    Runs in an import worker process (or inline) and touches no database. Returns ``(route, r5
+    body, dropped paths)`` with route ``"mapped"`` or ``"aux"``, or ``("error", error entry, None)``.
+    """
+    try:
+        r5, dropped = _convert_entry(resource_type, resource)
+        if FHIRResourceView._creates_mapped(resource_type, r5):
+            return "mapped", r5, dropped
+        if "create" not in aux_interactions(resource_type):
+            raise MethodNotAllowed("POST", detail=f"The 'create' interaction is not allowed for {resource_type}.")
+        r5 = _camelized(r5)
+        validate_fhir_resource(resource_type, r5)
+        return "aux", r5, dropped
+    except Exception as exc:  # per-entry best-effort, mirroring batch semantics.
+        return "error", _error_entry(exc), None
+
+
+def _convert_entry(resource_type, camel):
+    """Convert one (camelCase) R4 resource to R5; return ``(r5_body, dropped_r4_paths)``."""
+    if not resource_type:
+        raise DRFValidationError("Bundle entry is missing a resource / resourceType.")
+    if not is_supported_resource(resource_type):
+        raise NotFound(f"Unsupported FHIR resource type: {resource_type}.")
+    try:
+        r5 = transform_to_r5(resource_type, camel)
+    except XVerError as exc:
+        raise DRFValidationError(str(exc))
+    dropped = dropped_field_paths(camel, r5)
+    if dropped:
+        logger.warning(
+            "cross_version import: %s dropped R4 fields with no R5 home: %s",
+            resource_type,
+            ", ".join(dropped),
+        )
+    return r5, dropped
+
+
+def _batch_response(entries):
+    return {"resourceType": "Bundle", "type": "batch-response", "entry": entries}
+
+
+def _outcome_entry(outcome, resource_type, dropped):
+    return _error_entry(outcome) if isinstance(outcome, Exception) else _success_entry(outcome, resource_type, dropped)
 
 
 def _success_entry(created, resource_type, dropped):
@@ -0,0 +1,84 @@
+"""Observation time-series operations: ``FHIR/R5/Observation/$stats`` and ``.../$lastn``.
+
+Both take the Observation search params (``patient``, ``code``, ``date``, the study/organization
+filters, ...) and run over the same authorized queryset a search would, so an operation never
+sees more than a search by the same user. The aggregation itself is in core/fhir/observation_stats.py.
+
+  * ``$stats`` answers a ``Parameters`` resource with one ``statistic`` parameter per code (its
+    ``code``, ``count``, ``earliest``, ``latest`` and one ``measure`` part per numeric OMH value,
+    with per-``bucket`` parts when ``bucket=day|hour`` is given).
+  * ``$lastn`` answers a searchset ``Bundle`` of the newest ``max`` (default 1) observations per code.
+"""
+
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.fhir.observation_stats import observation_lastn, observation_stats, parse_bucket, parse_lastn_max
+from core.fhir.search import apply_search_params
+from core.views.fhir import FHIROperationOutcomeMixin, ObservationHandler, apply_common_search_filters
+
+
+def _observation_queryset(request):
+    queryset = ObservationHandler("Observation", request).search()
+    queryset = apply_common_search_filters(queryset, request)
+    return apply_search_params(queryset, "Observation", request, "mapped")
+
+
+def _number_parts(values):
+    parts = [{"name": "count", "valueInteger": values["count"]}]
+    for name in ("average", "minimum", "maximum"):
+        if values[name] is not None:
+            parts.append({"name": name, "valueDecimal": values[name]})
+    return parts
+
+
+def _measure_parameter(measure):
+    parts = [{"name": "name", "valueString": measure["name"]}]
+    if measure["unit"]:
+        parts.append({"name": "unit", "valueString": measure["unit"]})
+    parts += _number_parts(measure)
+    for bucket in measure.get("buckets", []):
+        parts.append(
+            {"name": "bucket", "part": [{"name": "start", "valueDateTime": bucket["start"]}, *_number_parts(bucket)]}
+        )
+    return {"name": "measure", "part": parts}
+
+
+def _statistic_parameter(stat):
+    coding = {key: stat[key] for key in ("system", "code", "display") if stat[key]}
+    parts = [
+        {"name": "code", "valueCodeableConcept": {"coding": [coding]}},
+        {"name": "count", "valueInteger": stat["count"]},
+    ]
+    for name in ("earliest", "latest"):
+        if stat[name] is not None:
+            parts.append({"name": name, "valueDateTime": stat[name]})
+    parts += [_measure_parameter(measure) for measure in stat["measures"]]
+    return {"name": "statistic", "part": parts}
+
+
+class FHIRObservationStatsView(FHIROperationOutcomeMixin, APIView):
+    """``GET Observation/$stats`` -- per-code counts, time range and numeric aggregates."""
+
+    def get(self, request):
+        bucket = parse_bucket(request.GET.get("bucket"))
+        stats = observation_stats(_observation_queryset(request), bucket=bucket)
+        return Response({"resourceType": "Parameters", "parameter": [_statistic_parameter(stat) for stat in stats]})
+
+
+class FHIRObservationLastNView(FHIROperationOutcomeMixin, APIView):
+    """``GET Observation/$lastn`` -- the newest ``max`` observations of each code."""
+
+    def get(self, request):
+        max_per_code = parse_lastn_max(request.GET.get("max"))
+        handler = ObservationHandler("Observation", request)
+        observations = list(observation_lastn(_observation_queryset(request), max_per_code))
+        return Response(
+            {
+                "resourceType": "Bundle",
+                "type": "searchset",
+                "total": len(observations),
+                "link": [{"relation": "self", "url": request.build_absolute_uri()}],
+                "entry": [{"resource": handler.serialize(observation)} for observation in observations],
+            }
+        )
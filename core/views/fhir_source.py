@@ -1,10 +1,11 @@
+from django.urls import reverse
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from core.fhir.ref_indexing import index_fhir_source_refs
-from core.models import FhirSource
+from core.fhir.ref_indexing import index_fhir_source_refs, start_ref_index_job
+from core.models import FhirRefIndexJob, FhirSource
 from core.serializers import FhirSourceSerializer
 
 
@@ -35,7 +36,43 @@ class FhirSourceViewSet(ModelViewSet):
         """Rewrite this source's aux-resource references from upstream ids to JHE ids (#584).
 
         get_object() enforces ownership (the queryset is the caller's own sources). Returns a
-        summary of rows indexed and references rewritten / not found.
+        summary of rows indexed and references rewritten / not found. ``cross_source: true``
+        also resolves references against the patient's other sources. With
+        ``Prefer: respond-async`` the pass runs as a background job and the 202 response points
+        at its status.
         """
         fhir_source = self.get_object()
-        return Response(index_fhir_source_refs(fhir_source))
+        cross_source = request.data.get("cross_source") in (True, "true")
+        if "respond-async" not in request.headers.get("Prefer", ""):
+            return Response(index_fhir_source_refs(fhir_source, cross_source=cross_source))
+        job = FhirRefIndexJob.objects.create(jhe_user=request.user, fhir_source=fhir_source, cross_source=cross_source)
+        start_ref_index_job(job)
+        job.refresh_from_db()
+        return Response(_ref_index_job_status(request, job), status=202)
+
+    @action(detail=True, methods=["GET"], url_path=r"index_refs/(?P<job_id>[0-9a-f-]{36})")
+    def index_refs_status(self, request, pk=None, job_id=None):
+        """Progress of an index-refs job on this source: status, counters so far, and error."""
+        jobs = FhirRefIndexJob.objects.filter(pk=job_id, fhir_source=self.get_object())
+        jobs.expire_stale()  # failed jobs can be resumed (manage.py index_fhir_refs --resume)
+        job = jobs.first()
+        if job is None:
+            return Response({"error": "Index-refs job not found"}, status=404)
+        return Response(_ref_index_job_status(request, job))
+
+
+def _ref_index_job_status(request, job):
+    return {
+        "job_id": str(job.pk),
+        "status": job.status,
+        "status_url": request.build_absolute_uri(
+            reverse("FhirSource-index-refs-status", args=[job.fhir_source_id, job.pk])
+        ),
+        "cross_source": job.cross_source,
+        "rows_indexed": job.rows_indexed,
+        "refs_rewritten": job.refs_rewritten,
+        "refs_not_found": job.refs_not_found,
+        "error": job.error,
+        "created": job.created,
+        "finished": job.finished,
+    }
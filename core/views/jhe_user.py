@@ -43,7 +43,7 @@ class JheUserViewSet(ModelViewSet):
             serializer = JheUserSerializer(request.user, many=False)
         data = serializer.data
         if hasattr(request.user, "practitioner_profile"):
-            data["settings"] = request.user.practitioner_profile.settings
+            data["settings"] = request.user.practitioner_profile.current_settings()
         return Response(data)
 
     @action(detail=False, methods=["GET"])
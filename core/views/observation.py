@@ -6,11 +6,12 @@ from rest_framework.viewsets import ModelViewSet
 from core.models import Observation
 from core.pagination import CustomPageNumberPagination
 from core.serializers import ObservationSerializer
+from core.views.async_api import AsyncAPIViewMixin
 
 logger = logging.getLogger(__name__)
 
 
-class ObservationViewSet(ModelViewSet):
+class ObservationViewSet(AsyncAPIViewMixin, ModelViewSet):
     model_class = Observation
     serializer_class = ObservationSerializer
     pagination_class = CustomPageNumberPagination
@@ -16,11 +16,12 @@ from core.serializers import (
     PractitionerOrganizationSerializer,
     StudySerializer,
 )
+from core.views.async_api import AsyncAPIViewMixin
 
 logger = logging.getLogger(__name__)
 
 
-class OrganizationViewSet(ModelViewSet):
+class OrganizationViewSet(AsyncAPIViewMixin, ModelViewSet):
     """
     This viewset automatically provides `list`, `create`, `retrieve`,
     `update` and `destroy` actions.
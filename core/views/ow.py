@@ -1,30 +1,26 @@
-import json
 import logging
 
-import boto3
-import requests
+import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import transaction
 from django.http import HttpResponseRedirect
-
-
-# from omh_shim import convert
-def convert(*args, **kwargs):
-    raise NotImplementedError("omh-shim disabled in 0.0.11")
-
-
+from django.urls import reverse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from core.models import CodeableConcept, DataSource, JheUser, Observation
-from core.services.jhe_settings import get_setting
+from core.models import CodeableConcept, JheSetting, OwSyncJob
+from core.services import ow_api
+from core.services.ow_sync import HEART_RATE_CODE, start_sync_job
+from core.views.async_api import async_api_view
 
 logger = logging.getLogger(__name__)
 
 
-@api_view(["POST"])
+@async_api_view(["POST"])
 @permission_classes([IsAuthenticated])
-def create_ow_user(request):
+async def create_ow_user(request):
     """
     POST /api/v1/ow/users
     Finds or creates a user in Open Wearables.
@@ -32,8 +28,7 @@ def create_ow_user(request):
     then stores the returned OW user_id in the JHE user's identifier field.
     """
     user = request.user
-    ow_api_url = get_setting("ow.api_url", "")
-    ow_api_key = get_setting("ow.api_key", "")
+    ow_api_url, ow_api_key = await sync_to_async(ow_api.api_config)()
 
     if not ow_api_url or not ow_api_key:
         return Response({"error": "OW integration not configured"}, status=500)
@@ -52,13 +47,8 @@ def create_ow_user(request):
     }
 
     try:
-        ow_response = requests.post(
-            ow_api_url + "/api/v1/users",
-            json=payload,
-            headers={"X-Open-Wearables-API-Key": ow_api_key},
-            timeout=10,
-        )
-    except requests.RequestException as e:
+        ow_response = await ow_api.request("POST", ow_api_url, ow_api_key, "/api/v1/users", json=payload)
+    except httpx.HTTPError as e:
         logger.error("Failed to reach OW API: %s", e)
         return Response({"error": "Failed to reach OW API"}, status=502)
 
@@ -72,22 +62,21 @@ def create_ow_user(request):
     # Store OW user_id in JHE user's identifier field with the "ow:" prefix
     # used by ow_poll's filter (identifier__startswith="ow:").
     user.identifier = f"ow:{ow_user_id}"
-    user.save(update_fields=["identifier"])
+    await user.asave(update_fields=["identifier"])
 
     return Response({"ow_user_id": ow_user_id})
 
 
-@api_view(["GET"])
+@async_api_view(["GET"])
 @permission_classes([IsAuthenticated])
-def get_oura_auth_url(request):
+async def get_oura_auth_url(request):
     """
     GET /api/v1/ow/oauth/oura/authorize
     Passes through to the OW OAuth authorize endpoint.
     Populates user_id from the bearer token (looked up from identifier field).
     """
     user = request.user
-    ow_api_url = get_setting("ow.api_url", "")
-    ow_api_key = get_setting("ow.api_key", "")
+    ow_api_url, ow_api_key = await sync_to_async(ow_api.api_config)()
 
     if not ow_api_url or not ow_api_key:
         return Response({"error": "OW integration not configured"}, status=500)
@@ -106,14 +95,8 @@ def get_oura_auth_url(request):
         params["redirect_uri"] = redirect_uri
 
     try:
-        ow_response = requests.get(
-            ow_api_url + "/api/v1/oauth/oura/authorize",
-            params=params,
-            headers={"X-Open-Wearables-API-Key": ow_api_key},
-            timeout=10,
-            allow_redirects=False,
-        )
-    except requests.RequestException as e:
+        ow_response = await ow_api.request("GET", ow_api_url, ow_api_key, "/api/v1/oauth/oura/authorize", params=params)
+    except httpx.HTTPError as e:
         logger.error("Failed to reach OW API: %s", e)
         return Response({"error": "Failed to reach OW API"}, status=502)
 
@@ -124,30 +107,30 @@ def get_oura_auth_url(request):
     return Response(ow_response.json())
 
 
-@api_view(["GET"])
+@async_api_view(["GET"])
 @permission_classes([AllowAny])
-def oura_oauth_callback(request):
+async def oura_oauth_callback(request):
     """
     GET /api/v1/oauth/oura/callback
     Proxy for the Oura OAuth callback. Oura redirects the browser here after
     the user authorizes. We forward the request to the OW backend which
     exchanges the code for tokens, then follow its redirect response.
     """
-    ow_api_url = get_setting("ow.api_url", "")
-    ow_api_key = get_setting("ow.api_key", "")
+    ow_api_url, ow_api_key = await sync_to_async(ow_api.api_config)()
 
     if not ow_api_url or not ow_api_key:
         return Response({"error": "OW integration not configured"}, status=500)
 
     try:
-        ow_response = requests.get(
-            ow_api_url + "/api/v1/oauth/oura/callback",
+        ow_response = await ow_api.request(
+            "GET",
+            ow_api_url,
+            ow_api_key,
+            "/api/v1/oauth/oura/callback",
             params=request.query_params.dict(),
-            headers={"X-Open-Wearables-API-Key": ow_api_key},
             timeout=15,
-            allow_redirects=False,
         )
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error("Failed to reach OW API: %s", e)
         return Response({"error": "Failed to reach OW API"}, status=502)
 
@@ -166,173 +149,70 @@ def oura_oauth_callback(request):
     return Response(ow_response.json())
 
 
-def _get_s3_client():
-    """Create a boto3 S3 client for OW's MinIO instance."""
-    return boto3.client(
-        "s3",
-        endpoint_url=settings.OW_S3_ENDPOINT_URL,
-        aws_access_key_id=settings.OW_S3_ACCESS_KEY,
-        aws_secret_access_key=settings.OW_S3_SECRET_KEY,
-        region_name=settings.OW_S3_REGION,
-    )
-
-
-def _is_heart_rate_file(s3_client, bucket: str, key: str) -> bool:
-    """Check S3 object metadata to determine if this is a heart rate file."""
-    try:
-        head = s3_client.head_object(Bucket=bucket, Key=key)
-        trace_id = head.get("Metadata", {}).get("trace_id", "")
-        return "heartrate" in trace_id.lower()
-    except Exception:
-        return False
-
-
-@api_view(["GET"])
+@api_view(["GET", "POST"])
 @permission_classes([IsAuthenticated])
 def sync_ow_data(request):
     """
-    GET /api/v1/ow/sync
-    Syncs Oura heart rate data from OW's MinIO/S3 into JHE Observations.
+    GET|POST /api/v1/ow/sync
+    Starts a sync of Oura heart rate data from OW's MinIO/S3 into JHE Observations
+    as a background job (core/services/ow_sync.py) and answers 202 with the job id
+    and its status URL. While a sync is already running, that job is returned instead
+    of starting another, unless it has stopped reporting progress (core/services/jobs.py).
 
     Uses ow_key DESC LIMIT 1 as the StartAfter marker so only new files
-    are fetched on each call.
+    are fetched on each run.
     """
-    bucket = settings.OW_S3_BUCKET
-    if not settings.OW_S3_ENDPOINT_URL or not bucket:
+    if not settings.OW_S3_ENDPOINT_URL or not settings.OW_S3_BUCKET:
         return Response({"error": "OW S3 not configured"}, status=500)
-
-    s3_client = _get_s3_client()
-    s3_prefix = settings.OW_S3_PREFIX
-    prefix = f"{s3_prefix}/oura/"
-
-    # Resume from the last synced S3 key
-    last_key = (
-        Observation.objects.filter(ow_key__isnull=False).order_by("-ow_key").values_list("ow_key", flat=True).first()
-    )
-
-    list_kwargs = {"Bucket": bucket, "Prefix": prefix}
-    if last_key:
-        list_kwargs["StartAfter"] = last_key
-
-    try:
-        paginator = s3_client.get_paginator("list_objects_v2")
-        pages = paginator.paginate(**list_kwargs)
-    except Exception as e:
-        logger.error("Failed to list MinIO objects: %s", e)
-        return Response({"error": "Failed to connect to MinIO"}, status=502)
-
-    # Get heart rate CodeableConcept
-    try:
-        hr_code = CodeableConcept.objects.get(coding_code="omh:heart-rate:2.0")
-    except CodeableConcept.DoesNotExist:
+    if not CodeableConcept.objects.filter(coding_code=HEART_RATE_CODE).exists():
         return Response({"error": "Heart rate CodeableConcept not found. Run seed first."}, status=500)
 
-    oura_ds, _ = DataSource.objects.get_or_create(
-        name="Oura Ring",
-        defaults={"type": "personal_device"},
-    )
-
-    total_files = 0
-    total_observations = 0
-    total_skipped = 0
-    errors = []
-
-    for page in pages:
-        for obj in page.get("Contents", []):
-            key = obj["Key"]
-
-            if not key.endswith(".json"):
-                continue
-
-            # Filter for heart rate files via metadata
-            if not _is_heart_rate_file(s3_client, bucket, key):
-                continue
-
-            total_files += 1
-
-            # Extract OW user UUID from key path
-            relative_key = key
-            if key.startswith(s3_prefix + "/"):
-                relative_key = key[len(s3_prefix) + 1 :]
-            rel_parts = relative_key.split("/")
-            if len(rel_parts) < 5:
-                errors.append(f"Unexpected key format: {key}")
-                continue
-
-            ow_user_uuid = rel_parts[3]
-
-            # Resolve patient
-            try:
-                jhe_user = JheUser.objects.get(identifier=ow_user_uuid)
-                patient = jhe_user.patient_profile
-            except JheUser.DoesNotExist:
-                total_skipped += 1
-                logger.debug("No JHE user with identifier=%s, skipping %s", ow_user_uuid, key)
-                continue
-            except Exception:
-                total_skipped += 1
-                continue
-
-            if patient is None:
-                total_skipped += 1
-                continue
-
-            # Download and parse the file
-            try:
-                s3_response = s3_client.get_object(Bucket=bucket, Key=key)
-                measurements = json.loads(s3_response["Body"].read().decode("utf-8"))
-            except Exception as e:
-                errors.append(f"Download/parse failed for {key}: {e}")
-                continue
-
-            if not isinstance(measurements, list):
-                if isinstance(measurements, dict) and isinstance(measurements.get("data"), list):
-                    measurements = measurements["data"]
-                else:
-                    errors.append(f"Expected array in {key}, got {type(measurements).__name__}")
-                    continue
-
-            # Convert and build observation batch
-            obs_batch = []
-            for i, sample in enumerate(measurements):
-                try:
-                    omh_record = convert(
-                        source="oura_raw",
-                        data_type="heart_rate",
-                        sample=sample,
-                    )
-                    obs_batch.append(
-                        Observation(
-                            subject_patient=patient,
-                            codeable_concept=hr_code,
-                            data_source=oura_ds,
-                            omh_data=omh_record,
-                            ow_key=key,
-                            status="final",
-                        )
-                    )
-                except Exception as e:
-                    errors.append(f"{key} sample {i}: {e}")
-
-            # Bulk-create in chunks
-            chunk_size = 500
-            created_count = 0
-            for ci in range(0, len(obs_batch), chunk_size):
-                chunk = obs_batch[ci : ci + chunk_size]
-                try:
-                    Observation.objects.bulk_create(chunk)
-                    created_count += len(chunk)
-                except Exception as e:
-                    errors.append(f"Bulk save {key} chunk {ci}: {e}")
-
-            total_observations += created_count
-            logger.info("Synced %d/%d from %s", created_count, len(measurements), key)
-
-    return Response(
-        {
-            "files_processed": total_files,
-            "files_skipped": total_skipped,
-            "observations_created": total_observations,
-            "errors": errors if errors else None,
-        }
-    )
+    with transaction.atomic():
+        # Serialize concurrent starts by row-locking the ow.sync_in_progress setting for the length
+        # of this transaction; with the active-job check below that means one sync job at a time.
+        # The lock only covers job creation: ow_poll treats the row's value as a timestamp lease
+        # and never locks it, so a sync may still run alongside a poll tick.
+        JheSetting.objects.select_for_update().get_or_create(
+            key="ow.sync_in_progress", defaults={"value_type": "string", "value_string": ""}
+        )
+        # A job left active by a process that died (deploy, OOM, recycled worker) would block every
+        # later sync; once it has stopped beating it is failed, and this run resumes after it.
+        OwSyncJob.objects.expire_stale()
+        job = OwSyncJob.objects.filter(status__in=OwSyncJob.ACTIVE_STATUSES).order_by("created").first()
+        created = job is None
+        if created:
+            job = OwSyncJob.objects.create(jhe_user=request.user)
+    if created:
+        start_sync_job(job)
+        job.refresh_from_db()
+    return Response(_sync_job_status(request, job), status=202)
+
+
+@async_api_view(["GET"])
+@permission_classes([IsAuthenticated])
+async def ow_sync_status(request, job_id):
+    """
+    GET /api/v1/ow/sync/<job_id>
+    Progress of a sync job: status, counters so far, and errors.
+    """
+    jobs = OwSyncJob.objects.filter(pk=job_id)
+    await sync_to_async(jobs.expire_stale)()
+    job = await jobs.afirst()
+    if job is None:
+        return Response({"error": "Sync job not found"}, status=404)
+    return Response(_sync_job_status(request, job))
+
+
+def _sync_job_status(request, job):
+    return {
+        "job_id": str(job.pk),
+        "status": job.status,
+        "status_url": request.build_absolute_uri(reverse("ow-sync-status", args=[job.pk])),
+        "files_processed": job.files_processed,
+        "files_skipped": job.files_skipped,
+        "observations_created": job.observations_created,
+        "errors": job.errors or None,
+        "error": job.error,
+        "created": job.created,
+        "finished": job.finished,
+    }
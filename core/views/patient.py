@@ -2,6 +2,8 @@ import inspect
 import logging
 from datetime import datetime
 
+import httpx
+from asgiref.sync import sync_to_async
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.validators import validate_email
 from django.db import IntegrityError, transaction
@@ -40,10 +42,12 @@ from core.serializers import (
     StudyPatientScopeConsentSerializer,
     StudyPendingConsentsSerializer,
 )
+from core.services import ow_api
 from core.services.jhe_settings import get_setting
+from core.views.async_api import AsyncAPIViewMixin
 
 
-class PatientViewSet(ModelViewSet):
+class PatientViewSet(AsyncAPIViewMixin, ModelViewSet):
     model_class = Patient
     serializer_class = PatientSerializer
     pagination_class = CustomPageNumberPagination
@@ -255,30 +259,17 @@ class PatientViewSet(ModelViewSet):
         return Response(PatientSerializer(patient).data)
 
     @action(detail=True, methods=["GET"], url_path="wearable-status")
-    def wearable_status(self, request, pk):
+    async def wearable_status(self, request, pk):
         """GET /api/v1/patients/{id}/wearable-status - Check OW connection status."""
-        if (not request.user.is_practitioner()) and (int(pk) != request.user.get_patient().id):
-            raise PermissionDenied("The Patient does not match the current patient user.")
-        patient = self.get_object()
-        jhe_user = patient.jhe_user
-        if not jhe_user.identifier or not jhe_user.identifier.startswith("ow:"):
+        ow_user_id, (ow_api_url, ow_api_key) = await sync_to_async(self._ow_status_target)(pk)
+        if ow_user_id is None:
             return Response({"connections": [], "connected": False})
-
-        ow_user_id = jhe_user.identifier.removeprefix("ow:")
-        ow_api_url = get_setting("ow.api_url", "")
-        ow_api_key = get_setting("ow.api_key", "")
         if not ow_api_url or not ow_api_key:
             return Response({"error": "OW integration not configured"}, status=500)
 
-        import requests as http_requests
-
         try:
-            ow_response = http_requests.get(
-                f"{ow_api_url}/api/v1/users/{ow_user_id}/connections",
-                headers={"X-Open-Wearables-API-Key": ow_api_key},
-                timeout=10,
-            )
-        except http_requests.RequestException as e:
+            ow_response = await ow_api.request("GET", ow_api_url, ow_api_key, f"/api/v1/users/{ow_user_id}/connections")
+        except httpx.HTTPError as e:
             logging.getLogger(__name__).warning("OW wearable-status check failed: %s", e)
             return Response({"connections": [], "connected": False, "error": "OW unreachable"})
 
@@ -290,6 +281,15 @@ class PatientViewSet(ModelViewSet):
         )
         return Response({"connections": connections, "connected": len(connections) > 0})
 
+    def _ow_status_target(self, pk):
+        # The synchronous half of wearable_status: authorize, then (OW user id or None, OW config).
+        if (not self.request.user.is_practitioner()) and (int(pk) != self.request.user.get_patient().id):
+            raise PermissionDenied("The Patient does not match the current patient user.")
+        jhe_user = self.get_object().jhe_user
+        if not jhe_user.identifier or not jhe_user.identifier.startswith("ow:"):
+            return None, ("", "")
+        return jhe_user.identifier.removeprefix("ow:"), ow_api.api_config()
+
     @action(detail=True, methods=["GET", "POST", "PATCH", "DELETE"])
     def consents(self, request, pk):
         # if this is a patient, check they are accessing their own consents
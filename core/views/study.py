@@ -19,11 +19,12 @@ from core.serializers import (
     StudyScopeRequestSerializer,
     StudySerializer,
 )
+from core.views.async_api import AsyncAPIViewMixin
 
 logger = logging.getLogger(__name__)
 
 
-class StudyViewSet(ModelViewSet):
+class StudyViewSet(AsyncAPIViewMixin, ModelViewSet):
     model_class = Study
     serializer_class = StudyOrganizationSerializer
     pagination_class = CustomPageNumberPagination
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jhe.settings")
 
 application = get_asgi_application()
+
+# Discover the trusted EHR issuers' JWKS before the first token exchange needs them.
+from core.oidc_verify import start_discovery_prewarm  # noqa: E402
+
+start_discovery_prewarm()
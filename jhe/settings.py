@@ -58,6 +58,57 @@ OW_S3_ACCESS_KEY = os.getenv("OW_S3_ACCESS_KEY", "")
 OW_S3_SECRET_KEY = os.getenv("OW_S3_SECRET_KEY", "")
 OW_S3_REGION = os.getenv("OW_S3_REGION", "us-east-1")
 
+# Background jobs -- $export, async R4 imports, OW sync, index-refs (core/services/jobs.py):
+# whether they run on a background thread (false runs them inline in the request that starts
+# them), and how long an active job may go without a heartbeat before it is marked failed.
+JOBS_IN_BACKGROUND = os.getenv("JOBS_IN_BACKGROUND", "true").lower() != "false"
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "600"))
+
+# FHIR Bulk Data $export (core/fhir/export.py): the directory NDJSON output files are written to.
+FHIR_EXPORT_DIR = Path(os.getenv("FHIR_EXPORT_DIR", BASE_DIR / "fhir_exports"))
+
+# R4 -> R5 import (core/fhir/cross_version*.py): the prebuilt type/map index written by
+# `manage.py build_cross_version_index` (ignored when missing or stale -- the engine then derives it
+# lazily), and whether each process loads it and compiles the map plans at startup
+# (CoreConfig.ready) instead of on its first import request.
+FHIR_XVER_INDEX_PATH = Path(
+    os.getenv("FHIR_XVER_INDEX_PATH", BASE_DIR / "data" / "fhir" / "cross-version-index.marshal")
+)
+FHIR_XVER_WARM_UP = os.getenv("FHIR_XVER_WARM_UP", "false").lower() == "true"
+
+# How FHIR write bodies are validated (core/fhir/fhir_validation.py): "full" parses each into its
+# fhir.resources model, "structural" checks it against the resource type's compiled JSON Schema
+# (shape only, much cheaper), "off" skips validation -- only for deployments whose writers are
+# all trusted.
+FHIR_VALIDATION_MODE = os.getenv("FHIR_VALIDATION_MODE", "full").lower()
+# How often each server process logs (INFO) its validation timings per resource type and mode;
+# 0 turns the summary off.
+FHIR_VALIDATION_TIMINGS_LOG_SECONDS = int(os.getenv("FHIR_VALIDATION_TIMINGS_LOG_SECONDS", "300"))
+
+# R4 Bundle import (core/services/fhir_import.py): how many worker processes convert and validate
+# the entries of a large Bundle (0 does it on the request's thread).
+FHIR_IMPORT_WORKERS = int(os.getenv("FHIR_IMPORT_WORKERS", "0"))
+
+# The default cache: Django's per-process local memory unless CACHE_BACKEND names a backend shared
+# by the server processes (e.g. django.core.cache.backends.db.DatabaseCache with
+# CACHE_LOCATION=jhe_cache after `manage.py createcachetable`).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Practitioner UI settings (current org/study/resource): 0 writes every change through; a positive
+# value writes each practitioner's changes at most once per this many seconds, buffering the rest
+# in the cache, which must then be shared (core/services/practitioner_settings.py).
+PRACTITIONER_SETTINGS_FLUSH_SECONDS = int(os.getenv("PRACTITIONER_SETTINGS_FLUSH_SECONDS", "0"))
+
+# How long a patient's consented-scope set stays cached when the cache is shared
+# (core/services/consent_scopes.py). Consent, enrollment and study-scope changes invalidate it
+# immediately; this only bounds staleness from writers that bypass model signals.
+CONSENTED_SCOPES_CACHE_SECONDS = int(os.getenv("CONSENTED_SCOPES_CACHE_SECONDS", "300"))
+
 OIDC_CLIENT_AUTHORITY_PATH = "/o/"
 
 if "ALLOWED_HOSTS" in os.environ:
@@ -146,6 +197,8 @@ MIDDLEWARE = [
     # tests/patient-access-client demo on another origin) can read the token
     # response. Outermost so it sets headers on every /o/ response.
     "core.middleware.OAuthCorsMiddleware",
+    # Per-request memo of FHIR user resolution and authorization checks (core/fhir/scope.py).
+    "core.middleware.AuthContextMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -177,6 +230,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "jhe.wsgi.application"
+# Served by uvicorn when JHE_SERVER=asgi (scripts/start_server.bash).
+ASGI_APPLICATION = "jhe.asgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
@@ -246,6 +301,7 @@ OAUTH2_PROVIDER_APPLICATION_MODEL = "oauth2_provider.Application"
 # core/management/commands/seed.py and https://jupyterhealth.github.io/software-documentation/jhe/provider-ehr-launch :
 #   auth.sof.trusted_issuers  (json array) — trusted EHR OIDC issuers (id_token `iss`)
 #   auth.sof.trusted_audience (string)     — the SMART app's client_id at the EHR (id_token `aud`)
+#   auth.sof.discovery_ttl / auth.sof.discovery_stale_ttl (int) — issuer discovery cache lifetimes
 
 X_FRAME_OPTIONS = os.getenv("X_FRAME_OPTIONS", "SAMEORIGIN")
 
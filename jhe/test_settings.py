@@ -18,3 +18,7 @@ TEST_RUNNER = "django.test.runner.DiscoverRunner"
 # Fast password hashing for tests: speeds up every test that creates a user and sidesteps a
 # flaky native pbkdf2 access-violation crash seen on Windows. Never use MD5 in production.
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Write practitioner settings through synchronously: no deferred-flush timer threads touching the
+# test database. tests/backend/test_practitioner_settings.py covers the write-behind path.
+PRACTITIONER_SETTINGS_FLUSH_SECONDS = 0
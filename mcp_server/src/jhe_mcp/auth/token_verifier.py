@@ -13,11 +13,24 @@ Validation has two layers:
    JHE client, rejecting foreign-audience tokens. If JHE does not expose
    introspection (404 / 403 / connection error) we fall back to userinfo-only
    and warn once, rather than hard-failing.
+
+Both calls go through one long-lived pooled ``httpx.AsyncClient`` (shared with
+the ``UserinfoValidator``), so a tool call reuses a warm keep-alive connection
+instead of paying a TLS handshake. An accepted verification is cached -- keyed
+by the token's SHA-256, bounded LRU, for ``cache_ttl`` seconds or until the
+introspected ``exp``, whichever is sooner -- and concurrent requests carrying
+the same uncached token share a single upstream verification. Rejections are
+never cached. ``stats()`` reports the cache/coalescing counters.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 
 import httpx
 from mcp.server.auth.provider import AccessToken, TokenVerifier
@@ -37,6 +50,12 @@ class JheAccessToken(AccessToken):
     subject: str | None = None
 
 
+@dataclass(frozen=True)
+class _CachedVerification:
+    access_token: JheAccessToken
+    expires_at: float  # monotonic deadline
+
+
 class JheTokenVerifier(TokenVerifier):
     """Verify JHE-issued opaque bearer tokens for per-request MCP auth."""
 
@@ -45,14 +64,77 @@ class JheTokenVerifier(TokenVerifier):
         settings: Settings,
         validator: UserinfoValidator | None = None,
         introspect_timeout: float = 5.0,
+        cache_ttl: float = 60.0,
+        max_entries: int = 1024,
+        http_client: httpx.AsyncClient | None = None,
     ) -> None:
         self._settings = settings
-        self._validator = validator or UserinfoValidator(userinfo_endpoint=settings.userinfo_endpoint)
+        self._http_client = http_client or httpx.AsyncClient(
+            timeout=introspect_timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        self._validator = validator or UserinfoValidator(
+            userinfo_endpoint=settings.userinfo_endpoint, client=self._http_client
+        )
         self._introspect_endpoint = f"{settings.jhe_base_url}/o/introspect/"
         self._introspect_timeout = introspect_timeout
         self._audience_warning_emitted = False
+        self._cache_ttl = cache_ttl
+        self._max_entries = max_entries
+        self._cache: OrderedDict[str, _CachedVerification] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[JheAccessToken | None]] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "rejected": 0, "evicted": 0}
+
+    def stats(self) -> dict[str, int]:
+        """Cache and single-flight counters, plus the current cache size."""
+        return {**self._stats, "cached": len(self._cache), "inflight": len(self._inflight)}
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        await self._http_client.aclose()
 
     async def verify_token(self, token: str) -> AccessToken | None:
+        key = hashlib.sha256(token.encode()).hexdigest()
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None:
+            if now < cached.expires_at:
+                self._cache.move_to_end(key)
+                self._stats["hits"] += 1
+                return cached.access_token
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            task = asyncio.ensure_future(self._verify_and_cache(key, token))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _task: self._inflight.pop(key, None))
+        # Shielded so one cancelled request doesn't abort the verification others await.
+        return await asyncio.shield(task)
+
+    async def _verify_and_cache(self, key: str, token: str) -> JheAccessToken | None:
+        started = time.monotonic()
+        result = await self._verify_uncached(token)
+        if result is None:
+            self._stats["rejected"] += 1
+            return None
+        access_token, exp = result
+        expires_at = started + self._cache_ttl
+        if exp is not None:
+            # Never serve a token from cache past the expiry JHE reported for it.
+            expires_at = min(expires_at, started + (exp - time.time()))
+        if expires_at > time.monotonic():
+            self._cache[key] = _CachedVerification(access_token=access_token, expires_at=expires_at)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+                self._stats["evicted"] += 1
+        return access_token
+
+    async def _verify_uncached(self, token: str) -> tuple[JheAccessToken, int | None] | None:
         # Layer 1: userinfo validation -> subject. Failure means reject.
         # A transport-level failure (httpx.HTTPError) must fail closed as a clean
         # 401 reject, not surface as a 500.
@@ -69,7 +151,7 @@ class JheTokenVerifier(TokenVerifier):
             return None
 
         # Layer 2: best-effort audience check via introspection.
-        client_id = await self._introspect_client_id(token)
+        client_id, exp = await self._introspect(token)
         if client_id is None:
             # Introspection unavailable. Fail closed when MCP_REQUIRE_AUDIENCE is
             # set (production), else fall back to userinfo-only (dev default).
@@ -82,53 +164,57 @@ class JheTokenVerifier(TokenVerifier):
             logger.warning("Rejecting token issued to foreign client_id")
             return None
 
-        return JheAccessToken(
+        access_token = JheAccessToken(
             token=token,
             client_id=client_id,
             scopes=list(JHE_SCOPES),
+            expires_at=exp,
             subject=subject,
         )
+        return access_token, exp
 
-    async def _introspect_client_id(self, token: str) -> str | None:
-        """Return the introspected client_id, or None if introspection is unavailable.
+    async def _introspect(self, token: str) -> tuple[str | None, int | None]:
+        """Return ``(client_id, exp)`` from introspection; client_id is None if unavailable.
 
         Returns the (possibly foreign) client_id when JHE reports the token as
-        active; returns None when introspection cannot be performed so the caller
-        can fall back to userinfo-only validation.
+        active, with its ``exp`` (unix seconds) when reported; returns a None
+        client_id when introspection cannot be performed so the caller can fall
+        back to userinfo-only validation.
         """
         auth: tuple[str, str] | None = None
         if self._settings.jhe_client_secret:
             auth = (self._settings.jhe_client_id, self._settings.jhe_client_secret)
         try:
-            async with httpx.AsyncClient(timeout=self._introspect_timeout) as client:
-                resp = await client.post(
-                    self._introspect_endpoint,
-                    data={"token": token},
-                    auth=auth,
-                )
+            resp = await self._http_client.post(
+                self._introspect_endpoint,
+                data={"token": token},
+                auth=auth,
+                timeout=self._introspect_timeout,
+            )
         except httpx.HTTPError:
             self._warn_audience_unenforced()
-            return None
+            return None, None
         if resp.status_code in (403, 404):
             # JHE does not expose introspection to us; audience can't be enforced.
             self._warn_audience_unenforced()
-            return None
+            return None, None
         if resp.status_code != 200:
             self._warn_audience_unenforced()
-            return None
+            return None, None
         try:
             body = resp.json()
         except ValueError:
             self._warn_audience_unenforced()
-            return None
+            return None, None
         if not body.get("active"):
             # Introspection says token is not active for us -> treat as foreign.
-            return ""
+            return "", None
         introspected = body.get("client_id")
         if not isinstance(introspected, str) or not introspected:
             self._warn_audience_unenforced()
-            return None
-        return introspected
+            return None, None
+        exp = body.get("exp")
+        return introspected, exp if isinstance(exp, int) and not isinstance(exp, bool) else None
 
     def _warn_audience_unenforced(self) -> None:
         if not self._audience_warning_emitted:
@@ -6,7 +6,8 @@ Calling `/o/userinfo/` with `Authorization: Bearer <opaque>` returns 200 + the
 pattern for opaque-token validation.
 
 We cache results for `cache_ttl` seconds so repeated MCP requests from the
-same client don't hammer JHE.
+same client don't hammer JHE. Pass a long-lived `client` to reuse its pooled
+connections; without one each lookup opens (and closes) its own client.
 """
 
 from __future__ import annotations
@@ -34,12 +35,14 @@ class UserinfoValidator:
         cache_ttl: int = 60,
         timeout: float = 5.0,
         max_entries: int = 1024,
+        client: httpx.AsyncClient | None = None,
     ) -> None:
         self._endpoint = userinfo_endpoint
         self._cache_ttl = cache_ttl
         self._timeout = timeout
         self._max_entries = max_entries
         self._cache: dict[str, _CachedSub] = {}
+        self._client = client
 
     def _evict(self, now: float) -> None:
         """Remove expired entries; if still over limit, drop the oldest."""
@@ -60,8 +63,12 @@ class UserinfoValidator:
                 return cached.subject
             # Expired entry — evict immediately.
             del self._cache[token]
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            resp = await client.get(self._endpoint, headers={"Authorization": f"Bearer {token}"})
+        headers = {"Authorization": f"Bearer {token}"}
+        if self._client is not None:
+            resp = await self._client.get(self._endpoint, headers=headers, timeout=self._timeout)
+        else:
+            async with httpx.AsyncClient(timeout=self._timeout) as client:
+                resp = await client.get(self._endpoint, headers=headers)
         if resp.status_code == 401:
             self._cache.pop(token, None)
             raise TokenValidationError("token rejected by userinfo endpoint")
@@ -63,6 +63,7 @@ Efficient workflows — do NOT dump or page through records just to count or fin
 def build_server(
     settings: Settings,
     pre_tool_hook: Callable[[], Awaitable[None]] | None = None,
+    token_verifier: JheTokenVerifier | None = None,
 ) -> FastMCP:
     parsed = urllib.parse.urlparse(settings.mcp_resource_url)
     public_host = parsed.netloc  # host[:port]
@@ -78,7 +79,7 @@ def build_server(
         name="jhe-mcp",
         instructions=SERVER_INSTRUCTIONS,
         transport_security=transport_security,
-        token_verifier=JheTokenVerifier(settings),
+        token_verifier=token_verifier or JheTokenVerifier(settings),
         auth=AuthSettings(
             # Our broker is the authorization server the clients use.
             issuer_url=settings.mcp_resource_url,
@@ -91,6 +91,10 @@ class JheClient:
         self._timeout = timeout
         self._client: httpx.AsyncClient | None = None
 
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
     async def __aenter__(self) -> JheClient:
         self._client = httpx.AsyncClient(timeout=self._timeout)
         return self
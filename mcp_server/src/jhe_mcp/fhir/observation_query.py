@@ -16,6 +16,11 @@ MAX_PAGE_SIZE = 1000
 # MAX_PAGE_SIZE * MAX_PAGES is the most records a single call will pull.
 MAX_PAGES = 50
 
+# Per-base-URL Observation capabilities (search param and operation names), read
+# once from the server's CapabilityStatement (``GET metadata``).
+_CAPABILITIES: dict[str, dict[str, frozenset[str]]] = {}
+_NO_CAPABILITIES: dict[str, frozenset[str]] = {"search_params": frozenset(), "operations": frozenset()}
+
 
 def _bundle_total(bundle: Any) -> int:
     """Return a FHIR search Bundle's ``total``, rejecting non-Bundle responses.
@@ -38,9 +43,9 @@ def build_observation_params(
 ) -> dict[str, Any]:
     """Build FHIR Observation query params shared by all observation tools.
 
-    Date filtering is intentionally NOT included here: the JHE FHIR Observation
-    endpoint does not parse a ``date`` parameter, so any date window is applied
-    client-side (see ``in_date_range`` / ``collect_observations``).
+    Date filtering is NOT included here: a date window is added per request by
+    ``collect_observations`` / ``count_with_optional_date`` -- as ``date`` params
+    when the server advertises them, else applied client-side (``in_date_range``).
     """
     params: dict[str, Any] = {}
     if study_id is not None:
@@ -114,12 +119,60 @@ async def fetch_observation_page(
     return total, entries, has_more
 
 
+async def observation_capabilities(client: JheClient) -> dict[str, frozenset[str]]:
+    """The Observation ``search_params`` / ``operations`` the server's CapabilityStatement lists.
+
+    Read once per base URL. A server without ``metadata`` (404), or one that
+    answers with something other than a CapabilityStatement, advertises
+    nothing, so callers fall back to fetching and reducing client-side.
+    """
+    base_url = getattr(client, "base_url", None)
+    if isinstance(base_url, str) and base_url in _CAPABILITIES:
+        return _CAPABILITIES[base_url]
+    try:
+        statement = await client.fhir_get("metadata", treat_404_as_none=True)
+    except JheClientError as exc:
+        logger.warning("CapabilityStatement unavailable (%s); reducing observations client-side", exc.status)
+        return _NO_CAPABILITIES
+    search_params: set[str] = set()
+    operations: set[str] = set()
+    if isinstance(statement, dict) and statement.get("resourceType") == "CapabilityStatement":
+        for rest in statement.get("rest") or []:
+            for resource in rest.get("resource") or []:
+                if resource.get("type") == "Observation":
+                    search_params.update(param.get("name") for param in resource.get("searchParam") or [])
+                    operations.update(op.get("name") for op in resource.get("operation") or [])
+    capabilities = {"search_params": frozenset(search_params), "operations": frozenset(operations)}
+    if isinstance(base_url, str):
+        _CAPABILITIES[base_url] = capabilities
+    return capabilities
+
+
+async def supports_date_search(client: JheClient) -> bool:
+    """True when the server evaluates the Observation ``date`` search param itself."""
+    return "date" in (await observation_capabilities(client))["search_params"]
+
+
+async def supports_operation(client: JheClient, name: str) -> bool:
+    """True when the server advertises the ``Observation/$<name>`` operation."""
+    return name in (await observation_capabilities(client))["operations"]
+
+
+def date_params(start: str | None, end: str | None) -> dict[str, Any]:
+    """The FHIR ``date`` params for an inclusive ``YYYY-MM-DD`` window (repeated params AND)."""
+    bounds = []
+    if start:
+        bounds.append(f"ge{start}")
+    if end:
+        bounds.append(f"le{end}")
+    return {"date": bounds} if bounds else {}
+
+
 async def iter_all_observations(client: JheClient, params: dict[str, Any]) -> list[dict]:
     """Page through every matching entry server-side (raw bundle entries).
 
     Bounded by ``MAX_PAGES``; if the result set is larger, we stop and log a
-    warning rather than paging indefinitely (the date-filtered / summarize paths
-    fetch everything because JHE ignores the ``date`` param).
+    warning rather than paging indefinitely.
     """
     out: list[dict] = []
     for page in range(1, MAX_PAGES + 1):
@@ -136,6 +189,28 @@ async def iter_all_observations(client: JheClient, params: dict[str, Any]) -> li
     return out
 
 
+async def windowed_params(
+    client: JheClient,
+    params: dict[str, Any],
+    start: str | None,
+    end: str | None,
+) -> dict[str, Any] | None:
+    """``params`` narrowed to the date window server-side, or None when the caller must filter.
+
+    Validates the window. With no window, ``params`` is returned unchanged; with
+    one, the ``date`` params (and a ``_sort=date``) are added when the server
+    supports them, else None is returned and the caller fetches and filters
+    in process.
+    """
+    _require_iso_date(start, "start")
+    _require_iso_date(end, "end")
+    if not (start or end):
+        return params
+    if not await supports_date_search(client):
+        return None
+    return {**params, **date_params(start, end), "_sort": "date"}
+
+
 async def collect_observations(
     client: JheClient,
     params: dict[str, Any],
@@ -143,19 +218,19 @@ async def collect_observations(
     start: str | None = None,
     end: str | None = None,
 ) -> list[Observation]:
-    """Fetch all matching observations, applying a client-side date window.
+    """Fetch all matching observations within an optional date window.
 
-    The backend ignores date params, so when ``start``/``end`` are supplied we
-    fetch the full (patient/study/code-scoped) set and filter in process on each
-    record's ``effective_at``.
+    The window is sent to the server as ``date`` params when its
+    CapabilityStatement lists them; otherwise the full (patient/study/code-scoped)
+    set is fetched and filtered in process on each record's ``effective_at``.
     """
-    _require_iso_date(start, "start")
-    _require_iso_date(end, "end")
+    server_params = await windowed_params(client, params, start, end)
+    if server_params is not None:
+        entries = await iter_all_observations(client, server_params)
+        return [Observation.from_fhir_entry(e) for e in entries]
     entries = await iter_all_observations(client, params)
     observations = [Observation.from_fhir_entry(e) for e in entries]
-    if start or end:
-        observations = [o for o in observations if in_date_range(o.effective_at, start, end)]
-    return observations
+    return [o for o in observations if in_date_range(o.effective_at, start, end)]
 
 
 async def count_with_optional_date(
@@ -165,7 +240,84 @@ async def count_with_optional_date(
     end: str | None,
 ) -> int:
     """Count observations, using the cheap bundle `total` when no date window is
-    given, and a client-side filtered full fetch when one is."""
+    given, a ``_summary=count`` request over the window when the server filters
+    dates, and a client-side filtered full fetch otherwise."""
     if not (start or end):
         return await count_observations(client, params)
-    return len(await collect_observations(client, params, start=start, end=end))
+    server_params = await windowed_params(client, params, start, end)
+    if server_params is None:
+        return len(await collect_observations(client, params, start=start, end=end))
+    server_params.pop("_sort", None)
+    bundle = await client.fhir_get("Observation", params={**server_params, "_summary": "count"})
+    return _bundle_total(bundle)
+
+
+def _parts(parameter: dict[str, Any]) -> dict[str, list[dict[str, Any]]]:
+    parts: dict[str, list[dict[str, Any]]] = {}
+    for part in parameter.get("part") or []:
+        parts.setdefault(part.get("name"), []).append(part)
+    return parts
+
+
+def _part_value(parts: dict[str, list[dict[str, Any]]], name: str) -> Any:
+    for part in parts.get(name) or []:
+        for key, value in part.items():
+            if key.startswith("value"):
+                return value
+    return None
+
+
+def _numbers(parts: dict[str, list[dict[str, Any]]]) -> dict[str, Any]:
+    return {name: _part_value(parts, name) for name in ("count", "average", "minimum", "maximum")}
+
+
+async def fetch_observation_stats(
+    client: JheClient,
+    params: dict[str, Any],
+    *,
+    start: str | None = None,
+    end: str | None = None,
+    bucket: str | None = None,
+) -> list[dict[str, Any]]:
+    """Per-code statistics from the server's ``Observation/$stats`` operation.
+
+    Only call this when ``supports_operation(client, "stats")``; the date window
+    is sent as ``date`` params. Returns one dict per code -- ``code``,
+    ``code_system``, ``code_display``, ``count``, ``earliest``, ``latest`` and
+    ``measures`` (``{name, unit, count, average, minimum, maximum[, buckets]}``).
+    """
+    _require_iso_date(start, "start")
+    _require_iso_date(end, "end")
+    query = {**params, **date_params(start, end)}
+    if bucket:
+        query["bucket"] = bucket
+    result = await client.fhir_get("Observation/$stats", params=query)
+    if not isinstance(result, dict) or result.get("resourceType") != "Parameters":
+        raise JheClientError(0, f"Expected a FHIR Parameters resource, got: {str(result)[:200]}")
+    stats = []
+    for parameter in result.get("parameter") or []:
+        parts = _parts(parameter)
+        codeable = _part_value(parts, "code") or {}
+        coding = (codeable.get("coding") or [{}])[0]
+        measures = []
+        for measure in parts.get("measure") or []:
+            measure_parts = _parts(measure)
+            entry = {"name": _part_value(measure_parts, "name"), "unit": _part_value(measure_parts, "unit")}
+            entry.update(_numbers(measure_parts))
+            if "bucket" in measure_parts:
+                entry["buckets"] = [
+                    {"start": _part_value(_parts(b), "start"), **_numbers(_parts(b))} for b in measure_parts["bucket"]
+                ]
+            measures.append(entry)
+        stats.append(
+            {
+                "code": coding.get("code"),
+                "code_system": coding.get("system"),
+                "code_display": coding.get("display"),
+                "count": _part_value(parts, "count") or 0,
+                "earliest": _part_value(parts, "earliest"),
+                "latest": _part_value(parts, "latest"),
+                "measures": measures,
+            }
+        )
+    return stats
@@ -7,6 +7,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from jhe_mcp.auth.broker import build_broker_router
+from jhe_mcp.auth.token_verifier import JheTokenVerifier
 from jhe_mcp.config import Settings
 from jhe_mcp.core import build_server
 from jhe_mcp.fhir.client import assert_request_ctx_importable
@@ -18,7 +19,10 @@ def build_app(settings: Settings) -> FastAPI:
     # Fail fast at boot if the per-request token context import has moved (e.g.
     # after an mcp upgrade); otherwise per-request auth would silently regress.
     assert_request_ctx_importable()
-    mcp = build_server(settings)
+    # Built here (not inside build_server) so the app owns its pooled HTTP client
+    # and can report its cache counters.
+    token_verifier = JheTokenVerifier(settings)
+    mcp = build_server(settings, token_verifier=token_verifier)
 
     # In resource-server mode the MCP SDK wraps /mcp with RequireAuthMiddleware,
     # which verifies the bearer token on *every* request via JheTokenVerifier and
@@ -32,13 +36,14 @@ def build_app(settings: Settings) -> FastAPI:
     async def lifespan(_app):
         async with mcp.session_manager.run():
             yield
+        await token_verifier.aclose()
 
     app = FastAPI(title="jhe-mcp HTTP", lifespan=lifespan)
     app.include_router(build_broker_router(settings))
 
     @app.get("/health")
     async def health():
-        return {"status": "ok"}
+        return {"status": "ok", "token_verifier": token_verifier.stats()}
 
     app.mount("/", streamable_app)
     return app
@@ -8,9 +8,24 @@ from jhe_mcp.fhir.observation_query import (
     build_observation_params,
     collect_observations,
     fetch_observation_page,
+    fetch_observation_stats,
+    supports_operation,
+    windowed_params,
 )
 
 
+def _accumulate(
+    summary: dict[str, dict[str, Any]], key: str, count: int, earliest: str | None, latest: str | None
+) -> None:
+    """Fold ``count`` records spanning ``earliest``..``latest`` into ``summary[key]``."""
+    bucket = summary.setdefault(key, {"count": 0, "earliest": None, "latest": None})
+    bucket["count"] += count
+    if earliest and (bucket["earliest"] is None or earliest < bucket["earliest"]):
+        bucket["earliest"] = earliest
+    if latest and (bucket["latest"] is None or latest > bucket["latest"]):
+        bucket["latest"] = latest
+
+
 async def summarize_patient_observations(
     *,
     patient_id: str,
@@ -18,21 +33,25 @@ async def summarize_patient_observations(
     end: str | None = None,
     base_url: str,
 ) -> dict[str, dict[str, Any]]:
-    """Per-data-type digest for a patient: {type: {count, earliest, latest}}."""
+    """Per-data-type digest for a patient: {type: {count, earliest, latest}}.
+
+    Computed by the server's ``Observation/$stats`` when it offers one (one small
+    response however many records match), else reduced from the full fetch. Either
+    way, codes that share a display name are folded into one entry.
+    """
     params = build_observation_params(patient_id=patient_id)
+    summary: dict[str, dict[str, Any]] = {}
     async with JheClient(base_url) as client:
+        if await supports_operation(client, "stats"):
+            stats = await fetch_observation_stats(client, params, start=start, end=end)
+            for s in stats:
+                key = s["code_display"] or s["code"] or "unknown"
+                _accumulate(summary, key, s["count"], s["earliest"], s["latest"])
+            return summary
         observations = await collect_observations(client, params, start=start, end=end)
-    summary: dict[str, dict[str, Any]] = {}
     for obs in observations:
         key = obs.code_display or obs.code or "unknown"
-        bucket = summary.setdefault(key, {"count": 0, "earliest": None, "latest": None})
-        bucket["count"] += 1
-        at = obs.effective_at
-        if at:
-            if bucket["earliest"] is None or at < bucket["earliest"]:
-                bucket["earliest"] = at
-            if bucket["latest"] is None or at > bucket["latest"]:
-                bucket["latest"] = at
+        _accumulate(summary, key, 1, obs.effective_at, obs.effective_at)
     return summary
 
 
@@ -43,13 +62,23 @@ async def get_patient_date_range(
 ) -> dict[str, Any]:
     """Earliest/latest observation timestamp and total count for a patient.
 
-    Fetches the patient's observations server-side and reduces to a compact
-    ``{earliest, latest, count}`` so the caller gets exact first/last dates in a
-    single call instead of paging to the end. ``earliest``/``latest`` are
-    ISO-8601 strings (``None`` if no record has a parseable timestamp).
+    Reduced server-side by ``Observation/$stats`` when available, otherwise from
+    the patient's fetched observations, to a compact ``{earliest, latest, count}``
+    so the caller gets exact first/last dates in a single call instead of paging
+    to the end. ``earliest``/``latest`` are ISO-8601 strings (``None`` if no
+    record has a parseable timestamp).
     """
     params = build_observation_params(patient_id=patient_id)
     async with JheClient(base_url) as client:
+        if await supports_operation(client, "stats"):
+            stats = await fetch_observation_stats(client, params)
+            earliest = [s["earliest"] for s in stats if s["earliest"]]
+            latest = [s["latest"] for s in stats if s["latest"]]
+            return {
+                "earliest": min(earliest) if earliest else None,
+                "latest": max(latest) if latest else None,
+                "count": sum(s["count"] for s in stats),
+            }
         observations = await collect_observations(client, params)
     dated = [o.effective_at for o in observations if o.effective_at]
     return {
@@ -73,8 +102,9 @@ async def get_patient_observations(
     """One page of a patient's observations with total/has_more awareness.
 
     verbosity="slim" (default) omits the raw OMH body; "full" includes it.
-    With a start/end window the backend cannot filter by date, so the full set
-    is fetched and filtered client-side, then paginated in process.
+    A start/end window is paged server-side when the backend filters by date;
+    otherwise the full set is fetched and filtered client-side, then paginated
+    in process.
     """
     if verbosity not in ("slim", "full"):
         raise ValueError(f"verbosity must be 'slim' or 'full', got {verbosity!r}")
@@ -82,17 +112,19 @@ async def get_patient_observations(
     page_size = max(1, min(int(limit), 1000))
     page = max(1, int(page))
 
-    if start or end:
-        async with JheClient(base_url) as client:
+    async with JheClient(base_url) as client:
+        server_params = await windowed_params(client, params, start, end)
+        if server_params is not None:
+            total, entries, has_more = await fetch_observation_page(
+                client, server_params, page=page, page_size=page_size
+            )
+            observations = [Observation.from_fhir_entry(e) for e in entries]
+        else:
             filtered = await collect_observations(client, params, start=start, end=end)
-        total = len(filtered)
-        offset = (page - 1) * page_size
-        observations = filtered[offset : offset + page_size]
-        has_more = offset + page_size < total
-    else:
-        async with JheClient(base_url) as client:
-            total, entries, has_more = await fetch_observation_page(client, params, page=page, page_size=page_size)
-        observations = [Observation.from_fhir_entry(e) for e in entries]
+            total = len(filtered)
+            offset = (page - 1) * page_size
+            observations = filtered[offset : offset + page_size]
+            has_more = offset + page_size < total
 
     if verbosity == "slim":
         payload = [SlimObservation.from_observation(o).model_dump() for o in observations]
@@ -78,7 +78,7 @@ async def test_count_study_observations_by_patient(auth, fake_client, monkeypatc
 
 @pytest.mark.asyncio
 async def test_count_patient_observations_date_filter_is_client_side(auth, fake_client):
-    # Backend ignores `date`, so a date window triggers a full fetch + in-process filter.
+    # No CapabilityStatement `date` param, so a date window triggers a full fetch + in-process filter.
     fake_client.fhir_get.return_value = {
         "total": 3,
         "entry": [
@@ -93,3 +93,21 @@ async def test_count_patient_observations_date_filter_is_client_side(auth, fake_
     assert n == 2  # o1, o2 in window; o3 (May) excluded
     sent = fake_client.fhir_get.await_args.kwargs["params"]
     assert sent["_count"] == 1000  # full-fetch page, not the cheap _count=1 path
+
+
+@pytest.mark.asyncio
+async def test_count_patient_observations_date_window_is_one_summary_count(auth, fake_client):
+    capability = {
+        "resourceType": "CapabilityStatement",
+        "rest": [{"resource": [{"type": "Observation", "searchParam": [{"name": "date", "type": "date"}]}]}],
+    }
+    fake_client.fhir_get.side_effect = [capability, {"resourceType": "Bundle", "total": 12, "entry": []}]
+    n = await count_patient_observations(
+        patient_id="40006", start="2026-04-01", end="2026-04-30", base_url="http://jhe"
+    )
+    assert n == 12
+    assert fake_client.fhir_get.await_count == 2  # metadata + a single count request
+    sent = fake_client.fhir_get.await_args.kwargs["params"]
+    assert sent["_summary"] == "count"
+    assert sent["date"] == ["ge2026-04-01", "le2026-04-30"]
+    assert "_count" not in sent
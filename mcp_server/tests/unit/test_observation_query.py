@@ -9,14 +9,20 @@ from jhe_mcp.fhir.observation_query import (
     fetch_observation_page,
     in_date_range,
     iter_all_observations,
+    supports_date_search,
 )
 
+_CAPABILITY = {
+    "resourceType": "CapabilityStatement",
+    "rest": [{"resource": [{"type": "Observation", "searchParam": [{"name": "date", "type": "date"}]}]}],
+}
+
 
 def test_build_params_patient_and_code():
     params = build_observation_params(patient_id="7", data_type="blood-glucose")
     assert params["patient"] == "7"
     assert "omh:blood-glucose:4.0" in params["code"]
-    # date is filtered client-side, never sent to the backend
+    # the date window is added per request (see collect_observations), never here
     assert "date" not in params
 
 
@@ -141,3 +147,88 @@ async def test_iter_all_observations_caps_at_max_pages():
     out = await iter_all_observations(client, {"patient": "7"})
     assert client.fhir_get.await_count == oq.MAX_PAGES
     assert len(out) == oq.MAX_PAGE_SIZE * oq.MAX_PAGES
+
+
+# --- server-side date window, discovered from the CapabilityStatement ---
+
+
+@pytest.mark.asyncio
+async def test_supports_date_search_reads_capability_once_per_base_url(monkeypatch):
+    monkeypatch.setattr(oq, "_CAPABILITIES", {})
+    client = AsyncMock()
+    client.base_url = "http://jhe"
+    client.fhir_get.return_value = _CAPABILITY
+    assert await supports_date_search(client) is True
+    assert await supports_date_search(client) is True
+    assert client.fhir_get.await_count == 1
+    assert client.fhir_get.await_args.args == ("metadata",)
+
+
+@pytest.mark.asyncio
+async def test_supports_date_search_false_without_capability(monkeypatch):
+    monkeypatch.setattr(oq, "_CAPABILITIES", {})
+    client = AsyncMock()
+    client.base_url = "http://old-jhe"
+    client.fhir_get.return_value = None  # 404 -> no metadata endpoint
+    assert await supports_date_search(client) is False
+    client.fhir_get.side_effect = JheClientError(500, "boom")
+    assert await supports_date_search(client) is False  # cached from the first answer
+
+
+@pytest.mark.asyncio
+async def test_collect_observations_pushes_date_window_to_server(monkeypatch):
+    monkeypatch.setattr(oq, "_CAPABILITIES", {})
+    client = AsyncMock()
+    client.base_url = "http://jhe"
+    client.fhir_get.side_effect = [_CAPABILITY, {"total": 1, "entry": [{"resource": {"id": "a"}}]}]
+    observations = await oq.collect_observations(client, {"patient": "7"}, start="2026-04-01", end="2026-04-30")
+    # Entries come back already windowed, so none is dropped client-side (this one has no date).
+    assert len(observations) == 1
+    sent = client.fhir_get.await_args.kwargs["params"]
+    assert sent["date"] == ["ge2026-04-01", "le2026-04-30"]
+    assert sent["_sort"] == "date"
+
+
+@pytest.mark.asyncio
+async def test_fetch_observation_stats_parses_parameters():
+    client = AsyncMock()
+    client.fhir_get.return_value = {
+        "resourceType": "Parameters",
+        "parameter": [
+            {
+                "name": "statistic",
+                "part": [
+                    {"name": "code", "valueCodeableConcept": {"coding": [{"code": "omh:heart-rate:2.0"}]}},
+                    {"name": "count", "valueInteger": 2},
+                    {
+                        "name": "measure",
+                        "part": [
+                            {"name": "name", "valueString": "heart_rate"},
+                            {"name": "unit", "valueString": "beats/min"},
+                            {"name": "count", "valueInteger": 2},
+                            {"name": "minimum", "valueDecimal": 60},
+                            {
+                                "name": "bucket",
+                                "part": [
+                                    {"name": "start", "valueDateTime": "2026-04-01T00:00:00Z"},
+                                    {"name": "count", "valueInteger": 2},
+                                ],
+                            },
+                        ],
+                    },
+                ],
+            }
+        ],
+    }
+    [stat] = await oq.fetch_observation_stats(client, {"patient": "7"}, bucket="day")
+    assert stat["code"] == "omh:heart-rate:2.0" and stat["count"] == 2 and stat["earliest"] is None
+    [measure] = stat["measures"]
+    assert measure["unit"] == "beats/min" and measure["minimum"] == 60 and measure["average"] is None
+    assert measure["buckets"] == [
+        {"start": "2026-04-01T00:00:00Z", "count": 2, "average": None, "minimum": None, "maximum": None}
+    ]
+    assert client.fhir_get.await_args.kwargs["params"] == {"patient": "7", "bucket": "day"}
+
+    client.fhir_get.return_value = {"resourceType": "Bundle"}
+    with pytest.raises(JheClientError):
+        await oq.fetch_observation_stats(client, {"patient": "7"})
@@ -94,7 +94,7 @@ async def test_summarize_groups_by_type_with_date_range(auth, fake_client):
 
 @pytest.mark.asyncio
 async def test_get_patient_observations_date_filter_client_side(auth, fake_client):
-    # Backend ignores `date`; tool fetches all, filters by effective_at, paginates in process.
+    # Backend doesn't advertise `date`; tool fetches all, filters by effective_at, paginates in process.
     fake_client.fhir_get.return_value = {
         "total": 3,
         "entry": [
@@ -173,3 +173,107 @@ async def test_get_patient_date_range_empty(auth, fake_client):
     fake_client.fhir_get.return_value = {"total": 0, "entry": []}
     result = await get_patient_date_range(patient_id="40099", base_url="http://jhe")
     assert result == {"earliest": None, "latest": None, "count": 0}
+
+
+@pytest.mark.asyncio
+async def test_get_patient_observations_date_window_pages_server_side(auth, fake_client):
+    capability = {
+        "resourceType": "CapabilityStatement",
+        "rest": [{"resource": [{"type": "Observation", "searchParam": [{"name": "date", "type": "date"}]}]}],
+    }
+    page = {
+        "total": 7,
+        "entry": [_entry("o3", "omh:blood-glucose:4.0", "Blood glucose", "2026-04-20T00:00:00Z", 99)],
+    }
+    fake_client.fhir_get.side_effect = [capability, page]
+    result = await get_patient_observations(
+        patient_id="40006", start="2026-04-01", end="2026-04-30", limit=2, page=2, base_url="http://jhe"
+    )
+    assert result["total"] == 7  # the server's windowed total
+    assert result["has_more"] is True
+    sent = fake_client.fhir_get.await_args.kwargs["params"]
+    assert sent["date"] == ["ge2026-04-01", "le2026-04-30"]
+    assert sent["_count"] == 2 and sent["_page"] == 2
+
+
+_STATS_CAPABILITY = {
+    "resourceType": "CapabilityStatement",
+    "rest": [{"resource": [{"type": "Observation", "operation": [{"name": "stats"}, {"name": "lastn"}]}]}],
+}
+
+
+def _statistic(code: str, display: str, count: int, earliest: str, latest: str) -> dict:
+    return {
+        "name": "statistic",
+        "part": [
+            {
+                "name": "code",
+                "valueCodeableConcept": {
+                    "coding": [{"system": "https://w3id.org/openmhealth", "code": code, "display": display}]
+                },
+            },
+            {"name": "count", "valueInteger": count},
+            {"name": "earliest", "valueDateTime": earliest},
+            {"name": "latest", "valueDateTime": latest},
+            {
+                "name": "measure",
+                "part": [
+                    {"name": "name", "valueString": "heart_rate"},
+                    {"name": "count", "valueInteger": count},
+                    {"name": "average", "valueDecimal": 71.5},
+                ],
+            },
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_summarize_uses_server_stats_operation(auth, fake_client):
+    stats = {
+        "resourceType": "Parameters",
+        "parameter": [
+            _statistic("omh:heart-rate:2.0", "Heart rate", 525600, "2025-01-01T00:00:00Z", "2025-12-31T23:59:00Z")
+        ],
+    }
+    fake_client.fhir_get.side_effect = [_STATS_CAPABILITY, stats]
+    summary = await summarize_patient_observations(
+        patient_id="40006", start="2025-01-01", end="2025-12-31", base_url="http://jhe"
+    )
+    assert summary == {
+        "Heart rate": {"count": 525600, "earliest": "2025-01-01T00:00:00Z", "latest": "2025-12-31T23:59:00Z"}
+    }
+    assert fake_client.fhir_get.await_args.args == ("Observation/$stats",)
+    sent = fake_client.fhir_get.await_args.kwargs["params"]
+    assert sent["patient"] == "40006" and sent["date"] == ["ge2025-01-01", "le2025-12-31"]
+
+
+@pytest.mark.asyncio
+async def test_summarize_stats_folds_codes_sharing_a_display(auth, fake_client):
+    # $stats groups by system/code; two codes with one display must add up as the fallback does.
+    stats = {
+        "resourceType": "Parameters",
+        "parameter": [
+            _statistic("omh:heart-rate:1.0", "Heart rate", 4, "2024-02-01T00:00:00Z", "2024-03-01T00:00:00Z"),
+            _statistic("omh:heart-rate:2.0", "Heart rate", 6, "2024-01-01T00:00:00Z", "2024-02-15T00:00:00Z"),
+        ],
+    }
+    fake_client.fhir_get.side_effect = [_STATS_CAPABILITY, stats]
+    summary = await summarize_patient_observations(patient_id="40006", base_url="http://jhe")
+    assert summary == {
+        "Heart rate": {"count": 10, "earliest": "2024-01-01T00:00:00Z", "latest": "2024-03-01T00:00:00Z"}
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_patient_date_range_uses_server_stats_operation(auth, fake_client):
+    stats = {
+        "resourceType": "Parameters",
+        "parameter": [
+            _statistic("omh:heart-rate:2.0", "Heart rate", 10, "2024-01-01T00:00:00Z", "2024-03-01T00:00:00Z"),
+            _statistic("omh:blood-glucose:4.0", "Blood glucose", 5, "2023-06-01T00:00:00Z", "2024-02-01T00:00:00Z"),
+        ],
+    }
+    fake_client.fhir_get.side_effect = [_STATS_CAPABILITY, stats]
+    result = await get_patient_date_range(patient_id="40006", base_url="http://jhe")
+    assert result == {"earliest": "2023-06-01T00:00:00Z", "latest": "2024-03-01T00:00:00Z", "count": 15}
+    assert fake_client.fhir_get.await_count == 2
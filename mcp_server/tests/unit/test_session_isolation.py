@@ -73,9 +73,9 @@ def captured_bearers(monkeypatch):
     from jhe_mcp.auth.token_verifier import JheTokenVerifier
 
     async def fake_introspect(self, token: str):
-        return None  # introspection unavailable -> userinfo-only fallback
+        return None, None  # introspection unavailable -> userinfo-only fallback
 
-    monkeypatch.setattr(JheTokenVerifier, "_introspect_client_id", fake_introspect)
+    monkeypatch.setattr(JheTokenVerifier, "_introspect", fake_introspect)
 
     from jhe_mcp.fhir.client import JheClient, _per_request_bearer
 
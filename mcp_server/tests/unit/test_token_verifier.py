@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import time
+
 import httpx
 import pytest
 import respx
@@ -99,3 +102,77 @@ async def test_inactive_introspection_rejected():
     respx.post(f"{_BASE}/o/introspect/").mock(return_value=httpx.Response(200, json={"active": False}))
     v = JheTokenVerifier(_settings())
     assert await v.verify_token("AAA") is None
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_verified_token_is_cached():
+    userinfo = respx.get(f"{_BASE}/o/userinfo/").mock(return_value=httpx.Response(200, json={"sub": "subjectA"}))
+    introspect = respx.post(f"{_BASE}/o/introspect/").mock(
+        return_value=httpx.Response(200, json={"active": True, "client_id": "jhe-mcp-client"})
+    )
+    v = JheTokenVerifier(_settings())
+    first = await v.verify_token("AAA")
+    assert await v.verify_token("AAA") is first
+    assert (userinfo.call_count, introspect.call_count) == (1, 1)
+    assert v.stats()["hits"] == 1 and v.stats()["misses"] == 1
+    await v.aclose()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_rejection_is_not_cached():
+    userinfo = respx.get(f"{_BASE}/o/userinfo/").mock(return_value=httpx.Response(401))
+    v = JheTokenVerifier(_settings())
+    assert await v.verify_token("bad") is None
+    assert await v.verify_token("bad") is None
+    assert userinfo.call_count == 2
+    assert v.stats()["rejected"] == 2
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_cache_entry_never_outlives_introspected_exp():
+    respx.get(f"{_BASE}/o/userinfo/").mock(return_value=httpx.Response(200, json={"sub": "subjectA"}))
+    introspect = respx.post(f"{_BASE}/o/introspect/").mock(
+        return_value=httpx.Response(
+            200, json={"active": True, "client_id": "jhe-mcp-client", "exp": int(time.time()) - 1}
+        )
+    )
+    v = JheTokenVerifier(_settings(), cache_ttl=300)
+    tok = await v.verify_token("AAA")
+    assert tok is not None and tok.expires_at is not None
+    await v.verify_token("AAA")
+    assert introspect.call_count == 2
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_concurrent_requests_share_one_verification():
+    async def slow_userinfo(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"sub": "subjectA"})
+
+    userinfo = respx.get(f"{_BASE}/o/userinfo/").mock(side_effect=slow_userinfo)
+    respx.post(f"{_BASE}/o/introspect/").mock(
+        return_value=httpx.Response(200, json={"active": True, "client_id": "jhe-mcp-client"})
+    )
+    v = JheTokenVerifier(_settings())
+    results = await asyncio.gather(*(v.verify_token("AAA") for _ in range(5)))
+    assert all(r is results[0] and r is not None for r in results)
+    assert userinfo.call_count == 1
+    assert v.stats()["coalesced"] == 4 and v.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_cache_is_lru_bounded():
+    respx.get(f"{_BASE}/o/userinfo/").mock(return_value=httpx.Response(200, json={"sub": "subjectA"}))
+    respx.post(f"{_BASE}/o/introspect/").mock(return_value=httpx.Response(404))
+    v = JheTokenVerifier(_settings(), max_entries=2)
+    for token in ("A", "B", "A", "C"):
+        await v.verify_token(token)
+    # "A" was refreshed by its hit, so "B" is the one evicted.
+    await v.verify_token("A")
+    assert v.stats()["cached"] == 2 and v.stats()["evicted"] == 1
+    assert v.stats()["hits"] == 2
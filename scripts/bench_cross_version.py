@@ -0,0 +1,354 @@
+"""Benchmark the R4 -> R5 cross-version engine: the reference interpreter (walks the StructureMap
+JSON on every resource) against the compiled group plans that transform_to_r5 now uses
+(core.fhir.cross_version._Engine), over a corpus of generated Synthea-style R4 patient bundles.
+
+Every resource's R5 output from the two executors must be identical; the script stops with an
+AssertionError on the first difference. Timings are per resource, after one warm-up pass so
+map loading, the type index and plan compilation stay out of the measurement.
+
+Run locally: python manage.py shell < scripts/bench_cross_version.py
+"""
+
+import random
+import time
+import uuid
+from collections import Counter
+
+from core.fhir.cross_version import _Engine, _Interpreter
+
+BUNDLES = 40
+SEED = 20240601
+
+LOINC = "http://loinc.org"
+SNOMED = "http://snomed.info/sct"
+RXNORM = "http://www.nlm.nih.gov/research/umls/rxnorm"
+CVX = "http://hl7.org/fhir/sid/cvx"
+UCUM = "http://unitsofmeasure.org"
+OBS_CATEGORY = "http://terminology.hl7.org/CodeSystem/observation-category"
+
+VITALS = [
+    ("8302-2", "Body Height", "cm", 150, 195),
+    ("29463-7", "Body Weight", "kg", 50, 110),
+    ("39156-5", "Body mass index (BMI) [Ratio]", "kg/m2", 18, 35),
+    ("8867-4", "Heart rate", "/min", 55, 100),
+    ("9279-1", "Respiratory rate", "/min", 12, 20),
+]
+CONDITIONS = [
+    ("44054006", "Diabetes"),
+    ("38341003", "Hypertension"),
+    ("195662009", "Acute viral pharyngitis (disorder)"),
+    ("10509002", "Acute bronchitis (disorder)"),
+]
+MEDICATIONS = [
+    ("860975", "24 HR Metformin hydrochloride 500 MG Extended Release Oral Tablet"),
+    ("314076", "lisinopril"),
+]
+VACCINES = [("140", "Influenza, seasonal, injectable, preservative free"), ("113", "Td (adult) preservative free")]
+
+
+def cc(system, code, display):
+    return {"coding": [{"system": system, "code": code, "display": display}], "text": display}
+
+
+def ref(resource):
+    return {"reference": f"urn:uuid:{resource['id']}"}
+
+
+def synthea_bundle(rng):
+    """One Synthea-shaped R4 patient history as a list of resources (Synthea emits them as a
+    transaction Bundle; the engine converts the entries one by one)."""
+    patient = {
+        "resourceType": "Patient",
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "meta": {"profile": ["http://hl7.org/fhir/us/core/StructureDefinition/us-core-patient"]},
+        "text": {"status": "generated", "div": '<div xmlns="http://www.w3.org/1999/xhtml">Generated by Synthea</div>'},
+        "extension": [
+            {"url": "http://synthetichealth.github.io/synthea/disability-adjusted-life-years", "valueDecimal": 0.5},
+            {
+                "url": "http://hl7.org/fhir/StructureDefinition/patient-birthPlace",
+                "valueAddress": {"city": "Boston", "state": "Massachusetts", "country": "US"},
+            },
+        ],
+        "identifier": [
+            {"system": "https://github.com/synthetichealth/synthea", "value": str(rng.getrandbits(64))},
+            {
+                "type": cc("http://terminology.hl7.org/CodeSystem/v2-0203", "MR", "Medical Record Number"),
+                "system": "http://hospital.smarthealthit.org",
+                "value": str(rng.getrandbits(32)),
+            },
+        ],
+        "name": [{"use": "official", "family": f"Family{rng.randint(1, 999)}", "given": ["Given", "Middle"]}],
+        "telecom": [{"system": "phone", "value": "555-555-5555", "use": "home"}],
+        "gender": rng.choice(["male", "female"]),
+        "birthDate": f"{rng.randint(1940, 2010)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+        "address": [
+            {
+                "extension": [
+                    {
+                        "url": "http://hl7.org/fhir/StructureDefinition/geolocation",
+                        "extension": [
+                            {"url": "latitude", "valueDecimal": 42.36},
+                            {"url": "longitude", "valueDecimal": -71.06},
+                        ],
+                    }
+                ],
+                "line": [f"{rng.randint(1, 999)} Main St"],
+                "city": "Boston",
+                "state": "MA",
+                "postalCode": "02101",
+                "country": "US",
+            }
+        ],
+        "maritalStatus": cc("http://terminology.hl7.org/CodeSystem/v3-MaritalStatus", "M", "Married"),
+        "multipleBirthBoolean": False,
+        "communication": [{"language": cc("urn:ietf:bcp:47", "en-US", "English")}],
+    }
+    resources = [patient]
+    for visit in range(rng.randint(3, 8)):
+        start = f"20{10 + visit:02d}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T09:00:00-05:00"
+        end = start.replace("T09:00", "T09:30")
+        encounter = {
+            "resourceType": "Encounter",
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "status": "finished",
+            "class": {"system": "http://terminology.hl7.org/CodeSystem/v3-ActCode", "code": "AMB"},
+            "type": [cc(SNOMED, "185349003", "Encounter for check up (procedure)")],
+            "subject": ref(patient),
+            "participant": [
+                {
+                    "type": [cc("http://terminology.hl7.org/CodeSystem/v3-ParticipationType", "PPRF", "primary")],
+                    "period": {"start": start, "end": end},
+                    "individual": {"display": "Dr. Example"},
+                }
+            ],
+            "period": {"start": start, "end": end},
+            "serviceProvider": {"display": "Example Hospital"},
+        }
+        resources.append(encounter)
+        for code, display, unit, low, high in VITALS:
+            resources.append(
+                {
+                    "resourceType": "Observation",
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "status": "final",
+                    "category": [cc(OBS_CATEGORY, "vital-signs", "vital-signs")],
+                    "code": cc(LOINC, code, display),
+                    "subject": ref(patient),
+                    "encounter": ref(encounter),
+                    "effectiveDateTime": start,
+                    "issued": start.replace("-05:00", ".000-05:00"),
+                    "valueQuantity": {
+                        "value": round(rng.uniform(low, high), 1),
+                        "unit": unit,
+                        "system": UCUM,
+                        "code": unit,
+                    },
+                }
+            )
+        resources.append(
+            {
+                "resourceType": "Observation",
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "status": "final",
+                "category": [cc(OBS_CATEGORY, "vital-signs", "vital-signs")],
+                "code": cc(LOINC, "85354-9", "Blood pressure panel with all children optional"),
+                "subject": ref(patient),
+                "encounter": ref(encounter),
+                "effectiveDateTime": start,
+                "component": [
+                    {
+                        "code": cc(LOINC, component, display),
+                        "valueQuantity": {
+                            "value": rng.randint(low, high),
+                            "unit": "mm[Hg]",
+                            "system": UCUM,
+                            "code": "mm[Hg]",
+                        },
+                    }
+                    for component, display, low, high in (
+                        ("8462-4", "Diastolic Blood Pressure", 60, 95),
+                        ("8480-6", "Systolic Blood Pressure", 100, 150),
+                    )
+                ],
+            }
+        )
+        resources.append(
+            {
+                "resourceType": "Observation",
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "status": "final",
+                "category": [cc(OBS_CATEGORY, "survey", "survey")],
+                "code": cc(LOINC, "72166-2", "Tobacco smoking status"),
+                "subject": ref(patient),
+                "encounter": ref(encounter),
+                "effectiveDateTime": start,
+                "valueCodeableConcept": cc(SNOMED, "266919005", "Never smoked tobacco (finding)"),
+            }
+        )
+        lab = {
+            "resourceType": "Observation",
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "status": "final",
+            "category": [cc(OBS_CATEGORY, "laboratory", "laboratory")],
+            "code": cc(LOINC, "4548-4", "Hemoglobin A1c/Hemoglobin.total in Blood"),
+            "subject": ref(patient),
+            "encounter": ref(encounter),
+            "effectiveDateTime": start,
+            "valueQuantity": {"value": round(rng.uniform(4.5, 9), 1), "unit": "%", "system": UCUM, "code": "%"},
+        }
+        resources.append(lab)
+        resources.append(
+            {
+                "resourceType": "DiagnosticReport",
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "status": "final",
+                "category": [cc("http://terminology.hl7.org/CodeSystem/v2-0074", "LAB", "Laboratory")],
+                "code": cc(LOINC, "4548-4", "Hemoglobin A1c"),
+                "subject": ref(patient),
+                "encounter": ref(encounter),
+                "effectiveDateTime": start,
+                "issued": start,
+                "result": [ref(lab)],
+            }
+        )
+        if rng.random() < 0.6:
+            code, display = rng.choice(CONDITIONS)
+            resources.append(
+                {
+                    "resourceType": "Condition",
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "clinicalStatus": cc(
+                        "http://terminology.hl7.org/CodeSystem/condition-clinical", "active", "active"
+                    ),
+                    "verificationStatus": cc(
+                        "http://terminology.hl7.org/CodeSystem/condition-ver-status", "confirmed", "confirmed"
+                    ),
+                    "category": [
+                        cc("http://terminology.hl7.org/CodeSystem/condition-category", "encounter-diagnosis", "Dx")
+                    ],
+                    "code": cc(SNOMED, code, display),
+                    "subject": ref(patient),
+                    "encounter": ref(encounter),
+                    "onsetDateTime": start,
+                    "recordedDate": start,
+                }
+            )
+        if rng.random() < 0.5:
+            code, display = rng.choice(MEDICATIONS)
+            resources.append(
+                {
+                    "resourceType": "MedicationRequest",
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "status": "active",
+                    "intent": "order",
+                    "medicationCodeableConcept": cc(RXNORM, code, display),
+                    "subject": ref(patient),
+                    "encounter": ref(encounter),
+                    "authoredOn": start,
+                    "requester": {"display": "Dr. Example"},
+                    "dosageInstruction": [
+                        {
+                            "sequence": 1,
+                            "timing": {"repeat": {"frequency": 1, "period": 1, "periodUnit": "d"}},
+                            "asNeededBoolean": False,
+                            "doseAndRate": [
+                                {
+                                    "type": cc(
+                                        "http://terminology.hl7.org/CodeSystem/dose-rate-type", "ordered", "Ordered"
+                                    ),
+                                    "doseQuantity": {"value": 1},
+                                }
+                            ],
+                        }
+                    ],
+                }
+            )
+        if rng.random() < 0.4:
+            code, display = rng.choice(VACCINES)
+            resources.append(
+                {
+                    "resourceType": "Immunization",
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "status": "completed",
+                    "vaccineCode": cc(CVX, code, display),
+                    "patient": ref(patient),
+                    "encounter": ref(encounter),
+                    "occurrenceDateTime": start,
+                    "primarySource": True,
+                }
+            )
+        if rng.random() < 0.3:
+            resources.append(
+                {
+                    "resourceType": "Procedure",
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "status": "completed",
+                    "code": cc(SNOMED, "430193006", "Medication Reconciliation (procedure)"),
+                    "subject": ref(patient),
+                    "encounter": ref(encounter),
+                    "performedPeriod": {"start": start, "end": end},
+                    "location": {"display": "Example Hospital"},
+                }
+            )
+    resources.append(
+        {
+            "resourceType": "AllergyIntolerance",
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "clinicalStatus": cc(
+                "http://terminology.hl7.org/CodeSystem/allergyintolerance-clinical", "active", "Active"
+            ),
+            "verificationStatus": cc(
+                "http://terminology.hl7.org/CodeSystem/allergyintolerance-verification", "confirmed", "Confirmed"
+            ),
+            "type": rng.choice(["allergy", "intolerance"]),
+            "category": ["food"],
+            "criticality": "low",
+            "code": cc(SNOMED, "91935009", "Allergy to peanuts"),
+            "patient": ref(patient),
+            "recordedDate": "2015-01-01T09:00:00-05:00",
+            "reaction": [{"manifestation": [cc(SNOMED, "271807003", "Eruption of skin")], "severity": "mild"}],
+        }
+    )
+    resources.append(
+        {
+            "resourceType": "CarePlan",
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "status": "active",
+            "intent": "order",
+            "category": [cc(SNOMED, "698360004", "Diabetes self management plan")],
+            "subject": ref(patient),
+            "period": {"start": "2015-01-01T09:00:00-05:00"},
+            "activity": [
+                {
+                    "detail": {
+                        "code": cc(SNOMED, "160670007", "Diabetic diet"),
+                        "status": "in-progress",
+                        "location": {"display": "Example Hospital"},
+                    }
+                }
+            ],
+        }
+    )
+    return resources
+
+
+def bench(label, engine, corpus):
+    engine.transform(corpus[0]["resourceType"], corpus[0])  # warm-up
+    for resource in corpus:
+        engine.transform(resource["resourceType"], resource)
+    start = time.perf_counter()
+    outputs = [engine.transform(resource["resourceType"], resource) for resource in corpus]
+    elapsed = time.perf_counter() - start
+    print(f"{label:>12}: {elapsed / len(corpus) * 1e6:8.1f} us/resource ({len(corpus)} resources, {elapsed:.2f} s)")
+    return outputs, elapsed
+
+
+rng = random.Random(SEED)
+corpus = [resource for _ in range(BUNDLES) for resource in synthea_bundle(rng)]
+print("corpus:", ", ".join(f"{n} {t}" for t, n in Counter(r["resourceType"] for r in corpus).most_common()))
+
+reference, before = bench("interpreter", _Interpreter(), corpus)
+compiled, after = bench("compiled", _Engine(), corpus)
+for resource, expected, actual in zip(corpus, reference, compiled):
+    assert actual == expected, f"{resource['resourceType']}/{resource['id']}: compiled output differs"
+print(f"identical output for {len(corpus)} resources; speedup: {before / after:.1f}x")
@@ -0,0 +1,84 @@
+"""Benchmark the cold path of the R4 -> R5 engine: how long a freshly started process takes to
+set up Django and serve its first (and second) R4 conversion, with and without the prebuilt
+cross-version index (manage.py build_cross_version_index) and the startup warm-up
+(FHIR_XVER_WARM_UP). Each configuration runs in new Python processes, like a gunicorn worker
+booting on a machine that was just started.
+
+Run locally (with the usual DB_*/SECRET_KEY environment; no database is touched):
+
+    python manage.py build_cross_version_index
+    python scripts/bench_cross_version_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, os, time
+start = time.perf_counter()
+import django
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jhe.settings")
+django.setup()
+setup = time.perf_counter() - start
+
+from core.fhir.cross_version import transform_to_r5
+
+observation = {
+    "resourceType": "Observation",
+    "status": "final",
+    "code": {"coding": [{"system": "http://loinc.org", "code": "8867-4"}]},
+    "subject": {"reference": "Patient/p1"},
+    "effectiveDateTime": "2023-01-15T10:30:00Z",
+    "valueQuantity": {"value": 72, "unit": "/min", "system": "http://unitsofmeasure.org", "code": "/min"},
+}
+timings = [setup]
+for resource_type, body in (("Observation", observation), ("Patient", {"resourceType": "Patient", "gender": "male"})):
+    start = time.perf_counter()
+    transform_to_r5(resource_type, body)
+    timings.append(time.perf_counter() - start)
+print(json.dumps(timings))
+"""
+
+
+def run(env_overrides, runs):
+    env = {**os.environ, **env_overrides}
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD], cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return [statistics.median(column) for column in zip(*samples)]
+
+
+def main(runs):
+    index = os.environ.get("FHIR_XVER_INDEX_PATH", str(BASE_DIR / "data" / "fhir" / "cross-version-index.marshal"))
+    if not Path(index).exists():
+        raise SystemExit(f"No index at {index}; run: python manage.py build_cross_version_index")
+    with tempfile.TemporaryDirectory() as empty:
+        configurations = [
+            ("no index", {"FHIR_XVER_INDEX_PATH": os.path.join(empty, "missing"), "FHIR_XVER_WARM_UP": "false"}),
+            ("prebuilt index", {"FHIR_XVER_INDEX_PATH": index, "FHIR_XVER_WARM_UP": "false"}),
+            ("index + warm-up", {"FHIR_XVER_INDEX_PATH": index, "FHIR_XVER_WARM_UP": "true"}),
+        ]
+        print(f"{'configuration':<18}{'setup ms':>10}{'1st Observation ms':>20}{'1st Patient ms':>16}{'total ms':>10}")
+        for label, env in configurations:
+            setup, first, second = run(env, runs)
+            print(
+                f"{label:<18}{setup * 1000:>10.0f}{first * 1000:>20.1f}{second * 1000:>16.1f}"
+                f"{(setup + first + second) * 1000:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="processes per configuration (median is reported)")
+    main(parser.parse_args().runs)
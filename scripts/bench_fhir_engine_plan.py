@@ -0,0 +1,52 @@
+"""Benchmark FHIR rendering of the mapped resources: the reference interpreter (render_resource,
+which re-walks the fhir_config.json mapping on every instance) against the compiled plans that
+build_fhir_resource now uses (core.fhir.engine.get_compiled_plan).
+
+One instance of each mapped resource type is read from the local database; types with no rows
+are skipped. The two renderings of every instance must be identical; the script stops with an
+AssertionError on the first difference. Timings are per instance, best of REPEAT runs.
+
+Run locally: python manage.py shell < scripts/bench_fhir_engine_plan.py
+"""
+
+import time
+
+from django.apps import apps
+
+from core.fhir.config import get_resource_mapping, mapped_model_name
+from core.fhir.engine import get_compiled_plan, render_resource
+
+MAPPED_TYPES = ["Device", "Group", "Observation", "Organization", "Patient", "Practitioner"]
+ROUNDS = 200
+REPEAT = 5
+
+
+def best_of(render, instance):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            render(instance)
+        best = min(best, time.perf_counter() - start)
+    return best / ROUNDS
+
+
+total_interpreted = total_compiled = 0.0
+for resource_type in MAPPED_TYPES:
+    instance = apps.get_model("core", mapped_model_name(resource_type)).objects.first()
+    if instance is None:
+        print(f"{resource_type:>13}: no rows, skipped")
+        continue
+    mapping = get_resource_mapping(resource_type)
+    source_model = instance._meta.object_name
+    plan = get_compiled_plan(mapping, source_model)
+    assert plan(instance) == render_resource(instance, source_model, mapping), (
+        f"{resource_type}/{instance.pk}: compiled output differs"
+    )
+    interpreted = best_of(lambda obj: render_resource(obj, source_model, mapping), instance)
+    compiled = best_of(plan, instance)
+    total_interpreted += interpreted
+    total_compiled += compiled
+    print(f"{resource_type:>13}: interpreter {interpreted * 1e6:8.1f} us  plan {compiled * 1e6:8.1f} us")
+if total_compiled:
+    print(f"identical output; speedup: {total_interpreted / total_compiled:.1f}x")
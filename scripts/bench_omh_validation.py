@@ -0,0 +1,61 @@
+"""Benchmark per-observation OMH validation cost: the legacy per-save path (re-read the header
+and body schemas, rebuild the referencing registry, re-run check_schema) against the cached
+compiled validators that Observation.clean() now uses (core.utils.get_schema_validator).
+
+Run locally: python manage.py shell < scripts/bench_omh_validation.py
+"""
+
+import json
+import time
+
+from django.conf import settings
+from jsonschema import validators
+from referencing import Registry
+
+from core.utils import (
+    NoNetwork,
+    build_schema_registry,
+    clear_schema_validator_cache,
+    get_schema_validator,
+    omh_body_schema_path,
+)
+
+CODING_CODE = "omh:blood-glucose:4.0"
+ITERATIONS = 200
+
+header_path = settings.DATA_DIR_PATH.schemas_metadata / "header-1.0.json"
+body_path = omh_body_schema_path(CODING_CODE)
+example = json.loads(
+    (
+        settings.DATA_DIR_PATH.examples_data_point / (CODING_CODE.replace(":", "_").replace(".", "-") + ".json")
+    ).read_text()
+)
+
+
+def legacy_validate(instance, path):
+    schema = json.loads(path.read_text())
+    Validator = validators.validator_for(schema)
+    Validator.check_schema(schema)
+    registry = build_schema_registry().combine(Registry(retrieve=NoNetwork()))
+    Validator(schema, registry=registry).validate(instance)
+
+
+def cached_validate(instance, path):
+    get_schema_validator(path).validate(instance)
+
+
+def bench(label, validate):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        validate(example["header"], header_path)
+        validate(example["body"], body_path)
+    per_observation = (time.perf_counter() - start) / ITERATIONS
+    print(f"{label:>8}: {per_observation * 1000:8.3f} ms/observation ({ITERATIONS} observations)")
+    return per_observation
+
+
+clear_schema_validator_cache()
+before = bench("legacy", legacy_validate)
+cached_validate(example["header"], header_path)  # warm the cache once, as the first save would
+after = bench("cached", cached_validate)
+print(f" speedup: {before / after:8.1f}x")
@@ -0,0 +1,107 @@
+"""Load test: concurrent MCP-style read traffic against a running JHE, to compare the WSGI and
+ASGI deployments (scripts/start_server.bash) on throughput and tail latency.
+
+Each virtual client loops over the calls the MCP server's tools make on a user's behalf --
+study listing, a study's patients, Observation counts and pages for a patient -- plus, with
+--wearable-status, the patient wearable-status check that waits on Open Wearables. Start the
+server in one mode, run the script, restart in the other mode and run it again:
+
+    JHE_SERVER=wsgi bash scripts/start_server.bash      # then JHE_SERVER=asgi
+    python scripts/load_test_asgi.py --base-url http://localhost:8000 --token <access token> \\
+        --concurrency 32 --duration 30 [--wearable-status]
+
+The token is a practitioner's OAuth access token that can see at least one study with a patient.
+Prints requests/s, errors and p50/p95/p99 latency per call and overall. Needs only httpx.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def discover(client):
+    """(study_id, patient_id) of the first study that has a patient."""
+    studies = (await client.get("/api/v1/studies")).raise_for_status().json()["results"]
+    for study in studies:
+        patients = (await client.get(f"/api/v1/studies/{study['id']}/patients")).raise_for_status().json()
+        if patients["results"]:
+            return study["id"], patients["results"][0]["id"]
+    raise SystemExit("No study with a patient is visible to this token.")
+
+
+def calls(study_id, patient_id, wearable_status):
+    mix = [
+        ("studies.count", "/api/v1/studies", {"page_size": 1}),
+        ("studies.list", "/api/v1/studies", None),
+        ("study.patients", f"/api/v1/studies/{study_id}/patients", None),
+        ("observations.count", "/FHIR/R5/Observation", {"patient": patient_id, "_summary": "count"}),
+        ("observations.page", "/FHIR/R5/Observation", {"patient": patient_id, "_count": 100}),
+    ]
+    if wearable_status:
+        mix.append(("patient.wearable_status", f"/api/v1/patients/{patient_id}/wearable-status", None))
+    return mix
+
+
+async def worker(client, mix, deadline, latencies, errors):
+    while time.monotonic() < deadline:
+        for name, path, params in mix:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, params=params)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies[name].append(time.perf_counter() - start)
+            if failed:
+                errors[name] += 1
+
+
+def report(latencies, errors, elapsed):
+    print(f"{'call':<26}{'requests':>10}{'req/s':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = sorted(latencies.items())
+    rows.append(("TOTAL", [s for samples in latencies.values() for s in samples]))
+    for name, samples in rows:
+        failed = sum(errors.values()) if name == "TOTAL" else errors[name]
+        print(
+            f"{name:<26}{len(samples):>10}{len(samples) / elapsed:>9.1f}{failed:>8}"
+            f"{statistics.median(samples) * 1000:>9.1f}{percentile(samples, 0.95) * 1000:>9.1f}"
+            f"{percentile(samples, 0.99) * 1000:>9.1f}"
+        )
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url.rstrip("/"),
+        headers={"Authorization": f"Bearer {args.token}"},
+        timeout=args.timeout,
+        limits=limits,
+    ) as client:
+        mix = calls(*await discover(client), args.wearable_status)
+        # An untimed warm-up round so first-request imports and connection setup stay out of p99.
+        await asyncio.gather(*(client.get(path, params=params) for _ in range(4) for _, path, params in mix))
+        latencies, errors = defaultdict(list), defaultdict(int)
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(*(worker(client, mix, deadline, latencies, errors) for _ in range(args.concurrency)))
+        report(latencies, errors, time.monotonic() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="practitioner OAuth access token")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent virtual MCP clients")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--wearable-status", action="store_true", help="include the OW wearable-status call")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,23 @@
+#!/usr/bin/env bash
+# Production web server (the Dockerfile CMD).
+#   JHE_SERVER=wsgi (default)  gunicorn sync workers on jhe.wsgi
+#   JHE_SERVER=asgi            uvicorn workers on jhe.asgi -- async FHIR reads and Open Wearables
+#                              proxy calls (core/views/async_api.py) no longer pin a worker each
+# WEB_CONCURRENCY sets the number of worker processes in both modes.
+set -euo pipefail
+cd "$(dirname "${BASH_SOURCE[0]}")/.."
+
+workers="${WEB_CONCURRENCY:-2}"
+case "${JHE_SERVER:-wsgi}" in
+  asgi)
+    # Django implements no ASGI lifespan events.
+    exec uvicorn jhe.asgi:application --host 0.0.0.0 --port 8000 --workers "$workers" --lifespan off
+    ;;
+  wsgi)
+    exec gunicorn --bind :8000 --workers "$workers" jhe.wsgi
+    ;;
+  *)
+    echo "JHE_SERVER must be 'wsgi' or 'asgi', got '${JHE_SERVER}'" >&2
+    exit 1
+    ;;
+esac
@@ -0,0 +1,92 @@
+"""Async dispatch of the read paths (core/views/async_api.py)."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.test import AsyncClient
+from django.urls import resolve
+from django.utils import timezone
+from oauth2_provider.models import AccessToken
+
+from .utils import Code, add_observations
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/FHIR/R5/Observation",
+        "/FHIR/R5/Observation/1",
+        "/api/v1/patients",
+        "/api/v1/patients/1/wearable-status",
+        "/api/v1/observations",
+        "/api/v1/studies",
+        "/api/v1/organizations",
+        "/api/v1/ow/users",
+        "/api/v1/ow/sync/00000000-0000-0000-0000-000000000000",
+    ],
+)
+def test_read_paths_are_async_views(path):
+    assert iscoroutinefunction(resolve(path).func)
+
+
+@pytest.fixture
+def asgi_get(user):
+    # A real bearer token: the async client runs the full ASGI handler + DRF authentication.
+    token = AccessToken.objects.create(
+        user=user, token="async-views-test-token", expires=timezone.now() + timedelta(hours=1), scope="openid"
+    )
+
+    def get(path, params=None):
+        return async_to_sync(AsyncClient().get)(path, params, headers={"Authorization": f"Bearer {token.token}"})
+
+    return get
+
+
+def test_fhir_search_and_read_over_asgi(asgi_get, patient, hr_study):
+    add_observations(patient=patient, code=Code.HeartRate, n=3)
+
+    bundle = asgi_get("/FHIR/R5/Observation", {"patient": patient.id}).json()
+    assert bundle["total"] == 3
+    observation_id = bundle["entry"][0]["resource"]["id"]
+
+    count = asgi_get("/FHIR/R5/Observation", {"_summary": "count"}).json()
+    assert (count["total"], count["entry"]) == (3, [])
+
+    read = asgi_get(f"/FHIR/R5/Observation/{observation_id}")
+    assert read.status_code == 200
+    assert read.json()["id"] == observation_id
+
+    missing = asgi_get("/FHIR/R5/Observation/999999999")
+    assert missing.status_code == 404
+    assert missing.json()["resourceType"] == "OperationOutcome"
+
+
+def test_sync_handlers_still_run_under_async_dispatch(asgi_get, organization):
+    response = asgi_get("/api/v1/organizations", {"page_size": 5})
+    assert response.status_code == 200
+    assert [org["id"] for org in response.json()["results"]] == [organization.id]
+
+    anonymous = async_to_sync(AsyncClient().get)("/FHIR/R5/Observation")
+    assert anonymous.status_code == 401
+
+
+@patch("core.views.patient.ow_api.request", new_callable=AsyncMock)
+def test_wearable_status_awaits_ow(mock_request, api_client, patient):
+    patient.jhe_user.identifier = "ow:abc"
+    patient.jhe_user.save(update_fields=["identifier"])
+    ow_response = MagicMock(status_code=200)
+    ow_response.json.return_value = [{"provider": "oura"}]
+    mock_request.return_value = ow_response
+
+    with patch("core.views.patient.ow_api.api_config", return_value=("https://ow.example.com", "key")):
+        data = api_client.get(f"/api/v1/patients/{patient.id}/wearable-status").json()
+    assert data == {"connections": [{"provider": "oura"}], "connected": True}
+    mock_request.assert_awaited_once_with("GET", "https://ow.example.com", "key", "/api/v1/users/abc/connections")
+
+    mock_request.side_effect = httpx.ConnectError("refused")
+    with patch("core.views.patient.ow_api.api_config", return_value=("https://ow.example.com", "key")):
+        data = api_client.get(f"/api/v1/patients/{patient.id}/wearable-status").json()
+    assert data["error"] == "OW unreachable"
@@ -0,0 +1,62 @@
+"""Request-scoped memoization of FHIR user resolution and authorization (core/fhir/scope.py)."""
+
+import pytest
+from django.core.exceptions import PermissionDenied
+from django.test import RequestFactory
+
+from core.fhir.scope import auth_context, authorize_practitioner_scope, current_auth_context, resolve_fhir_user
+from core.middleware import AuthContextMiddleware
+from core.models import FhirAuxResource, Observation, Organization, PractitionerOrganization
+
+
+def test_middleware_installs_a_context_per_request():
+    rf = RequestFactory()
+    middleware = AuthContextMiddleware(lambda request: current_auth_context())
+    first = middleware(rf.get("/"))
+    assert first is not None
+    assert middleware(rf.get("/")) is not first
+    assert current_auth_context() is None
+
+
+def test_user_and_patient_profile_are_memoized(user, patient, django_assert_num_queries):
+    with auth_context():
+        with django_assert_num_queries(2):
+            assert resolve_fhir_user(user.id) is resolve_fhir_user(str(user.id))
+            assert patient.jhe_user.get_patient() is patient.jhe_user.get_patient()
+    # Outside a request nothing is memoized.
+    with django_assert_num_queries(2):
+        resolve_fhir_user(user.id)
+        resolve_fhir_user(user.id)
+
+
+def test_authorized_scopes_are_memoized(user, patient, organization, hr_study, django_assert_num_queries):
+    with auth_context():
+        with django_assert_num_queries(3):
+            authorize_practitioner_scope(user.id, organization.id, hr_study.id, patient.id)
+        with django_assert_num_queries(0):
+            authorize_practitioner_scope(user.id, organization.id, hr_study.id, patient.id)
+            authorize_practitioner_scope(str(user.id), str(organization.id), str(hr_study.id), str(patient.id))
+
+        # A mapped + aux search over the same scope resolves the user once and re-authorizes nothing.
+        with django_assert_num_queries(1):
+            scope = {"organization_id": organization.id, "study_id": hr_study.id, "patient_id": patient.id}
+            Observation.fhir_search(user.id, **scope)
+            FhirAuxResource.fhir_search(user.id, "Condition", **scope)
+
+
+def test_denials_are_not_memoized_and_membership_changes_reset(user, organization):
+    other = Organization.objects.create(name="Other Org", type="other")
+    with auth_context():
+        authorize_practitioner_scope(user.id, organization.id)
+        for _ in range(2):
+            with pytest.raises(PermissionDenied):
+                authorize_practitioner_scope(user.id, other.id)
+
+        PractitionerOrganization.objects.create(practitioner=user.practitioner, organization=other)
+        authorize_practitioner_scope(user.id, other.id)
+        assert current_auth_context().authorized
+
+        PractitionerOrganization.objects.filter(organization=other).delete()
+        assert not current_auth_context().authorized
+        with pytest.raises(PermissionDenied):
+            authorize_practitioner_scope(user.id, other.id)
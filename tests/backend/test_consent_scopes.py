@@ -0,0 +1,82 @@
+"""Consented-scope sets for ingest authorization (``Patient.consented_scope_ids``)."""
+
+import io
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from core.models import CodeableConcept, Patient, StudyPatient, StudyPatientScopeConsent, StudyScopeRequest
+
+from .utils import Code
+
+
+def _hr():
+    return CodeableConcept.objects.get(coding_code=Code.HeartRate.value)
+
+
+def test_scope_ids_are_memoized_per_instance(patient, hr_study, django_assert_num_queries):
+    hr = _hr()
+    with django_assert_num_queries(1):
+        assert patient.consented_scope_ids() == {hr.pk}
+        patient.consented_scope_ids()
+    # A fresh instance (the next request, in any server process) reads the database again.
+    fresh = Patient.objects.get(pk=patient.pk)
+    with django_assert_num_queries(1):
+        assert fresh.consented_scope_ids() == patient.consented_scope_ids()
+
+
+def test_revoking_consent_applies_to_the_next_instance(patient, hr_study):
+    hr = _hr()
+    assert hr.pk in Patient.objects.get(pk=patient.pk).consented_scope_ids()
+
+    consent = StudyPatientScopeConsent.objects.get(study_patient__patient=patient, scope_code=hr)
+    consent.consented = False
+    consent.save()
+    assert hr.pk not in Patient.objects.get(pk=patient.pk).consented_scope_ids()
+
+
+def test_leaving_the_study_drops_its_scopes(patient, hr_study):
+    assert Patient.objects.get(pk=patient.pk).consented_scope_ids()
+    StudyPatient.objects.filter(study=hr_study, patient=patient).delete()
+    assert Patient.objects.get(pk=patient.pk).consented_scope_ids() == frozenset()
+
+
+@pytest.fixture
+def shared_cache(settings):
+    # The cross-request tier is only used with a cache shared by the server processes.
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "test_jhe_cache"}
+    }
+    call_command("createcachetable", stdout=io.StringIO())
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_shared_cache_serves_later_instances(patient, hr_study, shared_cache, django_assert_num_queries):
+    hr = _hr()
+    assert Patient.objects.get(pk=patient.pk).consented_scope_ids() == {hr.pk}
+    fresh = Patient.objects.get(pk=patient.pk)
+    with django_assert_num_queries(1):  # the cache read; no consent query
+        assert fresh.consented_scope_ids() == {hr.pk}
+
+
+def test_revoking_consent_invalidates_the_cached_set(patient, hr_study, shared_cache):
+    hr = _hr()
+    assert hr.pk in Patient.objects.get(pk=patient.pk).consented_scope_ids()
+
+    consent = StudyPatientScopeConsent.objects.get(study_patient__patient=patient, scope_code=hr)
+    consent.consented = False
+    consent.save()
+    assert hr.pk not in Patient.objects.get(pk=patient.pk).consented_scope_ids()
+
+
+def test_enrollment_and_scope_changes_invalidate_the_cached_set(patient, hr_study, shared_cache):
+    assert Patient.objects.get(pk=patient.pk).consented_scope_ids()
+    StudyScopeRequest.objects.filter(study=hr_study).first().save()
+    assert cache.get(f"patient_consented_scopes:{patient.pk}") is None
+
+    assert Patient.objects.get(pk=patient.pk).consented_scope_ids()
+    StudyPatient.objects.filter(study=hr_study, patient=patient).delete()
+    assert Patient.objects.get(pk=patient.pk).consented_scope_ids() == frozenset()
@@ -0,0 +1,69 @@
+"""Config-derived Postgres indexes for the FhirAuxResource search params (core/fhir/aux_indexes.py).
+
+The migration builds them for the shipped config; the query builder must phrase its predicates so
+the planner can use them (checked with EXPLAIN, sequential scans disabled).
+"""
+
+import io
+import json
+
+from django.core.management import call_command
+from django.db import connection
+
+from core.fhir.aux_indexes import GIN_INDEX_NAME, aux_index_definitions
+from core.fhir.search import _aux_param_sql, _containment_document
+from core.models import FhirAuxResource
+
+
+def _existing_indexes():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'core_fhirauxresource'")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _plan(queryset):
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+def test_migration_creates_config_indexes(db):
+    names = {name for name, _, _ in aux_index_definitions()}
+    assert GIN_INDEX_NAME in names
+    assert names <= _existing_indexes()
+
+
+def test_command_drops_and_recreates(db):
+    call_command("fhir_aux_indexes", "--drop", stdout=io.StringIO())
+    assert GIN_INDEX_NAME not in _existing_indexes()
+    call_command("fhir_aux_indexes", stdout=io.StringIO())
+    assert {name for name, _, _ in aux_index_definitions()} <= _existing_indexes()
+
+
+def test_token_predicates_use_containment():
+    assert _containment_document("Encounter", "type.coding", {"code": "x"}) == {"type": [{"coding": [{"code": "x"}]}]}
+    assert _containment_document("Condition", "code.coding", {"code": "x"}) == {"code": {"coding": [{"code": "x"}]}}
+    assert _containment_document("Condition", "status", "active") is None  # not an R5 Condition element
+
+    sql, params = _aux_param_sql(
+        "Condition", {"type": "token", "path": "clinicalStatus.coding"}, ["http://terminology.hl7.org|active"]
+    )
+    assert "@>" in sql and "jsonb_path_exists" not in sql
+    assert json.loads(params[0]) == {
+        "clinicalStatus": {"coding": [{"code": "active", "system": "http://terminology.hl7.org"}]}
+    }
+
+
+def test_token_search_plan_uses_gin(db):
+    sql, params = _aux_param_sql("Condition", {"type": "token", "path": "code.coding"}, ["http://snomed.info/sct|1"])
+    # No resource_type filter: on an empty table the partial date indexes would otherwise win.
+    queryset = FhirAuxResource.objects.extra(where=[sql], params=params)
+    assert GIN_INDEX_NAME in _plan(queryset)
+
+
+def test_date_search_plan_uses_expression_index(db):
+    sql, params = _aux_param_sql("Condition", {"type": "date", "path": ["recordedDate"]}, ["ge2024-01-01"])
+    queryset = FhirAuxResource.objects.filter(resource_type="Condition").extra(where=[sql], params=params)
+    plan = _plan(queryset)
+    condition_indexes = {name for name, _, _ in aux_index_definitions() if name.startswith("fhiraux_condition_")}
+    assert any(name in plan for name in condition_indexes), plan
@@ -0,0 +1,124 @@
+"""Token-side search index for aux resources (core/fhir/search_index.py, FhirAuxSearchIndex).
+
+The index is maintained on every save and answers aux search params with ``EXISTS`` lookups; the
+JSONB builder stays behind the ``fhir.aux_search_index`` setting and must agree with it.
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+from django.core.management import call_command
+
+import core.fhir.search as fhir_search
+from core.fhir.search_index import date_range, extract_index_values
+from core.models import FhirAuxResource, FhirAuxSearchIndex, FhirSource
+
+_CLINICAL = "http://terminology.hl7.org/CodeSystem/condition-clinical"
+
+
+@pytest.fixture
+def fhir_source(patient, device):
+    return FhirSource.objects.create(patient=patient, data_source=device, fhir_base_url="https://ehr.example/fhir")
+
+
+def _condition(patient, code="active", **extra):
+    return {
+        "resourceType": "Condition",
+        "subject": {"reference": f"Patient/{patient.id}"},
+        "clinicalStatus": {"coding": [{"system": _CLINICAL, "code": code}]},
+        **extra,
+    }
+
+
+def _create(fhir_source, body):
+    return FhirAuxResource.objects.create(resource_type=body["resourceType"], fhir_source=fhir_source, fhir_data=body)
+
+
+def _ids(bundle):
+    return {entry["resource"]["id"] for entry in bundle.get("entry", [])}
+
+
+def test_extract_index_values_per_param_type(patient):
+    rows = extract_index_values(
+        "Condition",
+        _condition(patient, recordedDate="2021-06", encounter={"reference": "https://x.example/Encounter/e1"}),
+    )
+    by_param = {}
+    for row in rows:
+        by_param.setdefault(row["param"], []).append(row)
+
+    assert by_param["clinical-status"] == [{"param": "clinical-status", "system": _CLINICAL, "value": "active"}]
+    assert by_param["encounter"] == [{"param": "encounter", "system": "https://x.example/Encounter", "value": "e1"}]
+    [recorded] = by_param["recorded-date"]
+    assert recorded["date_low"] == datetime(2021, 6, 1, tzinfo=UTC)
+    assert recorded["date_high"].date().isoformat() == "2021-06-30"
+
+    [name] = [row for row in extract_index_values("Location", {"name": "North Clinic"}) if row["param"] == "name"]
+    assert name["value"] == "north clinic"
+
+
+def test_date_range_precision():
+    assert date_range("2020") == (datetime(2020, 1, 1, tzinfo=UTC), datetime(2020, 12, 31, 23, 59, 59, 999999, UTC))
+    low, high = date_range("2020-02-29T10:00:00+02:00")
+    assert low.isoformat() == "2020-02-29T10:00:00+02:00" and (high - low).total_seconds() < 1
+    assert date_range("not a date") is None
+
+
+def test_index_follows_save_and_delete(fhir_source, patient):
+    resource = _create(fhir_source, _condition(patient))
+    assert resource.search_index.filter(param="clinical-status", value="active").exists()
+
+    resource.fhir_data = _condition(patient, code="inactive")
+    resource.save()
+    assert set(resource.search_index.filter(param="clinical-status").values_list("value", flat=True)) == {"inactive"}
+
+    resource.delete()
+    assert not FhirAuxSearchIndex.objects.exists()
+
+
+@pytest.mark.parametrize("use_index", [True, False])
+def test_index_and_jsonb_searches_agree(api_client, fhir_source, patient, monkeypatch, use_index):
+    monkeypatch.setattr(fhir_search, "get_setting", lambda key, default=None: use_index)
+    encounter = {"reference": "Encounter/e1"}
+    active = _create(fhir_source, _condition(patient, recordedDate="2021-06-15", encounter=encounter)).id
+    inactive = _create(fhir_source, _condition(patient, code="inactive", recordedDate="2022-01-01")).id
+
+    def search(**params):
+        return _ids(api_client.get("/FHIR/R5/Condition", params).json())
+
+    assert search(**{"clinical-status": f"{_CLINICAL}|active"}) == {str(active)}
+    assert search(**{"clinical-status": "active,inactive"}) == {str(active), str(inactive)}
+    assert search(encounter="Encounter/e1") == search(encounter="e1") == {str(active)}
+    assert search(**{"recorded-date": "ge2022-01-01"}) == {str(inactive)}
+    assert search(**{"recorded-date": "2021-06-15"}) == {str(active)}
+
+
+def test_date_search_uses_ranges(api_client, fhir_source, patient):
+    month = _create(fhir_source, _condition(patient, recordedDate="2021-06")).id
+    instant = _create(fhir_source, _condition(patient, recordedDate="2021-06-15T12:00:00Z")).id
+
+    def search(value):
+        return _ids(api_client.get("/FHIR/R5/Condition", {"recorded-date": value}).json())
+
+    # A whole-month value ends after the 15th, so only the instant lies inside that day.
+    assert search("2021-06-15") == {str(instant)}
+    assert search("2021-06") == {str(month), str(instant)}
+    assert search("gt2021-06-15") == {str(month)}
+    assert search("lt2021-06-01") == set()
+    assert api_client.get("/FHIR/R5/Condition", {"recorded-date": "ge2021-13"}).status_code == 400
+
+
+def test_index_filter_is_exists_subquery(api_client, fhir_source, patient, rf):
+    request = rf.get("/FHIR/R5/Condition", {"clinical-status": "active"})
+    queryset = fhir_search.apply_search_params(FhirAuxResource.objects.all(), "Condition", request, "aux")
+    sql = str(queryset.query)
+    assert "EXISTS" in sql and "core_fhirauxsearchindex" in sql
+    assert "fhir_data @>" not in sql
+
+
+def test_rebuild_command(fhir_source, patient):
+    resource = _create(fhir_source, _condition(patient))
+    FhirAuxSearchIndex.objects.all().delete()
+
+    call_command("rebuild_fhir_aux_search_index", "--resource-type", "Condition", stdout=open("/dev/null", "w"))
+    assert resource.search_index.filter(param="clinical-status", value="active").exists()
@@ -0,0 +1,169 @@
+"""Tests for the FHIR Bulk Data ``$export`` operation (core/fhir/export.py, core/views/fhir_export.py).
+
+Jobs run inline (``JOBS_IN_BACKGROUND=False``) and write under a per-test directory, so a
+kick-off is immediately followed by a completed status manifest.
+"""
+
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.fhir.export import default_export_types
+from core.models import FhirAuxResource, FhirExportJob, FhirSource, JheUser, Organization
+
+from .utils import Code, add_observations, create_study
+
+
+@pytest.fixture(autouse=True)
+def export_settings(settings, tmp_path):
+    settings.FHIR_EXPORT_DIR = tmp_path
+    settings.JOBS_IN_BACKGROUND = False
+    return settings
+
+
+def _kick_off(client, path, **params):
+    r = client.get(path, params)
+    assert r.status_code == 202, r.content
+    status_url = r["Content-Location"]
+    assert "/FHIR/R5/$export-status/" in status_url
+    return status_url
+
+
+def _manifest(client, status_url):
+    r = client.get(status_url)
+    assert r.status_code == 200, r.content
+    return r.json()
+
+
+def _download(client, url):
+    r = client.get(url)
+    assert r.status_code == 200
+    assert r["Content-Type"] == "application/fhir+ndjson"
+    return [json.loads(line) for line in b"".join(r.streaming_content).decode().splitlines()]
+
+
+def test_group_export_writes_ndjson_manifest(api_client, hr_study, patient):
+    add_observations(patient=patient, code=Code.HeartRate, n=3)
+
+    status_url = _kick_off(api_client, f"/FHIR/R5/Group/{hr_study.id}/$export", _type="Observation,Patient")
+    manifest = _manifest(api_client, status_url)
+
+    assert manifest["requiresAccessToken"] is True
+    assert manifest["transactionTime"]
+    assert manifest["request"].endswith(f"Group/{hr_study.id}/$export?_type=Observation%2CPatient")
+    assert manifest["error"] == []
+    by_type = {item["type"]: item for item in manifest["output"]}
+    assert set(by_type) == {"Observation", "Patient"}
+    assert by_type["Observation"]["count"] == 3
+
+    observations = _download(api_client, by_type["Observation"]["url"])
+    assert len(observations) == 3
+    assert {o["resourceType"] for o in observations} == {"Observation"}
+    assert {o["subject"]["reference"] for o in observations} == {f"Patient/{patient.id}"}
+    patients = _download(api_client, by_type["Patient"]["url"])
+    assert [p["id"] for p in patients] == [str(patient.id)]
+
+
+def test_export_includes_aux_rows(api_client, hr_study, patient, device):
+    source = FhirSource.objects.create(patient=patient, data_source=device, fhir_base_url="https://ehr.example/fhir")
+    FhirAuxResource.objects.create(
+        resource_type="Condition",
+        fhir_source=source,
+        fhir_data={"resourceType": "Condition", "subject": {"reference": f"Patient/{patient.id}"}},
+    )
+
+    manifest = _manifest(api_client, _kick_off(api_client, "/FHIR/R5/Patient/$export", _type="Condition"))
+
+    [item] = manifest["output"]
+    assert item["type"] == "Condition"
+    [condition] = _download(api_client, item["url"])
+    assert condition["resourceType"] == "Condition"
+
+
+def test_export_since_and_empty_types(api_client, hr_study, patient):
+    add_observations(patient=patient, code=Code.HeartRate, n=2)
+    since = (timezone.now() + timedelta(minutes=5)).isoformat()
+
+    manifest = _manifest(api_client, _kick_off(api_client, "/FHIR/R5/$export", _type="Observation", _since=since))
+
+    # Nothing was updated after _since, so no file is listed (or left on disk).
+    assert manifest["output"] == []
+    job = FhirExportJob.objects.get()
+    assert job.since is not None
+    assert job.status == FhirExportJob.STATUS_COMPLETED
+
+
+def test_patient_export_default_types_skip_non_compartment():
+    types = default_export_types("patient")
+    assert "Observation" in types and "Patient" in types
+    assert not {"Device", "Group", "Organization", "Practitioner"} & set(types)
+    assert set(types) < set(default_export_types("system"))
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"_type": "NotAResource"}, {"_since": "yesterday"}, {"_outputFormat": "application/json"}],
+)
+def test_kick_off_rejects_bad_params(api_client, params):
+    r = api_client.get("/FHIR/R5/$export", params)
+    assert r.status_code == 400
+    assert r.json()["resourceType"] == "OperationOutcome"
+    assert not FhirExportJob.objects.exists()
+
+
+def test_group_export_requires_access(api_client):
+    other_org = Organization.objects.create(name="Other Org", type="other")
+    other_study = create_study(name="other", organization=other_org, codes=[Code.HeartRate])
+
+    r = api_client.get(f"/FHIR/R5/Group/{other_study.id}/$export")
+    assert r.status_code == 403
+    assert api_client.get("/FHIR/R5/Group/999999/$export").status_code in (403, 404)
+    assert not FhirExportJob.objects.exists()
+
+
+def test_status_in_progress_and_owner_only(api_client, user):
+    job = FhirExportJob.objects.create(jhe_user=user, level="system", request_url="http://testserver/FHIR/R5/$export")
+
+    r = api_client.get(f"/FHIR/R5/$export-status/{job.pk}")
+    assert r.status_code == 202
+    assert r["X-Progress"] == "accepted"
+
+    stranger = JheUser.objects.create_user(
+        email="stranger@example.org", password="unused", identifier="stranger", user_type="practitioner"
+    )
+    other_client = APIClient()
+    other_client.force_authenticate(stranger)
+    assert other_client.get(f"/FHIR/R5/$export-status/{job.pk}").status_code == 404
+
+
+def test_orphaned_job_reports_failed(api_client, user, settings, tmp_path):
+    job = FhirExportJob.objects.create(
+        jhe_user=user, level="system", request_url="http://testserver/FHIR/R5/$export", status="in-progress"
+    )
+    (tmp_path / str(job.pk)).mkdir()
+    (tmp_path / str(job.pk) / "Patient.ndjson").write_text("{}\n")
+    # No heartbeat for longer than JOB_STALE_SECONDS: the process running the job died.
+    silent_since = timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS + 1)
+    FhirExportJob.objects.filter(pk=job.pk).update(last_updated=silent_since)
+
+    r = api_client.get(f"/FHIR/R5/$export-status/{job.pk}")
+
+    assert r.status_code == 500
+    assert "stopped reporting progress" in r.json()["issue"][0]["diagnostics"]
+    assert not (tmp_path / str(job.pk)).exists()
+
+
+def test_delete_cancels_and_removes_output(api_client, hr_study, patient, tmp_path):
+    add_observations(patient=patient, code=Code.HeartRate, n=1)
+    status_url = _kick_off(api_client, "/FHIR/R5/$export", _type="Observation")
+    url = _manifest(api_client, status_url)["output"][0]["url"]
+    job = FhirExportJob.objects.get()
+    assert (tmp_path / str(job.pk) / "Observation.ndjson").is_file()
+
+    assert api_client.delete(status_url).status_code == 202
+    assert not (tmp_path / str(job.pk)).exists()
+    assert api_client.get(status_url).status_code == 404
+    assert api_client.get(url).status_code == 404
@@ -0,0 +1,36 @@
+"""The config-derived CapabilityStatement at ``FHIR/R5/metadata`` (core/fhir/capability.py)."""
+
+from core.fhir.config import supported_resource_types
+
+
+def _resource(statement, resource_type):
+    [entry] = [entry for entry in statement["rest"][0]["resource"] if entry["type"] == resource_type]
+    return entry
+
+
+def test_metadata_lists_supported_resources(api_client):
+    r = api_client.get("/FHIR/R5/metadata")
+    assert r.status_code == 200
+    statement = r.json()
+    assert statement["resourceType"] == "CapabilityStatement"
+    assert statement["fhirVersion"] == "5.0.0"
+    assert [entry["type"] for entry in statement["rest"][0]["resource"]] == supported_resource_types()
+
+
+def test_metadata_advertises_search_params(api_client):
+    statement = api_client.get("/FHIR/R5/metadata").json()
+
+    observation = _resource(statement, "Observation")
+    params = {param["name"]: param["type"] for param in observation["searchParam"]}
+    assert params["date"] == "date"
+    assert params["_lastUpdated"] == "date"
+    assert {"code": "search-type"} in observation["interaction"]
+
+    condition = {param["name"]: param["type"] for param in _resource(statement, "Condition")["searchParam"]}
+    assert condition["clinical-status"] == "token"
+    assert condition["encounter"] == "reference"
+
+
+def test_metadata_advertises_observation_operations(api_client):
+    observation = _resource(api_client.get("/FHIR/R5/metadata").json(), "Observation")
+    assert {op["name"] for op in observation["operation"]} == {"stats", "lastn"}
@@ -0,0 +1,74 @@
+"""Tests for opt-in keyset (``_cursor``) paging of FHIR searchset Bundles (core/fhir/pagination.py)."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import FhirAuxResource, FhirSource, Observation
+
+from .utils import Code, add_observations, fetch_paginated, get_link
+
+
+def test_cursor_pages_cover_every_row_once(api_client, hr_study, patient):
+    add_observations(patient=patient, code=Code.HeartRate, n=23)
+    # Identical timestamps: the id tie-breaker alone must keep pages disjoint.
+    Observation.objects.update(last_updated=timezone.now())
+
+    results = fetch_paginated(api_client, "/FHIR/R5/Observation", {"_cursor": "", "_count": 5, "_total": "accurate"})
+
+    ids = [int(entry["resource"]["id"]) for entry in results]
+    assert len(ids) == len(set(ids)) == 23
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_cursor_ascending_and_no_offset_or_count(api_client, hr_study, patient):
+    add_observations(patient=patient, code=Code.HeartRate, n=6)
+
+    r = api_client.get("/FHIR/R5/Observation", {"_cursor": "", "_count": 4, "_sort": "_lastUpdated"})
+    assert r.status_code == 200, r.text
+    first = r.json()
+    assert "total" not in first  # _total defaults to none in cursor mode
+    next_url = get_link(first, "next")
+    assert "_cursor=" in next_url
+
+    with CaptureQueriesContext(connection) as ctx:
+        second = api_client.get(next_url).json()
+    sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+    assert "OFFSET" not in sql
+    assert "COUNT(" not in sql
+
+    ids = [int(e["resource"]["id"]) for e in first["entry"] + second["entry"]]
+    assert ids == sorted(Observation.objects.values_list("id", flat=True))
+    assert get_link(second, "next") is None
+
+
+def test_cursor_total_estimate(api_client, hr_study, patient):
+    add_observations(patient=patient, code=Code.HeartRate, n=3)
+    r = api_client.get("/FHIR/R5/Observation", {"_cursor": "", "_total": "estimate"})
+    assert r.status_code == 200
+    assert isinstance(r.json()["total"], int)
+
+
+def test_cursor_on_aux_store(api_client, patient, device):
+    source = FhirSource.objects.create(patient=patient, data_source=device, fhir_base_url="https://ehr.example/fhir")
+    FhirAuxResource.objects.bulk_create(
+        FhirAuxResource(resource_type="Condition", fhir_source=source, fhir_data={"resourceType": "Condition"})
+        for _ in range(7)
+    )
+
+    results = fetch_paginated(api_client, "/FHIR/R5/Condition", {"_cursor": "", "_count": 3, "_total": "accurate"})
+
+    assert {e["resource"]["id"] for e in results} == {
+        str(pk) for pk in FhirAuxResource.objects.values_list("pk", flat=True)
+    }
+
+
+def test_cursor_rejects_bad_params(api_client, hr_study):
+    for params in (
+        {"_cursor": "not-a-cursor"},
+        {"_cursor": "", "_sort": "date"},
+        {"_cursor": "", "_total": "sometimes"},
+    ):
+        r = api_client.get("/FHIR/R5/Observation", params)
+        assert r.status_code == 400, params
+        assert r.json()["resourceType"] == "OperationOutcome"
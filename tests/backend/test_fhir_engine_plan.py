@@ -0,0 +1,46 @@
+"""Compiled mapping plans (core/fhir/engine.py) against the reference interpreter.
+
+For every mapped resource in fhir_config.json, the plan ``build_fhir_resource`` runs must render
+exactly what ``render_resource`` (which re-walks the mapping per instance) does. Their timings
+are compared by scripts/bench_fhir_engine_plan.py.
+"""
+
+import pytest
+from django.apps import apps
+
+from core.fhir.config import get_resource_mapping, mapped_model_name
+from core.fhir.engine import build_fhir_resource, compile_mapping, get_compiled_plan, render_resource
+from core.models import PatientIdentifier
+
+from .utils import Code, add_observations
+
+MAPPED_TYPES = ["Device", "Group", "Observation", "Organization", "Patient", "Practitioner"]
+
+
+@pytest.fixture
+def instances(user, hr_study, patient, device):
+    PatientIdentifier.objects.create(patient=patient, system="http://example.org/mrn", value="MRN-1")
+    add_observations(patient=patient, code=Code.HeartRate, n=1)
+    rows = {}
+    for resource_type in MAPPED_TYPES:
+        model = apps.get_model("core", mapped_model_name(resource_type))
+        rows[resource_type] = model.fhir_search(user.id).first() or model.objects.first()
+    return rows
+
+
+@pytest.mark.parametrize("resource_type", MAPPED_TYPES)
+def test_compiled_plan_matches_interpreter(instances, resource_type):
+    instance = instances[resource_type]
+    assert instance is not None
+    mapping = get_resource_mapping(resource_type)
+    expected = render_resource(instance, instance._meta.object_name, mapping)
+
+    assert compile_mapping(mapping, instance._meta.object_name)(instance) == expected
+    built = build_fhir_resource(instance, resource_type, mapping)
+    assert built == {**expected, "resourceType": resource_type, "id": str(instance.pk)}
+
+
+def test_compiled_plan_is_cached_per_mapping():
+    mapping = get_resource_mapping("Patient")
+    assert get_compiled_plan(mapping, "Patient") is get_compiled_plan(mapping, "Patient")
+    assert get_compiled_plan(dict(mapping), "Patient") is not get_compiled_plan(mapping, "Patient")
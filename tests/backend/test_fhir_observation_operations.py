@@ -0,0 +1,119 @@
+"""``Observation/$stats`` and ``Observation/$lastn`` (core/fhir/observation_stats.py)."""
+
+from copy import deepcopy
+
+import pytest
+
+from core.models import CodeableConcept, Observation, Organization, PractitionerOrganization
+from core.utils import generate_observation_value_attachment_data
+
+from .utils import Code, create_study
+
+
+def _add(patient, code, when, **values):
+    concept, _ = CodeableConcept.objects.get_or_create(
+        coding_system="https://w3id.org/openmhealth", coding_code=code.value, defaults={"text": code.value}
+    )
+    data = deepcopy(generate_observation_value_attachment_data(code.value))
+    data["body"]["effective_time_frame"] = {"date_time": when}
+    for key, value in values.items():
+        data["body"][key]["value"] = value
+    return Observation.objects.create(subject_patient=patient, codeable_concept=concept, omh_data=data)
+
+
+@pytest.fixture
+def series(patient):
+    _add(patient, Code.HeartRate, "2026-04-01T08:00:00+00:00", heart_rate=60)
+    _add(patient, Code.HeartRate, "2026-04-01T20:00:00+00:00", heart_rate=80)
+    _add(patient, Code.HeartRate, "2026-04-02T08:00:00+00:00", heart_rate=100)
+    _add(
+        patient,
+        Code.BloodPressure,
+        "2026-04-03T08:00:00+00:00",
+        systolic_blood_pressure=120,
+        diastolic_blood_pressure=80,
+    )
+
+
+def _parts(parameter):
+    return {part["name"]: part for part in parameter["part"]}
+
+
+def _statistics(response):
+    assert response.status_code == 200, response.content
+    body = response.json()
+    assert body["resourceType"] == "Parameters"
+    return {_parts(p)["code"]["valueCodeableConcept"]["coding"][0]["code"]: p for p in body["parameter"]}
+
+
+def test_stats_per_code_counts_range_and_measures(api_client, patient, series):
+    stats = _statistics(api_client.get("/FHIR/R5/Observation/$stats", {"patient": patient.id}))
+    assert set(stats) == {Code.HeartRate.value, Code.BloodPressure.value}
+
+    heart_rate = _parts(stats[Code.HeartRate.value])
+    assert heart_rate["count"]["valueInteger"] == 3
+    assert heart_rate["earliest"]["valueDateTime"].startswith("2026-04-01T08:00:00")
+    assert heart_rate["latest"]["valueDateTime"].startswith("2026-04-02T08:00:00")
+    measure = _parts(heart_rate["measure"])
+    assert measure["name"]["valueString"] == "heart_rate"
+    assert measure["unit"]["valueString"] == "beats/min"
+    assert measure["average"]["valueDecimal"] == 80
+    assert (measure["minimum"]["valueDecimal"], measure["maximum"]["valueDecimal"]) == (60, 100)
+
+    pressure = stats[Code.BloodPressure.value]
+    names = {_parts(p)["name"]["valueString"] for p in pressure["part"] if p["name"] == "measure"}
+    assert names == {"systolic_blood_pressure", "diastolic_blood_pressure"}
+
+
+def test_stats_day_buckets_and_date_window(api_client, patient, series):
+    params = {"patient": patient.id, "code": f"https://w3id.org/openmhealth|{Code.HeartRate.value}", "bucket": "day"}
+    [heart_rate] = _statistics(api_client.get("/FHIR/R5/Observation/$stats", params)).values()
+    buckets = [_parts(p) for p in _parts(heart_rate)["measure"]["part"] if p["name"] == "bucket"]
+    assert [b["start"]["valueDateTime"][:10] for b in buckets] == ["2026-04-01", "2026-04-02"]
+    assert [b["count"]["valueInteger"] for b in buckets] == [2, 1]
+    assert buckets[0]["average"]["valueDecimal"] == 70
+
+    windowed = _statistics(
+        api_client.get("/FHIR/R5/Observation/$stats", {"patient": patient.id, "date": "ge2026-04-02"})
+    )
+    assert _parts(windowed[Code.HeartRate.value])["count"]["valueInteger"] == 1
+
+
+def test_stats_count_each_observation_once(api_client, user, patient, series):
+    # A patient reachable through two of the practitioner's organizations is still one subject.
+    second = Organization.objects.create(name="Second Org", type="other")
+    PractitionerOrganization.objects.create(practitioner=user.practitioner, organization=second, role="member")
+    patient.organizations.add(second)
+
+    stats = _statistics(api_client.get("/FHIR/R5/Observation/$stats", {"patient": patient.id}))
+    assert _parts(stats[Code.HeartRate.value])["count"]["valueInteger"] == 3
+    lastn = api_client.get("/FHIR/R5/Observation/$lastn", {"patient": patient.id, "max": 5}).json()
+    assert len(lastn["entry"]) == 4
+
+
+def test_stats_rejects_bad_bucket(api_client, patient):
+    r = api_client.get("/FHIR/R5/Observation/$stats", {"patient": patient.id, "bucket": "week"})
+    assert r.status_code == 400
+    assert r.json()["resourceType"] == "OperationOutcome"
+
+
+def test_stats_requires_access(api_client):
+    other = create_study(name="other", organization=Organization.objects.create(name="Other"), codes=[])
+    r = api_client.get("/FHIR/R5/Observation/$stats", {"patient._has:Group:member:_id": other.id})
+    assert r.status_code == 403
+
+
+def test_lastn_returns_newest_per_code(api_client, patient, series):
+    r = api_client.get("/FHIR/R5/Observation/$lastn", {"patient": patient.id, "max": 2})
+    assert r.status_code == 200, r.content
+    bundle = r.json()
+    assert bundle["type"] == "searchset" and bundle["total"] == 3
+    times = [
+        (e["resource"]["code"]["coding"][0]["code"], e["resource"]["effectiveDateTime"][:16]) for e in bundle["entry"]
+    ]
+    assert times == [
+        (Code.BloodPressure.value, "2026-04-03T08:00"),
+        (Code.HeartRate.value, "2026-04-02T08:00"),
+        (Code.HeartRate.value, "2026-04-01T20:00"),
+    ]
+    assert api_client.get("/FHIR/R5/Observation/$lastn", {"max": 0}).status_code == 400
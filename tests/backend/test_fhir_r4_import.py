@@ -1,4 +1,4 @@
-"""Tests for R4 ingestion: the cross-version transform engine (core/fhir/xver) and the
+"""Tests for R4 ingestion: the cross-version transform engine (core/fhir/cross_version.py) and the
 /fhir-import/R4 endpoint (core/views/fhir_import.py).
 
 The engine converts an R4 body to R5 by interpreting the bundled HL7 ``*4to5`` FML StructureMaps;
@@ -6,13 +6,28 @@ the endpoint then reuses the normal create routing (mapped-vs-aux, R5 validation
 provenance). See fhir-r4-import.md (repo root).
 """
 
+import io
+import marshal
 import uuid
 
 import pytest
-
-from core.fhir.cross_version import XVerError, dropped_field_paths, transform_to_r5
+from django.core.management import call_command
+
+from core.fhir import cross_version_index, cross_version_type_index
+from core.fhir.cross_version import (
+    XVerError,
+    _Engine,
+    _Interpreter,
+    _plans_for,
+    dropped_field_paths,
+    transform_to_r5,
+    warm_up,
+)
+from core.fhir.cross_version_maps import get_maps
 from core.fhir.fhir_validation import validate_fhir_resource
-from core.models import FhirAuxResource, FhirSource
+from core.fhir.search_index import extract_index_values
+from core.models import FhirAuxResource, FhirAuxSearchIndex, FhirImportJob, FhirSource
+from core.services import fhir_import
 
 
 @pytest.fixture
@@ -97,6 +112,118 @@ def test_engine_unknown_resource_raises():
         transform_to_r5("NotAResource", {"resourceType": "NotAResource"})
 
 
+_CODED = {"coding": [{"system": "http://snomed.info/sct", "code": "91935009", "display": "Peanuts"}], "text": "Peanuts"}
+
+
+@pytest.mark.parametrize(
+    "r4",
+    [
+        {
+            "resourceType": "Encounter",
+            "status": "finished",
+            "class": {"system": "http://terminology.hl7.org/CodeSystem/v3-ActCode", "code": "AMB"},
+            "type": [_CODED],
+            "subject": {"reference": "Patient/p1"},
+            "participant": [{"type": [_CODED], "period": {"start": "2020-01-01T09:00:00Z"}}],
+            "period": {"start": "2020-01-01T09:00:00Z", "end": "2020-01-01T09:30:00Z"},
+        },
+        {
+            "resourceType": "AllergyIntolerance",  # ``type = 'allergy'`` condition
+            "type": "allergy",
+            "category": ["food"],
+            "code": _CODED,
+            "patient": {"reference": "Patient/p1"},
+            "reaction": [{"manifestation": [_CODED], "severity": "mild"}],
+        },
+        {
+            "resourceType": "MedicationRequest",
+            "status": "active",
+            "intent": "order",
+            "medicationCodeableConcept": _CODED,
+            "subject": {"reference": "Patient/p1"},
+            "dosageInstruction": [
+                {"timing": {"repeat": {"frequency": 1, "period": 1, "periodUnit": "d"}}, "asNeededBoolean": False}
+            ],
+        },
+        {
+            "resourceType": "CarePlan",
+            "status": "active",
+            "intent": "order",
+            "subject": {"reference": "Patient/p1"},
+            "activity": [{"detail": {"code": _CODED, "status": "in-progress"}}],
+        },
+    ],
+    ids=lambda r4: r4["resourceType"],
+)
+def test_compiled_plans_match_interpreter(r4):
+    expected = _Interpreter().transform(r4["resourceType"], r4)
+    engine = _Engine()
+    assert engine.transform(r4["resourceType"], r4) == expected
+    # Plans are compiled once per maps instance and reused by later engines.
+    plan = engine.plans.group(r4["resourceType"])
+    assert _Engine().plans.group(r4["resourceType"]) is plan
+    assert _Engine().transform(r4["resourceType"], r4) == expected
+
+
+def _reset_xver_caches():
+    cross_version_index.load_index.cache_clear()
+    cross_version_type_index._tables.clear()
+    get_maps.cache_clear()
+
+
+@pytest.fixture
+def xver_index_path(tmp_path, settings):
+    settings.FHIR_XVER_INDEX_PATH = tmp_path / "cross-version-index.marshal"
+    _reset_xver_caches()
+    yield settings.FHIR_XVER_INDEX_PATH
+    _reset_xver_caches()
+
+
+def test_prebuilt_index_gives_identical_output(xver_index_path):
+    r4 = {
+        "resourceType": "Observation",
+        "status": "final",
+        "code": {"coding": [{"system": "http://loinc.org", "code": "8867-4"}]},
+        "effectiveDateTime": "2023-01-15T10:30:00Z",
+        "valueQuantity": {"value": 72, "unit": "/min"},
+        "component": [{"code": {"text": "rate"}, "valueQuantity": {"value": 71}}],
+    }
+    assert cross_version_index.load_index() is None  # no index yet: introspected lazily
+    expected = transform_to_r5("Observation", r4)
+
+    call_command("build_cross_version_index", stdout=io.StringIO())
+    _reset_xver_caches()
+    index = cross_version_index.load_index()
+    assert index is not None
+    assert get_maps().groups.keys() == index["maps"]["groups"].keys()
+    assert transform_to_r5("Observation", r4) == expected
+    # Only the types the conversion touched were decoded.
+    assert "Observation" in cross_version_type_index._tables
+    assert len(cross_version_type_index._tables) < len(index["types"])
+
+
+def test_stale_or_corrupt_index_is_ignored(xver_index_path):
+    cross_version_index.write_index({"Observation": {}}, {"groups": {}, "default_groups": {}, "conceptmaps": {}})
+    assert cross_version_index.load_index() is not None
+
+    stale = marshal.loads(xver_index_path.read_bytes())
+    stale["fingerprint"]["fhir.resources"] = "0.0.0"
+    xver_index_path.write_bytes(marshal.dumps(stale))
+    cross_version_index.load_index.cache_clear()
+    assert cross_version_index.load_index() is None
+
+    xver_index_path.write_bytes(b"not an index")
+    cross_version_index.load_index.cache_clear()
+    assert cross_version_index.load_index() is None
+    assert transform_to_r5("Patient", {"gender": "male"})["gender"] == "male"
+
+
+def test_warm_up_compiles_every_group():
+    warm_up()
+    maps = get_maps()
+    assert len(_plans_for(maps)._compiled) >= len(maps.groups)
+
+
 # ---------------------------------------------------------------------------
 # Dropped-field detection (leaf-value diff)
 # ---------------------------------------------------------------------------
@@ -263,3 +390,88 @@ def test_import_bundle_reports_per_entry_error(api_client, patient, fhir_source)
     entries = r.json()["entry"]
     assert entries[0]["response"]["outcome"]["resourceType"] == "OperationOutcome"
     assert entries[1]["response"]["status"] == "201 Created"
+
+
+# ---------------------------------------------------------------------------
+# Bundle pipeline: worker-pool conversion, batched writes, async import jobs
+# ---------------------------------------------------------------------------
+
+
+def _condition(patient, text):
+    return {
+        "resourceType": "Condition",
+        "clinicalStatus": {
+            "coding": [{"system": "http://terminology.hl7.org/CodeSystem/condition-clinical", "code": "active"}]
+        },
+        "code": {"text": text},
+        "subject": {"reference": f"Patient/{patient.id}"},
+    }
+
+
+def _mixed_bundle(patient):
+    entries = [{"resource": _condition(patient, f"Condition {i}")} for i in range(5)]
+    entries.insert(2, {"resource": {"resourceType": "NotAResource"}})
+    entries.insert(4, {"resource": {"resourceType": "Condition", "subject": "not a reference"}})  # invalid R5
+    return {"resourceType": "Bundle", "type": "batch", "entry": entries}
+
+
+def _assert_mixed_response(entries):
+    statuses = [entry["response"]["status"][:3] for entry in entries]
+    assert statuses == ["201", "201", "404", "201", "400", "201", "201"]
+    created = [entry["resource"]["code"]["text"] for entry in entries if "resource" in entry]
+    assert created == [f"Condition {i}" for i in range(5)]  # each entry stays in its Bundle slot
+
+
+def test_import_bundle_on_worker_pool_keeps_entry_order(api_client, patient, fhir_source, settings, monkeypatch):
+    settings.FHIR_IMPORT_WORKERS = 2
+    monkeypatch.setattr(fhir_import, "PARALLEL_MIN_ENTRIES", 1)
+    monkeypatch.setattr(fhir_import, "WRITE_BATCH_SIZE", 2)
+    try:
+        r = api_client.post("/fhir-import/R4", _mixed_bundle(patient), **_src(fhir_source))
+        assert fhir_import._pool is not None  # converted on the worker processes
+    finally:
+        fhir_import.shutdown_pool()
+    assert r.status_code == 200, r.text
+    _assert_mixed_response(r.json()["entry"])
+    rows = FhirAuxResource.objects.filter(fhir_source=fhir_source)
+    assert rows.count() == 5
+    # The batched insert sends no post_save, so the import writes the search index itself.
+    assert FhirAuxSearchIndex.objects.filter(resource__in=rows).exists()
+    assert FhirAuxSearchIndex.objects.filter(resource__in=rows).count() == sum(
+        len(extract_index_values("Condition", row.fhir_data)) for row in rows
+    )
+
+
+def test_import_bundle_respond_async(api_client, patient, fhir_source, settings):
+    settings.JOBS_IN_BACKGROUND = False
+    r = api_client.post("/fhir-import/R4", _mixed_bundle(patient), HTTP_PREFER="respond-async", **_src(fhir_source))
+    assert r.status_code == 202, r.text
+    status_url = r["Content-Location"]
+    job = FhirImportJob.objects.get()
+    assert job.status == FhirImportJob.STATUS_COMPLETED and job.total == 7
+    assert job.bundle is None  # the request body is not kept once imported
+
+    r = api_client.get(status_url)
+    assert r.status_code == 200, r.text
+    assert r.json()["type"] == "batch-response"
+    _assert_mixed_response(r.json()["entry"])
+    assert FhirAuxResource.objects.filter(fhir_source=fhir_source).count() == 5
+
+
+def test_import_job_status_while_running_and_for_other_users(api_client, patient, fhir_source, user):
+    job = FhirImportJob.objects.create(jhe_user=user, fhir_source_id=str(fhir_source.id), total=3)
+    url = f"/fhir-import/R4/$import-status/{job.pk}"
+    r = api_client.get(url)
+    assert r.status_code == 202
+    assert r["X-Progress"].startswith("accepted")
+
+    job.status = FhirImportJob.STATUS_FAILED
+    job.error = "boom"
+    job.save()
+    r = api_client.get(url)
+    assert r.status_code == 500
+    assert r.json()["resourceType"] == "OperationOutcome"
+
+    job.jhe_user = patient.jhe_user  # another user's job is not visible
+    job.save()
+    assert api_client.get(url).status_code == 404
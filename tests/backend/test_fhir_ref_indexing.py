@@ -1,6 +1,7 @@
 """Issue #584: the index-refs pass rewrites aux-resource references from upstream ids to
 JHE ids (same-FhirSource lookup), marks rows ref_indexed, and is exposed as a FhirSource
-detail endpoint. Also covers the create-time id rewrite (upstream id -> JHE UUID)."""
+detail endpoint (inline, or as a resumable background job). Also covers array ref paths,
+cross-source resolution, chunking and the create-time id rewrite (upstream id -> JHE UUID)."""
 
 import pytest
 from rest_framework.test import APIClient
@@ -120,3 +121,120 @@ def test_index_refs_endpoint(fhir_source, patient):
     assert r.json()["refsRewritten"] == 1
     enc.refresh_from_db()
     assert enc.fhir_data["subject"]["reference"] == f"Patient/{pat.pk}"
+
+
+def test_index_rewrites_every_ref_in_an_array_path(fhir_source):
+    obs = [_aux(fhir_source, "Observation", f"obs-{i}", {"id": f"obs-{i}"}) for i in range(2)]
+    report = _aux(
+        fhir_source,
+        "DiagnosticReport",
+        "dr-1",
+        {
+            "id": "dr-1",
+            "result": [
+                {"reference": "Observation/obs-0"},
+                {"reference": "Observation/obs-1"},
+                {"reference": "Observation/obs-9"},
+                {"display": "no reference"},
+            ],
+        },
+    )
+
+    summary = index_fhir_source_refs(fhir_source)
+
+    report.refresh_from_db()
+    assert [entry.get("reference") for entry in report.fhir_data["result"]] == [
+        f"Observation/{obs[0].pk}",
+        f"Observation/{obs[1].pk}",
+        "not-found:obs-9",
+        None,
+    ]
+    assert summary == {"rows_indexed": 3, "refs_rewritten": 2, "refs_not_found": 1}
+
+
+def test_cross_source_resolution(fhir_source, patient, device):
+    other = FhirSource.objects.create(patient=patient, data_source=device, label="other")
+    third = FhirSource.objects.create(patient=patient, data_source=device, label="third")
+    pat = _aux(other, "Patient", "pat-1", {"id": "pat-1"}, ref_indexed=True)
+    # enc-1 exists in two other sources: ambiguous, so it is not resolved across sources.
+    _aux(other, "Encounter", "enc-1", {"id": "enc-1"}, ref_indexed=True)
+    _aux(third, "Encounter", "enc-1", {"id": "enc-1"}, ref_indexed=True)
+    body = {"id": "c-1", "subject": {"reference": "Patient/pat-1"}, "encounter": {"reference": "Encounter/enc-1"}}
+    condition = _aux(fhir_source, "Condition", "c-1", body)
+
+    assert index_fhir_source_refs(fhir_source)["refs_rewritten"] == 0  # same-source only by default
+    FhirAuxResource.objects.filter(pk=condition.pk).update(fhir_data=body, ref_indexed=False)
+
+    summary = index_fhir_source_refs(fhir_source, cross_source=True)
+
+    condition.refresh_from_db()
+    assert condition.fhir_data["subject"]["reference"] == f"Patient/{pat.pk}"
+    assert condition.fhir_data["encounter"]["reference"] == "not-found:enc-1"
+    assert summary == {"rows_indexed": 1, "refs_rewritten": 1, "refs_not_found": 1}
+
+
+def test_index_in_chunks_updates_search_index(fhir_source):
+    enc = _aux(fhir_source, "Encounter", "enc-1", {"id": "enc-1"})
+    conditions = [
+        _aux(fhir_source, "Condition", f"c-{i}", {"id": f"c-{i}", "encounter": {"reference": "Encounter/enc-1"}})
+        for i in range(5)
+    ]
+    chunks = []
+
+    summary = index_fhir_source_refs(fhir_source, chunk_size=2, on_chunk=lambda last, counts: chunks.append(counts))
+
+    assert [counts["rows_indexed"] for counts in chunks] == [2, 2, 2]
+    assert summary["rows_indexed"] == 6 and summary["refs_rewritten"] == 5
+    assert not fhir_source.aux_resources.filter(ref_indexed=False).exists()
+    for condition in conditions:
+        values = condition.search_index.filter(param="encounter").values_list("value", flat=True)
+        assert [value for value in values if str(enc.pk) in value], list(values)
+
+
+def test_resume_skips_committed_chunks(fhir_source):
+    from core.fhir.ref_indexing import run_ref_index_job
+    from core.models import FhirRefIndexJob
+
+    rows = sorted(
+        (_aux(fhir_source, "Encounter", f"enc-{i}", {"id": f"enc-{i}"}) for i in range(3)), key=lambda row: row.pk
+    )
+    job = FhirRefIndexJob.objects.create(
+        jhe_user=fhir_source.patient.jhe_user,
+        fhir_source=fhir_source,
+        status=FhirRefIndexJob.STATUS_FAILED,
+        rows_indexed=1,
+        resume_after=rows[0].pk,
+    )
+
+    run_ref_index_job(job.pk)  # not resumable without resume=True
+    assert FhirRefIndexJob.objects.get(pk=job.pk).status == FhirRefIndexJob.STATUS_FAILED
+
+    run_ref_index_job(job.pk, resume=True)
+
+    job.refresh_from_db()
+    assert job.status == FhirRefIndexJob.STATUS_COMPLETED
+    assert (job.rows_indexed, job.resume_after, job.error) == (3, rows[-1].pk, None)
+    assert FhirAuxResource.objects.get(pk=rows[0].pk).ref_indexed is False  # before the resume point
+
+
+def test_index_refs_endpoint_async(fhir_source, patient, settings):
+    settings.JOBS_IN_BACKGROUND = False
+    _aux(fhir_source, "Patient", "pat-1", {"id": "pat-1"})
+    _aux(fhir_source, "Encounter", "enc-1", {"id": "enc-1", "subject": {"reference": "Patient/pat-1"}})
+    api = APIClient()
+    api.default_format = "json"
+    api.force_authenticate(patient.jhe_user)
+
+    r = api.post(f"/api/v1/fhir_sources/{fhir_source.id}/index_refs", HTTP_PREFER="respond-async")
+
+    assert r.status_code == 202, r.text
+    body = r.json()
+    assert body["status"] == "completed"
+    assert (body["rowsIndexed"], body["refsRewritten"]) == (2, 1)
+    status = api.get(body["statusUrl"])
+    assert status.status_code == 200, status.text
+    assert status.json()["jobId"] == body["jobId"]
+
+    other = FhirSource.objects.create(patient=patient, data_source=fhir_source.data_source, label="other")
+    r = api.get(f"/api/v1/fhir_sources/{other.id}/index_refs/{body['jobId']}")
+    assert r.status_code == 404
@@ -553,6 +553,17 @@ def test_aux_sort_by_date(api_client, patient, fhir_source):
     assert order_desc == [c, a, b]
 
 
+def test_aux_sort_by_date_pages_ties_by_id(api_client, patient, fhir_source):
+    # Equal dates are ordered by id, so offset pages neither skip nor repeat a row.
+    ids = sorted(_post_condition(api_client, fhir_source, patient, recordedDate="2021-06-15") for _ in range(5))
+    for sort, expected in (("date", ids), ("-date", ids[::-1])):
+        paged = []
+        for page in (1, 2, 3):
+            bundle = api_client.get("/FHIR/R5/Condition", {"_sort": sort, "_count": 2, "_page": page}).json()
+            paged += [e["resource"]["id"] for e in bundle["entry"]]
+        assert paged == expected
+
+
 def test_aux_summary_count(api_client, patient, fhir_source):
     for _ in range(3):
         _post_condition(api_client, fhir_source, patient)
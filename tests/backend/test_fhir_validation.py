@@ -0,0 +1,192 @@
+"""Tests for FHIR write validation (core/fhir/fhir_validation.py) and its structural mode's
+compiled JSON Schema (core/fhir/fhir_schema.py)."""
+
+import re
+import time
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from fhir.resources.condition import Condition
+from rest_framework.exceptions import ValidationError as DRFValidationError
+
+from core.fhir.fhir_schema import compile_schema, resource_schema
+from core.fhir.fhir_validation import (
+    fhir_model_class,
+    reset_validation_timings,
+    validate_fhir_resource,
+    validation_timings,
+)
+from core.models import FhirAuxResource, FhirSource
+
+_CLINICAL_STATUS = {
+    "coding": [{"system": "http://terminology.hl7.org/CodeSystem/condition-clinical", "code": "active"}]
+}
+
+VALID = [
+    (
+        "Condition",
+        {
+            "resourceType": "Condition",
+            "clinicalStatus": _CLINICAL_STATUS,
+            "code": {"coding": [{"system": "http://snomed.info/sct", "code": "38341003"}], "text": "Hypertension"},
+            "subject": {"reference": "Patient/1"},
+            "onsetDateTime": "2021-03-04T10:00:00Z",
+            "note": [{"text": "Diagnosed at annual check-up"}],
+        },
+    ),
+    (
+        "Patient",
+        {
+            "resourceType": "Patient",
+            "active": True,
+            "name": [{"family": "Doe", "given": ["Jane", "Q"]}],
+            "gender": "female",
+            "birthDate": "1980-05",
+            "_birthDate": {"extension": [{"url": "http://example.org/precision", "valueCode": "month"}]},
+        },
+    ),
+    (
+        "Observation",
+        {
+            "resourceType": "Observation",
+            "status": "final",
+            "code": {"coding": [{"system": "http://loinc.org", "code": "8867-4"}]},
+            "subject": {"reference": "Patient/1"},
+            "valueQuantity": {"value": 72.5, "unit": "/min", "system": "http://unitsofmeasure.org", "code": "/min"},
+            "component": [{"code": {"text": "rhythm"}, "valueBoolean": False}],
+        },
+    ),
+    (
+        "Immunization",
+        {
+            "resourceType": "Immunization",
+            "status": "completed",
+            "vaccineCode": {"text": "Influenza"},
+            "patient": {"reference": "Patient/1"},
+            "occurrenceDateTime": "2023-10-01",
+            "primarySource": True,
+            "doseQuantity": {"value": 1},
+        },
+    ),
+]
+
+
+@pytest.mark.parametrize("resource_type,body", VALID, ids=[resource_type for resource_type, _ in VALID])
+def test_structural_accepts_what_full_accepts(resource_type, body):
+    assert validate_fhir_resource(resource_type, body, mode="full") is not None
+    assert validate_fhir_resource(resource_type, body, mode="structural") is None
+
+
+@pytest.mark.parametrize(
+    "change,message",
+    [
+        ({"bogus": 1}, "Condition.bogus: unknown element"),
+        ({"subject": "Patient/1"}, "Condition.subject: expected an object"),
+        ({"note": {"text": "not a list"}}, "Condition.note: expected an array"),
+        ({"onsetDateTime": "yesterday"}, "Condition.onsetDateTime: invalid value 'yesterday'"),
+        ({"clinicalStatus": None}, "Condition.clinicalStatus: expected an object"),
+    ],
+)
+def test_structural_rejects_malformed_bodies(change, message):
+    body = {**VALID[0][1], **change}
+    with pytest.raises(DRFValidationError) as excinfo:
+        validate_fhir_resource("Condition", body, mode="structural")
+    assert message in str(excinfo.value.detail[0])
+    # full validation rejects the same bodies
+    with pytest.raises(DRFValidationError):
+        validate_fhir_resource("Condition", body, mode="full")
+
+
+@pytest.mark.parametrize(
+    "change,message",
+    [
+        ({"note": []}, "Condition.note: must not be empty"),
+        ({"code": {"coding": [{"code": 12}]}}, "Condition.code.coding[0].code: expected a string"),
+    ],
+)
+def test_structural_follows_fhir_json_where_the_model_coerces(change, message):
+    # FHIR JSON has no empty arrays and no numeric strings; the model parse tolerates both.
+    body = {**VALID[0][1], **change}
+    assert validate_fhir_resource("Condition", body, mode="full") is not None
+    with pytest.raises(DRFValidationError, match=re.escape(message)):
+        validate_fhir_resource("Condition", body, mode="structural")
+
+
+def test_structural_requires_required_elements():
+    body = {key: value for key, value in VALID[0][1].items() if key != "subject"}
+    with pytest.raises(DRFValidationError, match="Condition.subject: required element is missing"):
+        validate_fhir_resource("Condition", body, mode="structural")
+
+
+def test_resource_schema_is_json_schema():
+    schema = resource_schema("Condition")
+    assert schema["properties"]["subject"] == {"$ref": "#/$defs/Reference"}
+    assert schema["properties"]["category"]["type"] == "array"
+    assert schema["properties"]["resourceType"] == {"const": "Condition"}
+    assert {"clinicalStatus", "subject"} <= set(schema["required"])
+    assert "Extension" in schema["$defs"]
+    check = compile_schema(schema)
+    assert check(VALID[0][1]) == []
+    assert check({**VALID[0][1], "resourceType": "Patient"}) == ["Condition.resourceType: must be 'Condition'"]
+
+
+def test_off_mode_skips_validation_but_not_the_type_check():
+    assert validate_fhir_resource("Condition", {"bogus": 1}, mode="off") is None
+    with pytest.raises(DRFValidationError, match="Unknown FHIR resource type"):
+        validate_fhir_resource("NotAResource", {}, mode="off")
+
+
+def test_full_mode_returns_the_parsed_model():
+    model = validate_fhir_resource(*VALID[0])
+    assert isinstance(model, Condition)
+    assert model.code.text == "Hypertension"
+    assert fhir_model_class("Condition") is Condition
+
+
+def test_invalid_mode_setting(settings):
+    settings.FHIR_VALIDATION_MODE = "strict"
+    with pytest.raises(ImproperlyConfigured):
+        validate_fhir_resource(*VALID[0])
+
+
+def test_timings_are_recorded_per_type_and_mode():
+    reset_validation_timings()
+    validate_fhir_resource(*VALID[0], mode="full")
+    validate_fhir_resource(*VALID[0], mode="structural")
+    validate_fhir_resource(*VALID[0], mode="structural")
+    with pytest.raises(DRFValidationError):
+        validate_fhir_resource("Condition", {"bogus": 1}, mode="full")
+    timings = validation_timings()
+    assert timings[("Condition", "full")]["count"] == 2
+    assert timings[("Condition", "structural")]["count"] == 2
+    assert timings[("Condition", "structural")]["max_ms"] >= timings[("Condition", "structural")]["mean_ms"] > 0
+
+
+def test_timings_summary_is_logged_periodically(settings, caplog):
+    reset_validation_timings()
+    settings.FHIR_VALIDATION_TIMINGS_LOG_SECONDS = 3600
+    with caplog.at_level("INFO", logger="core.fhir.fhir_validation"):
+        validate_fhir_resource(*VALID[0], mode="structural")
+        assert not caplog.records
+
+        with patch("core.fhir.fhir_validation.time.monotonic", return_value=time.monotonic() + 3600):
+            validate_fhir_resource(*VALID[0], mode="structural")
+    [record] = caplog.records
+    assert record.levelname == "INFO"
+    assert record.getMessage().startswith("fhir validation timings: Condition (structural) count=2 ")
+
+
+@pytest.mark.parametrize("mode,status", [("full", 400), ("structural", 400), ("off", 201)])
+def test_aux_create_honours_validation_mode(api_client, patient, device, settings, mode, status):
+    settings.FHIR_VALIDATION_MODE = mode
+    source = FhirSource.objects.create(patient=patient, data_source=device, label="EHR")
+    body = {
+        "resourceType": "Condition",
+        "clinicalStatus": _CLINICAL_STATUS,
+        "subject": {"reference": f"Patient/{patient.id}"},
+        "onsetDateTime": "not a date",
+    }
+    r = api_client.post("/FHIR/R5/Condition", body, HTTP_X_JHE_FHIR_SOURCE_ID=str(source.id))
+    assert r.status_code == status, r.text
+    assert FhirAuxResource.objects.filter(fhir_source=source).exists() == (status == 201)
@@ -0,0 +1,76 @@
+"""The shared background-job runner (core/services/jobs.py) and stale-job expiry."""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.models import OwSyncJob
+from core.services import jobs
+
+
+@pytest.fixture
+def job(user):
+    return OwSyncJob.objects.create(jhe_user=user)
+
+
+def test_run_job_claims_once_and_records_completion(job):
+    calls = []
+
+    def work(claimed):
+        calls.append(claimed.status)
+        return {"files_processed": 3}
+
+    jobs.run_job(OwSyncJob, job.pk, work)
+    jobs.run_job(OwSyncJob, job.pk, work)  # already completed: not run again
+
+    job.refresh_from_db()
+    assert calls == [OwSyncJob.STATUS_IN_PROGRESS]
+    assert (job.status, job.files_processed, job.error) == (OwSyncJob.STATUS_COMPLETED, 3, None)
+    assert job.finished is not None
+
+
+def test_run_job_records_failure(job):
+    def work(claimed):
+        raise RuntimeError("bucket gone")
+
+    jobs.run_job(OwSyncJob, job.pk, work)
+
+    job.refresh_from_db()
+    assert (job.status, job.error) == (OwSyncJob.STATUS_FAILED, "bucket gone")
+
+
+def test_resume_reclaims_failed_jobs(job):
+    OwSyncJob.objects.filter(pk=job.pk).update(status=OwSyncJob.STATUS_FAILED, error="interrupted")
+
+    assert jobs.claim(OwSyncJob, job.pk) is None
+    claimed = jobs.claim(OwSyncJob, job.pk, resume=True)
+    assert (claimed.status, claimed.error) == (OwSyncJob.STATUS_IN_PROGRESS, None)
+
+
+def test_stale_jobs_expire_and_are_not_resurrected(job, settings):
+    settings.JOB_STALE_SECONDS = 600
+    silent_since = timezone.now() - timedelta(seconds=601)
+
+    def work(claimed):
+        # The run outlives its heartbeat (e.g. the process was frozen) and is expired meanwhile.
+        OwSyncJob.objects.filter(pk=claimed.pk).update(last_updated=silent_since)
+        assert OwSyncJob.objects.expire_stale() == 1
+
+    jobs.run_job(OwSyncJob, job.pk, work)
+
+    job.refresh_from_db()
+    assert job.status == OwSyncJob.STATUS_FAILED
+    assert "stopped reporting progress" in job.error
+
+
+def test_fresh_active_jobs_are_not_stale(job):
+    assert OwSyncJob.objects.expire_stale() == 0
+    assert OwSyncJob.objects.get(pk=job.pk).status == OwSyncJob.STATUS_ACCEPTED
+
+
+def test_start_job_runs_inline_when_not_in_background(job, settings):
+    settings.JOBS_IN_BACKGROUND = False
+    ran = []
+    jobs.start_job(job, ran.append)
+    assert ran == [job.pk]
@@ -5,8 +5,9 @@ import pytest
 from django.db import connection
 from django.test.utils import CaptureQueriesContext
 
-from core.models import JheUser, Organization
+from core.models import JheUser, Observation, Organization
 from core.utils import generate_observation_value_attachment_data
+from core.views.fhir_base import FHIRBase
 
 from .utils import (
     Code,
@@ -154,6 +155,60 @@ def test_observation_upload_bundle(api_client, device, hr_study, patient, get_ob
     assert value_attachment_out["body"] == value_attachment_in["body"]
 
 
+def _bundle_entry(patient, device, code=Code.HeartRate, identifier=None):
+    record = generate_observation_value_attachment_data(code.value)
+    resource = {
+        "resourceType": "Observation",
+        "status": "final",
+        "code": {"coding": [{"system": Code.OpenMHealth.value, "code": code.value}]},
+        "subject": {"reference": f"Patient/{patient.id}"},
+        "device": {"reference": f"Device/{device.id}"},
+        "valueAttachment": {
+            "contentType": "application/json",
+            "data": base64.b64encode(json.dumps(record).encode()).decode(),
+        },
+    }
+    if identifier:
+        resource["identifier"] = [{"system": "https://example.org/ids", "value": identifier}]
+    return {"resource": resource, "request": {"method": "POST", "url": "Observation"}}
+
+
+def test_observation_upload_bundle_is_batched(api_client, device, hr_study, patient, get_observations):
+    # A large bundle is written with one fhir_bulk_create pass: the query count stays flat
+    # instead of growing with the number of entries.
+    entries = [_bundle_entry(patient, device, identifier=f"obs-{i}") for i in range(50)]
+    with CaptureQueriesContext(connection) as ctx:
+        r = api_client.post("/FHIR/R5/", data={"resourceType": "Bundle", "type": "batch", "entry": entries})
+    assert r.status_code == 200, r.text
+    statuses = [entry["response"]["status"] for entry in r.json()["entry"]]
+    assert statuses == ["201 Created"] * 50
+    assert len(ctx.captured_queries) < 20
+    assert get_observations(_count=100)["total"] == 50
+
+    stored = Observation.objects.get(identifiers__value="obs-0")
+    # bulk_create bypasses save(): the effective_* projection is still populated.
+    assert stored.effective_date_time is not None
+
+
+def test_observation_upload_bundle_per_entry_outcomes(
+    api_client, organization, device, hr_study, patient, get_observations
+):
+    # Outcomes come back in entry order; a failing entry does not affect its neighbours.
+    create_study(name="bp", organization=organization, codes=[Code.BloodPressure])  # known code, no consent
+    entries = [
+        _bundle_entry(patient, device, identifier="dup"),
+        _bundle_entry(patient, device, identifier="dup"),  # repeats an identifier earlier in the batch
+        _bundle_entry(patient, device, code=Code.BloodPressure),  # not consented for this patient
+        _bundle_entry(patient, device, identifier="other"),
+    ]
+    entries[3]["resource"]["device"]["reference"] = "Device/999999"
+    r = api_client.post("/FHIR/R5/", data={"resourceType": "Bundle", "type": "batch", "entry": entries})
+    assert r.status_code == 200, r.text
+    statuses = [entry["response"]["status"] for entry in r.json()["entry"]]
+    assert statuses == ["201 Created", "409 Conflict", "403 Forbidden", "400 Bad Request"]
+    assert get_observations()["total"] == 1
+
+
 def test_observation_upload_bundle_without_trailing_slash(api_client, device, hr_study, patient, get_observations):
     """The batch base accepts POST with or without the trailing slash (POST /FHIR/R5)."""
     record = generate_observation_value_attachment_data(Code.HeartRate.value)
@@ -289,3 +344,13 @@ def test_get_observation_access(api_client, patient, hr_study):
         assert r.status_code == 200, f"{r.status_code} != 200, {r.text}"
     observations = r.json()["entry"]
     assert len(observations) == 6
+
+
+def test_unexpected_bundle_entry_error_is_logged(caplog):
+    error = RuntimeError("boom")
+    with caplog.at_level("ERROR", logger="core.views.fhir_base"):
+        entry = FHIRBase.bundle_error_response_entry(error)
+
+    assert entry["response"]["status"].startswith("422 ")
+    [record] = caplog.records
+    assert record.exc_info[1] is error
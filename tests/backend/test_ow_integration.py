@@ -2,8 +2,9 @@
 Tests for Open Wearables proxy endpoints (POST /api/v1/ow/users, GET /api/v1/ow/oauth/oura/authorize).
 """
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 from rest_framework.test import APIClient
 
@@ -110,7 +111,7 @@ class TestCreateOwUser:
         assert resp.status_code == 500
         assert "not configured" in resp.json()["error"].lower()
 
-    @patch("core.views.ow.requests.post")
+    @patch("core.views.ow.ow_api.request", new_callable=AsyncMock)
     def test_creates_user_in_ow(self, mock_post, ow_client, ow_user, ow_settings):
         mock_resp = MagicMock()
         mock_resp.status_code = 201
@@ -124,10 +125,11 @@ class TestCreateOwUser:
         assert data["owUserId"] == "new-ow-user-id-123"
 
         # Verify OW API was called with correct payload
-        mock_post.assert_called_once()
+        mock_post.assert_awaited_once()
         call_args = mock_post.call_args
+        assert call_args[0][:2] == ("POST", "https://ow.example.com")
+        assert call_args[0][2] == "sk-test-api-key-12345678"
         assert call_args[1]["json"]["email"] == "ow-test@example.org"
-        assert "X-Open-Wearables-API-Key" in call_args[1]["headers"]
 
         # Verify user's identifier was updated
         ow_user.refresh_from_db()
@@ -139,7 +141,7 @@ class TestCreateOwUser:
         data = resp.json()
         assert data["owUserId"] == "550e8400-e29b-41d4-a716-446655440000"
 
-    @patch("core.views.ow.requests.post")
+    @patch("core.views.ow.ow_api.request", new_callable=AsyncMock)
     def test_passes_through_409_conflict(self, mock_post, ow_client, ow_user, ow_settings):
         """OW returning 409 (user exists) is currently surfaced verbatim by JHE."""
         mock_resp = MagicMock()
@@ -150,7 +152,7 @@ class TestCreateOwUser:
         resp = ow_client.post(self.URL)
         assert resp.status_code == 409
 
-    @patch("core.views.ow.requests.post")
+    @patch("core.views.ow.ow_api.request", new_callable=AsyncMock)
     def test_handles_ow_api_error(self, mock_post, ow_client, ow_settings):
         mock_resp = MagicMock()
         mock_resp.status_code = 500
@@ -160,11 +162,9 @@ class TestCreateOwUser:
         resp = ow_client.post(self.URL)
         assert resp.status_code == 500
 
-    @patch("core.views.ow.requests.post")
+    @patch("core.views.ow.ow_api.request", new_callable=AsyncMock)
     def test_handles_connection_error(self, mock_post, ow_client, ow_settings):
-        import requests as req
-
-        mock_post.side_effect = req.ConnectionError("Connection refused")
+        mock_post.side_effect = httpx.ConnectError("Connection refused")
 
         resp = ow_client.post(self.URL)
         assert resp.status_code == 502
@@ -193,7 +193,7 @@ class TestOuraAuthorize:
         assert resp.status_code == 500
         assert "not configured" in resp.json()["error"].lower()
 
-    @patch("core.views.ow.requests.get")
+    @patch("core.views.ow.ow_api.request", new_callable=AsyncMock)
     def test_returns_authorization_url(self, mock_get, ow_linked_client, ow_settings):
         mock_resp = MagicMock()
         mock_resp.ok = True
@@ -214,7 +214,7 @@ class TestOuraAuthorize:
         call_args = mock_get.call_args
         assert call_args[1]["params"]["user_id"] == "550e8400-e29b-41d4-a716-446655440000"
 
-    @patch("core.views.ow.requests.get")
+    @patch("core.views.ow.ow_api.request", new_callable=AsyncMock)
     def test_uses_custom_redirect_uri(self, mock_get, ow_linked_client, ow_settings):
         mock_resp = MagicMock()
         mock_resp.ok = True
@@ -228,7 +228,7 @@ class TestOuraAuthorize:
         call_args = mock_get.call_args
         assert call_args[1]["params"]["redirect_uri"] == "https://myapp.com/callback"
 
-    @patch("core.views.ow.requests.get")
+    @patch("core.views.ow.ow_api.request", new_callable=AsyncMock)
     def test_handles_ow_api_error(self, mock_get, ow_linked_client, ow_settings):
         mock_resp = MagicMock()
         mock_resp.ok = False
@@ -239,11 +239,9 @@ class TestOuraAuthorize:
         resp = ow_linked_client.get(self.URL)
         assert resp.status_code == 500
 
-    @patch("core.views.ow.requests.get")
+    @patch("core.views.ow.ow_api.request", new_callable=AsyncMock)
     def test_handles_connection_error(self, mock_get, ow_linked_client, ow_settings):
-        import requests as req
-
-        mock_get.side_effect = req.ConnectionError("Connection refused")
+        mock_get.side_effect = httpx.ConnectError("Connection refused")
 
         resp = ow_linked_client.get(self.URL)
         assert resp.status_code == 502
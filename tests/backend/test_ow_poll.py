@@ -2,7 +2,9 @@
 Tests for the `ow_poll` management command (normalized + raw modes).
 """
 
-from io import StringIO
+import json
+from datetime import timedelta
+from io import BytesIO, StringIO
 from unittest.mock import patch
 
 import pytest
@@ -14,8 +16,10 @@ from core.models import (
     JheSetting,
     Observation,
     ObservationIdentifier,
+    OwIngestCheckpoint,
 )
 from core.services.jhe_settings import get_setting
+from core.services.ow_ingest import S3Config, get_client, list_new_objects_by_user
 from core.utils import generate_observation_value_attachment_data
 
 HR_CODE = "omh:heart-rate:2.0"
@@ -117,7 +121,7 @@ def test_creates_observation_for_consented_patient(db, ow_user, patient_with_con
     fake_record = {"timestamp": "2024-01-01T00:00:00Z", "value": 72}
 
     with (
-        patch("core.management.commands.ow_poll.requests.get") as mock_get,
+        patch("core.management.commands.ow_poll.requests.Session.get") as mock_get,
         patch("core.management.commands.ow_poll.convert") as mock_convert,
     ):
         mock_get.return_value.status_code = 200
@@ -141,7 +145,7 @@ def test_dedupes_via_observation_identifier(db, ow_user, patient_with_consent, h
     _clear_sync_lock()
 
     with (
-        patch("core.management.commands.ow_poll.requests.get") as mock_get,
+        patch("core.management.commands.ow_poll.requests.Session.get") as mock_get,
         patch("core.management.commands.ow_poll.convert") as mock_convert,
     ):
         mock_get.return_value.status_code = 200
@@ -162,7 +166,7 @@ def test_skips_user_without_ow_identifier(db, patient_with_consent, hr_concept):
     patient_with_consent.jhe_user.identifier = ""
     patient_with_consent.jhe_user.save(update_fields=["identifier"])
 
-    with patch("core.management.commands.ow_poll.requests.get") as mock_get:
+    with patch("core.management.commands.ow_poll.requests.Session.get") as mock_get:
         call_command("ow_poll", stdout=StringIO())
 
     mock_get.assert_not_called()
@@ -184,7 +188,7 @@ def test_skips_patient_without_hr_consent(db, organization, hr_concept):
     )
     user.patient.organizations.add(organization)
 
-    with patch("core.management.commands.ow_poll.requests.get") as mock_get:
+    with patch("core.management.commands.ow_poll.requests.Session.get") as mock_get:
         call_command("ow_poll", stdout=StringIO())
 
     mock_get.assert_not_called()
@@ -195,7 +199,7 @@ def test_lock_released_on_exception(db, ow_user, hr_concept):
     _set_jhe_setting("module.ow", True)
     _clear_sync_lock()
 
-    with patch("core.management.commands.ow_poll.requests.get", side_effect=RuntimeError("boom")):
+    with patch("core.management.commands.ow_poll.requests.Session.get", side_effect=RuntimeError("boom")):
         # Per-user errors are swallowed by the loop (logger.exception). Lock
         # should still be released by the outer try/finally.
         call_command("ow_poll", stdout=StringIO())
@@ -217,64 +221,173 @@ def test_aborts_when_settings_missing(db, ow_user, hr_concept):
     assert not get_setting("ow.sync_in_progress")
 
 
-def test_raw_mode_creates_observation_and_dedupes(db, ow_user, patient_with_consent, hr_concept):
-    _set_jhe_setting("module.ow", True)
-    _clear_sync_lock()
-    _set_jhe_setting("ow.ingest_mode", "raw", value_type="string")
+_RAW_CONFIG = S3Config("https://s3.example.test", "key", "secret", "ow-bucket", "raw-payloads/oura/api_response")
+_HR_PREFIX = "raw-payloads/oura/api_response/v2/usercollection/heartrate/"
 
-    from collections import namedtuple
 
-    S3Obj = namedtuple("S3Obj", ["key", "last_modified"])
-    fake_obj = S3Obj(
-        key="raw-payloads/oura/api_response/v2/usercollection/heartrate/user-123/1.json",
-        last_modified=None,
-    )
+class _FakeS3:
+    """Just enough of a boto3 S3 client: one bucket of JSON objects, listed in key order."""
+
+    def __init__(self, objects, page_size=1000):
+        self.objects = objects
+        self.page_size = page_size
+        self.list_calls = []
+        self.reads = []
 
+    def list_objects_v2(self, Bucket, Prefix, StartAfter="", ContinuationToken=None):
+        self.list_calls.append({"Prefix": Prefix, "StartAfter": StartAfter})
+        keys = sorted(k for k in self.objects if k.startswith(Prefix) and k > (ContinuationToken or StartAfter))
+        page = keys[: self.page_size]
+        contents = [{"Key": k, "LastModified": self.objects[k][0]} for k in page]
+        if len(keys) > self.page_size:
+            return {"Contents": contents, "IsTruncated": True, "NextContinuationToken": page[-1]}
+        return {"Contents": contents, "IsTruncated": False}
+
+    def get_object(self, Bucket, Key):
+        self.reads.append(Key)
+        body = self.objects[Key][1]
+        if isinstance(body, Exception):
+            raise body
+        return {"Body": BytesIO(json.dumps(body).encode())}
+
+
+def _raw_poll(client, **convert_kwargs):
     with (
-        patch("core.management.commands.ow_poll.list_new_objects", return_value=[fake_obj]) as mock_list,
-        patch(
-            "core.management.commands.ow_poll.read_object",
-            return_value={"data": [{"x": 1}]},
-        ),
-        patch(
-            "core.management.commands.ow_poll.convert",
-            return_value=_fake_omh_record(uuid_value="raw-uuid-1"),
-        ),
+        patch("core.management.commands.ow_poll.load_config", return_value=_RAW_CONFIG),
+        patch("core.management.commands.ow_poll.get_client", return_value=client),
+        patch("core.management.commands.ow_poll.convert", **convert_kwargs),
     ):
         call_command("ow_poll", stdout=StringIO())
-        # Second tick should be a no-op (dedup via ow:raw + uuid).
-        call_command("ow_poll", stdout=StringIO())
 
-    assert mock_list.called
-    assert ObservationIdentifier.objects.filter(system="ow:raw", value="raw-uuid-1").count() == 1
-    assert Observation.objects.count() == 1
 
-
-def test_raw_mode_skips_non_heartrate_keys(db, ow_user, patient_with_consent, hr_concept):
+@pytest.fixture
+def raw_mode(db, ow_user, patient_with_consent, hr_concept):
     _set_jhe_setting("module.ow", True)
     _clear_sync_lock()
     _set_jhe_setting("ow.ingest_mode", "raw", value_type="string")
 
-    from collections import namedtuple
 
-    S3Obj = namedtuple("S3Obj", ["key", "last_modified"])
-    not_hr = S3Obj(
-        key="raw-payloads/oura/api_response/v2/usercollection/sleep/user-123/1.json",
-        last_modified=None,
+def test_raw_mode_creates_observation_and_dedupes(raw_mode):
+    now = timezone.now()
+    client = _FakeS3({f"{_HR_PREFIX}user-123/1.json": (now, {"data": [{"x": 1}]})})
+
+    _raw_poll(client, return_value=_fake_omh_record(uuid_value="raw-uuid-1"))
+    # Second tick should be a no-op (dedup via ow:raw + uuid).
+    _raw_poll(client, return_value=_fake_omh_record(uuid_value="raw-uuid-1"))
+
+    assert ObservationIdentifier.objects.filter(system="ow:raw", value="raw-uuid-1").count() == 1
+    assert Observation.objects.count() == 1
+
+
+def test_raw_mode_resumes_from_checkpoint(raw_mode):
+    now = timezone.now()
+    client = _FakeS3(
+        {
+            f"{_HR_PREFIX}user-123/1.json": (now, {"data": [{"x": 1}]}),
+            f"{_HR_PREFIX}user-123/2.json": (now, {"data": [{"x": 2}]}),
+        }
     )
+    _raw_poll(client, side_effect=[_fake_omh_record("a"), _fake_omh_record("b")])
 
-    with (
-        patch("core.management.commands.ow_poll.list_new_objects", return_value=[not_hr]),
-        patch("core.management.commands.ow_poll.read_object") as mock_read,
-        patch("core.management.commands.ow_poll.convert") as mock_convert,
-    ):
-        call_command("ow_poll", stdout=StringIO())
+    checkpoint = OwIngestCheckpoint.objects.get(ow_user_id="user-123", prefix=_HR_PREFIX)
+    assert checkpoint.last_key == f"{_HR_PREFIX}user-123/2.json"
+    assert Observation.objects.count() == 2
+
+    client.objects[f"{_HR_PREFIX}user-123/3.json"] = (now, {"data": [{"x": 3}]})
+    client.reads.clear()
+    _raw_poll(client, return_value=_fake_omh_record("c"))
+
+    assert client.list_calls[-1] == {"Prefix": f"{_HR_PREFIX}user-123/", "StartAfter": f"{_HR_PREFIX}user-123/2.json"}
+    assert client.reads == [f"{_HR_PREFIX}user-123/3.json"]
+    assert Observation.objects.count() == 3
+
+
+def test_raw_mode_keeps_checkpoint_when_a_read_fails(raw_mode):
+    now = timezone.now()
+    client = _FakeS3(
+        {
+            f"{_HR_PREFIX}user-123/1.json": (now, {"data": [{"x": 1}]}),
+            f"{_HR_PREFIX}user-123/2.json": (now, OSError("boom")),
+        }
+    )
+    _raw_poll(client, return_value=_fake_omh_record("a"))
+
+    assert Observation.objects.count() == 1
+    assert not OwIngestCheckpoint.objects.exists()
+
+
+def test_raw_mode_skips_non_heartrate_keys(raw_mode):
+    now = timezone.now()
+    client = _FakeS3(
+        {"raw-payloads/oura/api_response/v2/usercollection/sleep/user-123/1.json": (now, {"data": [{"x": 1}]})}
+    )
+    _raw_poll(client)
 
-    mock_read.assert_not_called()
-    mock_convert.assert_not_called()
+    assert client.list_calls[0]["Prefix"] == f"{_HR_PREFIX}user-123/"
+    assert client.reads == []
     assert Observation.objects.count() == 0
 
 
+def test_list_new_objects_by_user_lists_each_users_prefix():
+    since = timezone.now()
+    before, after = since - timedelta(minutes=1), since + timedelta(minutes=1)
+    client = _FakeS3(
+        {
+            f"{_HR_PREFIX}alice/1.json": (after, {}),
+            f"{_HR_PREFIX}alice/2.json": (before, {}),
+            f"{_HR_PREFIX}alice/3.json": (after, {}),
+            f"{_HR_PREFIX}bob/1.json": (after, {}),
+            f"{_HR_PREFIX}bob/2.json": (before, {}),
+            f"{_HR_PREFIX}carol/1.json": (after, {}),
+        },
+        page_size=2,
+    )
+
+    listed = list_new_objects_by_user(
+        client, "ow-bucket", _HR_PREFIX, {"alice": since, "bob": since}, {"bob": f"{_HR_PREFIX}bob/1.json"}
+    )
+
+    # alice has no checkpoint (filtered by time), bob resumes after his; carol is not polled.
+    assert {user: [o.key for o in objects] for user, objects in listed.items()} == {
+        "alice": [f"{_HR_PREFIX}alice/1.json", f"{_HR_PREFIX}alice/3.json"],
+        "bob": [f"{_HR_PREFIX}bob/2.json"],
+    }
+    # alice's prefix takes two pages; bob's listing starts at his checkpoint. No one reads carol's keys.
+    assert client.list_calls == [
+        {"Prefix": f"{_HR_PREFIX}alice/", "StartAfter": ""},
+        {"Prefix": f"{_HR_PREFIX}alice/", "StartAfter": ""},
+        {"Prefix": f"{_HR_PREFIX}bob/", "StartAfter": f"{_HR_PREFIX}bob/1.json"},
+    ]
+
+
+def test_list_new_objects_by_user_without_checkpoint_lists_only_own_prefix():
+    # A user with no objects yet never gets a checkpoint; listing them must not drag every
+    # other user's keys back in.
+    since = timezone.now()
+    client = _FakeS3(
+        {
+            f"{_HR_PREFIX}alice/1.json": (since, {}),
+            f"{_HR_PREFIX}alice/2.json": (since, {}),
+        }
+    )
+
+    listed = list_new_objects_by_user(
+        client, "ow-bucket", _HR_PREFIX, {"alice": since, "dave": since}, {"alice": f"{_HR_PREFIX}alice/2.json"}
+    )
+
+    assert listed == {"alice": [], "dave": []}
+    assert client.list_calls == [
+        {"Prefix": f"{_HR_PREFIX}alice/", "StartAfter": f"{_HR_PREFIX}alice/2.json"},
+        {"Prefix": f"{_HR_PREFIX}dave/", "StartAfter": ""},
+    ]
+
+
+def test_get_client_is_cached_per_settings():
+    other = _RAW_CONFIG._replace(secret_access_key="rotated")
+    assert get_client(_RAW_CONFIG) is get_client(_RAW_CONFIG)
+    assert get_client(other) is not get_client(_RAW_CONFIG)
+
+
 def test_unknown_mode_aborts(db, ow_user, hr_concept):
     _set_jhe_setting("module.ow", True)
     _clear_sync_lock()
@@ -300,7 +413,7 @@ def test_stale_lock_is_force_released(db, ow_user, patient_with_consent, hr_conc
     _hold_sync_lock(acquired_at=stale_at)
 
     with (
-        patch("core.management.commands.ow_poll.requests.get") as mock_get,
+        patch("core.management.commands.ow_poll.requests.Session.get") as mock_get,
         patch("core.management.commands.ow_poll.convert") as mock_convert,
     ):
         mock_get.return_value.status_code = 200
@@ -312,3 +425,50 @@ def test_stale_lock_is_force_released(db, ow_user, patient_with_consent, hr_conc
     # Force-reclaim: poll ran, observation persisted, lock cleared on exit.
     assert Observation.objects.count() == 1
     assert not get_setting("ow.sync_in_progress")
+
+
+def test_batches_dedup_and_reports_metrics(db, ow_user, patient_with_consent, hr_concept):
+    """One response's records are deduped together: repeats in the payload and uuids already
+    ingested are skipped, and the tick's metrics line counts what was seen and created."""
+    _set_jhe_setting("module.ow", True)
+    _set_jhe_setting("ow.poll_concurrency", 2, value_type="int")
+    _clear_sync_lock()
+
+    with (
+        patch("core.management.commands.ow_poll.requests.Session.get") as mock_get,
+        patch("core.management.commands.ow_poll.convert") as mock_convert,
+    ):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {"data": [{"x": 1}]}
+        mock_convert.return_value = _fake_omh_record(uuid_value="old")
+        call_command("ow_poll", stdout=StringIO())
+
+        mock_get.return_value.json.return_value = {"data": [{"x": 1}, {"x": 2}, {"x": 3}]}
+        mock_convert.side_effect = [
+            _fake_omh_record(uuid_value="new"),
+            _fake_omh_record(uuid_value="new"),
+            _fake_omh_record(uuid_value="old"),
+        ]
+        out = StringIO()
+        call_command("ow_poll", stdout=out)
+
+    assert set(ObservationIdentifier.objects.values_list("value", flat=True)) == {"old", "new"}
+    assert Observation.objects.count() == 2
+    assert all(obs.effective_date_time is not None for obs in Observation.objects.all())
+    metrics = out.getvalue()
+    assert "users_polled=1" in metrics and "records_seen=3" in metrics and "records_created=1" in metrics
+    assert "concurrency=2" in metrics and "latency_p95_ms=" in metrics
+
+
+def test_failed_fetch_counts_as_failed_user(db, ow_user, patient_with_consent, hr_concept):
+    _set_jhe_setting("module.ow", True)
+    _clear_sync_lock()
+
+    with patch("core.management.commands.ow_poll.requests.Session.get") as mock_get:
+        mock_get.return_value.status_code = 502
+        mock_get.return_value.text = "bad gateway"
+        out = StringIO()
+        call_command("ow_poll", stdout=out)
+
+    assert "users_failed=1" in out.getvalue()
+    assert Observation.objects.count() == 0
@@ -0,0 +1,193 @@
+"""``/api/v1/ow/sync`` background job (core/services/ow_sync.py)."""
+
+import io
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+
+from core.models import CodeableConcept, Observation, OwSyncJob
+from core.services.ow_sync import iter_measurements, key_is_heart_rate
+from core.utils import generate_observation_value_attachment_data
+
+HR_CODE = "omh:heart-rate:2.0"
+LAYOUT_KEY = "raw-payloads/oura/api_response/v2/usercollection/heartrate/{user}/{n}.json"
+LEGACY_KEY = "raw-payloads/oura/api_response/2024/{user}/{n}.json"
+
+
+def test_iter_measurements_streams_arrays_across_chunks():
+    payload = b'[{"bpm": 61, "ts": "2024-01-01"}, 12345, "x\\u00e9", [1, 2]]'
+    assert list(iter_measurements(io.BytesIO(payload), chunk_size=5)) == [
+        {"bpm": 61, "ts": "2024-01-01"},
+        12345,
+        "xé",
+        [1, 2],
+    ]
+    envelope = b'{"next_token": null, "meta": {"n": [1]}, "data": [{"bpm": 70}]}'
+    assert list(iter_measurements(io.BytesIO(envelope), chunk_size=3)) == [{"bpm": 70}]
+    assert list(iter_measurements(io.BytesIO(b" [ ] "))) == []
+
+
+@pytest.mark.parametrize("payload", [b'{"items": []}', b'"text"', b"[1, 2"])
+def test_iter_measurements_rejects_other_shapes(payload):
+    with pytest.raises(ValueError):
+        list(iter_measurements(io.BytesIO(payload), chunk_size=4))
+
+
+def test_key_layout_classification():
+    assert key_is_heart_rate("oura/api_response/v2/usercollection/heartrate/u1/1.json") is True
+    assert key_is_heart_rate("oura/api_response/v2/usercollection/sleep/u1/1.json") is False
+    assert key_is_heart_rate("oura/api_response/2024/u1/1.json") is None
+
+
+class _FakeS3:
+    def __init__(self, objects, trace_ids):
+        self.objects, self.trace_ids = objects, trace_ids
+        self.heads, self.list_kwargs = [], None
+
+    def get_paginator(self, name):
+        fake = self
+
+        class _Paginator:
+            def paginate(self, **kwargs):
+                fake.list_kwargs = kwargs
+                return [{"Contents": [{"Key": key} for key in sorted(fake.objects)]}]
+
+        return _Paginator()
+
+    def head_object(self, Bucket, Key):
+        self.heads.append(Key)
+        return {"Metadata": {"trace_id": self.trace_ids.get(Key, "")}}
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+
+@pytest.fixture
+def ow_patient(patient):
+    CodeableConcept.objects.get_or_create(
+        coding_system="https://w3id.org/openmhealth", coding_code=HR_CODE, defaults={"text": HR_CODE}
+    )
+    patient.jhe_user.identifier = "ow:user-1"
+    patient.jhe_user.save(update_fields=["identifier"])
+    return patient
+
+
+@pytest.fixture
+def sync_settings(settings):
+    settings.OW_S3_ENDPOINT_URL = "http://minio.test"
+    settings.JOBS_IN_BACKGROUND = False
+
+
+def _fake_convert(source, data_type, sample):
+    record = generate_observation_value_attachment_data(HR_CODE)
+    record["body"]["heart_rate"]["value"] = sample["bpm"]
+    return record
+
+
+def test_sync_job_filters_by_layout_and_reports_status(api_client, ow_patient, sync_settings):
+    s3 = _FakeS3(
+        {
+            LAYOUT_KEY.format(user="user-1", n=1): b'{"data": [{"bpm": 60}, {"bpm": 61}]}',
+            LAYOUT_KEY.format(user="user-1", n=2).replace("heartrate", "sleep"): b"[]",
+            LAYOUT_KEY.format(user="stranger", n=3): b"[]",
+            LEGACY_KEY.format(user="user-1", n=4): b'[{"bpm": 62}]',
+            LEGACY_KEY.format(user="user-1", n=5): b'[{"bpm": 63}]',
+            LAYOUT_KEY.format(user="user-1", n=6): b'{"unexpected": true}',
+        },
+        trace_ids={LEGACY_KEY.format(user="user-1", n=4): "/v2/usercollection/heartrate"},
+    )
+    with (
+        patch("core.services.ow_sync.get_s3_client", return_value=s3),
+        patch("core.services.ow_sync.convert", side_effect=_fake_convert),
+    ):
+        r = api_client.post("/api/v1/ow/sync")
+
+    assert r.status_code == 202, r.content
+    body = r.json()
+    assert body["status"] == OwSyncJob.STATUS_COMPLETED
+    # Only the two keys whose layout doesn't name the endpoint were HEADed.
+    assert sorted(s3.heads) == [LEGACY_KEY.format(user="user-1", n=4), LEGACY_KEY.format(user="user-1", n=5)]
+    assert (body["filesProcessed"], body["filesSkipped"], body["observationsCreated"]) == (3, 1, 3)
+    assert any("user-1/6.json" in error for error in body["errors"])
+    assert Observation.objects.filter(subject_patient=ow_patient).count() == 3
+
+    status = api_client.get(body["statusUrl"])
+    assert status.status_code == 200 and status.json()["observationsCreated"] == 3
+
+
+def test_sync_resumes_after_last_key_and_reuses_running_job(api_client, ow_patient, sync_settings, user):
+    last = LAYOUT_KEY.format(user="user-1", n=1)
+    Observation.objects.create(
+        subject_patient=ow_patient,
+        codeable_concept=CodeableConcept.objects.get(coding_code=HR_CODE),
+        omh_data=generate_observation_value_attachment_data(HR_CODE),
+        ow_key=last,
+    )
+    s3 = _FakeS3({}, {})
+    with patch("core.services.ow_sync.get_s3_client", return_value=s3):
+        api_client.get("/api/v1/ow/sync")
+    assert s3.list_kwargs["StartAfter"] == last
+
+    running = OwSyncJob.objects.create(jhe_user=user, status=OwSyncJob.STATUS_IN_PROGRESS)
+    r = api_client.post("/api/v1/ow/sync")
+    assert r.status_code == 202 and r.json()["jobId"] == str(running.pk)
+
+
+def test_orphaned_job_does_not_block_later_syncs(api_client, ow_patient, sync_settings, user, settings):
+    orphan = OwSyncJob.objects.create(jhe_user=user, status=OwSyncJob.STATUS_IN_PROGRESS)
+    silent_since = timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS + 1)
+    OwSyncJob.objects.filter(pk=orphan.pk).update(last_updated=silent_since)
+
+    with patch("core.services.ow_sync.get_s3_client", return_value=_FakeS3({}, {})):
+        r = api_client.post("/api/v1/ow/sync")
+
+    assert r.status_code == 202
+    assert r.json()["jobId"] != str(orphan.pk) and r.json()["status"] == OwSyncJob.STATUS_COMPLETED
+    orphan.refresh_from_db()
+    assert orphan.status == OwSyncJob.STATUS_FAILED
+
+
+def test_sync_inserts_files_in_listing_order(api_client, ow_patient, sync_settings):
+    # The first file downloads slowest; later files must still not be inserted before it, or an
+    # interrupted run would resume after a key whose predecessors were never synced.
+    keys = [LAYOUT_KEY.format(user="user-1", n=n) for n in range(1, 5)]
+    s3 = _FakeS3({key: b'[{"bpm": 60}]' for key in keys}, {})
+    get_object = s3.get_object
+
+    def slow_first(Bucket, Key):
+        if Key == keys[0]:
+            time.sleep(0.2)
+        return get_object(Bucket, Key)
+
+    s3.get_object = slow_first
+    with (
+        patch("core.services.ow_sync.get_s3_client", return_value=s3),
+        patch("core.services.ow_sync.convert", side_effect=_fake_convert),
+    ):
+        api_client.post("/api/v1/ow/sync")
+
+    assert list(Observation.objects.order_by("id").values_list("ow_key", flat=True)) == keys
+
+
+def test_sync_validates_and_projects_timing_like_save(api_client, ow_patient, sync_settings):
+    key = LAYOUT_KEY.format(user="user-1", n=1)
+    s3 = _FakeS3({key: b'[{"bpm": 60}, {"bpm": "fast"}]'}, {})
+    with (
+        patch("core.services.ow_sync.get_s3_client", return_value=s3),
+        patch("core.services.ow_sync.convert", side_effect=_fake_convert),
+    ):
+        body = api_client.post("/api/v1/ow/sync").json()
+
+    # The record failing its OMH schema is reported, not inserted.
+    assert body["observationsCreated"] == 1
+    assert any(f"{key} record 1" in error for error in body["errors"])
+    observation = Observation.objects.get(ow_key=key)
+    assert observation.effective_date_time or observation.effective_period_start
+
+
+def test_sync_requires_s3_config(api_client, settings):
+    settings.OW_S3_ENDPOINT_URL = ""
+    assert api_client.post("/api/v1/ow/sync").status_code == 500
@@ -0,0 +1,66 @@
+"""Practitioner -> patient access projection (PractitionerPatientAccess, maintained in core/signals.py)."""
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from core.models import (
+    FhirAuxResource,
+    Organization,
+    Patient,
+    PatientOrganization,
+    PractitionerOrganization,
+    PractitionerPatientAccess,
+)
+
+
+def _access(user):
+    return set(
+        PractitionerPatientAccess.objects.filter(practitioner_user=user).values_list("patient_id", "organization_id")
+    )
+
+
+@pytest.fixture
+def other_org(db):
+    return Organization.objects.create(name="Other Org", type="other")
+
+
+def test_membership_changes_are_projected(user, patient, organization, other_org):
+    assert _access(user) == {(patient.id, organization.id)}
+
+    # Through-model writes (post_save / post_delete).
+    link = PractitionerOrganization.objects.create(practitioner=user.practitioner, organization=other_org)
+    assert _access(user) == {(patient.id, organization.id)}
+    PatientOrganization.objects.create(patient=patient, organization=other_org)
+    assert _access(user) == {(patient.id, organization.id), (patient.id, other_org.id)}
+    link.delete()
+    assert _access(user) == {(patient.id, organization.id)}
+
+    # Related-manager writes from either side (m2m_changed add, row-wise remove/clear).
+    other_org.practitioners.add(user.practitioner)
+    assert (patient.id, other_org.id) in _access(user)
+    patient.organizations.remove(organization)
+    assert _access(user) == {(patient.id, other_org.id)}
+    other_org.patients.clear()
+    assert _access(user) == set()
+
+
+def test_deleting_an_organization_revokes_access(user, patient, organization):
+    organization.delete()
+    assert not PractitionerPatientAccess.objects.exists()
+
+
+def test_rebuild_command(user, patient, organization):
+    PractitionerPatientAccess.objects.all().delete()
+    call_command("rebuild_practitioner_patient_access", stdout=StringIO())
+    assert _access(user) == {(patient.id, organization.id)}
+
+
+def test_scope_is_a_semi_join_without_distinct(user, patient, organization, other_org):
+    sql = str(FhirAuxResource.fhir_search(user.id, "Condition", organization_id=organization.id).query)
+    assert "core_practitionerpatientaccess" in sql
+    assert "DISTINCT" not in sql
+    assert "core_practitionerorganization" not in sql
+    assert list(Patient.for_practitioner_organization_study(user.id, organization.id)) == [patient]
+    assert not Patient.for_practitioner_organization_study(user.id, other_org.id).exists()
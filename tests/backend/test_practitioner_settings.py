@@ -0,0 +1,123 @@
+"""Write-behind practitioner UI settings (core/services/practitioner_settings.py)."""
+
+import io
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Practitioner
+from core.services import practitioner_settings
+
+
+def _updates(queries):
+    return [q["sql"] for q in queries.captured_queries if q["sql"].startswith('UPDATE "core_practitioner"')]
+
+
+@pytest.fixture
+def practitioner(user):
+    return user.practitioner
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    started = []
+
+    class _Timer:
+        def __init__(self, interval, function, args):
+            self.function, self.args = function, args
+            self.daemon = False
+
+        def start(self):
+            started.append(self)
+
+    monkeypatch.setattr(practitioner_settings.threading, "Timer", _Timer)
+    return started
+
+
+@pytest.fixture
+def write_behind(settings, practitioner, timers):
+    # Write-behind needs a cache shared by the server processes; the database cache is one.
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "test_jhe_cache"}
+    }
+    call_command("createcachetable", stdout=io.StringIO())
+    settings.PRACTITIONER_SETTINGS_FLUSH_SECONDS = 30
+    yield
+    practitioner_settings.flush(practitioner.pk)
+
+
+def test_unchanged_value_is_not_written(practitioner):
+    practitioner.save_setting("current_study_id", 7)
+    with CaptureQueriesContext(connection) as queries:
+        practitioner.save_setting("current_study_id", 7)
+        practitioner.delete_setting("current_fhir_resource")
+    assert _updates(queries) == []
+
+
+def test_changes_within_period_are_coalesced(practitioner, write_behind, timers):
+    with CaptureQueriesContext(connection) as queries:
+        practitioner.save_setting("current_organization_id", 1)  # first change: written now
+        practitioner.save_setting("current_study_id", 2)
+        practitioner.save_setting("current_study_id", 3)
+        practitioner.delete_setting("current_organization_id")
+    assert len(_updates(queries)) == 1
+    assert len(timers) == 1
+
+    # Read-your-writes: a fresh instance sees the buffered changes before they are flushed.
+    fresh = Practitioner.objects.get(pk=practitioner.pk)
+    assert fresh.settings == {"current_organization_id": 1}
+    assert fresh.current_settings() == {"current_study_id": 3}
+    assert fresh.get_setting("current_organization_id") is None
+
+    # The timer runs _flush_in_thread (which also manages the thread's DB connection).
+    assert timers[0].function is practitioner_settings._flush_in_thread
+    practitioner_settings.flush(*timers[0].args)
+    fresh.refresh_from_db()
+    assert fresh.settings == {"current_study_id": 3}
+    assert fresh.current_settings() == {"current_study_id": 3}
+
+
+def test_profile_returns_buffered_settings(api_client, practitioner, write_behind, organization):
+    practitioner.save_setting("current_fhir_resource", "Patient")
+    api_client.get("/api/v1/patients", {"organization_id": organization.id})
+
+    settings = api_client.get("/api/v1/users/profile").json()["settings"]
+    assert settings["currentOrganizationId"] == organization.id
+    assert settings["currentFhirResource"] == "Patient"
+
+
+def test_write_behind_requires_a_shared_cache(settings, practitioner):
+    settings.PRACTITIONER_SETTINGS_FLUSH_SECONDS = 30
+    with pytest.raises(ImproperlyConfigured):
+        practitioner.save_setting("current_study_id", 1)
+
+
+def test_older_change_never_overwrites_a_newer_one(practitioner):
+    # Process A buffers study=1, process B then writes study=2 through, and A's timer flushes last.
+    older = {"current_study_id": {"value": 1, "delete": False, "changed": 100}}
+    newer = {"current_study_id": {"value": 2, "delete": False, "changed": 200}}
+    practitioner_settings._write(practitioner.pk, newer)
+    practitioner_settings._write(practitioner.pk, older)
+
+    practitioner.refresh_from_db()
+    assert practitioner.settings["current_study_id"] == 2
+    assert practitioner.settings_changed["current_study_id"] == 200
+
+
+def test_overdue_changes_are_flushed_on_read(practitioner, write_behind, timers):
+    practitioner.save_setting("current_organization_id", 1)
+    practitioner.save_setting("current_study_id", 2)  # buffered behind the period's timer
+    # The process holding the timer dies; once the period has passed, the next read writes it.
+    timers.clear()
+    stale = practitioner_settings.pending_changes(practitioner.pk)["current_study_id"]
+    stale["changed"] -= 60 * 1_000_000_000
+    from django.core.cache import cache
+
+    cache.set(practitioner_settings._pending_key(practitioner.pk, "current_study_id"), stale)
+
+    fresh = Practitioner.objects.get(pk=practitioner.pk)
+    assert fresh.get_setting("current_study_id") == 2
+    assert Practitioner.objects.get(pk=practitioner.pk).settings["current_study_id"] == 2
@@ -0,0 +1,104 @@
+"""Query-plan regression tests for the practitioner search builders.
+
+The study-scoped Observation search must not de-duplicate its rows (no ``Unique`` / hashed
+``Aggregate`` node over the observations): its many-to-many conditions are correlated ``EXISTS`` subqueries, so a page is read off
+the ``(subject_patient, -last_updated)`` ordering without sorting/hashing the whole joined set.
+A ``_cursor`` page's seek must likewise enter that index at the cursor.
+"""
+
+import json
+
+import pytest
+from django.db import connection
+
+from core.fhir.pagination import FHIRCursorPagination
+from core.models import FhirAuxResource, FhirSource, Observation, Organization, PractitionerOrganization
+
+from .utils import Code, add_observations, add_patient_to_study, create_study
+
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def _deduplicating_nodes(queryset):
+    """Unique / hashed-Aggregate nodes over rows of the searched table itself.
+
+    The planner may still unique-ify the (small) inner side of an EXISTS semi-join; those nodes
+    only read the subquery's table and are not a DISTINCT over the result.
+    """
+    table = queryset.model._meta.db_table
+    [explained] = json.loads(queryset.explain(format="json"))
+    return [
+        node["Node Type"]
+        for node in _nodes(explained["Plan"])
+        if (node["Node Type"] == "Unique" or (node["Node Type"] == "Aggregate" and node.get("Strategy") == "Hashed"))
+        and any(child.get("Relation Name") == table for child in _nodes(node))
+    ]
+
+
+@pytest.fixture
+def study(user, organization, patient):
+    # A second organization shared by the practitioner and the patient: under the old
+    # membership joins every row matched once per shared organization.
+    other = Organization.objects.create(name="Second Org", type="other")
+    PractitionerOrganization.objects.create(practitioner=user.practitioner, organization=other)
+    patient.organizations.add(other)
+    study = create_study(organization=organization, codes=[Code.HeartRate, Code.BloodPressure])
+    add_patient_to_study(patient, study)
+    add_observations(patient=patient, code=Code.HeartRate, n=3)
+    add_observations(patient=patient, code=Code.BloodGlucose, n=2)
+    return study
+
+
+def test_study_scoped_observation_search_has_no_deduplication(user, patient, study):
+    queryset = Observation.fhir_search(user.id, study_id=study.id, patient_identifier_value="x")[:20]
+    assert _deduplicating_nodes(queryset) == []
+    assert "DISTINCT" not in str(queryset.query)
+
+    page = Observation.fhir_search(user.id, study_id=study.id)[:20]
+    assert _deduplicating_nodes(page) == []
+    # Each observation once, and only the study's requested codes.
+    assert len(page) == 3
+    assert {o.codeable_concept.coding_code for o in page} == {Code.HeartRate.value}
+
+
+def test_practitioner_observation_list_has_no_deduplication(user, study):
+    queryset = Observation.for_practitioner_organization_study_patient(user.id, study_id=study.id)[:20]
+    assert _deduplicating_nodes(queryset) == []
+    assert len(queryset) == 3
+
+
+def test_aux_search_has_no_deduplication(user, patient, study, device):
+    source = FhirSource.objects.create(patient=patient, data_source=device, fhir_base_url="https://ehr.example/fhir")
+    FhirAuxResource.objects.create(
+        resource_type="Condition",
+        fhir_source=source,
+        fhir_data={"resourceType": "Condition", "subject": {"reference": f"Patient/{patient.id}"}},
+    )
+    queryset = FhirAuxResource.fhir_search(user.id, "Condition", study_id=study.id)[:20]
+    assert _deduplicating_nodes(queryset) == []
+    assert len(queryset) == 1
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_cursor_seek_is_an_index_range(patient, descending):
+    add_observations(patient=patient, code=Code.HeartRate, n=3)
+    last = Observation.objects.order_by("last_updated", "pk")[1]
+    pagination = FHIRCursorPagination()
+    pagination.descending = descending
+    order = ("-last_updated", "-pk") if descending else ("last_updated", "pk")
+    page = (
+        Observation.objects.filter(subject_patient=patient)
+        .order_by(*order)
+        .filter(pagination._seek(last.last_updated, last.pk))[:20]
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    [explained] = json.loads(page.explain(format="json"))
+    # The (subject_patient, -last_updated) index is entered at the cursor, not scanned up to it.
+    conditions = [node.get("Index Cond", "") for node in _nodes(explained["Plan"])]
+    assert any("subject_patient_id" in cond and "last_updated" in cond for cond in conditions), conditions
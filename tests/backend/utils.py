@@ -19,6 +19,7 @@ from core.models import (
     Organization,
     Patient,
     PatientOrganization,
+    PractitionerPatientAccess,
     Study,
     StudyPatient,
     StudyPatientScopeConsent,
@@ -86,6 +87,9 @@ def add_patients(n, organization=None):
 
     for Class, items in to_create.items():
         Class.objects.bulk_create(items)
+    if organization:
+        # bulk_create sends no post_save, so project the new memberships explicitly.
+        PractitionerPatientAccess.refresh(organization_ids=[organization.id])
     n_created += n
     return to_create[Patient]
 
@@ -2,7 +2,6 @@ import time
 
 import jwt
 import pytest
-import requests
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 
@@ -126,6 +125,109 @@ def test_alg_none_rejected(rsa_private_pem):
     assert e.value.status_code == 401
 
 
+@pytest.fixture
+def discovery(db, monkeypatch):
+    """Serve discovery docs from a list of fake responses; records the URLs requested."""
+    oidc_verify.clear_discovery_cache()
+    calls = []
+    responses = []
+
+    class _FakeResponse:
+        def __init__(self, body, headers=None, ok=True):
+            self.body, self.headers, self.ok = body, headers or {}, ok
+
+        def json(self):
+            return self.body
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    monkeypatch.setattr(oidc_verify._session, "get", fake_get)
+    yield calls, responses, _FakeResponse
+    oidc_verify.clear_discovery_cache()
+
+
+def test_discovery_is_cached(discovery):
+    calls, responses, response = discovery
+    responses.append(response({"jwks_uri": "https://ehr.example.org/jwks"}))
+    assert discover_jwks_uri(ISS) == discover_jwks_uri(ISS) == "https://ehr.example.org/jwks"
+    assert calls == [f"{ISS}/.well-known/smart-configuration"]
+
+
+def test_discovery_honors_no_store(discovery):
+    calls, responses, response = discovery
+    responses.append(response({"jwks_uri": "https://ehr.example.org/jwks"}, {"Cache-Control": "no-store"}))
+    discover_jwks_uri(ISS)
+    discover_jwks_uri(ISS)
+    assert len(calls) == 2
+
+
+def test_header_ttl():
+    class _R:
+        def __init__(self, headers):
+            self.headers = headers
+
+    assert oidc_verify._header_ttl(_R({"Cache-Control": "public, max-age=120"})) == 120
+    assert oidc_verify._header_ttl(_R({"Cache-Control": "no-cache"})) == 0
+    assert oidc_verify._header_ttl(_R({"Expires": "Thu, 01 Jan 1970 00:00:00 GMT"})) == 0
+    assert oidc_verify._header_ttl(_R({})) is None
+
+
+def test_stale_discovery_served_while_revalidating(discovery, monkeypatch):
+    calls, responses, response = discovery
+    responses.append(response({"jwks_uri": "https://ehr.example.org/old"}, {"Cache-Control": "max-age=0"}))
+    oidc_verify._refresh(ISS)  # max-age=0 -> not cached
+    assert oidc_verify._discovery_cache == {}
+
+    responses[:] = [response({"jwks_uri": "https://ehr.example.org/old"})]
+    discover_jwks_uri(ISS)
+    entry = oidc_verify._discovery_cache[ISS]
+    oidc_verify._discovery_cache[ISS] = oidc_verify._Discovery(entry.jwks_uri, 0, entry.stale_until)
+
+    started = []
+    monkeypatch.setattr(oidc_verify.threading, "Thread", lambda **kwargs: started.append(kwargs) or _NoThread())
+    responses[:] = [response({"jwks_uri": "https://ehr.example.org/new"})]
+    assert discover_jwks_uri(ISS) == "https://ehr.example.org/old"
+    assert discover_jwks_uri(ISS) == "https://ehr.example.org/old"
+    # One revalidation at a time; running it swaps in the new document.
+    assert len(started) == 1
+    started[0]["target"](*started[0]["args"])
+    assert discover_jwks_uri(ISS) == "https://ehr.example.org/new"
+
+
+def test_expired_discovery_is_fallback_on_error(discovery):
+    calls, responses, response = discovery
+    responses.append(response({"jwks_uri": "https://ehr.example.org/jwks"}))
+    discover_jwks_uri(ISS)
+    oidc_verify._discovery_cache[ISS] = oidc_verify._Discovery("https://ehr.example.org/jwks", 0, 0)
+    responses[:] = [response({}, ok=False)]
+    assert discover_jwks_uri(ISS) == "https://ehr.example.org/jwks"
+
+
+def test_prewarm_discovers_trusted_issuers(discovery, monkeypatch):
+    _, responses, response = discovery
+    responses.append(response({"jwks_uri": "https://ehr.example.org/jwks"}))
+    fetched = []
+
+    class _Client:
+        def __init__(self, uri):
+            self.uri = uri
+
+        def get_jwk_set(self):
+            fetched.append(self.uri)
+
+    monkeypatch.setattr(oidc_verify, "_jwk_client", _Client)
+    monkeypatch.setattr(oidc_verify, "discover_jwks_uri", discover_jwks_uri)  # undo the autouse stub
+    assert oidc_verify.prewarm_discovery([ISS]) == 1
+    assert fetched == ["https://ehr.example.org/jwks"] and ISS in oidc_verify._discovery_cache
+
+
+class _NoThread:
+    def start(self):
+        pass
+
+
 def test_http_jwks_uri_rejected(monkeypatch):
     """A jwks_uri that uses http:// (not https://) must be rejected."""
 
@@ -135,7 +237,7 @@ def test_http_jwks_uri_rejected(monkeypatch):
         def json(self):
             return {"jwks_uri": "http://ehr.example.org/jwks"}
 
-    monkeypatch.setattr(requests, "get", lambda url, **kwargs: _FakeResponse())
+    monkeypatch.setattr(oidc_verify._session, "get", lambda url, **kwargs: _FakeResponse())
     with pytest.raises(IdTokenError) as e:
         discover_jwks_uri(ISS)
     assert e.value.status_code == 502
@@ -150,7 +252,7 @@ def test_non_json_discovery_rejected(monkeypatch):
         def json(self):
             raise ValueError("not json")
 
-    monkeypatch.setattr(requests, "get", lambda url, **kwargs: _FakeResponse())
+    monkeypatch.setattr(oidc_verify._session, "get", lambda url, **kwargs: _FakeResponse())
     with pytest.raises(IdTokenError) as e:
         discover_jwks_uri(ISS)
     assert e.value.status_code == 502
@@ -0,0 +1,91 @@
+"""Process-wide compiled OMH validator cache (core.utils.get_schema_validator).
+
+Observation.clean() validates every save against the header and per-code body schemas; the
+validators are compiled once against the preloaded registry and reused until the schema
+directories change or the cache is cleared explicitly.
+"""
+
+import shutil
+from dataclasses import replace
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from jsonschema import ValidationError
+
+from core.utils import (
+    clear_schema_validator_cache,
+    get_schema_registry,
+    get_schema_validator,
+    omh_body_schema_path,
+)
+
+HEADER_SCHEMA = settings.DATA_DIR_PATH.schemas_metadata / "header-1.0.json"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_schema_validator_cache()
+    yield
+    clear_schema_validator_cache()
+
+
+def _body(value=129):
+    return {
+        "blood_glucose": {"unit": "mg/dL", "value": value},
+        "effective_time_frame": {"date_time": "2024-01-01T00:00:00Z"},
+    }
+
+
+def test_validator_is_compiled_once_per_schema():
+    path = omh_body_schema_path("omh:blood-glucose:4.0")
+    assert path.name == "schema-omh_blood-glucose_4-0.json"
+    assert get_schema_validator(path) is get_schema_validator(path)
+    assert get_schema_validator(HEADER_SCHEMA) is not get_schema_validator(path)
+
+
+def test_cached_validator_resolves_refs_and_rejects_invalid():
+    validator = get_schema_validator(omh_body_schema_path("omh:blood-glucose:4.0"))
+    validator.validate(_body())
+    bad = _body()
+    bad["blood_glucose"]["unit"] = "MGDL"
+    with pytest.raises(ValidationError):
+        validator.validate(bad)
+
+
+def test_registry_is_shared_across_validators():
+    registry = get_schema_registry()
+    get_schema_validator(HEADER_SCHEMA)
+    assert get_schema_registry() is registry
+
+
+def test_clear_rebuilds_validators():
+    first = get_schema_validator(HEADER_SCHEMA)
+    clear_schema_validator_cache()
+    assert get_schema_validator(HEADER_SCHEMA) is not first
+
+
+def test_missing_schema_raises_and_is_not_cached():
+    path = omh_body_schema_path("omh:not-a-schema:1.0")
+    with pytest.raises(FileNotFoundError):
+        get_schema_validator(path)
+
+
+def test_schema_dir_change_invalidates_cache(tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(settings.DATA_DIR_PATH.data_dir / "omh/json-schemas", data_dir / "omh/json-schemas")
+    data_dir_path = replace(
+        settings.DATA_DIR_PATH,
+        data_dir=data_dir,
+        schemas_metadata=data_dir / "omh/json-schemas/metadata",
+        schemas_data=data_dir / "omh/json-schemas/data",
+        schemas_utility=data_dir / "omh/json-schemas/utility",
+    )
+    with override_settings(DATA_DIR_PATH=data_dir_path):
+        path = omh_body_schema_path("omh:blood-glucose:4.0")
+        first = get_schema_validator(path)
+        assert get_schema_validator(path) is first
+
+        # Adding a schema file bumps the directory mtime, so the next lookup rebuilds.
+        (data_dir_path.schemas_data / "schema-omh_extra_1-0.json").write_text('{"type": "object"}')
+        assert get_schema_validator(path) is not first